@@ -0,0 +1,619 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import json
+import yaml
+import math
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import concurrent.futures
+import multiprocessing
+try:
+  import resource
+except ImportError:
+  resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import compileClaProgram
+from compileClaProgram import BusModel, ClaCompiler, ClaProgram, PhaseProfiler, loadCsrMap, writeOutputFiles
+
+
+###################################
+# Global vars
+###################################
+g_defaultSizes = [100, 1000, 10000, 100000]
+#Sizes only benchmarked with --large, since they take a few minutes and over 1 GiB of memory
+g_largeSizes = [1000000]
+g_defaultBaselinePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+#Names of the generated struct buses and their fields
+g_fieldNames = ["valid", "ready", "addr", "data", "id", "opcode", "status", "size", "hdr", "payload", "meta", "credit", "state", "err", "tag", "qos"]
+g_busNames = ["req", "rsp", "cmd", "wr", "rd", "snp", "evt", "fifo", "ctl", "pipe"]
+g_busWidths = [8, 16, 24, 32, 48, 64]
+
+#Wall time and memory differences below these floors are treated as noise when comparing against the baseline
+g_comparedMetrics = {"Wall Time (s)": 0.005, "Peak Memory (B)": 64*1024}
+
+
+###################################
+# Input Generation
+###################################
+def getBusDict(name, busType, lowerIndex, width, laneWidth, subBuses=[]):
+  upperIndex = lowerIndex + width - 1
+  return {
+    "Bit Width": width,
+    "Bus Lower Index": lowerIndex,
+    "Bus Upper Index": upperIndex,
+    "Lane Lower": lowerIndex // laneWidth,
+    "Lane Lower Index": lowerIndex % laneWidth,
+    "Lane Upper": upperIndex // laneWidth,
+    "Lane Upper Index": upperIndex % laneWidth,
+    "Name": name,
+    "Sub Buses": subBuses,
+    "Type": busType
+  }
+
+def generateStructBus(rng, name, lowerIndex, width, laneWidth, structDepth):
+  '''
+  Returns a bus dict for a struct of the given width, with fields nested up to structDepth levels, and the number of
+  signals it flattens to
+  '''
+  if (structDepth == 0) or (width < 2) or ((structDepth == 1) and (rng.random() < 0.25)):
+    return getBusDict(name, "logic [{}:0]".format(width-1), lowerIndex, width, laneWidth), 1
+
+  fieldCount = rng.randint(2, min(4, width))
+  fieldOffsets = [0] + sorted(rng.sample(range(1, width), fieldCount-1)) + [width]
+  fieldNames = rng.sample(g_fieldNames, fieldCount)
+
+  subBuses = []
+  signalCount = 1
+  for fieldIndx in range(fieldCount):
+    fieldWidth = fieldOffsets[fieldIndx+1] - fieldOffsets[fieldIndx]
+    subBus, subSignalCount = generateStructBus(rng, fieldNames[fieldIndx], lowerIndex+fieldOffsets[fieldIndx], fieldWidth, laneWidth, structDepth-1)
+    subBuses.append(subBus)
+    signalCount += subSignalCount
+
+  #Buses are listed from the upper bit down, like the generateClaDoc.py output
+  subBuses.reverse()
+  return getBusDict(name, "{}_t".format(name), lowerIndex, width, laneWidth, subBuses), signalCount
+
+def getMaxInputLanes(csrMap, laneWidth):
+  '''
+  Returns the number of input lanes a debug mux can select from with the CDbgMuxSel select fields
+  '''
+  selectField = csrMap.getRegister("CDbgMuxSel").getField("Muxselseg0")
+  return (compileClaProgram.g_claDebugInputWidth // laneWidth) + (1 << selectField.width) - 1
+
+def getMaxFanIn(csrMap, laneWidth):
+  '''
+  Returns the number of 64 bit mux outputs a debug mux can take as inputs
+  '''
+  return getMaxInputLanes(csrMap, laneWidth) // (compileClaProgram.g_claDebugInputWidth // laneWidth)
+
+def generateBusInfo(signalCount, laneWidths=[16], structDepth=3, leafLanes=None, muxDepth=None, seed=0, csrMap=None):
+  '''
+  Returns a debug bus info dict (in the generateClaDoc.py format) with at least signalCount flattened signals. Leaf muxes
+  take leafLanes lanes of nested struct buses, and are combined by a tree of muxes with muxDepth levels (the minimum
+  number of levels when None). laneWidths are the lane widths of each mux level, starting from the leaf muxes
+  '''
+  rng = random.Random(seed)
+  if (csrMap is None):
+    csrMap = loadCsrMap()
+  dbmIdField = csrMap.getRegister("CDbgMuxSel").getField("DbmId")
+  muxesPerCsr = 1 << dbmIdField.width
+
+  def getLaneWidth(level):
+    return laneWidths[level % len(laneWidths)]
+
+  #Leaf muxes
+  leafLaneWidth = getLaneWidth(0)
+  if (leafLanes is None):
+    leafLanes = min(32, getMaxInputLanes(csrMap, leafLaneWidth))
+  if (leafLanes > getMaxInputLanes(csrMap, leafLaneWidth)):
+    raise ValueError("{} leaf mux lanes requested. A mux with {} bit lanes can only select from {} lanes".format(leafLanes, leafLaneWidth, getMaxInputLanes(csrMap, leafLaneWidth)))
+
+  levels = [[]]
+  totalSignals = 0
+  while (totalSignals < signalCount):
+    busList = []
+    lowerIndex = 0
+    while (lowerIndex < leafLanes*leafLaneWidth) and (totalSignals < signalCount):
+      width = min(rng.choice(g_busWidths), leafLanes*leafLaneWidth - lowerIndex)
+      busName = "m{}_{}{}".format(len(levels[0]), rng.choice(g_busNames), len(busList))
+      busDict, busSignalCount = generateStructBus(rng, busName, lowerIndex, width, leafLaneWidth, structDepth)
+      busList.append(busDict)
+      totalSignals += busSignalCount
+      lowerIndex += width
+    busList.reverse()
+    levels[0].append(busList)
+
+  #Upper mux levels. Each mux takes the 64 bit outputs of fanIn muxes from the level below
+  leafCount = len(levels[0])
+  if (muxDepth is None):
+    fanIns = []
+    muxCount = leafCount
+    while (muxCount > 1):
+      fanIns.append(getMaxFanIn(csrMap, getLaneWidth(len(fanIns)+1)))
+      muxCount = math.ceil(muxCount / fanIns[-1])
+  else:
+    if (muxDepth < 1) or ((muxDepth == 1) and (leafCount > 1)):
+      raise ValueError("{} leaf muxes are needed for {} signals. Use more than 1 mux level".format(leafCount, signalCount))
+    fanIn = 2
+    while (fanIn ** (muxDepth-1) < leafCount):
+      fanIn += 1
+    fanIns = [fanIn] * (muxDepth-1)
+
+    for level in range(1, muxDepth):
+      if (fanIn > getMaxFanIn(csrMap, getLaneWidth(level))):
+        raise ValueError("{} leaf muxes are needed for {} signals, but a mux with {} bit lanes only has {} inputs. Use more than {} mux levels".format(leafCount, signalCount, getLaneWidth(level), getMaxFanIn(csrMap, getLaneWidth(level)), muxDepth))
+
+  #Name the muxes from the CLA down, then connect each level to the one above it
+  muxNames = []
+  levelSizes = [leafCount]
+  for fanIn in fanIns:
+    levelSizes.append(math.ceil(levelSizes[-1] / fanIn))
+
+  topLevel = len(levelSizes) - 1
+  for level in range(len(levelSizes)):
+    if (level == topLevel):
+      muxNames.append(["debug_bus_mux_l{}".format(level)])
+    else:
+      muxNames.append(["debug_bus_mux_l{}_{}".format(level, indx) for indx in range(levelSizes[level])])
+
+  def getMuxOutput(level, indx):
+    if (level == topLevel):
+      return "dbm_out"
+    return "dbm_out_l{}_{}".format(level, indx)
+
+  for level in range(1, len(levelSizes)):
+    laneWidth = getLaneWidth(level)
+    fanIn = fanIns[level-1]
+    levels.append([])
+    for indx in range(levelSizes[level]):
+      busList = []
+      for childIndx in range(indx*fanIn, min((indx+1)*fanIn, levelSizes[level-1])):
+        lowerIndex = (childIndx - indx*fanIn) * compileClaProgram.g_claDebugInputWidth
+        busList.append(getBusDict(getMuxOutput(level-1, childIndx), "logic [{}:0]".format(compileClaProgram.g_claDebugInputWidth-1), lowerIndex, compileClaProgram.g_claDebugInputWidth, laneWidth))
+      busList.reverse()
+      levels[level].append(busList)
+
+  #Mux ids are unique per select CSR, so every DbmId worth of muxes gets its own CSR
+  debugMuxInstances = {}
+  muxIndx = 0
+  for level in range(len(levels)):
+    for indx in range(len(levels[level])):
+      debugMuxInstances[muxNames[level][indx]] = {
+        "DEBUG_MUX_ID": muxIndx % muxesPerCsr,
+        "DbgMuxSelCsr": "CrCsrCdbgmuxsel{}".format(muxIndx // muxesPerCsr),
+        "Debug Bus Inputs": levels[level][indx],
+        "Debug Bus Output": getMuxOutput(level, indx),
+        "LANE_WIDTH": getLaneWidth(level)
+      }
+      muxIndx += 1
+
+  return {"CLA Input": "dbm_out", "Debug Mux Instances": debugMuxInstances}
+
+def getLeafSignals(busList, parentBus=None):
+  '''
+  Returns (name, width, lower lane, upper lane) of every signal in busList without sub buses
+  '''
+  leafSignals = []
+  for busDict in busList:
+    signalName = busDict["Name"]
+    if (parentBus):
+      signalName = "{}.{}".format(parentBus, signalName)
+
+    if (len(busDict["Sub Buses"]) == 0):
+      leafSignals.append((signalName, busDict["Bit Width"], busDict["Lane Lower"], busDict["Lane Upper"]))
+    else:
+      leafSignals += getLeafSignals(busDict["Sub Buses"], signalName)
+
+  return leafSignals
+
+def generateProgram(busInfo, seed=0):
+  '''
+  Returns a CLA program dict that uses every trigger type. All of its signals come from the lanes of one leaf mux
+  that fit through the mux tree at once
+  '''
+  rng = random.Random(seed)
+  muxOutputs = set([muxInfo["Debug Bus Output"] for muxInfo in busInfo["Debug Mux Instances"].values()])
+  leafMuxes = []
+  for muxName, muxInfo in busInfo["Debug Mux Instances"].items():
+    if not any([(busDict["Name"] in muxOutputs) for busDict in muxInfo["Debug Bus Inputs"]]):
+      leafMuxes.append(muxName)
+
+  #Signals must fit in the output lanes of the leaf mux, and each must be contained in those lanes
+  muxInfo = busInfo["Debug Mux Instances"][rng.choice(leafMuxes)]
+  leafSignals = getLeafSignals(muxInfo["Debug Bus Inputs"])
+  outputLanes = compileClaProgram.g_claDebugInputWidth // muxInfo["LANE_WIDTH"]
+  inputLanes = sorted(set([signal[2] for signal in leafSignals if (signal[2] == signal[3])]))
+  selectedLanes = set(rng.sample(inputLanes, min(outputLanes, len(inputLanes))))
+  signals = [signal for signal in leafSignals if (signal[2] in selectedLanes) and (signal[3] in selectedLanes)]
+  multiBitSignals = [signal for signal in signals if (signal[1] > 1)] or signals
+
+  def getSignal(signalList, width=None):
+    name, signalWidth = rng.choice(signalList)[:2]
+    if (width is None) or (width >= signalWidth):
+      return name, signalWidth
+    return "{}[{}:0]".format(name, width-1), width
+
+  #Hex values are padded, since str2int() only treats strings longer than 3 characters as hex
+  def getValue(width):
+    return "0x{:02x}".format(rng.randrange(1 << width))
+
+  matchSignals = [getSignal(signals, 16) for indx in range(2)]
+  notMatchSignal = getSignal(signals, 16)
+  posedgeSignal = getSignal(signals)[0]
+  negedgeSignal = getSignal(signals)[0]
+  transitionSignal = getSignal(multiBitSignals, 4)
+  countOnesSignal = getSignal(multiBitSignals, 8)
+  anyChangeSignals = [getSignal(signals)[0] for indx in range(2)]
+
+  return {
+    "COUNTERS": ["MATCH_COUNT", "TIMEOUT_COUNT", "TICK_COUNT"],
+    "CUSTOM_ACTIONS": {"BENCH_ACTION": 0x1},
+    "START_NODE": "IDLE",
+    "NODES": {
+      "IDLE": {
+        "ARM": {
+          "event_triggers": {"start": ["ALWAYS_ON"]},
+          "event_logical_op": "start",
+          "actions": ["START_TRACE", "AUTO_INCREMENT TICK_COUNT"],
+          "next_state_node": "MATCH"
+        }
+      },
+      "MATCH": {
+        "DETECT_MATCH": {
+          "event_triggers": {
+            "match": ["{} == {}".format(name, getValue(width)) for name, width in matchSignals],
+            "notMatch": ["{} != {}".format(notMatchSignal[0], getValue(notMatchSignal[1]))],
+            "rise": ["posedge {}[0]".format(posedgeSignal)]
+          },
+          "event_logical_op": "(match && notMatch) || rise",
+          "actions": ["INCREMENT MATCH_COUNT", "TRACE_PULSE"],
+          "snapshot_signals": [matchSignals[0][0]],
+          "next_state_node": "CHANGE"
+        },
+        "DETECT_FALL": {
+          "event_triggers": {
+            "fall": ["negedge {}[0]".format(negedgeSignal)],
+            "external": ["XTRIGGER_0"]
+          },
+          "event_logical_op": "fall & !external",
+          "actions": ["CLEAR TIMEOUT_COUNT"],
+          "custom_actions": ["BENCH_ACTION"],
+          "next_state_node": "MATCH"
+        }
+      },
+      "CHANGE": {
+        "DETECT_CHANGE": {
+          "event_triggers": {
+            "change": ["anychange({})".format(name) for name in anyChangeSignals],
+            "transition": ["transition({}, {}, {})".format(transitionSignal[0], getValue(transitionSignal[1]), getValue(transitionSignal[1]))],
+            "ones": ["countones({}) == {}".format(countOnesSignal[0], rng.randint(0, countOnesSignal[1]))]
+          },
+          "event_logical_op": "change || (transition && ones)",
+          "actions": ["CLOCK_HALT", "STOP_TRACE"],
+          "next_state_node": "COUNT"
+        }
+      },
+      "COUNT": {
+        "COUNT_EQUAL": {
+          "event_triggers": {"equal": ["MATCH_COUNT == {}".format(rng.randint(1, 255))]},
+          "event_logical_op": "equal",
+          "actions": ["DEBUG_INTERRUPT", "XTRIGGER_1"],
+          "next_state_node": "IDLE"
+        },
+        "COUNT_TIMEOUT": {
+          "event_triggers": {
+            "timeout": ["TIMEOUT_COUNT > {}".format(rng.randint(1, 255))],
+            "tick": ["PERIOD_TICK"],
+            "early": ["TICK_COUNT < {}".format(rng.randint(1, 255))]
+          },
+          "event_logical_op": "(timeout && tick) || early",
+          "actions": ["STOP_AUTO_INCREMENT TICK_COUNT", "INCREMENT TIMEOUT_COUNT"],
+          "next_state_node": "MATCH"
+        },
+        "EXTERNAL": {
+          "event_triggers": {"external": ["XTRIGGER_1"]},
+          "event_logical_op": "external",
+          "actions": ["TOGGLE_GPIO"],
+          "next_state_node": "IDLE"
+        }
+      }
+    }
+  }
+
+def writeBenchmarkInputs(signalCount, inputDir, laneWidths=[16], structDepth=3, leafLanes=None, muxDepth=None, programCount=4, seed=0):
+  '''
+  Writes the generated bus info json and programCount program yamls for signalCount signals to inputDir.
+  Returns the bus info path and the program paths
+  '''
+  if not (os.path.exists(inputDir)):
+    os.makedirs(inputDir)
+
+  busInfo = generateBusInfo(signalCount, laneWidths, structDepth, leafLanes, muxDepth, seed)
+  busInfoPath = os.path.join(inputDir, "bench_debug_bus_info_{}.json".format(signalCount))
+  busInfoFile = open(busInfoPath, "w")
+  json.dump(busInfo, busInfoFile, separators=(",", ":"))
+  busInfoFile.close()
+
+  programPaths = []
+  for programIndx in range(programCount):
+    programPath = os.path.join(inputDir, "bench_cla_program_{}_{}.yaml".format(signalCount, programIndx))
+    programFile = open(programPath, "w")
+    yaml.safe_dump(generateProgram(busInfo, seed+programIndx), programFile, sort_keys=False)
+    programFile.close()
+    programPaths.append(programPath)
+
+  return busInfoPath, programPaths
+
+
+###################################
+# Benchmark
+###################################
+def getMaxRss():
+  if (resource is None):
+    return None
+  maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if (sys.platform == "darwin"):
+    return maxRss
+  return maxRss * 1024
+
+def getCpuModel():
+  try:
+    cpuInfoFile = open("/proc/cpuinfo", "r")
+    try:
+      for line in cpuInfoFile:
+        if (line.startswith("model name")):
+          return line.split(":", 1)[1].strip()
+    finally:
+      cpuInfoFile.close()
+  except OSError:
+    pass
+
+  return platform.processor()
+
+def getHostInfo():
+  '''
+  Returns the machine the benchmark runs on. Timings are only comparable between runs on the same host
+  '''
+  return {
+    "Hostname": platform.node(),
+    "Machine": platform.machine(),
+    "CPU": getCpuModel(),
+    "CPU Count": os.cpu_count()
+  }
+
+def runBenchmarkPass(busInfoPath, programPaths, outputDir, traceMemory=False):
+  '''
+  Loads the bus info and compiles every program the same way as compileClaProgram.py (without the bus cache), and
+  returns the profile dict. The whole compile is recorded as the "endToEnd" phase. Intended to run in a fresh process
+  '''
+  if (traceMemory):
+    tracemalloc.start()
+
+  profile = PhaseProfiler()
+  with profile.phase("endToEnd"):
+    with profile.phase("loadBusModel"):
+      busModel = BusModel.fromJsonFile(busInfoPath)
+    profile.merge(busModel.profile)
+
+    with profile.phase("loadCsrMap"):
+      csrMap = loadCsrMap()
+    compiler = ClaCompiler(busModel, csrMap)
+
+    for programPath in programPaths:
+      with profile.phase("ClaProgram.fromYamlFile"):
+        program = ClaProgram.fromYamlFile(programPath)
+      with profile.phase("compileCsrValues"):
+        csrValues = compiler.compile(program)
+      writeOutputFiles(csrValues, os.path.join(outputDir, "value_dump.{}".format(os.path.basename(programPath))))
+      profile.merge(csrValues.profile)
+
+  if (traceMemory):
+    tracemalloc.stop()
+
+  profileDict = profile.getDict()
+  profileDict["Max RSS (B)"] = getMaxRss()
+  return profileDict
+
+def runInFreshProcess(function, *args):
+  '''
+  Runs function in a new interpreter, so module level caches and memory from earlier runs do not skew the measurement
+  '''
+  with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+    return executor.submit(function, *args).result()
+
+def runBenchmark(signalCount, workDir, laneWidths=[16], structDepth=3, leafLanes=None, muxDepth=None, programCount=4, seed=0, traceMemory=True):
+  '''
+  Generates the inputs for signalCount signals and returns the timing, peak memory, and counters of compiling them
+  '''
+  inputDir = os.path.join(workDir, str(signalCount))
+  busInfoPath, programPaths = writeBenchmarkInputs(signalCount, inputDir, laneWidths, structDepth, leafLanes, muxDepth, programCount, seed)
+  busInfo = json.load(open(busInfoPath, "r"))
+  muxCount = len(busInfo["Debug Mux Instances"])
+  muxLevels = len(set([muxName.split("_")[3] for muxName in busInfo["Debug Mux Instances"]]))
+  del busInfo
+
+  profileDict = runInFreshProcess(runBenchmarkPass, busInfoPath, programPaths, inputDir)
+
+  #Timing comes from a separate pass, since tracemalloc slows down allocation heavy phases
+  if (traceMemory):
+    memoryDict = runInFreshProcess(runBenchmarkPass, busInfoPath, programPaths, inputDir, True)
+    for phaseName, phaseDict in memoryDict["Phases"].items():
+      profileDict["Phases"][phaseName]["Peak Memory (B)"] = phaseDict["Peak Memory (B)"]
+
+  return {
+    "Signals": profileDict["Counters"]["Flattened Signals"],
+    "Debug Muxes": muxCount,
+    "Mux Levels": muxLevels,
+    "Programs": programCount,
+    "Bus Info Size (B)": os.path.getsize(busInfoPath),
+    "Max RSS (B)": profileDict["Max RSS (B)"],
+    "Phases": profileDict["Phases"],
+    "Counters": profileDict["Counters"]
+  }
+
+def compareToBaseline(results, baseline, tolerance):
+  '''
+  Returns (size, phase, metric, baseline value, new value) for every compared metric, and the rows that are more than
+  tolerance (a fraction) worse than the baseline
+  '''
+  rows = []
+  regressions = []
+  for sizeStr, sizeResults in results["Benchmarks"].items():
+    if not (sizeStr in baseline["Benchmarks"]):
+      continue
+    baseResults = baseline["Benchmarks"][sizeStr]
+    if (baseResults["Signals"] != sizeResults["Signals"]) or (baseResults["Debug Muxes"] != sizeResults["Debug Muxes"]):
+      print("WARNING: Generated inputs for {} signals do not match the baseline. Rerun with the baseline generator options".format(sizeStr))
+      continue
+
+    for phaseName, phaseDict in sizeResults["Phases"].items():
+      if not (phaseName in baseResults["Phases"]):
+        continue
+      for metric, noiseFloor in g_comparedMetrics.items():
+        if not (metric in phaseDict) or not (metric in baseResults["Phases"][phaseName]):
+          continue
+        baseValue = baseResults["Phases"][phaseName][metric]
+        newValue = phaseDict[metric]
+        row = (sizeStr, phaseName, metric, baseValue, newValue)
+        rows.append(row)
+        if ((newValue - baseValue) > noiseFloor) and (newValue > baseValue*(1+tolerance)):
+          regressions.append(row)
+
+  return rows, regressions
+
+def formatMetric(metric, value):
+  if ("(B)" in metric):
+    return "{:.2f} MiB".format(value / (1024*1024))
+  return "{:.4f} s".format(value)
+
+def printResults(results, rows=[], regressions=[], regressionLabel="REGRESSION"):
+  compared = {}
+  for row in rows:
+    compared[row[:3]] = row
+
+  for sizeStr, sizeResults in results["Benchmarks"].items():
+    print("\n{} signals ({} debug muxes, {} mux levels, {} programs)".format(sizeResults["Signals"], sizeResults["Debug Muxes"], sizeResults["Mux Levels"], sizeResults["Programs"]))
+    print("  {:<32} {:>12} {:>14} {:>18}".format("Phase", "Wall Time", "Peak Memory", "vs Baseline"))
+    for phaseName, phaseDict in sorted(sizeResults["Phases"].items(), key=lambda item: -item[1]["Wall Time (s)"]):
+      peakMemory = "-"
+      if ("Peak Memory (B)" in phaseDict):
+        peakMemory = formatMetric("Peak Memory (B)", phaseDict["Peak Memory (B)"])
+
+      changeList = []
+      for metric in g_comparedMetrics:
+        row = compared.get((sizeStr, phaseName, metric))
+        if (row is None) or (row[3] == 0):
+          continue
+        changeStr = "{:+.0f}%".format(100.0*(row[4]-row[3])/row[3])
+        if (row in regressions):
+          changeStr += "!"
+        changeList.append(changeStr)
+
+      print("  {:<32} {:>12} {:>14} {:>18}".format(phaseName, formatMetric("Wall Time (s)", phaseDict["Wall Time (s)"]), peakMemory, " / ".join(changeList)))
+
+  for row in regressions:
+    print("{}: {} signals, {} {}: {} -> {}".format(regressionLabel, row[0], row[1], row[2], formatMetric(row[2], row[3]), formatMetric(row[2], row[4])))
+
+
+###################################
+# Main
+###################################
+def main():
+  #Get args
+  parser = argparse.ArgumentParser(description='(Version {}) Generate synthetic debug bus info and CLA programs, and benchmark compileClaProgram.py on them'.format(compileClaProgram.g_program_version))
+  parser.add_argument("--sizes", type=int, nargs="+", default=g_defaultSizes, help="Number of debug bus signals of each benchmark. Defaults to {}".format(" ".join([str(size) for size in g_defaultSizes])))
+  parser.add_argument("--large", action="store_true", help="Also benchmark {} signals. Takes a few minutes and over 1 GiB of memory".format(" ".join([str(size) for size in g_largeSizes])))
+  parser.add_argument("--laneWidths", type=int, nargs="+", default=[16], help="Lane width of each mux level, starting from the leaf muxes. Repeats for deeper trees. Defaults to 16")
+  parser.add_argument("--structDepth", type=int, default=3, help="Nesting depth of the generated struct buses")
+  parser.add_argument("--leafLanes", type=int, help="Number of input lanes of each leaf mux. Defaults to 32, or the number of lanes the mux select CSR can address")
+  parser.add_argument("--muxDepth", type=int, help="Number of mux levels between the leaf muxes and the CLA (including both). Defaults to the fewest levels that fit")
+  parser.add_argument("--programs", type=int, default=4, help="Number of CLA programs compiled at each size")
+  parser.add_argument("--seed", type=int, default=0, help="Seed for the input generator")
+  parser.add_argument("--workDir", type=str, help="Directory for the generated inputs and compiled outputs. Defaults to a temporary directory that is removed afterwards")
+  parser.add_argument("--generateOnly", action="store_true", help="Only write the generated bus info and programs to --workDir")
+  parser.add_argument("--noMemory", action="store_true", help="Skip the tracemalloc pass that measures the peak memory of each phase")
+  parser.add_argument("--outputPath", type=str, default="benchmark_results.json", help="Output path for the benchmark results json")
+  parser.add_argument("--baselinePath", type=str, default=g_defaultBaselinePath, help="Results json to compare against. Defaults to benchmark_baseline.json next to this script")
+  parser.add_argument("--updateBaseline", action="store_true", help="Write the results to --baselinePath instead of comparing against it")
+  parser.add_argument("--tolerance", type=float, default=0.25, help="Fraction a phase may be slower (or use more memory) than the baseline before it is reported as a regression")
+  args = parser.parse_args()
+  if (args.large):
+    args.sizes = args.sizes + [size for size in g_largeSizes if not (size in args.sizes)]
+
+  generatorArgs = {"laneWidths": args.laneWidths, "structDepth": args.structDepth, "leafLanes": args.leafLanes, "muxDepth": args.muxDepth, "programCount": args.programs, "seed": args.seed}
+  generatorInfo = {"Lane Widths": args.laneWidths, "Struct Depth": args.structDepth, "Leaf Lanes": args.leafLanes, "Mux Depth": args.muxDepth, "Programs": args.programs, "Seed": args.seed}
+
+  workDir = args.workDir
+  if (workDir is None):
+    if (args.generateOnly):
+      sys.exit("ERROR: --generateOnly requires --workDir")
+    workDir = tempfile.mkdtemp(prefix="cla_benchmark_")
+
+  try:
+    if (args.generateOnly):
+      for size in args.sizes:
+        busInfoPath, programPaths = writeBenchmarkInputs(size, os.path.join(workDir, str(size)), **generatorArgs)
+        print("Wrote \"{}\" and {} programs".format(busInfoPath, len(programPaths)))
+      return
+
+    results = {
+      "Compiler Version": compileClaProgram.g_program_version,
+      "Python Version": platform.python_version(),
+      "Platform": platform.platform(),
+      "Host": getHostInfo(),
+      "Generator": generatorInfo,
+      "Benchmarks": {}
+    }
+    for size in args.sizes:
+      print("Benchmarking {} signals".format(size))
+      results["Benchmarks"][str(size)] = runBenchmark(size, workDir, traceMemory=not args.noMemory, **generatorArgs)
+  except ValueError as e:
+    sys.exit("ERROR: {}".format(e))
+  finally:
+    if (args.workDir is None):
+      shutil.rmtree(workDir, ignore_errors=True)
+
+  if (args.updateBaseline):
+    outputFile = open(args.baselinePath, "w")
+    outputFile.write(json.dumps(results, indent=2))
+    outputFile.close()
+    printResults(results)
+    print("\nBaseline written to \"{}\"".format(args.baselinePath))
+    return
+
+  outputFile = open(args.outputPath, "w")
+  outputFile.write(json.dumps(results, indent=2))
+  outputFile.close()
+
+  rows = []
+  regressions = []
+  sameHost = False
+  if (os.path.exists(args.baselinePath)):
+    baseline = json.load(open(args.baselinePath, "r"))
+    if (baseline["Generator"] != generatorInfo):
+      print("WARNING: Baseline was generated with {}".format(baseline["Generator"]))
+    sameHost = (baseline.get("Host") == results["Host"]) and (baseline.get("Python Version") == results["Python Version"])
+    if not (sameHost):
+      print("WARNING: Baseline was recorded on {} with Python {}. Regressions are only reported as warnings".format(baseline.get("Host"), baseline.get("Python Version")))
+    rows, regressions = compareToBaseline(results, baseline, args.tolerance)
+  else:
+    print("WARNING: No baseline found at \"{}\"".format(args.baselinePath))
+
+  printResults(results, rows, regressions, "REGRESSION" if (sameHost) else "WARNING: Possible regression")
+  print("\nResults written to \"{}\"".format(args.outputPath))
+  if (len(regressions) > 0) and (sameHost):
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,238 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+
+
+###################################
+# Global vars
+###################################
+g_rdlDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "rtl", "mmr", "html")
+g_defaultCsrMapPaths = [os.path.join(g_rdlDir, "cla_csr.rdl"), os.path.join(g_rdlDir, "mcr_csr.rdl")]
+
+#The register offsets in the RDL and IP-XACT are 16x the APB byte addresses decoded by the generated
+#rtl/mmr/dfd_*_csr.sv blocks (CDbgClaCounter0Cfg @ 0x31000 is ADDR_CSR_CDBGCLACOUNTER0CFG = 'h3100)
+g_rdlAddressShift = 4
+
+#Strings are matched first so that "//" or "{" inside a desc is never taken as syntax
+g_rdlStripRegex = re.compile(r'"(?:[^"\\]|\\.)*"|/\*.*?\*/|//[^\n]*', re.DOTALL)
+g_rdlRegisterRegex = re.compile(r"\breg\s*\{((?:[^{}]|\{[^{}]*\})*)\}\s*(\w+)\s*@\s*(\w+)\s*;")
+g_rdlFieldRegex = re.compile(r"\bfield\s*\{([^{}]*)\}\s*(\w+)\s*\[\s*(\d+)\s*(?::\s*(\d+)\s*)?\]\s*(?:=\s*([\w']+)\s*)?;")
+g_rdlPropertyRegex = re.compile(r"\b(\w+)\s*=\s*(\w+)\s*;")
+
+g_ipxactNamespace = {"ipxact": "http://www.accellera.org/XMLSchema/IPXACT/1685-2014"}
+
+g_csrMapCache = {}
+
+
+class CsrMapError(Exception):
+  def __init__ (self, message, sourcePath=None):
+    super().__init__(message)
+    self.message = message
+    self.sourcePath = sourcePath
+
+  def __str__(self):
+    if (self.sourcePath is None):
+      return self.message
+    return "{}: {}".format(self.sourcePath, self.message)
+
+
+def getCsrKey(name):
+  '''
+  Returns the lookup key of a register name. The compiler drops the C prefix of the RDL names
+  (dbg_node0_eap0 = CDbgNode0Eap0), and the bus info prefixes mux select CSRs with CrCsr (CrCsrCdbgmuxsel = CDbgMuxSel)
+  '''
+  key = name.replace("_", "").lower()
+  if (key.startswith("crcsr")):
+    key = key[len("crcsr"):]
+  if (key.startswith("cdbg")):
+    key = key[1:]
+  return key
+
+def getFieldKey(name):
+  return name.replace("_", "").lower()
+
+def parseNumber(valueStr):
+  '''
+  Parses an RDL/IP-XACT number (0x31000, 'h31000, 64'h0, or decimal)
+  '''
+  valueStr = valueStr.strip().replace("_", "")
+  if ("'" in valueStr):
+    valueStr = valueStr.split("'", 1)[1]
+    radix = {"h": 16, "d": 10, "o": 8, "b": 2}[valueStr[0].lower()]
+    return int(valueStr[1:], radix)
+  return int(valueStr, 0)
+
+
+class CsrField:
+  def __init__ (self, name, offset, width, reset=0, access=None):
+    self.name = name
+    self.offset = offset
+    self.width = width
+    self.reset = reset
+    self.access = access
+
+  def getMask(self):
+    return ((1 << self.width) - 1) << self.offset
+
+  def __repr__(self):
+    return "{}[{}:{}]".format(self.name, self.offset+self.width-1, self.offset)
+
+
+class CsrRegister:
+  def __init__ (self, name, address, width=64, sourcePath=None):
+    self.name = name
+    self.address = address
+    self.width = width
+    self.sourcePath = sourcePath
+    self.fields = []
+    self.fieldIndex = {}
+
+  def addField(self, csrField):
+    if ((csrField.offset + csrField.width) > self.width):
+      raise CsrMapError("Field {}.{} does not fit in a {} bit register".format(self.name, repr(csrField), self.width), self.sourcePath)
+    for otherField in self.fields:
+      if (otherField.getMask() & csrField.getMask()):
+        raise CsrMapError("Fields {}.{} and {}.{} overlap".format(self.name, repr(otherField), self.name, repr(csrField)), self.sourcePath)
+
+    self.fields.append(csrField)
+    self.fieldIndex[getFieldKey(csrField.name)] = csrField
+
+    #Reserved fields are numbered by bit range in the RDL (Rsvd158 = Rsvd[15:8]). Allow a single one to be looked up as "rsvd"
+    if (re.fullmatch(r"rsvd\d*", getFieldKey(csrField.name)) and not ("rsvd" in self.fieldIndex)):
+      self.fieldIndex["rsvd"] = csrField
+
+  def getField(self, name):
+    try:
+      return self.fieldIndex[getFieldKey(name)]
+    except KeyError:
+      raise CsrMapError("Register {} has no field named \"{}\"".format(self.name, name), self.sourcePath)
+
+  def getResetValue(self):
+    resetValue = 0
+    for csrField in self.fields:
+      resetValue |= csrField.reset << csrField.offset
+    return resetValue
+
+
+class CsrMap:
+  '''
+  Register layouts and APB addresses, parsed from the RDL or IP-XACT register descriptions in rtl/mmr/html.
+  Registers are indexed by their RDL name and by the names used in compiled CLA programs
+  '''
+  def __init__ (self):
+    self.registers = {}
+    self.registerIndex = {}
+    self.addressIndex = {}
+
+  @classmethod
+  def fromFiles(cls, csrMapPaths):
+    csrMap = cls()
+    for csrMapPath in csrMapPaths:
+      if (os.path.splitext(csrMapPath)[1].lower() in [".ipxact", ".xml"]):
+        csrMap.parseIpxactFile(csrMapPath)
+      else:
+        csrMap.parseRdlFile(csrMapPath)
+    return csrMap
+
+  def addRegister(self, csrRegister):
+    csrKey = getCsrKey(csrRegister.name)
+    if (csrKey in self.registerIndex):
+      raise CsrMapError("Register {} is defined more than once".format(csrRegister.name), csrRegister.sourcePath)
+    if (csrRegister.address in self.addressIndex):
+      raise CsrMapError("Registers {} and {} are both mapped to address {}".format(self.addressIndex[csrRegister.address].name, csrRegister.name, hex(csrRegister.address)), csrRegister.sourcePath)
+
+    self.registers[csrRegister.name] = csrRegister
+    self.registerIndex[csrKey] = csrRegister
+    self.addressIndex[csrRegister.address] = csrRegister
+
+  def getRegister(self, name):
+    try:
+      return self.registerIndex[getCsrKey(name)]
+    except KeyError:
+      raise CsrMapError("No register named \"{}\" in the CSR map".format(name))
+
+  def getAddress(self, name):
+    return self.getRegister(name).address
+
+  def __contains__(self, name):
+    return getCsrKey(name) in self.registerIndex
+
+  def __len__(self):
+    return len(self.registers)
+
+  def parseRdlFile(self, rdlPath):
+    try:
+      with open(rdlPath, "r") as rdlFile:
+        rdlStr = rdlFile.read()
+    except OSError as e:
+      raise CsrMapError("Could not read register description. {}".format(e), rdlPath)
+
+    rdlStr = g_rdlStripRegex.sub(lambda m: '""' if m.group(0).startswith('"') else " ", rdlStr)
+
+    for regMatch in g_rdlRegisterRegex.finditer(rdlStr):
+      regBody, regName, regOffset = regMatch.groups()
+      regProperties = dict(g_rdlPropertyRegex.findall(g_rdlFieldRegex.sub(" ", regBody)))
+      csrRegister = CsrRegister(regName, parseNumber(regOffset) >> g_rdlAddressShift, parseNumber(regProperties.get("regwidth", "64")), rdlPath)
+
+      for fieldMatch in g_rdlFieldRegex.finditer(regBody):
+        fieldBody, fieldName, msb, lsb, reset = fieldMatch.groups()
+        msb = int(msb)
+        lsb = msb if (lsb is None) else int(lsb)
+        if (lsb > msb):
+          msb, lsb = lsb, msb
+        reset = 0 if (reset is None) else parseNumber(reset)
+        fieldProperties = dict(g_rdlPropertyRegex.findall(fieldBody))
+        csrRegister.addField(CsrField(fieldName, lsb, msb-lsb+1, reset, fieldProperties.get("sw")))
+
+      self.addRegister(csrRegister)
+
+  def parseIpxactFile(self, ipxactPath):
+    try:
+      root = ElementTree.parse(ipxactPath).getroot()
+    except (OSError, ElementTree.ParseError) as e:
+      raise CsrMapError("Could not read register description. {}".format(e), ipxactPath)
+
+    ns = g_ipxactNamespace
+    for addressBlock in root.iterfind(".//ipxact:addressBlock", ns):
+      baseAddress = parseNumber(addressBlock.findtext("ipxact:baseAddress", "0", ns))
+      for register in addressBlock.iterfind("ipxact:register", ns):
+        regOffset = baseAddress + parseNumber(register.findtext("ipxact:addressOffset", "0", ns))
+        csrRegister = CsrRegister(register.findtext("ipxact:name", None, ns), regOffset >> g_rdlAddressShift, int(register.findtext("ipxact:size", "64", ns)), ipxactPath)
+
+        for field in register.iterfind("ipxact:field", ns):
+          reset = field.findtext("ipxact:resets/ipxact:reset/ipxact:value", "0", ns)
+          csrRegister.addField(CsrField(
+              field.findtext("ipxact:name", None, ns),
+              int(field.findtext("ipxact:bitOffset", "0", ns)),
+              int(field.findtext("ipxact:bitWidth", "1", ns)),
+              parseNumber(reset),
+              field.findtext("ipxact:access", None, ns)
+            ))
+
+        self.addRegister(csrRegister)
+
+
+def getCsrMap(csrMapPaths=None):
+  '''
+  Returns the CsrMap of csrMapPaths (defaults to the CLA and MCR RDL files). Each set of files is only parsed once
+  per process, unless one of them changes on disk
+  '''
+  if (csrMapPaths is None):
+    csrMapPaths = g_defaultCsrMapPaths
+
+  cacheKey = []
+  for csrMapPath in csrMapPaths:
+    try:
+      fileStat = os.stat(csrMapPath)
+    except OSError as e:
+      raise CsrMapError("Could not read register description. {}".format(e), csrMapPath)
+    cacheKey.append((os.path.realpath(csrMapPath), fileStat.st_mtime_ns, fileStat.st_size))
+  cacheKey = tuple(cacheKey)
+
+  if not (cacheKey in g_csrMapCache):
+    g_csrMapCache[cacheKey] = CsrMap.fromFiles(csrMapPaths)
+
+  return g_csrMapCache[cacheKey]
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy
+
+
+###################################
+# Global vars
+###################################
+g_onesCountTable = numpy.array([bin(i).count("1") for i in range(256)], dtype=numpy.uint8)
+
+
+###################################
+# Helpers
+###################################
+def toSampleArray(samples):
+  return numpy.asarray(samples, dtype=numpy.uint64)
+
+def delayArray(values, firstValue):
+  '''
+  Returns values delayed by one cycle, with firstValue in the first cycle
+  '''
+  delayedValues = numpy.empty_like(values)
+  if (len(values) > 0):
+    delayedValues[0] = firstValue
+    delayedValues[1:] = values[:-1]
+  return delayedValues
+
+def countOnes(values):
+  '''
+  Returns the number of set bits of each value of a uint64 array
+  '''
+  if hasattr(numpy, "bitwise_count"):
+    return numpy.bitwise_count(values)
+  return g_onesCountTable[numpy.ascontiguousarray(values).view(numpy.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+###################################
+# Event Kernels
+###################################
+#Every kernel takes a uint64 array of CLA input samples and the register values written by the compile*Csrs functions,
+#and returns a bool array with the detector result of every sample. The CLA flops each result, so it is on the event
+#bus the cycle after its sample. Kernels that compare a sample to the one before take the sample before the array
+#(lastSample), so a long trace can be evaluated in chunks. It defaults to 0, the value of the detector flops at reset
+def matchEvents(samples, mask, match):
+  '''
+  dbg_signal_mask<n>/dbg_signal_match<n>: (x & mask) == match. The negative match event is the inverse
+  '''
+  samples = toSampleArray(samples)
+  if (mask == 0):
+    return numpy.full(len(samples), match == 0)
+  return (samples & numpy.uint64(mask)) == numpy.uint64(match)
+
+def edgeEvents(samples, signalSelect, posEdge=True, lastSample=0):
+  '''
+  dbg_signal_edge_detect_cfg: a rising (posEdge) or falling edge of bit signalSelect
+  '''
+  samples = toSampleArray(samples)
+  one = numpy.uint64(1)
+  currentBits = (samples >> numpy.uint64(signalSelect)) & one
+  lastBits = delayArray(currentBits, (int(lastSample) >> signalSelect) & 1)
+  if (posEdge):
+    return (currentBits & (lastBits ^ one)).astype(bool)
+  return (lastBits & (currentBits ^ one)).astype(bool)
+
+def transitionEvents(samples, mask, fromValue, toValue, lastFromMatch=False):
+  '''
+  dbg_transition_mask/from_value/to_value: (x & mask) == fromValue on the sample before, and (x & mask) == toValue on
+  this one. lastFromMatch is the from match of the sample before the array (False at reset)
+  '''
+  fromMatches = matchEvents(samples, mask, fromValue)
+  toMatches = matchEvents(samples, mask, toValue)
+  return delayArray(fromMatches, lastFromMatch) & toMatches
+
+def onesCountEvents(samples, mask, count):
+  '''
+  dbg_ones_count_mask/value: the number of set bits of x & mask equals count. The RTL compares 7 bits of the value
+  '''
+  samples = toSampleArray(samples)
+  return countOnes(samples & numpy.uint64(mask)) == (count & 0x7f)
+
+def anyChangeEvents(samples, mask, lastSample=0):
+  '''
+  dbg_any_change: any bit of x & mask differs from the sample before
+  '''
+  samples = toSampleArray(samples)
+  mask = numpy.uint64(mask)
+  maskedSamples = samples & mask
+  return maskedSamples != delayArray(maskedSamples, numpy.uint64(lastSample) & mask)
+
+
+###################################
+# Scoring
+###################################
+def getEventCycles(events, firstCycle=0):
+  '''
+  Returns the cycles (sample indexes, offset by firstCycle) of a bool event array
+  '''
+  return numpy.flatnonzero(events).astype(numpy.int64) + firstCycle
+
+def getFalseTriggers(eventCycles, expectedCycles, window=0):
+  '''
+  Returns a bool array of the event cycles that are not within window cycles of any expected cycle. Both arrays must
+  be sorted
+  '''
+  eventCycles = numpy.asarray(eventCycles, dtype=numpy.int64)
+  expectedCycles = numpy.asarray(expectedCycles, dtype=numpy.int64)
+  if (len(expectedCycles) == 0):
+    return numpy.ones(len(eventCycles), dtype=bool)
+
+  expectedIndexes = numpy.searchsorted(expectedCycles, eventCycles - window)
+  nearestCycles = expectedCycles[numpy.minimum(expectedIndexes, len(expectedCycles)-1)]
+  return (expectedIndexes == len(expectedCycles)) | (nearestCycles > eventCycles + window)
+
+def getMatchedExpectations(eventCycles, expectedCycles, window=0):
+  '''
+  Returns a bool array of the expected cycles that have an event within window cycles. Both arrays must be sorted
+  '''
+  eventCycles = numpy.asarray(eventCycles, dtype=numpy.int64)
+  expectedCycles = numpy.asarray(expectedCycles, dtype=numpy.int64)
+  if (len(eventCycles) == 0):
+    return numpy.zeros(len(expectedCycles), dtype=bool)
+
+  eventIndexes = numpy.searchsorted(eventCycles, expectedCycles - window)
+  nearestCycles = eventCycles[numpy.minimum(eventIndexes, len(eventCycles)-1)]
+  return (eventIndexes < len(eventCycles)) & (nearestCycles <= expectedCycles + window)
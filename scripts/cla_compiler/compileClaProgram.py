@@ -12,12 +12,35 @@ import argparse
 import shutil
 import math
 import traceback
+import glob
+import time
+import concurrent.futures
+import contextlib
+import collections.abc
+import copy
+import array
+import struct
+import hashlib
+import tempfile
+import tracemalloc
+import socket
+import socketserver
+import threading
+import signal
+try:
+  import numpy
+except ImportError:
+  numpy = None
+from claCsrMap import CsrMapError, getCsrMap, g_defaultCsrMapPaths
 
 
 ###################################
 # Global vars
 ###################################
-g_program_version = "1.1.0"
+g_program_version = "1.2.0"
+
+#libyaml parses programs several times faster than the pure python loader, when PyYAML was built with it
+g_yamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def getLogger(name, console="WARNING", outputdir="", logFile=True, fileLevel="DEBUG"):
@@ -82,14 +105,46 @@ def getLogger(name, console="WARNING", outputdir="", logFile=True, fileLevel="DE
 
 	return logger
 
-g_logger = None
+g_logger = logging.getLogger("compileClaProgram")
+
+
+###################################
+# Exceptions
+###################################
+class ClaCompilerError(Exception):
+  '''
+  Base class for all errors raised while compiling a CLA program
+  '''
+  def __init__(self, message, sourcePath=None):
+    super().__init__(message)
+    self.message = message
+    self.sourcePath = sourcePath
 
-g_debugSignals = {}
-g_debugMuxes = {}
-g_busConfigProvided = False
-g_claCounterAliases = []
+  def __str__(self):
+    if (self.sourcePath is None):
+      return self.message
+    return "{}: {}".format(self.sourcePath, self.message)
+
+class ClaProgramError(ClaCompilerError):
+  '''
+  The CLA program description is invalid
+  '''
+  pass
+
+class ClaBusInfoError(ClaCompilerError):
+  '''
+  The debug bus info json is invalid
+  '''
+  pass
+
+class ClaResourceError(ClaCompilerError):
+  '''
+  The CLA program requires more hardware resources than are available
+  '''
+  pass
 
 g_claDebugInputWidth = 64
+g_signalTableColumns = ["Input Mux", "Type", "Bit Width", "Lane Lower", "Lane Lower Index", "Lane Upper", "Lane Upper Index"]
 g_availableMatchRegs = 4
 g_availableCounters = 4
 g_availableEdgeDetects = 2
@@ -136,7 +191,6 @@ g_actionOpcodes = {
   "AUTO_INCREMENT_COUNTER_3": 0x1e,
   "STOP_AUTO_INCREMENT_COUNTER_3": 0x1f
 }
-g_customActionOpcodes = {}
 g_eventOpcodes = {
   "DISABLE": 0x0,
   "ALWAYS_ON": 0x1,
@@ -196,16 +250,96 @@ def str2int(valueStr):
   value = int(valueStr, valueBase)
   return value
 
-def getBinaryList(value, width=None):
-  blist = [int(x) for x in bin(value)[2:]]
-  if not (width is None):
-    bLength = len(blist)
-    if (bLength > width):
-      raise ValueError("Specified width {} is smaller than required width {} for value={}".format(width, len(blist), value))
-    elif (bLength < width):
-      blist = [0 for i in range(width-bLength)] + blist
+###################################
+# Profiling
+###################################
+class PhaseProfiler:
+  '''
+  Collects the wall and CPU time of named phases, and named work counters. Repeated phases are accumulated.
+  CPU time is measured for the whole process, so it includes other threads that run at the same time.
+  While tracemalloc is tracing, the peak memory allocated by each phase (above the memory in use when it started) is also recorded
+  '''
+  #Peak traced memory of each enclosing phase, across all profilers. Inner phases reset the tracemalloc peak
+  memoryPeakStack = []
+
+  def __init__ (self):
+    self.phases = {}
+    self.counters = {}
+
+  @contextlib.contextmanager
+  def phase(self, phaseName):
+    memoryTracing = tracemalloc.is_tracing()
+    if (memoryTracing):
+      startMemory, peakMemory = tracemalloc.get_traced_memory()
+      if (len(PhaseProfiler.memoryPeakStack) > 0):
+        PhaseProfiler.memoryPeakStack[-1] = max(PhaseProfiler.memoryPeakStack[-1], peakMemory)
+      PhaseProfiler.memoryPeakStack.append(startMemory)
+      tracemalloc.reset_peak()
+
+    wallStartTime = time.perf_counter()
+    cpuStartTime = time.process_time()
+    try:
+      yield
+    finally:
+      wallTime = time.perf_counter() - wallStartTime
+      cpuTime = time.process_time() - cpuStartTime
+
+      peakMemory = None
+      if (memoryTracing):
+        peakMemory = max(PhaseProfiler.memoryPeakStack.pop(), tracemalloc.get_traced_memory()[1])
+        if (len(PhaseProfiler.memoryPeakStack) > 0):
+          PhaseProfiler.memoryPeakStack[-1] = max(PhaseProfiler.memoryPeakStack[-1], peakMemory)
+        peakMemory -= startMemory
+
+      self.addPhase(phaseName, wallTime, cpuTime, peakMemory=peakMemory)
+
+  def addPhase(self, phaseName, wallTime, cpuTime, calls=1, peakMemory=None):
+    if not (phaseName in self.phases):
+      self.phases[phaseName] = {"Wall Time (s)": 0.0, "CPU Time (s)": 0.0, "Calls": 0}
+    phaseDict = self.phases[phaseName]
+    phaseDict["Wall Time (s)"] += wallTime
+    phaseDict["CPU Time (s)"] += cpuTime
+    phaseDict["Calls"] += calls
+    if not (peakMemory is None):
+      phaseDict["Peak Memory (B)"] = max(phaseDict.get("Peak Memory (B)", 0), peakMemory)
+
+  def count(self, counterName, amount=1):
+    self.counters[counterName] = self.counters.get(counterName, 0) + amount
+
+  def merge(self, profileDict):
+    '''
+    Adds the phases and counters of another profile (a PhaseProfiler or the dict returned by getDict())
+    '''
+    if isinstance(profileDict, PhaseProfiler):
+      profileDict = profileDict.getDict()
+    for phaseName, phaseDict in profileDict["Phases"].items():
+      self.addPhase(phaseName, phaseDict["Wall Time (s)"], phaseDict["CPU Time (s)"], phaseDict["Calls"], phaseDict.get("Peak Memory (B)"))
+    for counterName, amount in profileDict["Counters"].items():
+      self.count(counterName, amount)
+
+  def getDict(self):
+    phases = {}
+    for phaseName, phaseDict in self.phases.items():
+      phases[phaseName] = {
+        "Wall Time (s)": round(phaseDict["Wall Time (s)"], 6),
+        "CPU Time (s)": round(phaseDict["CPU Time (s)"], 6),
+        "Calls": phaseDict["Calls"]
+      }
+      if ("Peak Memory (B)" in phaseDict):
+        phases[phaseName]["Peak Memory (B)"] = phaseDict["Peak Memory (B)"]
+
+    return {"Phases": phases, "Counters": dict(self.counters)}
+
+  def writeToJsonFile(self, outputPath, infoDict=None):
+    profileDict = {"Compiler Version": g_program_version}
+    if not (infoDict is None):
+      profileDict.update(infoDict)
+    profileDict.update(self.getDict())
+
+    outputFile = open(outputPath, "w")
+    outputFile.write(json.dumps(profileDict, indent=2))
+    outputFile.close()
 
-  return blist
 
 ###################################
 # Program Parsing
@@ -228,10 +362,10 @@ class TRIGGER_TYPE(Enum):
 class TriggerCondition:
   def __init__ (self, parentEventTrigger, conditionStr):
     self.parentEventTrigger = parentEventTrigger
+    self.program = parentEventTrigger.program
 
     if not isinstance(conditionStr, str):
-      g_logger.error("Non-string trigger condition defined for \"{}.{}.{}\"".format(self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-      sys.exit()
+      raise ClaProgramError("Non-string trigger condition defined for \"{}.{}.{}\"".format(self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     self.conditionStr = conditionStr
     self.type, self.signal, self.value, self.from_value = self.parseCondition(conditionStr)
@@ -253,8 +387,7 @@ class TriggerCondition:
       #Parse operands
       operandList = conditionStr.split("==")
       if (len(operandList) != 2):
-        g_logger.error("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
       #Get signal name
       signal = operandList[0].strip()
       #Get comparison value
@@ -262,8 +395,7 @@ class TriggerCondition:
       try:
         value = str2int(value)
       except:
-        g_logger.error("Could not convert RHS of \"{}\" into a numerical value in \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not convert RHS of \"{}\" into a numerical value in \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
       
     #Not equals
     if ("!=" in conditionStr):
@@ -271,21 +403,17 @@ class TriggerCondition:
       #Parse operands
       operandList = conditionStr.split("!=")
       if (len(operandList) != 2):
-        g_logger.error("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
       #Get signal name
       signal = operandList[0].strip()
-      if (signal in g_claCounterAliases):
-        g_logger.error("Invalid condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        g_logger.error("Not equals comparison not supported for CLA counters")
-        sys.exit()
+      if (signal in self.program.counterAliases):
+        raise ClaProgramError("Invalid condition \"{}\" defined for event \"{}.{}.{}\". Not equals comparison not supported for CLA counters".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
       #Get comparison value
       value = operandList[1].strip()
       try:
         value = str2int(value)
       except:
-        g_logger.error("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Greater than
     if (">" in conditionStr):
@@ -296,21 +424,17 @@ class TriggerCondition:
       #Parse operands
       operandList = conditionStr.split(">")
       if (len(operandList) != 2):
-        g_logger.error("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
       #Get signal name
       signal = operandList[0].strip()
-      if not (signal in g_claCounterAliases):
-        g_logger.error("Invalid condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        g_logger.error("Greater than comparison only supported for CLA counters. \"{}\" not found in the program counters list {}".format(signal, g_claCounterAliases))
-        sys.exit()
+      if not (signal in self.program.counterAliases):
+        raise ClaProgramError("Invalid condition \"{}\" defined for event \"{}.{}.{}\". {} than comparison only supported for CLA counters. \"{}\" not found in the program counters list {}".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name, "Greater", signal, self.program.counterAliases))
       #Get comparison value
       value = operandList[1].strip()
       try:
         value = str2int(value)
       except:
-        g_logger.error("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Less than
     if ("<" in conditionStr):
@@ -321,21 +445,17 @@ class TriggerCondition:
       #Parse operands
       operandList = conditionStr.split("<")
       if (len(operandList) != 2):
-        g_logger.error("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
       #Get signal name
       signal = operandList[0].strip()
-      if not (signal in g_claCounterAliases):
-        g_logger.error("Invalid condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        g_logger.error("Greater than comparison only supported for CLA counters. \"{}\" not found in the program counters list {}".format(signal, g_claCounterAliases))
-        sys.exit()
+      if not (signal in self.program.counterAliases):
+        raise ClaProgramError("Invalid condition \"{}\" defined for event \"{}.{}.{}\". {} than comparison only supported for CLA counters. \"{}\" not found in the program counters list {}".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name, "Less", signal, self.program.counterAliases))
       #Get comparison value
       value = operandList[1].strip()
       try:
         value = str2int(value)
       except:
-        g_logger.error("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Posedge
     if (re.search(r"posedge\s", conditionStr)):
@@ -343,8 +463,7 @@ class TriggerCondition:
       #Get signal name
       signal = conditionStr[conditionStr.find("posedge")+len("posedge"):].strip()
       if (len(signal) < 1):
-        g_logger.error("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Negedge
     if (re.search(r"negedge\s", conditionStr)):
@@ -375,14 +494,13 @@ class TriggerCondition:
       try:
         signal = conditionStr[conditionStr.find("(")+1:conditionStr.find(")")].strip()
         if (len(signal) < 1):
-          g_logger.error("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-          sys.exit()
+          raise ClaProgramError("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
         if (len(signal.split(",")) > 1):
-          g_logger.error("{} arguments \"{}\" defined for anychange trigger in event \"{}.{}.{}\". Only one argument expected".format(len(signal.split(",")), conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-          sys.exit()
+          raise ClaProgramError("{} arguments \"{}\" defined for anychange trigger in event \"{}.{}.{}\". Only one argument expected".format(len(signal.split(",")), conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
+      except ClaProgramError:
+        raise
       except:
-        g_logger.error("Could not parse anychange condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not parse anychange condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Transition
     if (re.search(r"transition\s*\(", conditionStr)):
@@ -391,25 +509,23 @@ class TriggerCondition:
       try:
         transitionArgs = conditionStr[conditionStr.find("(")+1:conditionStr.find(")")].strip().split(",")
         if (len(transitionArgs) != 3):
-          g_logger.error("Could not parse transition condition \"{}\" defined for event \"{}.{}.{}\". 3 transition arguments required, only {} provided".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name, len(transitionArgs)))
-          sys.exit()
+          raise ClaProgramError("Could not parse transition condition \"{}\" defined for event \"{}.{}.{}\". 3 transition arguments required, only {} provided".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name, len(transitionArgs)))
 
         #Get signal name
         signal = transitionArgs[0].strip()
         if (len(signal) < 1):
-          g_logger.error("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-          sys.exit()
+          raise ClaProgramError("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
         #Get transition values
         try:
           from_value = str2int(transitionArgs[1].strip())
           value = str2int(transitionArgs[2].strip())
         except:
-          g_logger.error("Invalid value defined for transition condition \"{}\" in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-          sys.exit()
+          raise ClaProgramError("Invalid value defined for transition condition \"{}\" in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
+      except ClaProgramError:
+        raise
       except:
-        g_logger.error("Could not parse transition condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not parse transition condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Count ones
     if (re.search(r"countones\s*\(", conditionStr)):
@@ -417,35 +533,31 @@ class TriggerCondition:
       #Parse operands
       operandList = conditionStr.split("==")
       if (len(operandList) != 2):
-        g_logger.error("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Invalid expression \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
       #Get comparison value
       value = operandList[1].strip()
       try:
         value = str2int(value)
       except:
-        g_logger.error("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not convert RHS of \"{}\" into a numerical value in event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
       #Get signal name
       #TODO: Add support for multiple signals?
       try:
         signal = conditionStr[conditionStr.find("(")+1:conditionStr.find(")")].strip()
         if (len(signal) < 1):
-          g_logger.error("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-          sys.exit()
+          raise ClaProgramError("Signal name not found in condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
         if (len(signal.split(",")) > 1):
-          g_logger.error("{} arguments \"{}\" defined for count ones trigger in event \"{}.{}.{}\". Only one argument expected".format(len(signal.split(",")), conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-          sys.exit()
+          raise ClaProgramError("{} arguments \"{}\" defined for count ones trigger in event \"{}.{}.{}\". Only one argument expected".format(len(signal.split(",")), conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
+      except ClaProgramError:
+        raise
       except:
-        g_logger.error("Could not parse count ones condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-        sys.exit()
+        raise ClaProgramError("Could not parse count ones condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     #Unsupported
     if ((triggerType is None) or unsuportedCondition):
-      g_logger.error("Unsupported or invalid condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
-      sys.exit()
+      raise ClaProgramError("Unsupported or invalid condition \"{}\" defined for event \"{}.{}.{}\"".format(conditionStr, self.parentEventTrigger.parentEap.parentNode.name, self.parentEventTrigger.parentEap.name, self.parentEventTrigger.name))
 
     return triggerType, signal, value, from_value
 
@@ -485,13 +597,13 @@ class EventTrigger:
     g_logger.debug("Constructing EventTrigger {}.{}.{}".format(parentEap.parentNode.name, parentEap.name, eventName))
     self.name = eventName
     self.parentEap = parentEap
+    self.program = parentEap.program
 
     self.triggerConditions = self.extractTriggerConditions(triggerList)
 
   def extractTriggerConditions(self, triggerList):
     if (not isinstance(triggerList, list)) and (not isinstance(triggerList, str)):
-      g_logger.error("Triggers for event \"{}.{}.{}\" not defined as a list or string".format(self.parentEap.parentNode.name, self.parentEap.name, self.name))
-      sys.exit()
+      raise ClaProgramError("Triggers for event \"{}.{}.{}\" not defined as a list or string".format(self.parentEap.parentNode.name, self.parentEap.name, self.name))
 
     triggerConditions = []
     if isinstance(triggerList, str):
@@ -510,18 +622,16 @@ class EventTrigger:
     triggerSignalCounter = False
     triggerSignalMux = False
     for triggerCondition in triggerConditions:
-      triggerSignalCounter = triggerSignalCounter or (triggerCondition.signal in g_claCounterAliases)
-      triggerSignalMux = triggerSignalMux or (not (triggerCondition.signal in g_claCounterAliases))
+      triggerSignalCounter = triggerSignalCounter or (triggerCondition.signal in self.program.counterAliases)
+      triggerSignalMux = triggerSignalMux or (not (triggerCondition.signal in self.program.counterAliases))
     eventTypeConflict = triggerSignalCounter and triggerSignalMux
 
     if (len(triggerTypes) > 1) or eventTypeConflict:
-      g_logger.error("Multiple event types {} implied by trigger conditions for event \"{}.{}.{}\"".format(list(triggerTypes.keys()), self.parentEap.parentNode.name, self.parentEap.name, self.name))
-      sys.exit()
+      raise ClaProgramError("Multiple event types {} implied by trigger conditions for event \"{}.{}.{}\"".format(list(triggerTypes.keys()), self.parentEap.parentNode.name, self.parentEap.name, self.name))
 
     for triggerType in triggerTypes:
       if ((triggerType != TRIGGER_TYPE.EQUAL) and (triggerType != TRIGGER_TYPE.TRANSITION) and (triggerType != TRIGGER_TYPE.ANY_CHANGE)) and (len(triggerTypes[triggerType]) > 1):
-        g_logger.error("Multiple cases not supported by {} for event \"{}.{}.{}\"".format(triggerType, self.parentEap.parentNode.name, self.parentEap.name, self.name))
-        sys.exit()
+        raise ClaProgramError("Multiple cases not supported by {} for event \"{}.{}.{}\"".format(triggerType, self.parentEap.parentNode.name, self.parentEap.name, self.name))
       
     return triggerConditions
 
@@ -551,6 +661,7 @@ class EventActionPair:
     g_logger.debug("Constructing EventActionPair {}.{}".format(parentNode.name, eapName))
     self.name = eapName
     self.parentNode = parentNode
+    self.program = parentNode.program
     self.eapDict = eapDict
 
     eapFieldsUsed = eapDict.keys()
@@ -576,8 +687,7 @@ class EventActionPair:
 
     debug_mux_reg = eapDict["debug_mux_reg"]
     if not isinstance(debug_mux_reg, str):
-      g_logger.error("\"{}.{}\" Field \"debug_mux_reg\" must be a string".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("\"{}.{}\" Field \"debug_mux_reg\" must be a string".format(self.parentNode.name, self.name))
 
     return debug_mux_reg
 
@@ -588,8 +698,7 @@ class EventActionPair:
       return event_triggers
 
     if not isinstance(eapDict["event_triggers"], dict):
-      g_logger.error("Field \"event_triggers\" must be a dict")
-      sys.exit()
+      raise ClaProgramError("Field \"event_triggers\" must be a dict")
 
     #Check for keywords in event names for possible whitespace issues
     eventNameList = eapDict["event_triggers"].keys()
@@ -600,12 +709,10 @@ class EventActionPair:
 
     for eventName in eapDict["event_triggers"]:
       if (eventName in event_triggers):
-        g_logger.error("Event \"{}\" already defined for  \"{}.{}\"".format(eventName, self.parentNode.name, self.name))
-        sys.exit()
+        raise ClaProgramError("Event \"{}\" already defined for  \"{}.{}\"".format(eventName, self.parentNode.name, self.name))
 
       if (len(event_triggers) >= g_availableEventsPerEap):
-        g_logger.error("More than {} events defined for  \"{}.{}\"".format(g_availableEventsPerEap, self.parentNode.name, self.name))
-        sys.exit()
+        raise ClaProgramError("More than {} events defined for  \"{}.{}\"".format(g_availableEventsPerEap, self.parentNode.name, self.name))
 
       event_triggers[eventName] = EventTrigger(self, eventName, eapDict["event_triggers"][eventName])
 
@@ -626,18 +733,15 @@ class EventActionPair:
   def extractLogicalOp(self, eapDict):
     g_logger.debug("Extracting logical op for EventActionPair {}.{}".format(self.parentNode.name, self.name))
     if not ("event_logical_op" in eapDict):
-      g_logger.error("Required field \"event_logical_op\" not defined for EAP \"{}.{}\"".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("Required field \"event_logical_op\" not defined for EAP \"{}.{}\"".format(self.parentNode.name, self.name))
 
     event_logical_op = eapDict["event_logical_op"]
     if not isinstance(event_logical_op, str):
-      g_logger.error("\"{}.{}\" Field \"event_logical_op\" must be a string".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("\"{}.{}\" Field \"event_logical_op\" must be a string".format(self.parentNode.name, self.name))
 
     event_logical_op = event_logical_op.strip()
     if (event_logical_op in g_logicalOpcodes):
-      g_logger.error("Deprecated logical opcode \"{}\" defined for \"{}.{}\". Logical opcodes are no longer supported. Use a logical expression instead".format(event_logical_op, self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("Deprecated logical opcode \"{}\" defined for \"{}.{}\". Logical opcodes are no longer supported. Use a logical expression instead".format(event_logical_op, self.parentNode.name, self.name))
 
     return event_logical_op
 
@@ -648,12 +752,10 @@ class EventActionPair:
       actions = eapDict["actions"]
 
     if not isinstance(actions, list):
-      g_logger.error("\"{}.{}\" Field \"actions\" must be a list".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("\"{}.{}\" Field \"actions\" must be a list".format(self.parentNode.name, self.name))
 
     if (len(actions) > g_availableActionsPerEap):
-      g_logger.error("More than {} actions defined for \"{}.{}\"".format(g_availableActionsPerEap, self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("More than {} actions defined for \"{}.{}\"".format(g_availableActionsPerEap, self.parentNode.name, self.name))
 
     return actions
 
@@ -664,12 +766,10 @@ class EventActionPair:
       custom_actions = eapDict["custom_actions"]
 
     if not isinstance(custom_actions, list):
-      g_logger.error("\"{}.{}\" Field \"custom_actions\" must be a list".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("\"{}.{}\" Field \"custom_actions\" must be a list".format(self.parentNode.name, self.name))
 
     if (len(custom_actions) > g_availableCustomActionsPerEap):
-      g_logger.error("More than {} custom actions defined for \"{}.{}\"".format(g_availableCustomActionsPerEap, self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("More than {} custom actions defined for \"{}.{}\"".format(g_availableCustomActionsPerEap, self.parentNode.name, self.name))
 
     return custom_actions
 
@@ -680,8 +780,10 @@ class EventActionPair:
       snapshot_signals = eapDict["snapshot_signals"]
 
     if not isinstance(snapshot_signals, list):
-      g_logger.error("\"{}.{}\" Field \"snapshot_signals\" must be a list".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("\"{}.{}\" Field \"snapshot_signals\" must be a list of strings".format(self.parentNode.name, self.name))
+    for signalName in snapshot_signals:
+      if not isinstance(signalName, str):
+        raise ClaProgramError("\"{}.{}\" Field \"snapshot_signals\" must be a list of strings".format(self.parentNode.name, self.name))
 
     return snapshot_signals
 
@@ -692,14 +794,14 @@ class EventActionPair:
       next_state_node = eapDict["next_state_node"]
 
     if not isinstance(next_state_node, str):
-      g_logger.error("\"{}.{}\" Field \"next_state_node\" must be a string".format(self.parentNode.name, self.name))
-      sys.exit()
+      raise ClaProgramError("\"{}.{}\" Field \"next_state_node\" must be a string".format(self.parentNode.name, self.name))
 
     return next_state_node
 
 class StateNode:
-  def __init__ (self, nodeName, nodeDict):
+  def __init__ (self, program, nodeName, nodeDict):
     g_logger.debug("Constructing StateNode {}".format(nodeName))
+    self.program = program
     self.name = nodeName
     self.nodeDict = nodeDict
 
@@ -710,14 +812,120 @@ class StateNode:
   def addEap(self, eapName, eapDict):
     g_logger.debug("Adding EAP {} to StateNode {}".format(eapName, self.name))
     if (len(self.eaps) >= g_availableEapsPerNode):
-      g_logger.error("More than {} event actions pairs defined for state node \"{}\"".format(g_availableEapsPerNode, self.name))
-      sys.exit()
+      raise ClaProgramError("More than {} event actions pairs defined for state node \"{}\"".format(g_availableEapsPerNode, self.name))
     if (eapName in self.eaps):
-      g_logger.error("Event action pair \"{}\" already defined for state node \"{}\"".format(eapName, self.name))
-      sys.exit()
+      raise ClaProgramError("Event action pair \"{}\" already defined for state node \"{}\"".format(eapName, self.name))
+    if not isinstance(eapDict, dict):
+      raise ClaProgramError("Event action pair \"{}.{}\" must be a dict of EAP fields".format(self.name, eapName), self.program.name)
 
     self.eaps[eapName] = EventActionPair(self, eapName, eapDict)
 
+class ClaProgram:
+  '''
+  Parsed CLA program description. Holds all per-program compile state (counter aliases, custom action opcodes, state nodes)
+  '''
+  def __init__ (self, programDict, name=None):
+    self.name = name
+    self.programDict = programDict
+
+    if not isinstance(programDict, dict):
+      raise ClaProgramError("CLA program description must be a dict", name)
+
+    self.counterAliases = self.extractCounterAliases(programDict)
+    self.customActionOpcodes = self.extractCustomActions(programDict)
+    self.nodeDict = self.extractNodes(programDict)
+    self.startNode = self.extractStartNode(programDict)
+
+  @classmethod
+  def fromYamlFile(cls, programPath):
+    programFile = open(programPath, "r")
+    try:
+      programDict = yaml.load(programFile, Loader=g_yamlLoader)
+    except yaml.YAMLError as e:
+      raise ClaProgramError("Could not parse yaml: {}".format(e), programPath)
+    finally:
+      programFile.close()
+
+    return cls(programDict, name=programPath)
+
+  @classmethod
+  def fromYamlString(cls, programStr, name=None):
+    try:
+      programDict = yaml.load(programStr, Loader=g_yamlLoader)
+    except yaml.YAMLError as e:
+      raise ClaProgramError("Could not parse yaml: {}".format(e), name)
+
+    return cls(programDict, name=name)
+
+  def getHash(self):
+    '''
+    Returns the sha256 of the program description. Formatting and key order of the yaml do not change the hash
+    '''
+    programStr = json.dumps(self.programDict, sort_keys=True, default=str)
+    return hashlib.sha256(programStr.encode("utf-8")).digest()
+
+  def extractCounterAliases(self, programDict):
+    counterAliases = []
+    if not ("COUNTERS" in programDict):
+      return counterAliases
+
+    g_logger.info("Parsing CLA counters")
+    counterNameList = programDict["COUNTERS"]
+    if (not isinstance(counterNameList, list)):
+      raise ClaProgramError("\"COUNTERS\" must be a list of strings", self.name)
+
+    for counterName in counterNameList:
+      if (not isinstance(counterName, str)):
+        raise ClaProgramError("\"COUNTERS\" must be a list of strings", self.name)
+
+      counterAliases.append(counterName)
+
+    if (len(counterAliases) > g_availableCounters):
+      raise ClaResourceError("{} counters defined. Only {} supported".format(len(counterAliases), g_availableCounters), self.name)
+
+    return counterAliases
+
+  def extractCustomActions(self, programDict):
+    customActionOpcodes = {}
+    if not ("CUSTOM_ACTIONS" in programDict):
+      return customActionOpcodes
+
+    g_logger.info("Parsing custom action aliases")
+    if not isinstance(programDict["CUSTOM_ACTIONS"], dict):
+      raise ClaProgramError("\"CUSTOM_ACTIONS\" must be a dict of action names to opcodes", self.name)
+
+    for actionName in programDict["CUSTOM_ACTIONS"]:
+      opcodeVal = programDict["CUSTOM_ACTIONS"][actionName]
+      try:
+        customActionOpcodes[str(actionName)] = str2int(opcodeVal)
+      except:
+        raise ClaProgramError("Could not parse custom action \"{}\". Field value must be either int or hex".format(actionName), self.name)
+
+    return customActionOpcodes
+
+  def extractNodes(self, programDict):
+    if not ("NODES" in programDict):
+      raise ClaProgramError("Required field \"NODES\" is not defined", self.name)
+
+    if not isinstance(programDict["NODES"], dict):
+      raise ClaProgramError("\"NODES\" must be a dict of state nodes", self.name)
+
+    g_logger.info("Constructing node dictionary")
+    nodeDict = {}
+    for nodeName in programDict["NODES"]:
+      g_logger.info("Parsing node \"{}\"".format(nodeName))
+      if not isinstance(programDict["NODES"][nodeName], dict):
+        raise ClaProgramError("State node \"{}\" must be a dict of event action pairs".format(nodeName), self.name)
+      nodeDict[nodeName] = StateNode(self, nodeName, programDict["NODES"][nodeName])
+
+    return nodeDict
+
+  def extractStartNode(self, programDict):
+    if not ("START_NODE" in programDict):
+      raise ClaProgramError("Required field \"START_NODE\" is not defined", self.name)
+
+    return programDict["START_NODE"]
+
 class DebugMux():
   def __init__ (self, instanceName, output_signalname, mux_select_csr, mux_id=0, lane_width=16, output_width=64, cla_input_signalname="", additional_output_stages=0):
     self.name = instanceName
@@ -752,14 +960,22 @@ class DebugMux():
 
     self.output_signals = []
 
+    #Set by BusModel.createMuxInstances() for muxes used in a compile
+    self.debugSignals = None
+    self.muxInstances = None
+
+  def clone(self):
+    muxObj = DebugMux(self.name, output_signalname=self.output, mux_select_csr=list(self.mux_select_csrs), mux_id=self.mux_id, lane_width=self.lane_width, output_width=self.output_lanes*self.lane_width, additional_output_stages=self.output_cycle_delay-1)
+    muxObj.final_mux = self.final_mux
+    return muxObj
+
   def addRequiredInputSignal(self, signal_obj):
     csrName = signal_obj.muxsel_csr
     if (csrName is None):
       csrName = self.mux_select_csrs[0]
 
     if not (csrName in self.mux_select_csrs):
-      g_logger.error("Specified CSR reg \"{}\" is not connected to mux instance \"{}\" needed for signal \"{}\". Connected csrs = {}. Check your CLA config file".format(csrName, self.name, signal_obj.name, self.mux_select_csrs, self.name))
-      sys.exit()
+      raise ClaCompilerError("Specified CSR reg \"{}\" is not connected to mux instance \"{}\" needed for signal \"{}\". Connected csrs = {}. Check your CLA config file".format(csrName, self.name, signal_obj.name, self.mux_select_csrs, self.name))
 
     self.required_input_sigs[csrName].append(signal_obj)
 
@@ -777,12 +993,11 @@ class DebugMux():
       lanes = list(set(lanes))
       lanes.sort()
       if (len(lanes) > self.output_lanes):
-        g_logger.error("Too many lanes used for debug mux \"{}\" CSR \"{}\". Up to {} lanes can be used at once, but selected signals require {} lanes : {}".format(self.name, csrName, self.output_lanes, len(lanes), lanes))
-        listStr = "Selected signals: "
+        listStr = "Too many lanes used for debug mux \"{}\" CSR \"{}\". Up to {} lanes can be used at once, but selected signals require {} lanes : {}".format(self.name, csrName, self.output_lanes, len(lanes), lanes)
+        listStr += "\nSelected signals: "
         for dbmSignalObj in self.required_input_sigs[csrName]:
           listStr += "\n{}".format(str(dbmSignalObj))
-        g_logger.error(listStr)
-        sys.exit()
+        raise ClaResourceError(listStr)
 
       self.required_input_lanes[csrName] = lanes
 
@@ -826,54 +1041,60 @@ class DebugMux():
           usedCsrs.append(csrName)
 
       if (len(usedCsrs) > 1):
-        g_logger.error("Mux output signals required for the next mux level are unclear due to multiple mux select CSRs {} in use for \"{}\"".format(usedCsrs, self.name))
-        sys.exit()
+        raise ClaCompilerError("Mux output signals required for the next mux level are unclear due to multiple mux select CSRs {} in use for \"{}\"".format(usedCsrs, self.name))
 
-    #TODO: Add comment
+    #Get output parent signal
+    if not (self.output in self.debugSignals):
+      raise IndexError("\"{}\" not found in debug signals".format(self.output))
+    output_parent_signal = self.debugSignals[self.output]
+    load_mux = None
+    if not (output_parent_signal.input_mux is None):
+      load_mux = self.muxInstances[output_parent_signal.input_mux.name]
+
+    #Route each input bit range to the mux output bus, then split it across the input lanes of the next mux level
     for csrName in self.mux_select_csrs:
       for input_sig_obj in self.required_input_sigs[csrName]:
-        #Reset loaded_signals list in case this function is called multiple times 
-        input_sig_obj.loaded_signals = []
-
-        #Get output parent signal
-        if not (self.output in g_debugSignals):
-          raise IndexError("\"{}\" not found in g_debugSignals".format(self.output))
-        output_parent_signal = g_debugSignals[self.output]
-
-        #Generate bitwise output signals
-        for indx in range(input_sig_obj.width):
-          dbmInputLane, laneIndx = input_sig_obj.getBitPlacement(indx)
-          output_lane = self.output_lane_mappings[csrName].index(dbmInputLane)
-          output_bit = (output_lane * self.lane_width) + laneIndx
-
-          output_signalname = "{}[{}]".format(self.output, output_bit)
-          output_signal_obj = DebugBusSignal(output_signalname)
-          output_signal_obj.copy(output_parent_signal)
-          output_signal_obj.parseIndeces()
-
-          input_sig_obj.loaded_signals.insert(0, output_signal_obj)
-          output_signal_obj.driving_signal = input_sig_obj
-          output_signal_obj.cycle_delay = input_sig_obj.cycle_delay + self.output_cycle_delay
-
-          self.output_signals.append(output_signal_obj)
+        for input_range in input_sig_obj.getLaneRanges():
+          #Reset loaded_ranges list in case this function is called multiple times 
+          input_range.loaded_ranges = []
+
+          output_lane = self.output_lane_mappings[csrName].index(input_range.lane)
+          output_bit = (output_lane * self.lane_width) + input_range.lane_index
+          if ((output_bit + input_range.width) > output_parent_signal.width):
+            raise ClaCompilerError("Index out of bounds for \"{}[{}:{}]\". Signal width is {} bits".format(self.output, output_bit+input_range.width-1, output_bit, output_parent_signal.width))
+
+          if (load_mux is None):
+            output_range_obj = DebugBusRange(input_range.signal, input_range.signal_bit, input_range.width, self.output, output_bit)
+            output_range_obj.driving_range = input_range
+            output_range_obj.cycle_delay = input_range.cycle_delay + self.output_cycle_delay
+            input_range.loaded_ranges.append(output_range_obj)
+            self.output_signals.append(output_range_obj)
+            continue
+
+          for lane, lane_index, range_offset, range_width in output_parent_signal.splitLaneRanges(output_bit, input_range.width, load_mux.lane_width):
+            output_range_obj = DebugBusRange(input_range.signal, input_range.signal_bit+range_offset, range_width, self.output, output_bit+range_offset, load_mux, lane, lane_index)
+            output_range_obj.driving_range = input_range
+            output_range_obj.cycle_delay = input_range.cycle_delay + self.output_cycle_delay
+            input_range.loaded_ranges.append(output_range_obj)
+            self.output_signals.append(output_range_obj)
 
   def pushOutputsToNextMuxes(self):
-    loaded_muxes = []
     for output_signal_obj in self.output_signals:
       load_mux = output_signal_obj.input_mux
       if not (load_mux is None):
         load_mux.addRequiredInputSignal(output_signal_obj)
-        loaded_muxes.append(load_mux)
-
-    loaded_muxes = list(set(loaded_muxes))
-    for load_mux in loaded_muxes:
-      load_mux.calcOutputSignals()
 
   def calcOutputSignals(self):
     self.calcReuiredInputLanes()
     self.allocateOutputLanes()
     self.generateOutputSignals()
-    self.pushOutputsToNextMuxes()
+
+  def hasRequiredInputSignals(self):
+    for csrName in self.required_input_sigs:
+      if (len(self.required_input_sigs[csrName]) > 0):
+        return True
+
+    return False
 
   def logPrintMuxInfo(self):
     for csrName in self.output_lane_mappings:
@@ -881,20 +1102,25 @@ class DebugMux():
       g_logger.debug("{}({}) selected mux output lanes = {}".format(self.name, csrName, laneAssignments))
 
     for output_signal_obj in self.output_signals:
-      driving_signal_chain_str = " <- ".join([str(sig.name) for sig in output_signal_obj.getDrivingSignalChain()])
+      driving_signal_chain_str = " <- ".join([str(range_obj.name) for range_obj in output_signal_obj.getDrivingRangeChain()])
       g_logger.debug("{}: Generated mux output signal \"{}\"(propogation_delay = {} cycles). Signal drivers: {} <- {}".format(self.name, output_signal_obj.name, output_signal_obj.cycle_delay, output_signal_obj.name, driving_signal_chain_str))
     
 
 class DebugBusSignal:
+  #Number of DebugBusSignal objects created by this process. Reported as a profiling counter
+  createdCount = 0
+
   def __init__ (self, signalName, input_mux=None, busDict=None, muxsel_csr=None):
+    DebugBusSignal.createdCount += 1
     self.name = signalName
     self.input_mux = input_mux
     self.muxsel_csr = muxsel_csr
 
-    self.driving_signal = None
-    self.loaded_signals = []
     self.cycle_delay = 0
 
+    #Lane ranges of this signal at the input of its debug mux. Set when the signal is routed in a compile
+    self.input_ranges = None
+
     self.type = None
     self.width = None
     self.lower_lane = None
@@ -915,11 +1141,7 @@ class DebugBusSignal:
       self.upper_lane_index = int(busDict["Lane Upper Index"])
 
   def __str__(self):
-    driving_signal_chain_str = ""
-    if (isinstance(self.driving_signal, DebugBusSignal)):
-      driving_signal_chain_str = ", Drivers: {} <- {}".format(self.name, " <- ".join([str(sig.name) for sig in self.getDrivingSignalChain()]))
-      
-    return "(name: {}, width: {}, indexes: [{}:{}],Lower Lane: {}[{}], Upper Lane: {}[{}]{}, Propogation delay = {} cycles)".format(self.name, self.width, self.upper_signal_index, self.lower_signal_index, self.lower_lane, self.lower_lane_index, self.upper_lane, self.upper_lane_index, driving_signal_chain_str, self.cycle_delay)
+    return "(name: {}, width: {}, indexes: [{}:{}],Lower Lane: {}[{}], Upper Lane: {}[{}], Propogation delay = {} cycles)".format(self.name, self.width, self.upper_signal_index, self.lower_signal_index, self.lower_lane, self.lower_lane_index, self.upper_lane, self.upper_lane_index, self.cycle_delay)
 
   def __repr__(self):
     return str(self)
@@ -927,8 +1149,6 @@ class DebugBusSignal:
   def copy(self, dbmSignalObj):
     self.input_mux = dbmSignalObj.input_mux
     self.muxsel_csr = dbmSignalObj.muxsel_csr
-    self.driving_signal = dbmSignalObj.driving_signal
-    self.loaded_signals = dbmSignalObj.loaded_signals
     self.type = dbmSignalObj.type
     self.width = dbmSignalObj.width
     self.lower_lane = dbmSignalObj.lower_lane
@@ -945,13 +1165,73 @@ class DebugBusSignal:
 
     return laneList
 
-  def getDrivingSignalChain(self):
-    drivingSignalsChain = []
-    if isinstance(self.driving_signal, DebugBusSignal):
-      drivingSignalsChain.append(self.driving_signal)
-      drivingSignalsChain += self.driving_signal.getDrivingSignalChain()
-
-    return drivingSignalsChain
+  def splitLaneRanges(self, bitIndex, width, laneWidth):
+    '''
+    Splits bits [bitIndex+width-1:bitIndex] of this signal on lane boundaries. Returns a list of
+    (lane, lane index, offset from bitIndex, width) tuples, lowest bits first
+    '''
+    laneRanges = []
+    rangeOffset = 0
+    while (rangeOffset < width):
+      laneBit = self.lower_lane_index + bitIndex + rangeOffset
+      lane = self.lower_lane + int(laneBit/laneWidth)
+      laneIndx = int(laneBit%laneWidth)
+      rangeWidth = min(width - rangeOffset, laneWidth - laneIndx)
+
+      laneRanges.append((lane, laneIndx, rangeOffset, rangeWidth))
+      rangeOffset += rangeWidth
+
+    return laneRanges
+
+  def getLaneRanges(self):
+    '''
+    Returns this signal as DebugBusRange objects at the input lanes of its debug mux
+    '''
+    if (self.input_ranges is None):
+      if (not self.indexesParsed):
+        self.parseIndeces()
+
+      busName = self.name.split("[")[0].strip()
+      self.input_ranges = []
+      for lane, laneIndx, rangeOffset, rangeWidth in self.splitLaneRanges(0, self.width, self.input_mux.lane_width):
+        range_obj = DebugBusRange(self, rangeOffset, rangeWidth, busName, self.lower_signal_index+rangeOffset, self.input_mux, lane, laneIndx)
+        range_obj.cycle_delay = self.cycle_delay
+        range_obj.muxsel_csr = self.muxsel_csr
+        self.input_ranges.append(range_obj)
+
+    return self.input_ranges
+
+  def getClaBitRanges(self):
+    '''
+    Returns (signal bit, width, CLA debug bus bit) tuples for where the bits of this signal arrive at the CLA
+    '''
+    claBitRanges = []
+    pendingRanges = list(self.getLaneRanges())
+    while (len(pendingRanges) > 0):
+      range_obj = pendingRanges.pop(0)
+      if (len(range_obj.loaded_ranges) > 0):
+        pendingRanges += range_obj.loaded_ranges
+        continue
+
+      if (range_obj.driving_range is None):
+        raise ClaCompilerError("Could not find loaded output signal of \"{}\"".format(self.name))
+
+      claBitRanges.append((range_obj.signal_bit, range_obj.width, range_obj.bus_bit))
+
+    return claBitRanges
+
+  def getClaMaskValue(self, value=0):
+    '''
+    Returns the CLA debug bus mask covering this signal, and value shifted into the same bit positions
+    '''
+    maskValue = 0
+    shiftedValue = 0
+    for signalBit, width, claBit in self.getClaBitRanges():
+      rangeMask = (1 << width) - 1
+      maskValue |= rangeMask << claBit
+      shiftedValue |= ((value >> signalBit) & rangeMask) << claBit
+
+    return maskValue, shiftedValue
 
   def parseIndeces(self):
     if (self.indexesParsed):
@@ -962,8 +1242,7 @@ class DebugBusSignal:
       indxStart = self.name.find("[")
       indxEnd = self.name.find("]")
       if ((indxEnd == -1) or (indxStart == -1) or (indxStart >= len(self.name))):
-        g_logger.error("Could not parse bit indeces for \"{}\"".format(self.name))
-        sys.exit()
+        raise ClaCompilerError("Could not parse bit indeces for \"{}\"".format(self.name))
 
       indexStr = self.name[indxStart+1:indxEnd]
 
@@ -1004,24 +1283,19 @@ class DebugBusSignal:
 
       #Check index values
       if ((upperIndx is None) or (lowerIndx is None)):
-        g_logger.error("Could not parse bit indeces for \"{}\"".format(self.name))
-        sys.exit()
+        raise ClaCompilerError("Could not parse bit indeces for \"{}\"".format(self.name))
 
       if (upperIndx < lowerIndx):
-        g_logger.error("Invalid bit indeces for \"{}\"".format(self.name))
-        sys.exit()
+        raise ClaCompilerError("Invalid bit indeces for \"{}\"".format(self.name))
 
       if (lowerIndx < 0):
-        g_logger.error("Invalid bit indeces for \"{}\"".format(self.name))
-        sys.exit()
+        raise ClaCompilerError("Invalid bit indeces for \"{}\"".format(self.name))
 
       if (upperIndx >= self.width):
-        g_logger.error("Index out of bounds for \"{}\". Signal width is {} bits".format(self.name, self.width))
-        sys.exit()
+        raise ClaCompilerError("Index out of bounds for \"{}\". Signal width is {} bits".format(self.name, self.width))
 
       if (lowerIndx >= self.width):
-        g_logger.error("Index out of bounds for \"{}\". Signal width is {} bits".format(self.name, self.width))
-        sys.exit()
+        raise ClaCompilerError("Index out of bounds for \"{}\". Signal width is {} bits".format(self.name, self.width))
 
       #Modify width and lane indexes
       if isinstance(self.input_mux, DebugMux):
@@ -1052,53 +1326,640 @@ class DebugBusSignal:
     
     return lane, laneIndx
 
-  def expandBitwise(self):
-    if (not self.indexesParsed):
-      self.parseIndeces()
-
-    bitwiseSignals = []
-    for indx in range(self.lower_signal_index, self.upper_signal_index+1):
-      #Create new signal object for this bit
-      signalName = "{}[{}]".format(self.name.split("[")[0].strip(), indx)
-      bitSignalObj = DebugBusSignal(signalName)
-      bitSignalObj.copy(self)
-
-      #Update width and indexes
-      bitSignalObj.width = 1
-      bitSignalObj.lower_signal_index = indx
-      bitSignalObj.upper_signal_index = indx
-      if isinstance(self.input_mux, DebugMux):
-        bitSignalObj.lower_lane += int((self.lower_lane_index + (indx-self.lower_signal_index))/self.input_mux.lane_width)
-        bitSignalObj.lower_lane_index = int((self.lower_lane_index + (indx-self.lower_signal_index))%self.input_mux.lane_width)
-        bitSignalObj.upper_lane = bitSignalObj.lower_lane
-        bitSignalObj.upper_lane_index = bitSignalObj.lower_lane_index
 
-      bitSignalObj.indexesParsed = True
+class DebugBusRange:
+  '''
+  Contiguous bits [signal_bit+width-1:signal_bit] of a program signal, located at bus[bus_bit+width-1:bus_bit].
+  When the bus feeds a debug mux, lane and lane_index locate the lowest bit at that mux input. Signals are routed
+  through the mux tree as ranges, which are split whenever they cross a lane boundary
+  '''
+  def __init__ (self, signal, signal_bit, width, bus, bus_bit, input_mux=None, lane=None, lane_index=None):
+    self.signal = signal
+    self.signal_bit = signal_bit
+    self.width = width
+    self.bus = bus
+    self.bus_bit = bus_bit
+
+    self.input_mux = input_mux
+    self.lane = lane
+    self.lane_index = lane_index
+    self.muxsel_csr = None
+
+    self.cycle_delay = 0
+    self.driving_range = None
+    self.loaded_ranges = []
+
+    if (width == 1):
+      self.name = "{}[{}]".format(bus, bus_bit)
+    else:
+      self.name = "{}[{}:{}]".format(bus, bus_bit+width-1, bus_bit)
+
+  def __str__(self):
+    driving_range_chain_str = ""
+    if not (self.driving_range is None):
+      driving_range_chain_str = ", Drivers: {} <- {}".format(self.name, " <- ".join([str(range_obj.name) for range_obj in self.getDrivingRangeChain()]))
+
+    return "(name: {}, width: {}, Lane: {}[{}]{}, Propogation delay = {} cycles)".format(self.name, self.width, self.lane, self.lane_index, driving_range_chain_str, self.cycle_delay)
+
+  def __repr__(self):
+    return str(self)
+
+  def getLaneList(self):
+    return [self.lane]
+
+  def getLaneRanges(self):
+    return [self]
+
+  def getDrivingRangeChain(self):
+    drivingRangeChain = []
+    range_obj = self.driving_range
+    while not (range_obj is None):
+      drivingRangeChain.append(range_obj)
+      range_obj = range_obj.driving_range
+
+    return drivingRangeChain
+
+
+class DebugSignalTable(collections.abc.Mapping):
+  '''
+  Flattened debug signals stored as one array per field instead of one object per signal. Behaves like a read-only
+  dict of signal name -> DebugBusSignal. Signal objects are only created when they are looked up
+  '''
+  def __init__(self):
+    self.names = []
+    self.rows = {}
+    self.types = []
+    self.typeIndexes = {}
+    self.debugMuxes = []
+    self.muxIndexes = {}
+
+    self.columns = {}
+    for columnName in g_signalTableColumns:
+      self.columns[columnName] = array.array("i")
+
+    self.signalObjs = {}
+
+  def addSignal(self, signalName, inputMuxObj, busDict):
+    muxIndx = -1
+    if isinstance(inputMuxObj, DebugMux):
+      if not (inputMuxObj.name in self.muxIndexes):
+        self.muxIndexes[inputMuxObj.name] = len(self.debugMuxes)
+        self.debugMuxes.append(inputMuxObj)
+      muxIndx = self.muxIndexes[inputMuxObj.name]
+
+    typeStr = str(busDict["Type"])
+    if not (typeStr in self.typeIndexes):
+      self.typeIndexes[typeStr] = len(self.types)
+      self.types.append(typeStr)
+
+    values = {
+      "Input Mux": muxIndx,
+      "Type": self.typeIndexes[typeStr],
+      "Bit Width": int(busDict["Bit Width"]),
+      "Lane Lower": int(busDict["Lane Lower"]),
+      "Lane Lower Index": int(busDict["Lane Lower Index"]),
+      "Lane Upper": int(busDict["Lane Upper"]),
+      "Lane Upper Index": int(busDict["Lane Upper Index"])
+    }
+
+    if (signalName in self.rows):
+      #Redefined signal. Later definitions overwrite earlier ones
+      row = self.rows[signalName]
+      for columnName in g_signalTableColumns:
+        self.columns[columnName][row] = values[columnName]
+      self.signalObjs.pop(signalName, None)
+      return
+
+    self.rows[signalName] = len(self.names)
+    self.names.append(signalName)
+    for columnName in g_signalTableColumns:
+      self.columns[columnName].append(values[columnName])
+
+  def __getitem__(self, signalName):
+    if (signalName in self.signalObjs):
+      return self.signalObjs[signalName]
+
+    row = self.rows[signalName]
+    inputMuxObj = None
+    muxIndx = self.columns["Input Mux"][row]
+    if (muxIndx >= 0):
+      inputMuxObj = self.debugMuxes[muxIndx]
 
-      #Update loaded signals list
-      bitSignalObj.loaded_signals = [self.loaded_signals[indx-self.lower_signal_index]]
+    signalObj = DebugBusSignal(signalName, inputMuxObj)
+    signalObj.type = self.types[self.columns["Type"][row]]
+    signalObj.width = self.columns["Bit Width"][row]
+    signalObj.lower_lane = self.columns["Lane Lower"][row]
+    signalObj.lower_lane_index = self.columns["Lane Lower Index"][row]
+    signalObj.upper_lane = self.columns["Lane Upper"][row]
+    signalObj.upper_lane_index = self.columns["Lane Upper Index"][row]
 
-      #Append bit signal to list
-      bitwiseSignals.insert(0, bitSignalObj)
+    self.signalObjs[signalName] = signalObj
+    return signalObj
 
-    return bitwiseSignals
+  def __contains__(self, signalName):
+    return signalName in self.rows
 
+  def __iter__(self):
+    return iter(self.names)
 
-def flattenDebuBusSignals(inputMuxObj, busList, parentBus=None):
+  def __len__(self):
+    return len(self.names)
+
+
+def flattenDebuBusSignals(debugSignals, inputMuxObj, busList, parentBus=None):
   for subDict in busList:
     signalName = str(subDict["Name"])
     if (parentBus):
       signalName = "{}.{}".format(parentBus, signalName)
 
-    g_debugSignals[signalName] = DebugBusSignal(signalName, inputMuxObj, subDict)
+    debugSignals.addSignal(signalName, inputMuxObj, subDict)
+
+    flattenDebuBusSignals(debugSignals, inputMuxObj, subDict["Sub Buses"], signalName)
+
+
+class DebugSignalIndex:
+  '''
+  Candidate index over the flattened debug signal names. Maps every distinct path component to the signals that
+  contain it. A signal can only contain a requested name if each dotted part of the name is inside one of its
+  components, and the parts between the first and last one must be whole components. Only the signals holding
+  the most selective part are returned, so lookups scan the (much smaller) component vocabulary instead of the bus
+  '''
+  def __init__(self, signalNames=[]):
+    self.componentSignals = {}
+    for signalName in signalNames:
+      self.addSignal(signalName)
+
+  def addSignal(self, signalName):
+    for component in set(signalName.split(".")):
+      if not (component in self.componentSignals):
+        self.componentSignals[component] = []
+      self.componentSignals[component].append(signalName)
+
+  def getCandidates(self, name):
+    '''
+    Returns a superset of the signals that contain name as a substring
+    '''
+    parts = name.split(".")
+    if (len(parts) > 2):
+      #Inner parts must be whole components
+      return self.componentSignals.get(max(parts[1:-1], key=len), [])
+
+    #Leading and trailing parts can be anywhere inside a component
+    part = max(parts, key=len)
+    candidates = set()
+    for component in self.componentSignals:
+      if (part in component):
+        candidates.update(self.componentSignals[component])
+
+    return candidates
+
+
+###################################
+# Debug Bus Model
+###################################
+g_busModelCacheMagic = b"CLABUSM\0"
+g_busModelCacheFormat = 1
+g_busModelCacheHeaderFmt = "<8sII"
+g_busModelCacheEntries = 16
+
+g_defaultBusInfo = {
+  "CLA Input": "dbm_out", 
+  "Debug Mux Instances": {
+    "debug_bus_mux_A": {
+      "DEBUG_MUX_ID": 0, 
+      "DbgMuxSelCsr": "default_dummy_mux", 
+      "Debug Bus Inputs": [
+        {
+          "Bit Width": 64, 
+          "Bus Lower Index": 0, 
+          "Bus Upper Index": 63, 
+          "Lane Lower": 0, 
+          "Lane Lower Index": 0, 
+          "Lane Upper": 3, 
+          "Lane Upper Index": 15, 
+          "Name": "debug_signals", 
+          "Sub Buses": [], 
+          "Type": "logic [63:0]"
+        }
+      ], 
+      "Debug Bus Output": "dbm_out", 
+      "LANE_WIDTH": 16
+    }
+  }
+}
+
+class BusModel:
+  '''
+  Flattened debug bus signals, their name lookup index, and debug mux topology. Everything is built when the model
+  is loaded and never modified afterwards, so one BusModel can be shared by any number of compiles (including concurrent ones)
+  '''
+  def __init__ (self, claInfoDict=None, sourcePath=None):
+    self.sourcePath = sourcePath
+    self.busConfigProvided = not (claInfoDict is None)
+    if (claInfoDict is None):
+      #No debug bus info provided. Create dummy debug mux
+      g_logger.warning("No debug bus config provided. Instantiating default dummy mux")
+      claInfoDict = g_defaultBusInfo
+
+    self.claInputSignalName = None
+    self.debugSignals = DebugSignalTable()
+    self.debugMuxes = {}
+    self.muxLoads = {}
+    self.muxOrder = []
+    self.signalIndex = None
+    self.profile = PhaseProfiler()
+
+    try:
+      self.parseBusInfo(claInfoDict)
+    except ClaCompilerError:
+      raise
+    except Exception as e:
+      g_logger.debug(traceback.format_exc())
+      raise ClaBusInfoError("Error while parsing debug bus info ({}: {})".format(type(e).__name__, e), sourcePath)
+
+  @classmethod
+  def fromJsonFile(cls, busInfoPath):
+    g_logger.info("Parsing debug mux info \"{}\"".format(busInfoPath))
+    claInfoFile = open(busInfoPath, "r")
+    try:
+      claInfoDict = json.load(claInfoFile)
+    except ValueError as e:
+      raise ClaBusInfoError("Could not parse json: {}".format(e), busInfoPath)
+    finally:
+      claInfoFile.close()
+
+    return cls(claInfoDict, sourcePath=busInfoPath)
+
+  @classmethod
+  def fromSignalTable(cls, claInputSignalName, debugSignals, sourcePath=None):
+    '''
+    Builds a BusModel from an already flattened DebugSignalTable (ie one loaded from a BusModelCache)
+    '''
+    busModel = cls.__new__(cls)
+    busModel.sourcePath = sourcePath
+    busModel.busConfigProvided = True
+    busModel.claInputSignalName = claInputSignalName
+    busModel.debugSignals = debugSignals
+    busModel.profile = PhaseProfiler()
+
+    busModel.debugMuxes = {}
+    for muxObj in debugSignals.debugMuxes:
+      busModel.debugMuxes[muxObj.name] = muxObj
+    with busModel.profile.phase("sortDebugMuxes"):
+      busModel.sortDebugMuxes()
+    with busModel.profile.phase("DebugSignalIndex"):
+      busModel.signalIndex = DebugSignalIndex(debugSignals)
+
+    return busModel
+
+  def parseBusInfo(self, claInfoDict):
+    #Add CLA input signal to debugSignals
+    claInputSignalName = claInfoDict["CLA Input"]
+    claInputSignalName = str(claInputSignalName).strip()
+    if (len(claInputSignalName) == 0):
+      raise ClaBusInfoError("Invalid \"CLA Input\" \"\" defined", self.sourcePath)
+    self.claInputSignalName = claInputSignalName
+
+    self.debugSignals.addSignal(claInputSignalName, None, {
+                                                         "Bit Width": g_claDebugInputWidth, 
+                                                         "Bus Lower Index": 0, 
+                                                         "Bus Upper Index": g_claDebugInputWidth-1, 
+                                                         "Lane Lower": -1, 
+                                                         "Lane Lower Index": -1, 
+                                                         "Lane Upper": -1, 
+                                                         "Lane Upper Index": -1, 
+                                                         "Name": claInputSignalName, 
+                                                         "Sub Buses": [], 
+                                                         "Type": "logic [{}:0]".format(g_claDebugInputWidth-1)
+                                                       })
+
+    #Flatten all mux input signals
+    for mux_name in claInfoDict["Debug Mux Instances"]:
+      mux_info = claInfoDict["Debug Mux Instances"][mux_name]
+      additional_output_stages = 0
+      if ("additional_output_stages" in mux_info):
+        additional_output_stages = mux_info["additional_output_stages"]
+
+      muxObj = DebugMux(mux_name, output_signalname=mux_info["Debug Bus Output"], mux_select_csr=mux_info["DbgMuxSelCsr"], mux_id=mux_info["DEBUG_MUX_ID"], lane_width=mux_info["LANE_WIDTH"], output_width=64, cla_input_signalname=claInputSignalName, additional_output_stages=additional_output_stages)
+      self.debugMuxes[mux_name] = muxObj
+
+      with self.profile.phase("flattenDebuBusSignals"):
+        flattenDebuBusSignals(self.debugSignals, muxObj, mux_info["Debug Bus Inputs"])
+
+    with self.profile.phase("sortDebugMuxes"):
+      self.sortDebugMuxes()
+    with self.profile.phase("DebugSignalIndex"):
+      self.signalIndex = DebugSignalIndex(self.debugSignals)
+    self.profile.count("Flattened Signals", len(self.debugSignals))
+
+  def sortDebugMuxes(self):
+    '''
+    Orders the debug mux instances so that every mux comes before the mux its output feeds. Mux lanes are calculated
+    in this order, so each mux only has to be calculated once per compile
+    '''
+    #Find the mux loaded by each mux output
+    self.muxLoads = {}
+    inputCounts = {}
+    for muxName in self.debugMuxes:
+      inputCounts[muxName] = 0
+
+    for muxName in self.debugMuxes:
+      muxObj = self.debugMuxes[muxName]
+      loadMuxName = None
+      if (muxObj.output in self.debugSignals):
+        loadMux = self.debugSignals[muxObj.output].input_mux
+        if not (loadMux is None):
+          loadMuxName = loadMux.name
+          inputCounts[loadMuxName] += 1
+      self.muxLoads[muxName] = loadMuxName
+
+    #Kahn's algorithm, keeping bus info order between independent muxes
+    self.muxOrder = []
+    readyMuxes = [muxName for muxName in self.debugMuxes if (inputCounts[muxName] == 0)]
+    while (len(readyMuxes) > 0):
+      muxName = readyMuxes.pop(0)
+      self.muxOrder.append(muxName)
+
+      loadMuxName = self.muxLoads[muxName]
+      if not (loadMuxName is None):
+        inputCounts[loadMuxName] -= 1
+        if (inputCounts[loadMuxName] == 0):
+          readyMuxes.append(loadMuxName)
+
+    if (len(self.muxOrder) != len(self.debugMuxes)):
+      loopMuxes = [muxName for muxName in self.debugMuxes if not (muxName in self.muxOrder)]
+      raise ClaBusInfoError("Debug mux instances {} form a loop".format(loopMuxes), self.sourcePath)
+
+  def getMuxDepth(self, muxName):
+    '''
+    Returns the number of muxes between muxName and the CLA, including muxName
+    '''
+    depth = 0
+    while not (muxName is None):
+      depth += 1
+      muxName = self.muxLoads[muxName]
+
+    return depth
+
+  def findSignal(self, signalName, profile=None):
+    '''
+    Returns the flattened names that signalName resolves to. An exact match always wins. Otherwise, every signal
+    that contains signalName is a match, cut after the path component where signalName first ends
+    '''
+    if (profile is None):
+      profile = PhaseProfiler()
+    profile.count("Signal Lookups")
+
+    if (signalName in self.debugSignals):
+      profile.count("Signals Scanned")
+      return [signalName]
+
+    #The index only narrows the search. Matching is the same substring test over fewer signals
+    candidates = self.signalIndex.getCandidates(signalName)
+    profile.count("Signals Scanned", len(candidates))
+    nameMatches = []
+    for debugSignal in candidates:
+      if (signalName in debugSignal):
+        nameMatches.append(debugSignal)
+
+    #Reduce matches to largest parent buses
+    reducedMatches = []
+    for name in nameMatches:
+      endIndx = name[name.find(signalName)+len(signalName):].find(".")
+      reducedName = name
+      if (endIndx != -1):
+        reducedName = name[:endIndx+name.find(signalName)+len(signalName)]
+
+      reducedMatches.append(reducedName)
+
+    return sorted(set(reducedMatches))
+
+  def createMuxInstances(self):
+    '''
+    Returns a fresh copy of every debug mux for a single compile. Mux lane allocations are per-program state,
+    so they are never stored on the shared model
+    '''
+    muxInstances = {}
+    for muxName in self.debugMuxes:
+      muxInstances[muxName] = self.debugMuxes[muxName].clone()
+
+    for muxName in muxInstances:
+      muxInstances[muxName].debugSignals = self.debugSignals
+      muxInstances[muxName].muxInstances = muxInstances
+
+    return muxInstances
+
+
+class BusModelCache:
+  '''
+  Persistent cache of flattened BusModels. Entries are keyed by a hash of the bus info file contents and the compiler
+  version, and store the DebugSignalTable columns as raw little-endian arrays, so a cache hit skips json parsing and
+  bus flattening entirely. Least recently used entries are evicted once there are more than maxEntries
+  '''
+  def __init__(self, cacheDir=None, maxEntries=g_busModelCacheEntries):
+    if (cacheDir is None):
+      cacheDir = getDefaultCacheDir()
+    self.cacheDir = cacheDir
+    self.maxEntries = maxEntries
+
+  def getCacheKey(self, busInfoBytes):
+    hasher = hashlib.sha256()
+    hasher.update("{}:{}:".format(g_program_version, g_busModelCacheFormat).encode("utf-8"))
+    hasher.update(busInfoBytes)
+    return hasher.hexdigest()
+
+  def getEntryPath(self, cacheKey):
+    return os.path.join(self.cacheDir, "{}.busmodel".format(cacheKey))
+
+  def load(self, busInfoPath):
+    '''
+    Returns the BusModel for busInfoPath, from the cache if possible. On a miss, the json is parsed and the result is
+    added to the cache
+    '''
+    busInfoFile = open(busInfoPath, "rb")
+    busInfoBytes = busInfoFile.read()
+    busInfoFile.close()
+
+    cacheKey = self.getCacheKey(busInfoBytes)
+    entryPath = self.getEntryPath(cacheKey)
+
+    if (os.path.exists(entryPath)):
+      try:
+        busModel = self.readEntry(entryPath, cacheKey, busInfoPath)
+        self.touchEntry(entryPath)
+        busModel.profile.count("Bus Cache Hits")
+        g_logger.info("Loaded debug bus info \"{}\" from cache \"{}\"".format(busInfoPath, entryPath))
+        return busModel
+      except Exception as e:
+        g_logger.warning("Discarding unreadable bus model cache entry \"{}\" ({}: {})".format(entryPath, type(e).__name__, e))
+        self.removeEntry(entryPath)
+
+    g_logger.info("Parsing debug mux info \"{}\"".format(busInfoPath))
+    try:
+      claInfoDict = json.loads(busInfoBytes.decode("utf-8"))
+    except ValueError as e:
+      raise ClaBusInfoError("Could not parse json: {}".format(e), busInfoPath)
+    busModel = BusModel(claInfoDict, sourcePath=busInfoPath)
+    busModel.profile.count("Bus Cache Misses")
+
+    try:
+      self.writeEntry(entryPath, cacheKey, busModel)
+      self.evict()
+    except OSError as e:
+      g_logger.warning("Could not write bus model cache entry \"{}\" ({})".format(entryPath, e))
+
+    return busModel
+
+  def writeEntry(self, entryPath, cacheKey, busModel):
+    debugSignals = busModel.debugSignals
+
+    namesBytes = "\n".join(debugSignals.names).encode("utf-8")
+    muxList = []
+    for muxObj in debugSignals.debugMuxes:
+      muxList.append({
+        "Name": muxObj.name,
+        "Debug Bus Output": muxObj.output,
+        "DbgMuxSelCsr": muxObj.mux_select_csrs,
+        "DEBUG_MUX_ID": muxObj.mux_id,
+        "LANE_WIDTH": muxObj.lane_width,
+        "Output Width": muxObj.output_lanes*muxObj.lane_width,
+        "additional_output_stages": muxObj.output_cycle_delay-1,
+        "Final Mux": muxObj.final_mux
+      })
+
+    headerDict = {
+      "Compiler Version": g_program_version,
+      "Cache Key": cacheKey,
+      "CLA Input": busModel.claInputSignalName,
+      "Signal Count": len(debugSignals),
+      "Names Length": len(namesBytes),
+      "Types": debugSignals.types,
+      "Debug Muxes": muxList
+    }
+    headerBytes = json.dumps(headerDict).encode("utf-8")
+
+    if not (os.path.exists(self.cacheDir)):
+      os.makedirs(self.cacheDir)
+
+    #Write to a temp file and rename, so concurrent compiles never see a partial entry
+    tempFd, tempPath = tempfile.mkstemp(dir=self.cacheDir, suffix=".tmp")
+    try:
+      with os.fdopen(tempFd, "wb") as entryFile:
+        entryFile.write(struct.pack(g_busModelCacheHeaderFmt, g_busModelCacheMagic, g_busModelCacheFormat, len(headerBytes)))
+        entryFile.write(headerBytes)
+        entryFile.write(namesBytes)
+        for columnName in g_signalTableColumns:
+          column = debugSignals.columns[columnName]
+          if (sys.byteorder == "big"):
+            column = array.array("i", column)
+            column.byteswap()
+          entryFile.write(column.tobytes())
+      os.replace(tempPath, entryPath)
+    except:
+      if (os.path.exists(tempPath)):
+        os.remove(tempPath)
+      raise
+
+  def readEntry(self, entryPath, cacheKey, busInfoPath):
+    entryFile = open(entryPath, "rb")
+    data = entryFile.read()
+    entryFile.close()
+
+    magic, formatVersion, headerLength = struct.unpack_from(g_busModelCacheHeaderFmt, data, 0)
+    if ((magic != g_busModelCacheMagic) or (formatVersion != g_busModelCacheFormat)):
+      raise ValueError("Unsupported cache format")
+
+    offset = struct.calcsize(g_busModelCacheHeaderFmt)
+    headerDict = json.loads(data[offset:offset+headerLength].decode("utf-8"))
+    offset += headerLength
+    if ((headerDict["Cache Key"] != cacheKey) or (headerDict["Compiler Version"] != g_program_version)):
+      raise ValueError("Cache key mismatch")
+
+    debugSignals = DebugSignalTable()
+    signalCount = headerDict["Signal Count"]
+    namesLength = headerDict["Names Length"]
+    if (signalCount > 0):
+      debugSignals.names = data[offset:offset+namesLength].decode("utf-8").split("\n")
+    offset += namesLength
+    debugSignals.rows = dict(zip(debugSignals.names, range(signalCount)))
+    debugSignals.types = headerDict["Types"]
+    debugSignals.typeIndexes = dict(zip(debugSignals.types, range(len(debugSignals.types))))
+
+    for columnName in g_signalTableColumns:
+      column = array.array("i")
+      columnLength = signalCount*column.itemsize
+      column.frombytes(data[offset:offset+columnLength])
+      if (sys.byteorder == "big"):
+        column.byteswap()
+      debugSignals.columns[columnName] = column
+      offset += columnLength
+
+    if ((len(debugSignals.names) != signalCount) or (offset != len(data))):
+      raise ValueError("Truncated cache entry")
+
+    for muxDict in headerDict["Debug Muxes"]:
+      muxObj = DebugMux(muxDict["Name"], output_signalname=muxDict["Debug Bus Output"], mux_select_csr=muxDict["DbgMuxSelCsr"], mux_id=muxDict["DEBUG_MUX_ID"], lane_width=muxDict["LANE_WIDTH"], output_width=muxDict["Output Width"], additional_output_stages=muxDict["additional_output_stages"])
+      muxObj.final_mux = muxDict["Final Mux"]
+      debugSignals.muxIndexes[muxObj.name] = len(debugSignals.debugMuxes)
+      debugSignals.debugMuxes.append(muxObj)
+
+    return BusModel.fromSignalTable(headerDict["CLA Input"], debugSignals, sourcePath=busInfoPath)
+
+  def touchEntry(self, entryPath):
+    #Mark as most recently used
+    try:
+      os.utime(entryPath)
+    except OSError:
+      pass
+
+  def removeEntry(self, entryPath):
+    try:
+      os.remove(entryPath)
+    except OSError:
+      pass
+
+  def evict(self):
+    entryPaths = glob.glob(os.path.join(self.cacheDir, "*.busmodel"))
+    if (len(entryPaths) <= self.maxEntries):
+      return
+
+    entryPaths.sort(key=lambda path: os.path.getmtime(path))
+    for entryPath in entryPaths[:len(entryPaths)-self.maxEntries]:
+      g_logger.debug("Evicting bus model cache entry \"{}\"".format(entryPath))
+      self.removeEntry(entryPath)
+
 
-    flattenDebuBusSignals(inputMuxObj, subDict["Sub Buses"], signalName)
+def getDefaultCacheDir():
+  cacheHome = os.environ.get("XDG_CACHE_HOME")
+  if not (cacheHome):
+    cacheHome = os.path.join(os.path.expanduser("~"), ".cache")
+
+  return os.path.join(cacheHome, "tt-dfd", "cla_compiler")
 
 
 ###################################
 # Register Allocation
 ###################################
-def generateMuxGroupings(nodeDict):
+def getEapMuxSignals(eapObj, counterAliases):
+  '''
+  Returns the names of the debug bus signals an EAP needs from the debug muxes, snapshot signals first
+  '''
+  eapSignals = []
+  #Gather signals needed for snapshots
+  for signalName in eapObj.snapshot_signals:
+    eapSignals.append(signalName)
+
+  #Gather signals needed for event triggers
+  for eventName in eapObj.event_triggers:
+    eventTrigger = eapObj.event_triggers[eventName]
+    for triggerCondition in eventTrigger.triggerConditions:
+      if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.NOT_EQUAL) or (triggerCondition.type == TRIGGER_TYPE.POSEDGE) or (triggerCondition.type == TRIGGER_TYPE.NEGEDGE) or (triggerCondition.type == TRIGGER_TYPE.TRANSITION)  or (triggerCondition.type == TRIGGER_TYPE.COUNT_ONES) or (triggerCondition.type == TRIGGER_TYPE.ANY_CHANGE)) and (not (triggerCondition.signal in counterAliases)):
+        #This trigger condition requires a debug mux signal
+        eapSignals.append(triggerCondition.signal)
+
+  return eapSignals
+
+def generateMuxGroupings(nodeDict, counterAliases, busModel, debugMuxes, profile=None):
   g_logger.debug("Generating mux select signal groups")
 
   requiredSignals = []
@@ -1107,17 +1968,7 @@ def generateMuxGroupings(nodeDict):
     nodeObj = nodeDict[nodeName]
     for eapName in nodeObj.eaps:
       eapObj = nodeObj.eaps[eapName]
-      #Gather signals needed for snapshots
-      for signalName in eapObj.snapshot_signals:
-        requiredSignals.append(signalName)
-
-      #Gather signals needed for event triggers
-      for eventName in eapObj.event_triggers:
-        eventTrigger = eapObj.event_triggers[eventName]
-        for triggerCondition in eventTrigger.triggerConditions:
-          if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.NOT_EQUAL) or (triggerCondition.type == TRIGGER_TYPE.POSEDGE) or (triggerCondition.type == TRIGGER_TYPE.NEGEDGE) or (triggerCondition.type == TRIGGER_TYPE.TRANSITION)  or (triggerCondition.type == TRIGGER_TYPE.COUNT_ONES) or (triggerCondition.type == TRIGGER_TYPE.ANY_CHANGE)) and (not (triggerCondition.signal in g_claCounterAliases)):
-            #This trigger condition requires a debug mux signal. Add to muxGroups dict
-            requiredSignals.append(triggerCondition.signal)
+      requiredSignals += getEapMuxSignals(eapObj, counterAliases)
 
   #Lookup signal names in debug signals dict
   signal_obj_dict = {}
@@ -1128,42 +1979,22 @@ def generateMuxGroupings(nodeDict):
       signalRegex = signalRegex[:signalRegex.find("[")]
       signalRegex = signalRegex.strip()
 
-    #Get all signals that match this name
-    nameMatches = []
-    for debugSignal in g_debugSignals:
-      if (signalRegex in debugSignal):
-        nameMatches.append(debugSignal)
-
-    #Reduce matches to largest parent buses
-    reducedMatches = []
-    for name in nameMatches:
-      endIndx = name[name.find(signalRegex)+len(signalRegex):].find(".")
-      reducedName = name
-      if (endIndx != -1):
-        reducedName = name[:endIndx+name.find(signalRegex)+len(signalRegex)]
-
-      reducedMatches.append(reducedName)
-
-    reducedMatches = list(set(reducedMatches))
-
-    #Check for exact match
-    if (signalRegex in reducedMatches):
-      #Exact match is found. Use that signal
-      reducedMatches = [signalRegex]
+    #Get largest parent buses that match this name
+    reducedMatches = busModel.findSignal(signalRegex, profile)
 
     #Ensure only one match is found
     if (len(reducedMatches) == 0):
-      g_logger.error("Could not find rtl signal \"{}\"".format(signalName))
-      if (not g_busConfigProvided):
-        g_logger.error("No debug bus config file was provided. Without a mux config file, you can only use the signal name \"debug_signals\" in your CLA program description, which is the 64b input to the CLA module.".format(signalName))
-      sys.exit()
+      errorStr = "Could not find rtl signal \"{}\"".format(signalName)
+      if (not busModel.busConfigProvided):
+        errorStr += ". No debug bus config file was provided. Without a mux config file, you can only use the signal name \"debug_signals\" in your CLA program description, which is the 64b input to the CLA module."
+      raise ClaCompilerError(errorStr)
     if (len(reducedMatches) > 1):
-      g_logger.error("Multiple matches found for signal \"{}\" : {}".format(signalName, reducedMatches))
-      sys.exit()
+      raise ClaCompilerError("Multiple matches found for signal \"{}\" : {}".format(signalName, reducedMatches))
 
     #Generate DebugBusSignal obj
     dbmSignalObj = DebugBusSignal(signalName)
-    dbmSignalObj.copy(g_debugSignals[reducedMatches[0]])
+    dbmSignalObj.copy(busModel.debugSignals[reducedMatches[0]])
+    dbmSignalObj.input_mux = debugMuxes[dbmSignalObj.input_mux.name]
     dbmSignalObj.parseIndeces()
 
     signal_obj_dict[signalName] = dbmSignalObj
@@ -1174,8 +2005,7 @@ def generateMuxGroupings(nodeDict):
     nodeObj = nodeDict[nodeName]
     for eapName in nodeObj.eaps:
       eapObj = nodeObj.eaps[eapName]
-      #Gather signals needed for snapshots
-      for signalName in eapObj.snapshot_signals:
+      for signalName in getEapMuxSignals(eapObj, counterAliases):
         mux_name = signal_obj_dict[signalName].input_mux.name
         specified_muxsel_csr = eapObj.debug_mux_reg
 
@@ -1183,19 +2013,6 @@ def generateMuxGroupings(nodeDict):
           muxGroups[mux_name] = []
         muxGroups[mux_name].append((signalName, specified_muxsel_csr))
 
-      #Gather signals needed for event triggers
-      for eventName in eapObj.event_triggers:
-        eventTrigger = eapObj.event_triggers[eventName]
-        for triggerCondition in eventTrigger.triggerConditions:
-          if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.NOT_EQUAL) or (triggerCondition.type == TRIGGER_TYPE.POSEDGE) or (triggerCondition.type == TRIGGER_TYPE.NEGEDGE) or (triggerCondition.type == TRIGGER_TYPE.TRANSITION)  or (triggerCondition.type == TRIGGER_TYPE.COUNT_ONES) or (triggerCondition.type == TRIGGER_TYPE.ANY_CHANGE)) and (not (triggerCondition.signal in g_claCounterAliases)):
-            #This trigger condition requires a debug mux signal. Add to muxGroups dict
-            mux_name = signal_obj_dict[triggerCondition.signal].input_mux.name
-            specified_muxsel_csr = eapObj.debug_mux_reg
-
-            if (not (mux_name in muxGroups)):
-              muxGroups[mux_name] = []
-            muxGroups[mux_name].append((triggerCondition.signal, specified_muxsel_csr))
-
   #Reduce signal lists
   for muxName in muxGroups:
     muxGroups[muxName] = list(set(muxGroups[muxName]))
@@ -1211,20 +2028,44 @@ def generateMuxGroupings(nodeDict):
   return muxGroupsLinked
 
 
-def generateMuxLanes(muxSignals):
+def generateMuxLanes(muxSignals, debugMuxes, busModel):
   g_logger.debug("Generating mux select lanes")
 
   #Add initial required debug signals to 1st level mux objs
   for muxName in muxSignals:
-    muxObj = g_debugMuxes[muxName]
+    muxObj = debugMuxes[muxName]
     for signalName in muxSignals[muxName]:
       dbmSignalObj = muxSignals[muxName][signalName]
       muxObj.addRequiredInputSignal(dbmSignalObj)
 
-  #Calculate output lanes and signals for all muxes in tree
-  for muxName in muxSignals:
-    muxObj = g_debugMuxes[muxName]
+  #Calculate output lanes and signals for all muxes in tree. Muxes are visited in topological order, so every
+  #mux input is known before the mux is calculated
+  muxEvaluations = 0
+  routedRanges = 0
+  for muxName in busModel.muxOrder:
+    muxObj = debugMuxes[muxName]
+    if not (muxObj.hasRequiredInputSignals()):
+      continue
+
     muxObj.calcOutputSignals()
+    muxObj.pushOutputsToNextMuxes()
+    muxEvaluations += 1
+    routedRanges += len(muxObj.output_signals)
+
+  #Estimate of the mux evaluations of recursive propagation, which recalculated every downstream mux each time
+  #one of its inputs changed. Only used for comparison, nothing is evaluated recursively
+  estimatedRecursiveEvaluations = 0
+  for muxName in muxSignals:
+    estimatedRecursiveEvaluations += busModel.getMuxDepth(muxName)
+
+  muxStats = {
+    "Mux Evaluations": muxEvaluations,
+    "Estimated Recursive Mux Evaluations": estimatedRecursiveEvaluations,
+    "Routed Bit Ranges": routedRanges
+  }
+  g_logger.debug("Calculated {} debug muxes (an estimated {} evaluations saved over recursive propagation), routed {} bit ranges".format(muxEvaluations, estimatedRecursiveEvaluations-muxEvaluations, routedRanges))
+
+  return muxStats
 
 '''
 def generateMuxLanes_old(muxSignals):
@@ -1271,7 +2112,7 @@ def generateMuxLanes_old(muxSignals):
   return muxLanes
 '''
 
-def allocateCfgRegisters(nodeDict):
+def allocateCfgRegisters(nodeDict, counterAliases):
   g_logger.debug("Allocating CLA config registers")
 
   #Split triggers into match, edge_detect, and counters
@@ -1289,13 +2130,13 @@ def allocateCfgRegisters(nodeDict):
       for eventName in eapObj.event_triggers:
         eventTrigger = eapObj.event_triggers[eventName]
         for triggerCondition in eventTrigger.triggerConditions:
-          if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.NOT_EQUAL)) and (not triggerCondition.signal in g_claCounterAliases):
+          if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.NOT_EQUAL)) and (not triggerCondition.signal in counterAliases):
             #This trigger condition requires a debug signal match
             matchTriggers[eventTrigger.getHash()] = eventTrigger
           if ((triggerCondition.type == TRIGGER_TYPE.POSEDGE) or (triggerCondition.type == TRIGGER_TYPE.NEGEDGE)):
             #This trigger condition requires an edge detect
             edgeTriggers[eventTrigger.getHash()] = eventTrigger
-          if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.GREATER) or (triggerCondition.type == TRIGGER_TYPE.LESS)) and (triggerCondition.signal in g_claCounterAliases):
+          if ((triggerCondition.type == TRIGGER_TYPE.EQUAL) or (triggerCondition.type == TRIGGER_TYPE.GREATER) or (triggerCondition.type == TRIGGER_TYPE.LESS)) and (triggerCondition.signal in counterAliases):
             #This trigger condition requires a CLA counter
             counterTriggers[eventTrigger.getHash()] = eventTrigger
           if (triggerCondition.type == TRIGGER_TYPE.TRANSITION):
@@ -1311,8 +2152,7 @@ def allocateCfgRegisters(nodeDict):
 
   #Allocate event triggers to match regs
   if (len(matchTriggers) > g_availableMatchRegs):
-    g_logger.error("{} match/mask registers required to implement program. Only {} available".format(len(matchTriggers), g_availableMatchRegs))
-    sys.exit()
+    raise ClaResourceError("{} match/mask registers required to implement program. Only {} available".format(len(matchTriggers), g_availableMatchRegs))
 
   matchRegAllocations = {}
   for triggerHash in matchTriggers:
@@ -1320,7 +2160,7 @@ def allocateCfgRegisters(nodeDict):
 
   #Allocate counter triggers to counter regs
   counterRegAllocations = {}
-  for counterName in g_claCounterAliases:
+  for counterName in counterAliases:
     counterRegAllocations[counterName] = {}
     counterRegAllocations[counterName]["register"] = len(counterRegAllocations)-1
     counterRegAllocations[counterName]["target"] = None
@@ -1328,8 +2168,7 @@ def allocateCfgRegisters(nodeDict):
   for triggerHash in counterTriggers:
     eventTrigger = counterTriggers[triggerHash]
     if (len(eventTrigger.triggerConditions) > 1):
-      g_logger.error("Multiple counter comparisons used in {}.{}.{}. Only one counter comparison per event is supported".format(eventTrigger.parentEap.parentNode.name, eventTrigger.parentEap.name, eventTrigger.name))
-      sys.exit()
+      raise ClaCompilerError("Multiple counter comparisons used in {}.{}.{}. Only one counter comparison per event is supported".format(eventTrigger.parentEap.parentNode.name, eventTrigger.parentEap.name, eventTrigger.name))
 
     triggerCondition = eventTrigger.triggerConditions[0]
     if (counterRegAllocations[triggerCondition.signal]["target"] is None):
@@ -1337,8 +2176,7 @@ def allocateCfgRegisters(nodeDict):
     else:
       existingTarget = counterRegAllocations[triggerCondition.signal]["target"]
       if (triggerCondition.value != existingTarget):
-        g_logger.error("Multiple target values used for CLA counter \"{}\". Only one target value per counter is supported".format(triggerCondition.signal))
-        sys.exit()
+        raise ClaCompilerError("Multiple target values used for CLA counter \"{}\". Only one target value per counter is supported".format(triggerCondition.signal))
 
   #Allocate edge triggers to edge reg
   edgeRegAllocations = {}
@@ -1346,8 +2184,7 @@ def allocateCfgRegisters(nodeDict):
     edgeRegAllocations[triggerHash] = len(edgeRegAllocations)
 
   if (len(edgeRegAllocations) > g_availableEdgeDetects):
-    g_logger.error("{} edge detects required to implement program. Only {} available".format(len(edgeRegAllocations), g_availableEdgeDetects))
-    sys.exit()
+    raise ClaResourceError("{} edge detects required to implement program. Only {} available".format(len(edgeRegAllocations), g_availableEdgeDetects))
 
   #Allocate transition triggers to transition reg
   transitionRegAllocations = {}
@@ -1355,8 +2192,7 @@ def allocateCfgRegisters(nodeDict):
     transitionRegAllocations[triggerHash] = len(transitionRegAllocations)
 
   if (len(transitionRegAllocations) > g_availableTransitionDetects):
-    g_logger.error("{} transition detects required to implement program. Only {} available".format(len(transitionRegAllocations), g_availableTransitionDetects))
-    sys.exit()
+    raise ClaResourceError("{} transition detects required to implement program. Only {} available".format(len(transitionRegAllocations), g_availableTransitionDetects))
 
   #Allocate count ones triggers to count ones reg
   countOneRegAllocations = {}
@@ -1364,8 +2200,7 @@ def allocateCfgRegisters(nodeDict):
     countOneRegAllocations[triggerHash] = len(countOneRegAllocations)
 
   if (len(countOneRegAllocations) > g_availableCountOneRegs):
-    g_logger.error("{} ones_count registers required to implement program. Only {} available".format(len(countOneRegAllocations), g_availableCountOneRegs))
-    sys.exit()
+    raise ClaResourceError("{} ones_count registers required to implement program. Only {} available".format(len(countOneRegAllocations), g_availableCountOneRegs))
 
   #Allocate anychange triggers to anychange reg
   anyChangeRegAllocations = {}
@@ -1373,64 +2208,109 @@ def allocateCfgRegisters(nodeDict):
     anyChangeRegAllocations[triggerHash] = len(anyChangeRegAllocations)
 
   if (len(anyChangeRegAllocations) > g_availableAnyChangeRegs):
-    g_logger.error("{} any change mask registers required to implement program. Only {} available".format(len(anyChangeRegAllocations), g_availableAnyChangeRegs))
-    sys.exit()
+    raise ClaResourceError("{} any change mask registers required to implement program. Only {} available".format(len(anyChangeRegAllocations), g_availableAnyChangeRegs))
 
   return matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations
 
 ###################################
 # Register Classes
 ###################################
+def loadCsrMap(csrMapPaths=None):
+  '''
+  Returns the CsrMap of the register descriptions in csrMapPaths (defaults to the CLA and MCR RDL files)
+  '''
+  try:
+    return getCsrMap(csrMapPaths)
+  except CsrMapError as e:
+    raise ClaCompilerError(e.message, e.sourcePath)
+
+def checkFieldValue(regObj, field):
+  if (field.value is None):
+    field.value = 0
+  if (not isinstance(field.value, int)):
+    raise ClaCompilerError("Could not convert value=\"{}\" into binary for field {}.{}".format(field.value, regObj.name, field.name))
+  if ((field.value < 0) or ((field.value >> field.width) != 0)):
+    raise ClaCompilerError("Field {}.{}[{}:0] is not wide enough for value={}".format(regObj.name, field.name, field.width-1, field.value))
+
+def packRegValue(regObj, fieldList):
+  #Field offsets are set from the CsrMap when the fields are created
+  regValue = 0
+  for field in fieldList:
+    checkFieldValue(regObj, field)
+    regValue |= field.value << field.offset
+
+  return regValue
+
 def getRegDict(regObj, fieldList):
+  regValue = packRegValue(regObj, fieldList)
   regDict = {}
   regDict["fields"] = {}
-  concatBinList = []
   for field in fieldList:
-    if (field.value is None):
-      field.value = 0
     regDict["fields"][field.name] = "0x%x" % field.value  #Convert to hex
-    # if ("L") in str(regDict["fields"][field.name]):
-    #   print("#########")
-    #   print(field.value)
-    #   print(hex(field.value))
-    #   k = "0x%x" % field.value
-    #   print(k)
-    try:
-      concatBinList += getBinaryList(field.value, width=field.width)
-    except TypeError:
-      g_logger.error("Could not convert value=\"{}\" into binary for field {}.{}".format(field.value, regObj.name, field.name))
-      sys.exit()
-    except ValueError:
-      g_logger.error("Field {}.{}[{}:0] is not wide enough for value={}".format(regObj.name, field.name, field.width-1, field.value))
-      sys.exit()
 
-  regDict["value"] = "0x%x" % int("".join([str(i) for i in concatBinList]), 2)
+  regDict["value"] = "0x%x" % regValue
 
   return regDict
 
 class RegField:
-  def __init__ (self, name, width, value=0, comment=None):
+  def __init__ (self, name, width, value=0, comment=None, offset=0):
     self.name = name
     self.width = width
     self.value = value
     self.comment = comment
-
-class CounterCfgReg:
-  def __init__ (self, name, comment=None):
+    self.offset = offset
+
+class ClaRegister:
+  '''
+  Base class of the compiled registers. Field offsets, widths, reset values, and the register address come from
+  the register description in the CsrMap (see claCsrMap.py)
+  '''
+  def __init__ (self, name, comment=None, csrMap=None, csrName=None):
     self.name = name
     self.comment = comment
 
+    if (csrMap is None):
+      csrMap = loadCsrMap()
+    if (csrName is None):
+      csrName = name
+    try:
+      self.csr = csrMap.getRegister(csrName)
+    except CsrMapError as e:
+      raise ClaCompilerError(str(e))
+
+  def addField(self, fieldName, value=None):
+    try:
+      csrField = self.csr.getField(fieldName)
+    except CsrMapError as e:
+      raise ClaCompilerError(str(e))
+
+    if (value is None):
+      value = csrField.reset
+    return RegField(fieldName, width=csrField.width, value=value, offset=csrField.offset)
+
+  def getAddress(self):
+    return self.csr.address
+
+class CounterCfgReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
+
     #Register fields
-    self.rsvd = RegField("rsvd", width=1, value=0)
-    self.upper_target = RegField("upper_target", width=15, value=0)
-    self.upper_counter = RegField("upper_counter", width=15, value=0)
-    self.reset_on_target = RegField("reset_on_target", width=1, value=0)
-    self.target = RegField("target", width=16, value=0)
-    self.counter = RegField("counter", width=16, value=0)
+    self.rsvd = self.addField("rsvd")
+    self.upper_target = self.addField("upper_target")
+    self.upper_counter = self.addField("upper_counter")
+    self.reset_on_target = self.addField("reset_on_target")
+    self.target = self.addField("target")
+    self.counter = self.addField("counter")
+
+  def getFieldList(self):
+    return [self.rsvd, self.upper_target, self.upper_counter, self.reset_on_target, self.target, self.counter]
 
   def getDict(self):
-    fieldList = [self.rsvd, self.upper_target, self.upper_counter, self.reset_on_target, self.target, self.counter]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1445,29 +2325,28 @@ class CounterCfgReg:
 
     return commentDict
 
-class EapReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class EapReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.action3 = RegField("action3", width=6, value=0)
-    self.action2 = RegField("action2", width=6, value=0)
-    self.udf = RegField("udf", width=8, value=0)
-    self.event_type2 = RegField("event_type2", width=6, value=0)
-    self.custom_action1_enable = RegField("custom_action1_enable", width=1, value=0)
-    self.custom_action0_enable = RegField("custom_action0_enable", width=1, value=0)
-    self.custom_action_1 = RegField("custom_action_1", width=4, value=0)
-    self.custom_action_0 = RegField("custom_action_0", width=4, value=0)
-    self.event_type1 = RegField("event_type1", width=6, value=0)
-    self.event_type0 = RegField("event_type0", width=6, value=0)
-    self.logical_op = RegField("logical_op", width=2, value=0)
-    self.action1 = RegField("action1", width=6, value=0)
-    self.action0 = RegField("action0", width=6, value=0)
-    self.dest_node = RegField("dest_node", width=2, value=0)
-
-  def getDict(self):
-    fieldList = [
+    self.action3 = self.addField("action3")
+    self.action2 = self.addField("action2")
+    self.udf = self.addField("udf")
+    self.event_type2 = self.addField("event_type2")
+    self.custom_action1_enable = self.addField("custom_action1_enable")
+    self.custom_action0_enable = self.addField("custom_action0_enable")
+    self.custom_action_1 = self.addField("custom_action_1")
+    self.custom_action_0 = self.addField("custom_action_0")
+    self.event_type1 = self.addField("event_type1")
+    self.event_type0 = self.addField("event_type0")
+    self.logical_op = self.addField("logical_op")
+    self.action1 = self.addField("action1")
+    self.action0 = self.addField("action0")
+    self.dest_node = self.addField("dest_node")
+
+  def getFieldList(self):
+    return [
         self.action3,
         self.action2,
         self.udf,
@@ -1483,7 +2362,12 @@ class EapReg:
         self.action0,
         self.dest_node
       ]
-    return getRegDict(self, fieldList)
+
+  def getDict(self):
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1512,17 +2396,21 @@ class EapReg:
 
     return commentDict
 
-class SignalMaskReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class SignalMaskReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1537,17 +2425,21 @@ class SignalMaskReg:
 
     return commentDict
 
-class SignalMatchReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class SignalMatchReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1562,24 +2454,28 @@ class SignalMatchReg:
 
     return commentDict
 
-class EdgeDetectCfgReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class EdgeDetectCfgReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.pos_edge_signal1 = RegField("pos_edge_signal1", width=1, value=0)
-    self.signal1_select = RegField("signal1_select", width=6, value=0)
-    self.pos_edge_signal0 = RegField("pos_edge_signal0", width=1, value=0)
-    self.signal0_select = RegField("signal0_select", width=6, value=0)
+    self.pos_edge_signal1 = self.addField("pos_edge_signal1")
+    self.signal1_select = self.addField("signal1_select")
+    self.pos_edge_signal0 = self.addField("pos_edge_signal0")
+    self.signal0_select = self.addField("signal0_select")
 
-  def getDict(self):
-    fieldList = [self.pos_edge_signal1, 
+  def getFieldList(self):
+    return [self.pos_edge_signal1, 
         self.signal1_select, 
         self.pos_edge_signal0, 
         self.signal0_select
       ]
-    return getRegDict(self, fieldList)
+
+  def getDict(self):
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1598,17 +2494,21 @@ class EdgeDetectCfgReg:
 
     return commentDict
 
-class TransitionMaskReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class TransitionMaskReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1623,17 +2523,21 @@ class TransitionMaskReg:
 
     return commentDict
 
-class TransitionFromValueReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class TransitionFromValueReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1648,17 +2552,21 @@ class TransitionFromValueReg:
 
     return commentDict
 
-class TransitionToValueReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class TransitionToValueReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1673,17 +2581,21 @@ class TransitionToValueReg:
 
     return commentDict
 
-class OnesCountMaskReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class OnesCountMaskReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1698,17 +2610,21 @@ class OnesCountMaskReg:
 
     return commentDict
 
-class OnesCountValueReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class OnesCountValueReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.value = RegField("value", width=64, value=0)
+    self.value = self.addField("value")
+
+  def getFieldList(self):
+    return [self.value]
 
   def getDict(self):
-    fieldList = [self.value]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1723,17 +2639,21 @@ class OnesCountValueReg:
 
     return commentDict
 
-class AnyChangeReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class AnyChangeReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.mask = RegField("mask", width=64, value=0)
+    self.mask = self.addField("mask")
+
+  def getFieldList(self):
+    return [self.mask]
 
   def getDict(self):
-    fieldList = [self.mask]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1748,27 +2668,32 @@ class AnyChangeReg:
 
     return commentDict
 
-class MuxSelectReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class MuxSelectReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    #Every debug mux instance has its own select CSR name in the bus info, but they all share the MCR CDbgMuxSel layout
+    ClaRegister.__init__(self, name, comment, csrMap, csrName="CDbgMuxSel")
 
     #Register fields
-    self.Muxselseg7 = RegField("Muxselseg7", width=6, value=0)
-    self.Muxselseg6 = RegField("Muxselseg6", width=6, value=0)
-    self.Muxselseg5 = RegField("Muxselseg5", width=6, value=0)
-    self.Muxselseg4 = RegField("Muxselseg4", width=6, value=0)
-    self.Muxselseg3 = RegField("Muxselseg3", width=6, value=0)
-    self.Muxselseg2 = RegField("Muxselseg2", width=6, value=0)
-    self.Muxselseg1 = RegField("Muxselseg1", width=6, value=0)
-    self.Muxselseg0 = RegField("Muxselseg0", width=6, value=0)
-    self.rsvd = RegField("rsvd", width=8, value=0)
-    self.DbmId = RegField("DbmId", width=6, value=0)
-    self.DbmMode = RegField("DbmMode", width=2, value=1)
+    self.Muxselseg7 = self.addField("Muxselseg7")
+    self.Muxselseg6 = self.addField("Muxselseg6")
+    self.Muxselseg5 = self.addField("Muxselseg5")
+    self.Muxselseg4 = self.addField("Muxselseg4")
+    self.Muxselseg3 = self.addField("Muxselseg3")
+    self.Muxselseg2 = self.addField("Muxselseg2")
+    self.Muxselseg1 = self.addField("Muxselseg1")
+    self.Muxselseg0 = self.addField("Muxselseg0")
+    self.rsvd = self.addField("rsvd")
+    self.DbmId = self.addField("DbmId")
+    self.DbmMode = self.addField("DbmMode", value=1)
+
+  def getFieldList(self):
+    return [self.Muxselseg7, self.Muxselseg6, self.Muxselseg5, self.Muxselseg4, self.Muxselseg3, self.Muxselseg2, self.Muxselseg1, self.Muxselseg0, self.rsvd, self.DbmId, self.DbmMode]
 
   def getDict(self):
-    fieldList = [self.Muxselseg7, self.Muxselseg6, self.Muxselseg5, self.Muxselseg4, self.Muxselseg3, self.Muxselseg2, self.Muxselseg1, self.Muxselseg0, self.rsvd, self.DbmId, self.DbmMode]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1783,25 +2708,29 @@ class MuxSelectReg:
 
     return commentDict
 
-class DebugSignalDelayReg:
-  def __init__ (self, name, comment=None):
-    self.name = name
-    self.comment = comment
+class DebugSignalDelayReg(ClaRegister):
+  def __init__ (self, name, comment=None, csrMap=None):
+    ClaRegister.__init__(self, name, comment, csrMap)
 
     #Register fields
-    self.Muxselseg7 = RegField("Muxselseg7", width=2, value=0)
-    self.Muxselseg6 = RegField("Muxselseg6", width=2, value=0)
-    self.Muxselseg5 = RegField("Muxselseg5", width=2, value=0)
-    self.Muxselseg4 = RegField("Muxselseg4", width=2, value=0)
-    self.Muxselseg3 = RegField("Muxselseg3", width=2, value=0)
-    self.Muxselseg2 = RegField("Muxselseg2", width=2, value=0)
-    self.Muxselseg1 = RegField("Muxselseg1", width=2, value=0)
-    self.Muxselseg0 = RegField("Muxselseg0", width=2, value=0)
-    self.rsvd = RegField("rsvd", width=48, value=0)
+    self.Muxselseg7 = self.addField("Muxselseg7")
+    self.Muxselseg6 = self.addField("Muxselseg6")
+    self.Muxselseg5 = self.addField("Muxselseg5")
+    self.Muxselseg4 = self.addField("Muxselseg4")
+    self.Muxselseg3 = self.addField("Muxselseg3")
+    self.Muxselseg2 = self.addField("Muxselseg2")
+    self.Muxselseg1 = self.addField("Muxselseg1")
+    self.Muxselseg0 = self.addField("Muxselseg0")
+    self.rsvd = self.addField("rsvd")
+
+  def getFieldList(self):
+    return [self.rsvd, self.Muxselseg7, self.Muxselseg6, self.Muxselseg5, self.Muxselseg4, self.Muxselseg3, self.Muxselseg2, self.Muxselseg1, self.Muxselseg0]
 
   def getDict(self):
-    fieldList = [self.rsvd, self.Muxselseg7, self.Muxselseg6, self.Muxselseg5, self.Muxselseg4, self.Muxselseg3, self.Muxselseg2, self.Muxselseg1, self.Muxselseg0]
-    return getRegDict(self, fieldList)
+    return getRegDict(self, self.getFieldList())
+
+  def getValue(self):
+    return packRegValue(self, self.getFieldList())
 
   def getComments(self):
     commentDict = {}
@@ -1817,30 +2746,37 @@ class DebugSignalDelayReg:
     return commentDict
 
 class ClaValues:
-  def __init__ (self, name=None):
+  def __init__ (self, name=None, csrMap=None):
     self.name = name
+    if (csrMap is None):
+      csrMap = loadCsrMap()
+    self.csrMap = csrMap
+
+    #Phase timings and work counters collected while compiling
+    self.profile = PhaseProfiler()
+    self.programHash = None
 
     #Registers
     self.registers = {}
     for i in range(g_availableCounters):
-      self.addRegister(CounterCfgReg("dbg_cla_counter{}_cfg".format(i)))
+      self.addRegister(CounterCfgReg("dbg_cla_counter{}_cfg".format(i), csrMap=self.csrMap))
     
     for i in range(g_availableNodes):
       for j in range(g_availableEapsPerNode):
-        self.addRegister(EapReg("dbg_node{}_eap{}".format(i, j)))
+        self.addRegister(EapReg("dbg_node{}_eap{}".format(i, j), csrMap=self.csrMap))
 
     for i in range(g_availableMatchRegs):
-      self.addRegister(SignalMaskReg("dbg_signal_mask{}".format(i)))
-      self.addRegister(SignalMatchReg("dbg_signal_match{}".format(i)))
-
-    self.addRegister(EdgeDetectCfgReg("dbg_signal_edge_detect_cfg"))
-    self.addRegister(TransitionMaskReg("dbg_transition_mask"))
-    self.addRegister(TransitionFromValueReg("dbg_transition_from_value"))
-    self.addRegister(TransitionToValueReg("dbg_transition_to_value"))
-    self.addRegister(OnesCountMaskReg("dbg_ones_count_mask"))
-    self.addRegister(OnesCountValueReg("dbg_ones_count_value"))
-    self.addRegister(AnyChangeReg("dbg_any_change"))
-    self.addRegister(DebugSignalDelayReg("dbg_signal_delay_mux_sel"))
+      self.addRegister(SignalMaskReg("dbg_signal_mask{}".format(i), csrMap=self.csrMap))
+      self.addRegister(SignalMatchReg("dbg_signal_match{}".format(i), csrMap=self.csrMap))
+
+    self.addRegister(EdgeDetectCfgReg("dbg_signal_edge_detect_cfg", csrMap=self.csrMap))
+    self.addRegister(TransitionMaskReg("dbg_transition_mask", csrMap=self.csrMap))
+    self.addRegister(TransitionFromValueReg("dbg_transition_from_value", csrMap=self.csrMap))
+    self.addRegister(TransitionToValueReg("dbg_transition_to_value", csrMap=self.csrMap))
+    self.addRegister(OnesCountMaskReg("dbg_ones_count_mask", csrMap=self.csrMap))
+    self.addRegister(OnesCountValueReg("dbg_ones_count_value", csrMap=self.csrMap))
+    self.addRegister(AnyChangeReg("dbg_any_change", csrMap=self.csrMap))
+    self.addRegister(DebugSignalDelayReg("dbg_signal_delay_mux_sel", csrMap=self.csrMap))
 
   def addRegister(self, registerObj):
     registerName = registerObj.name
@@ -1851,11 +2787,28 @@ class ClaValues:
     if (isinstance(registerObj, MuxSelectReg)):
       registerName = "{}__ID_{}".format(registerName, registerObj.DbmId.value)
       if (registerName in self.registers):
-        g_logger.error("Multiple debug mux instances connected to select csr \"{}\" have the same mux ID \"{}\"".format(registerObj.name, registerObj.DbmId))
-        sys.exit()
+        raise ClaCompilerError("Multiple debug mux instances connected to select csr \"{}\" have the same mux ID \"{}\"".format(registerObj.name, registerObj.DbmId))
 
     self.registers[registerName] = registerObj
 
+  def resetRegister(self, registerName):
+    '''
+    Replaces a register with a new one of the same type, so every field is back at its reset value
+    '''
+    registerObj = self.registers[registerName]
+    self.registers[registerName] = type(registerObj)(registerObj.name, csrMap=self.csrMap)
+
+  def copy(self):
+    '''
+    Returns a copy with an empty profile that shares the register objects, so a register of the copy must be replaced
+    with resetRegister before it is modified
+    '''
+    csrValuesCopy = copy.copy(self)
+    csrValuesCopy.registers = dict(self.registers)
+    csrValuesCopy.profile = PhaseProfiler()
+
+    return csrValuesCopy
+
   def writeToYamlFile(self, outputPath, removeHexQuotes=True):
     #Generate value dict
     valueDict = {}
@@ -1893,41 +2846,374 @@ class ClaValues:
     outputFile.write(fileTxt)
     outputFile.close()
 
+  def getRegisterValues(self):
+    registerValues = {}
+    for registerName in self.registers:
+      registerValues[registerName] = self.registers[registerName].getValue()
+
+    return registerValues
+
+  def getCsrImage(self):
+    registerNames = list(self.registers)
+    addresses = [self.registers[registerName].getAddress() for registerName in registerNames]
+    registerValues = self.getRegisterValues()
+    values = [registerValues[registerName] for registerName in registerNames]
+
+    return CsrImage(addresses, values, registerNames, self.programHash)
+
+  def writeToBinaryFile(self, outputPath, includeNames=True):
+    self.getCsrImage().writeToFile(outputPath, includeNames)
+
+  def getResetImage(self):
+    registerNames = list(self.registers)
+    addresses = [self.registers[registerName].getAddress() for registerName in registerNames]
+    values = [self.registers[registerName].csr.getResetValue() for registerName in registerNames]
+
+    return CsrImage(addresses, values, registerNames)
+
+  def getApbWrites(self, baseline=None):
+    '''
+    Returns the 32 bit (address, data) APB writes that program every register, in register name order. With a baseline
+    CsrImage of the currently programmed values, only the 32 bit words that differ from the baseline are written
+    '''
+    registerValues = self.getRegisterValues()
+    baselineValues = {}
+    if (baseline is not None):
+      baselineValues = baseline.getValueDict()
+
+    apbWrites = []
+    for registerName in sorted(self.registers):
+      registerObj = self.registers[registerName]
+      address = registerObj.getAddress()
+      value = registerValues[registerName]
+
+      baselineValue = baselineValues.get(registerName if (baseline.names is not None) else address) if (baseline is not None) else None
+      if (baselineValue is None):
+        writeLower = True
+        writeUpper = True
+      else:
+        writeLower = ((value ^ baselineValue) & 0xFFFFFFFF) != 0
+        writeUpper = ((value ^ baselineValue) >> 32) != 0
+
+      #Debug muxes decode their DbmId from the lower word, so a mux select CSR is always written in full
+      if (isinstance(registerObj, MuxSelectReg) and (writeLower or writeUpper)):
+        writeLower = True
+        writeUpper = True
+
+      if (writeLower):
+        apbWrites.append((address, value & 0xFFFFFFFF))
+      if (writeUpper):
+        apbWrites.append((address + 4, (value >> 32) & 0xFFFFFFFF))
+
+    return apbWrites
+
+  def writeToApbTrafficFile(self, outputPath, baseline=None):
+    '''
+    Writes the APB writes in the format read by dv/dfd/dfd_mmrs_tb.sv. Returns the number of writes
+    '''
+    apbWrites = self.getApbWrites(baseline)
+
+    outputFile = open(outputPath, "w")
+    for address, data in apbWrites:
+      outputFile.write("write {} {} f\n".format(hex(address), hex(data)))
+    outputFile.close()
+
+    return len(apbWrites)
+
   def writeToCsvFile(self, outputPath):
     #Generate value dict
-    valueDict = {}
-    for registerName in self.registers:
-      valueDict[registerName] = self.registers[registerName].getDict()
+    registerValues = self.getRegisterValues()
 
     #Output to file
     outputFile = open(outputPath, "w")
     header = "mmr_name,hex_value\n"
     outputFile.write(header)
     for registerName in self.registers:
-      hexValStr = valueDict[registerName]["value"]
+      hexValStr = "0x%x" % registerValues[registerName]
       rowStr = "{},{}\n".format(registerName, hexValStr)
       outputFile.write(rowStr)
     outputFile.close()
     
 
+###################################
+# CSR Images
+###################################
+g_csrImageMagic = b"CLACSRI\0"
+g_csrImageFormat = 1
+#magic, format version, flags, record count, record offset, name table offset, program hash, reserved
+g_csrImageHeaderFmt = "<8sHHIII32s8x"
+g_csrImageRecordFmt = "<QQ"
+g_csrImageNameTableFlag = 0x1
+if (numpy is not None):
+  g_csrImageRecordDtype = numpy.dtype([("address", "<u8"), ("value", "<u8")])
+
+def alignImageOffset(offset):
+  return (offset + 7) & ~7
+
+class CsrImage:
+  '''
+  Compiled register values as a flat list of (address, value) records. Images are stored as a little-endian binary file:
+  a 64 byte header, the 16 byte (address, value) records, and an optional table of register names. Every section starts
+  on an 8 byte boundary, so the records can be loaded directly with numpy.fromfile() or mmap
+  '''
+  def __init__ (self, addresses, values, names=None, programHash=None):
+    self.addresses = addresses
+    self.values = values
+    self.names = names
+    if (programHash is None):
+      programHash = bytes(32)
+    self.programHash = programHash
+
+  def __len__(self):
+    return len(self.addresses)
+
+  def getRecords(self):
+    return [(int(address), int(value)) for address, value in zip(self.addresses, self.values)]
+
+  def getValueDict(self):
+    '''
+    Returns the register values keyed by register name, or by address when the image has no name table. Addresses that
+    are written more than once (debug mux select CSRs) can not be matched without names and are left out
+    '''
+    if (self.names is not None):
+      return dict(zip(self.names, [int(value) for value in self.values]))
+
+    valueDict = {}
+    repeatedAddresses = set()
+    for address, value in self.getRecords():
+      if (address in valueDict):
+        repeatedAddresses.add(address)
+      valueDict[address] = value
+    for address in repeatedAddresses:
+      del valueDict[address]
+
+    return valueDict
+
+  def toBytes(self, includeNames=True):
+    flags = 0
+    headerSize = struct.calcsize(g_csrImageHeaderFmt)
+    recordsBytes = b"".join([struct.pack(g_csrImageRecordFmt, address, value) for address, value in self.getRecords()])
+
+    nameTableOffset = 0
+    nameTableBytes = b""
+    if (includeNames and (self.names is not None)):
+      flags |= g_csrImageNameTableFlag
+      nameTableOffset = alignImageOffset(headerSize + len(recordsBytes))
+      namesBytes = "\0".join(self.names).encode("utf-8")
+      nameTableBytes = struct.pack("<I", len(namesBytes)) + namesBytes
+      nameTableBytes += bytes(alignImageOffset(len(nameTableBytes)) - len(nameTableBytes))
+
+    headerBytes = struct.pack(g_csrImageHeaderFmt, g_csrImageMagic, g_csrImageFormat, flags, len(self), headerSize, nameTableOffset, self.programHash)
+    return headerBytes + recordsBytes + nameTableBytes
+
+  def writeToFile(self, outputPath, includeNames=True):
+    outputFile = open(outputPath, "wb")
+    outputFile.write(self.toBytes(includeNames))
+    outputFile.close()
+
+  @classmethod
+  def fromFile(cls, imagePath):
+    '''
+    Reads a binary CSR image. With numpy, addresses and values are uint64 arrays that view the records in place
+    '''
+    imageFile = open(imagePath, "rb")
+    data = imageFile.read()
+    imageFile.close()
+
+    return cls.fromBytes(data, imagePath)
+
+  @classmethod
+  def fromBytes(cls, data, imagePath=None):
+    headerSize = struct.calcsize(g_csrImageHeaderFmt)
+    if (len(data) < headerSize):
+      raise ClaCompilerError("Truncated CSR image", imagePath)
+    magic, formatVersion, flags, recordCount, recordOffset, nameTableOffset, programHash = struct.unpack_from(g_csrImageHeaderFmt, data, 0)
+    if (magic != g_csrImageMagic):
+      raise ClaCompilerError("Not a CSR image", imagePath)
+    if (formatVersion != g_csrImageFormat):
+      raise ClaCompilerError("Unsupported CSR image format version {}".format(formatVersion), imagePath)
+
+    recordSize = struct.calcsize(g_csrImageRecordFmt)
+    if ((recordOffset + recordCount*recordSize) > len(data)):
+      raise ClaCompilerError("Truncated CSR image", imagePath)
+
+    if (numpy is not None):
+      records = numpy.frombuffer(data, dtype=g_csrImageRecordDtype, count=recordCount, offset=recordOffset)
+      addresses = records["address"]
+      values = records["value"]
+    else:
+      records = list(struct.iter_unpack(g_csrImageRecordFmt, data[recordOffset:recordOffset+recordCount*recordSize]))
+      addresses = [record[0] for record in records]
+      values = [record[1] for record in records]
+
+    names = None
+    if (flags & g_csrImageNameTableFlag):
+      namesLength = struct.unpack_from("<I", data, nameTableOffset)[0]
+      namesBytes = data[nameTableOffset+4:nameTableOffset+4+namesLength]
+      names = namesBytes.decode("utf-8").split("\0") if (recordCount > 0) else []
+      if (len(names) != recordCount):
+        raise ClaCompilerError("CSR image name table does not match its records", imagePath)
+
+    return cls(addresses, values, names, programHash)
+
+
+###################################
+# Logical Expressions
+###################################
+g_logicalTokenRegex = re.compile(r"\s*(&&|\|\||[&|!~^()]|[^\s&|!~^()]+)")
+g_logicalKeywords = {
+  "and": "&",
+  "or": "|",
+  "not": "!"
+}
+g_udfWidth = 2**g_availableEventsPerEap
+g_udfMask = (1 << g_udfWidth) - 1
+g_udfCache = {}
+
+class LogicalExpression:
+  '''
+  Parsed event_logical_op expression. Accepts verilog (&&, ||, !, &, |, ~, ^) and python (and, or, not) operators with
+  verilog precedence: unary > and > xor > or. The expression is evaluated for every row of the UDF truth table at once,
+  with each event represented by its truth table column
+  '''
+  def __init__(self, expression):
+    self.expression = str(expression)
+    self.tokens = self.tokenize(self.expression)
+    self.position = 0
+
+    self.tree = self.parseOr()
+    if (self.position < len(self.tokens)):
+      raise ValueError("Unexpected \"{}\"".format(self.tokens[self.position]))
+
+  def tokenize(self, expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while (position < len(expression)):
+      tokenMatch = g_logicalTokenRegex.match(expression, position)
+      token = tokenMatch.group(1)
+      position = tokenMatch.end()
+
+      if (token in g_logicalKeywords):
+        token = g_logicalKeywords[token]
+      elif (token == "&&"):
+        token = "&"
+      elif (token == "||"):
+        token = "|"
+      elif (token == "~"):
+        token = "!"
+      tokens.append(token)
+
+    return tokens
+
+  def peek(self):
+    if (self.position < len(self.tokens)):
+      return self.tokens[self.position]
+    return None
+
+  def parseBinary(self, operator, parseOperand):
+    tree = parseOperand()
+    while (self.peek() == operator):
+      self.position += 1
+      tree = (operator, tree, parseOperand())
+
+    return tree
+
+  def parseOr(self):
+    return self.parseBinary("|", self.parseXor)
+
+  def parseXor(self):
+    return self.parseBinary("^", self.parseAnd)
+
+  def parseAnd(self):
+    return self.parseBinary("&", self.parseUnary)
+
+  def parseUnary(self):
+    token = self.peek()
+    if (token is None):
+      raise ValueError("Unexpected end of expression")
+    self.position += 1
+
+    if (token == "!"):
+      return ("!", self.parseUnary())
+
+    if (token == "("):
+      tree = self.parseOr()
+      if (self.peek() != ")"):
+        raise ValueError("Missing \")\"")
+      self.position += 1
+      return tree
+
+    if (token in ["&", "|", "^", ")"]):
+      raise ValueError("Unexpected \"{}\"".format(token))
+
+    return ("event", token)
+
+  def getEventNames(self):
+    return [token for token in self.tokens if not (token in ["&", "|", "^", "!", "(", ")"])]
+
+  def getNormalizedString(self, event_indexes):
+    '''
+    Returns the expression with event names replaced by EAP event numbers. Expressions that only differ in event
+    names or formatting have the same normalized string
+    '''
+    normalizedTokens = []
+    for token in self.tokens:
+      if (token in event_indexes):
+        token = "event_{}".format(event_indexes[token])
+      normalizedTokens.append(token)
+
+    return " ".join(normalizedTokens)
+
+  def evaluate(self, event_indexes, tree=None):
+    '''
+    Returns the UDF truth table as an int. Bit n is the expression value when event_i = bit i of n
+    '''
+    if (tree is None):
+      tree = self.tree
+
+    operator = tree[0]
+    if (operator == "event"):
+      return getEventColumn(event_indexes[tree[1]])
+    if (operator == "!"):
+      return self.evaluate(event_indexes, tree[1]) ^ g_udfMask
+    if (operator == "&"):
+      return self.evaluate(event_indexes, tree[1]) & self.evaluate(event_indexes, tree[2])
+    if (operator == "^"):
+      return self.evaluate(event_indexes, tree[1]) ^ self.evaluate(event_indexes, tree[2])
+    if (operator == "|"):
+      return self.evaluate(event_indexes, tree[1]) | self.evaluate(event_indexes, tree[2])
+
+    raise ValueError("Unknown operator \"{}\"".format(operator))
+
+
+def getEventColumn(eventIndx):
+  #Truth table column of an event. Bit n is set for every row where event_<eventIndx> is true
+  column = 0
+  for row in range(g_udfWidth):
+    if ((row >> eventIndx) & 1):
+      column |= 1 << row
+
+  return column
+
+
 ###################################
 # Compilation
 ###################################
-def compileMuxCsrs(csrValues):
+def compileMuxCsrs(debugMuxes, csrValues):
   g_logger.debug("Compiling mux select registers")
-  for muxName in g_debugMuxes:
-    muxObj = g_debugMuxes[muxName]
+  for muxName in debugMuxes:
+    muxObj = debugMuxes[muxName]
     muxObj.logPrintMuxInfo()
 
     for registerName in muxObj.output_lane_mappings:
       if (len(registerName) == 0):
-        g_logger.error("Invalid CSR name \"{}\" defined for debug mux instance \"{}\"".format(registerName, muxObj.name))
-        sys.exit()
+        raise ClaCompilerError("Invalid CSR name \"{}\" defined for debug mux instance \"{}\"".format(registerName, muxObj.name))
       
       laneValues = muxObj.output_lane_mappings[registerName]
 
       #Populate mux reg
-      muxReg = MuxSelectReg(registerName)
+      muxReg = MuxSelectReg(registerName, csrMap=csrValues.csrMap)
       muxReg.comment = ", ".join([sig.name for sig in muxObj.required_input_sigs[registerName]])
       if (len(muxReg.comment) == 0):
         muxReg.comment = None
@@ -1987,16 +3273,15 @@ def compileCounterCsrs(counterRegAllocations, csrValues):
     csrValues.registers[registerName].comment = counterName
     csrValues.registers[registerName].target.value = target  #TODO: Take into account upper_target field if target value is too large
 
-def getCustomOpcode(customActStr):
+def getCustomOpcode(customActStr, customActionOpcodes):
   opcodeVal = None
-  if (customActStr in g_customActionOpcodes):
-    opcodeVal = g_customActionOpcodes[customActStr]
+  if (customActStr in customActionOpcodes):
+    opcodeVal = customActionOpcodes[customActStr]
   else:
     try:
       opcodeVal = str2int(customActStr)
     except:
-      g_logger.error("Unkown custom action \"{}\"".format(customActStr))
-      sys.exit()
+      raise ClaCompilerError("Unkown custom action \"{}\"".format(customActStr))
 
   return opcodeVal
 
@@ -2009,8 +3294,7 @@ def getActionOpcode(actionStr, counterRegAllocations):
     actionStr = "NULL"
 
   if not (isinstance(actionStr, str)):
-    g_logger.error("Invalid type {} used for actionStr arg \"{}\"".format(type(actionStr), actionStr))
-    sys.exit()
+    raise ClaCompilerError("Invalid type {} used for actionStr arg \"{}\"".format(type(actionStr), actionStr))
 
   #Handle static opcodes
   if (actionStr in g_actionOpcodes):
@@ -2021,8 +3305,7 @@ def getActionOpcode(actionStr, counterRegAllocations):
   if (re.search("CLEAR\s", actionStr)):
     counterName = actionStr.replace("CLEAR", "").strip()
     if not (counterName in counterRegAllocations):
-      g_logger.error("Unkown counter in action \"{}\"".format(actionStr))
-      sys.exit()
+      raise ClaCompilerError("Unkown counter in action \"{}\"".format(actionStr))
     
     counterRegIndx = counterRegAllocations[counterName]["register"]
     linkedOpcode = "CLEAR_COUNTER_{}".format(counterRegIndx)
@@ -2032,8 +3315,7 @@ def getActionOpcode(actionStr, counterRegAllocations):
   if (re.search("STOP_AUTO_INCREMENT\s", actionStr)):
     counterName = actionStr.replace("STOP_AUTO_INCREMENT", "").strip()
     if not (counterName in counterRegAllocations):
-      g_logger.error("Unkown counter in action \"{}\"".format(actionStr))
-      sys.exit()
+      raise ClaCompilerError("Unkown counter in action \"{}\"".format(actionStr))
     
     counterRegIndx = counterRegAllocations[counterName]["register"]
     linkedOpcode = "STOP_AUTO_INCREMENT_COUNTER_{}".format(counterRegIndx)
@@ -2043,8 +3325,7 @@ def getActionOpcode(actionStr, counterRegAllocations):
   if (re.search("AUTO_INCREMENT\s", actionStr)):
     counterName = actionStr.replace("AUTO_INCREMENT", "").strip()
     if not (counterName in counterRegAllocations):
-      g_logger.error("Unkown counter in action \"{}\"".format(actionStr))
-      sys.exit()
+      raise ClaCompilerError("Unkown counter in action \"{}\"".format(actionStr))
     
     counterRegIndx = counterRegAllocations[counterName]["register"]
     linkedOpcode = "AUTO_INCREMENT_COUNTER_{}".format(counterRegIndx)
@@ -2054,8 +3335,7 @@ def getActionOpcode(actionStr, counterRegAllocations):
   if (re.search("INCREMENT\s", actionStr)):
     counterName = actionStr.replace("INCREMENT", "").strip()
     if not (counterName in counterRegAllocations):
-      g_logger.error("Unkown counter in action \"{}\"".format(actionStr))
-      sys.exit()
+      raise ClaCompilerError("Unkown counter in action \"{}\"".format(actionStr))
     
     counterRegIndx = counterRegAllocations[counterName]["register"]
     linkedOpcode = "INCREMENT_COUNTER_{}".format(counterRegIndx)
@@ -2067,8 +3347,7 @@ def getActionOpcode(actionStr, counterRegAllocations):
     opcodeVal = str2int(actionStr)
     return opcodeVal
   except:
-    g_logger.error("Unkown action \"{}\"".format(actionStr))
-    sys.exit()
+    raise ClaCompilerError("Unkown action \"{}\"".format(actionStr))
 
   return opcodeVal
 
@@ -2158,64 +3437,45 @@ def getEventOpcode(eventObj, matchRegAllocations, counterRegAllocations, edgeReg
   return opcodeVal
 
 
-def compileLogicalUdf(eapObj):
+def compileLogicalUdf(eapObj, profile=None):
   g_logger.debug("Compiling logic UDF for for EAP \"{}.{}\"".format(eapObj.parentNode.name, eapObj.name))
 
-  #Replace verilog logical operators with bitwise operators for easier parsing
-  logical_expression = str(eapObj.event_logical_op)
-  logical_expression = logical_expression.replace("&&", "&")
-  logical_expression = logical_expression.replace("||", "|")
-  logical_expression = logical_expression.replace("!", "~")
-
-  #Replace verilog operators with python operators
-  logical_expression = logical_expression.replace("&", " and ")
-  logical_expression = logical_expression.replace("|", " or ")
-  logical_expression = logical_expression.replace("~", " not ")
-
-  #Remove double whitespace
-  while ("  " in logical_expression):
-    logical_expression = logical_expression.replace("  ", " ")
-
-  #Check for undefined event names
   event_indexes = eapObj.event_indexes
-  expression_events = logical_expression.replace("(", "").replace(")", "").split()
-  for eventName in expression_events:
-    if (not (eventName in event_indexes)) and (not (eventName in ["and", "or", "not", "(", ")"])):
-      g_logger.error("Event name \"{}\" used in logical expression \"{}\" not defined for EAP \"{}.{}\"".format(eventName, eapObj.event_logical_op, eapObj.parentNode.name, eapObj.name))
-      sys.exit()
+  try:
+    logicalExpression = LogicalExpression(eapObj.event_logical_op)
+  except ValueError as e:
+    raise ClaCompilerError("Could not parse logical expression \"{}\" for EAP \"{}.{}\". {}".format(eapObj.event_logical_op, eapObj.parentNode.name, eapObj.name, e))
 
-  #Replace user event names with EAP event names
-  for eventName in event_indexes:
-    logical_expression = logical_expression.replace(eventName, "event_{}".format(event_indexes[eventName]))
+  #Check for undefined event names
+  for eventName in logicalExpression.getEventNames():
+    if not (eventName in event_indexes):
+      raise ClaCompilerError("Event name \"{}\" used in logical expression \"{}\" not defined for EAP \"{}.{}\"".format(eventName, eapObj.event_logical_op, eapObj.parentNode.name, eapObj.name))
+
+  #Determine UDF bits. Results are reused for every EAP with the same normalized expression
+  normalizedExpression = logicalExpression.getNormalizedString(event_indexes)
+  if (normalizedExpression in g_udfCache):
+    udf_value = g_udfCache[normalizedExpression]
+    if not (profile is None):
+      profile.count("UDF Cache Hits")
+  else:
+    udf_value = logicalExpression.evaluate(event_indexes)
+    g_udfCache[normalizedExpression] = udf_value
+    if not (profile is None):
+      profile.count("UDF Evaluations")
 
-  #Determine UDF bits
+  #Print logical parsing info into log
   udf_table_str = "E2\tE1\tE0\tUDF Bit\tUDF Bit Value"
-  udf_bits = []
-  for event_2 in [False, True]:
-    for event_1 in [False, True]:
-      for event_0 in [False, True]:
-        try:
-          udf_bit_val = int(eval(logical_expression))
-          udf_table_str += "\n{} \t{} \t{} \t{}      \t{}".format(int(event_2), int(event_1), int(event_0), len(udf_bits), udf_bit_val)
-          udf_bits.append(udf_bit_val)
-        except:
-          g_logger.error("Could not evaluate python expression \"{}\" generated from verilog expression \"{}\"".format(logical_expression, eapObj.event_logical_op))
-          sys.exit()
-
-  #Conver bit list into int
-  udf_bits.reverse()
-  udf_value = int("".join([str(i) for i in udf_bits]), 2)
+  for row in range(g_udfWidth):
+    udf_table_str += "\n{} \t{} \t{} \t{}      \t{}".format((row >> 2) & 1, (row >> 1) & 1, row & 1, row, (udf_value >> row) & 1)
 
-  #Print logical parsing info into log
   g_logger.debug("Event indexes for EventActionPair {}.{} = {}".format(eapObj.parentNode.name, eapObj.name, event_indexes))
-  g_logger.debug("User defined logical expression \"{}\" => \"{}\"".format(eapObj.event_logical_op, logical_expression))
+  g_logger.debug("User defined logical expression \"{}\" => \"{}\"".format(eapObj.event_logical_op, normalizedExpression))
   g_logger.debug("UDF field table:\n{}".format(udf_table_str))
   g_logger.debug("UDF field value = {}".format(udf_value))
 
   return udf_value
 
-def compileEapCsrs(nodeDict, startNode, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, csrValues):
-  g_logger.debug("Compiling EAP registers")
+def allocateNodeIndexes(nodeDict, startNode):
   #Allocate node indexes
   freeNodes = [i for i in range(1,g_availableNodes)]
   nodeAllocations = {}
@@ -2228,135 +3488,115 @@ def compileEapCsrs(nodeDict, startNode, matchRegAllocations, counterRegAllocatio
 
     nodeAllocations[nodeName] = nodeIndex
 
-  #Populate node registers
+  return nodeAllocations
+
+def allocateEapRegisters(nodeDict, nodeAllocations):
+  '''
+  Returns the name of the EAP register of every EAP in nodeDict, as (register name, EventActionPair) pairs
+  '''
+  eapRegisters = []
   for nodeName in nodeDict:
     nodeIndex = nodeAllocations[nodeName]
-
-    #Populate EAP regs for this node
     nodeObj = nodeDict[nodeName]
     freeEaps = [i for i in range(0,g_availableEapsPerNode)]
     for eapName in nodeObj.eaps:
-      #Allocate EAP register
-      eapObj = nodeObj.eaps[eapName]
       eapInx = freeEaps.pop(0)
-      registerName = "dbg_node{}_eap{}".format(nodeIndex, eapInx)
-
-      eapReg = csrValues.registers[registerName]
-      eapReg.comment = "{}.{}".format(eapObj.parentNode.name, eapObj.name)
-
-      #Populate destination node
-      if not (eapObj.next_state_node in nodeAllocations):
-        g_logger.error("Unkown destination node \"{}\" in {}.{}".format(eapObj.next_state_node, eapObj.parentNode.name, eapObj.name))
-        sys.exit()
-
-      destinationNodeIndx = nodeAllocations[eapObj.next_state_node]
-      eapReg.dest_node.value = destinationNodeIndx
-      eapReg.dest_node.comment = eapObj.next_state_node
-
-      #Populate logical op and udf
-      eapReg.logical_op.value = g_logicalOpcodes["NONE"]  #Disable logical_op for all cases, since compiler just uses the UDF for everything
-      eapReg.logical_op.comment = "NONE"
-
-      eapReg.udf.comment = eapObj.event_logical_op
-      eapReg.udf.value = compileLogicalUdf(eapObj)
-
-      #Populate event types
-      for eventName in eapObj.event_triggers:
-        #Determine opcode value
-        eventObj = eapObj.event_triggers[eventName]
-        eventIndx = eapObj.event_indexes[eventName]
-        opcodeVal = getEventOpcode(eventObj, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations)
-
-        #Set field values
-        if (eventIndx == 0):
-          eapReg.event_type0.value = opcodeVal
-          eapReg.event_type0.comment = eventObj.generateComment()
-        elif (eventIndx == 1):
-          eapReg.event_type1.value = opcodeVal
-          eapReg.event_type1.comment = eventObj.generateComment()
-        elif (eventIndx == 2):
-          eapReg.event_type2.value = opcodeVal
-          eapReg.event_type2.comment = eventObj.generateComment()
-        else:
-          raise ValueError("Event index {} out of bounds".format(eventIndx))
-
-      #Populate custom actions
-      customIndx = 0
-      for customAct in eapObj.custom_actions:
-        #Determine opcode value
-        opcodeVal = getCustomOpcode(customAct)
-
-        #Set field values
-        if (customIndx == 0):
-          eapReg.custom_action_0.value = opcodeVal
-          eapReg.custom_action_0.comment = customAct
-          eapReg.custom_action0_enable.value = 1;
-        elif (customIndx == 1):
-          eapReg.custom_action_1.value = opcodeVal
-          eapReg.custom_action_1.comment = customAct
-          eapReg.custom_action1_enable.value = 1;
-        else:
-          raise ValueError("Custom action index {} out of bounds".format(customIndx))
-
-        #Mode on to next action
-        customIndx += 1
-
-      #Populate actions
-      actionIndx = 0
-      for action in eapObj.actions:
-        #Determine opcode value
-        opcodeVal = getActionOpcode(action, counterRegAllocations)
-
-        #Set field values
-        if (actionIndx == 0):
-          eapReg.action0.value = opcodeVal
-          eapReg.action0.comment = action
-        elif (actionIndx == 1):
-          eapReg.action1.value = opcodeVal
-          eapReg.action1.comment = action
-        elif (actionIndx == 2):
-          eapReg.action2.value = opcodeVal
-          eapReg.action2.comment = action
-        elif (actionIndx == 3):
-          eapReg.action3.value = opcodeVal
-          eapReg.action3.comment = action
-        else:
-          raise ValueError("Action index {} out of bounds".format(actionIndx))
+      eapRegisters.append(("dbg_node{}_eap{}".format(nodeIndex, eapInx), nodeObj.eaps[eapName]))
 
-        #Mode on to next action
-        actionIndx += 1
+  return eapRegisters
 
+def compileEapCsrs(nodeDict, startNode, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, csrValues):
+  g_logger.debug("Compiling EAP registers")
+  nodeAllocations = allocateNodeIndexes(nodeDict, startNode)
+
+  #Populate EAP regs for every node
+  for registerName, eapObj in allocateEapRegisters(nodeDict, nodeAllocations):
+    compileEapReg(eapObj, csrValues.registers[registerName], nodeAllocations, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, csrValues.profile)
+
+def compileEapReg(eapObj, eapReg, nodeAllocations, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, profile=None):
+  eapReg.comment = "{}.{}".format(eapObj.parentNode.name, eapObj.name)
+
+  #Populate destination node
+  if not (eapObj.next_state_node in nodeAllocations):
+    raise ClaCompilerError("Unkown destination node \"{}\" in {}.{}".format(eapObj.next_state_node, eapObj.parentNode.name, eapObj.name))
+
+  destinationNodeIndx = nodeAllocations[eapObj.next_state_node]
+  eapReg.dest_node.value = destinationNodeIndx
+  eapReg.dest_node.comment = eapObj.next_state_node
+
+  #Populate logical op and udf
+  eapReg.logical_op.value = g_logicalOpcodes["NONE"]  #Disable logical_op for all cases, since compiler just uses the UDF for everything
+  eapReg.logical_op.comment = "NONE"
+
+  eapReg.udf.comment = eapObj.event_logical_op
+  eapReg.udf.value = compileLogicalUdf(eapObj, profile)
+
+  #Populate event types
+  for eventName in eapObj.event_triggers:
+    #Determine opcode value
+    eventObj = eapObj.event_triggers[eventName]
+    eventIndx = eapObj.event_indexes[eventName]
+    opcodeVal = getEventOpcode(eventObj, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations)
+
+    #Set field values
+    if (eventIndx == 0):
+      eapReg.event_type0.value = opcodeVal
+      eapReg.event_type0.comment = eventObj.generateComment()
+    elif (eventIndx == 1):
+      eapReg.event_type1.value = opcodeVal
+      eapReg.event_type1.comment = eventObj.generateComment()
+    elif (eventIndx == 2):
+      eapReg.event_type2.value = opcodeVal
+      eapReg.event_type2.comment = eventObj.generateComment()
+    else:
+      raise ValueError("Event index {} out of bounds".format(eventIndx))
+
+  #Populate custom actions
+  customIndx = 0
+  for customAct in eapObj.custom_actions:
+    #Determine opcode value
+    opcodeVal = getCustomOpcode(customAct, eapObj.program.customActionOpcodes)
+
+    #Set field values
+    if (customIndx == 0):
+      eapReg.custom_action_0.value = opcodeVal
+      eapReg.custom_action_0.comment = customAct
+      eapReg.custom_action0_enable.value = 1;
+    elif (customIndx == 1):
+      eapReg.custom_action_1.value = opcodeVal
+      eapReg.custom_action_1.comment = customAct
+      eapReg.custom_action1_enable.value = 1;
+    else:
+      raise ValueError("Custom action index {} out of bounds".format(customIndx))
+
+    #Mode on to next action
+    customIndx += 1
+
+  #Populate actions
+  actionIndx = 0
+  for action in eapObj.actions:
+    #Determine opcode value
+    opcodeVal = getActionOpcode(action, counterRegAllocations)
+
+    #Set field values
+    if (actionIndx == 0):
+      eapReg.action0.value = opcodeVal
+      eapReg.action0.comment = action
+    elif (actionIndx == 1):
+      eapReg.action1.value = opcodeVal
+      eapReg.action1.comment = action
+    elif (actionIndx == 2):
+      eapReg.action2.value = opcodeVal
+      eapReg.action2.comment = action
+    elif (actionIndx == 3):
+      eapReg.action3.value = opcodeVal
+      eapReg.action3.comment = action
+    else:
+      raise ValueError("Action index {} out of bounds".format(actionIndx))
 
-class DbmBitIndex:
-  def __init__ (self, inputSignalObj, target=None):
-    self.target = target
-
-    #Check width of inputSignalObj
-    self.inputSignalObj = inputSignalObj
-    if (self.inputSignalObj.width != 1):
-      raise IndexError("DebugBusSignal object of width {} used to instantiate DbmBitIndex. Only single bit signals are supported".format(self.inputSignalObj.width))
-
-    self.dbmInputLane, self.laneIndx = inputSignalObj.getBitPlacement(0)
-
-    #Fetch final dbm output signal
-    self.output_signal_obj = inputSignalObj
-    while True:
-      if (len(self.output_signal_obj.loaded_signals) == 0):
-        break
-      if (len(self.output_signal_obj.loaded_signals) > 1):
-        g_logger.error("Too many loaded signals found for edge detect signal \"{}\"->\"{}\". Loaded signals = {}. Only single bit signals are supported for edge events".format(inputSignalObj.name, output_signal_obj.name, output_signal_obj.loaded_signals))
-        sys.exit()
-
-      self.output_signal_obj = self.output_signal_obj.loaded_signals[0]
-
-    if (self.output_signal_obj == inputSignalObj):
-      g_logger.error("Could not find loaded output signal of \"{}\"".format(inputSignalObj.name))
-      sys.exit()
-    
-    self.outputBitIndx = self.output_signal_obj.lower_signal_index
+    #Mode on to next action
+    actionIndx += 1
 
-  def __str__(self):
-    return "TODO"
 
 '''
 class DbmBitIndex_OLD:
@@ -2371,8 +3611,7 @@ class DbmBitIndex_OLD:
     return "INPUT_LANE_{}[{}] = OUTPUT_LANE_{}[{}] = DEBUG_BUS[{}] == {}".format(self.dbmInputLane, self.laneIndx, self.dbmOutputLane, self.laneIndx, self.outputBitIndx, self.target)
 '''
 
-def expandBitwise(triggerCondition, muxSignals, from_value=False):
-  matchBits = []
+def getSignalMaskValue(triggerCondition, muxSignals, from_value=False):
   #Fetch DebugBusSignal object
   dbmSignalObj = None
   for muxName in muxSignals:
@@ -2380,28 +3619,19 @@ def expandBitwise(triggerCondition, muxSignals, from_value=False):
       dbmSignalObj = muxSignals[muxName][triggerCondition.signal]
       break
 
-  #Convert target value into binary list
-  try:
-    if (from_value):
-      targetBitList = getBinaryList(triggerCondition.from_value, width=dbmSignalObj.width)
-    elif (triggerCondition.type == TRIGGER_TYPE.ANY_CHANGE):
-      targetBitList = [0 for i in range(dbmSignalObj.width)]
-    else:
-      targetBitList = getBinaryList(triggerCondition.value, width=dbmSignalObj.width)
-  except ValueError:
-    g_logger.error("Signal \"{}\" is not wide enough to compare to value \"{}\"".format(triggerCondition.signal, triggerCondition.value))
-    sys.exit()
-
-  targetBitList.reverse()
+  #Get target value
+  if (from_value):
+    targetValue = triggerCondition.from_value
+  elif (triggerCondition.type == TRIGGER_TYPE.ANY_CHANGE):
+    targetValue = 0
+  else:
+    targetValue = triggerCondition.value
 
-  #Generate list of DbmBitIndex objects
-  bitwiseSignals = dbmSignalObj.expandBitwise()
-  for indx in range(dbmSignalObj.width):
-    targetValue = targetBitList[indx]
-    bitSignalObj = bitwiseSignals[indx]
-    matchBits.append(DbmBitIndex(bitSignalObj, target=targetValue))
+  if (targetValue.bit_length() > dbmSignalObj.width):
+    raise ClaCompilerError("Signal \"{}\" is not wide enough to compare to value \"{}\"".format(triggerCondition.signal, triggerCondition.value))
 
-  return matchBits
+  #Shift target value into CLA debug bus bit positions
+  return dbmSignalObj.getClaMaskValue(targetValue)
 
 def compileMatchMaskCsrs(nodeDict, matchRegAllocations, muxSignals, csrValues):
   g_logger.debug("Compiling match/mask registers")
@@ -2421,31 +3651,15 @@ def compileMatchMaskCsrs(nodeDict, matchRegAllocations, muxSignals, csrValues):
           matchRegEvents[regindx] = eventObj
           matchRegMuxNames[regindx] = eapObj.debug_mux_reg
 
-  #Expand match triggers per bit
-  matchMaskLists = {}
+  #Generate match and mask values
   for regIndx in matchRegEvents:
-    #Generate list of DbmBitIndex objs
-    matchMaskBitList = []
+    maskValue = 0
+    matchValue = 0
     eventObj = matchRegEvents[regIndx]
     for triggerCondition in eventObj.triggerConditions:
-      matchMaskBitList += expandBitwise(triggerCondition, muxSignals)
-
-    matchMaskLists[regIndx] = matchMaskBitList
-
-  #Generate match and mask values
-  for regIndx in matchMaskLists:
-    maskBinList = [0 for i in range(g_claDebugInputWidth)]
-    matchBinList = [0 for i in range(g_claDebugInputWidth)]
-
-    for matchBitObj in matchMaskLists[regIndx]:
-      maskBinList[matchBitObj.outputBitIndx] = 1
-      matchBinList[matchBitObj.outputBitIndx] = matchBitObj.target
-
-    maskBinList.reverse()
-    matchBinList.reverse()
-    
-    maskValue = int("".join([str(i) for i in maskBinList]), 2)
-    matchValue = int("".join([str(i) for i in matchBinList]), 2)
+      signalMask, signalMatch = getSignalMaskValue(triggerCondition, muxSignals)
+      maskValue |= signalMask
+      matchValue = (matchValue & ~signalMask) | signalMatch
 
     #Populate CSR values
     maskRegisterName = "dbg_signal_mask{}".format(regIndx)
@@ -2489,18 +3703,19 @@ def compileEdgeDetectCsrs(nodeDict, edgeRegAllocations, muxSignals, csrValues):
         inputSignalObj = muxSignals[muxName][triggerCondition.signal]
         break
 
-    #Generate DbmBitIndex obj
-    targetValue = triggerCondition.type
-    edgeBitObj = DbmBitIndex(inputSignalObj, target=targetValue)
+    #Get CLA debug bus bit
+    if (inputSignalObj.width != 1):
+      raise IndexError("DebugBusSignal object of width {} used for edge detect. Only single bit signals are supported".format(inputSignalObj.width))
+    signalBit, width, claBitIndx = inputSignalObj.getClaBitRanges()[0]
 
     #Populate CSR value
     if (regIndx == 0):
-      csrValues.registers["dbg_signal_edge_detect_cfg"].signal0_select.value = edgeBitObj.outputBitIndx
+      csrValues.registers["dbg_signal_edge_detect_cfg"].signal0_select.value = claBitIndx
       csrValues.registers["dbg_signal_edge_detect_cfg"].signal0_select.comment = inputSignalObj.name
 
       csrValues.registers["dbg_signal_edge_detect_cfg"].pos_edge_signal0.value = int(triggerCondition.type == TRIGGER_TYPE.POSEDGE)
     elif (regIndx == 1):
-      csrValues.registers["dbg_signal_edge_detect_cfg"].signal1_select.value = edgeBitObj.outputBitIndx
+      csrValues.registers["dbg_signal_edge_detect_cfg"].signal1_select.value = claBitIndx
       csrValues.registers["dbg_signal_edge_detect_cfg"].signal1_select.comment = inputSignalObj.name
 
       csrValues.registers["dbg_signal_edge_detect_cfg"].pos_edge_signal1.value = int(triggerCondition.type == TRIGGER_TYPE.POSEDGE)
@@ -2526,35 +3741,15 @@ def compileTransitionCsrs(nodeDict, transitionRegAllocations, muxSignals, csrVal
           matchRegEvents[regindx] = eventObj
           matchRegMuxNames[regindx] = eapObj.debug_mux_reg
 
-  #Expand match triggers per bit
-  toMatchMaskLists = {}
-  fromMatchMaskLists = {}
+  #Generate match and mask values
   for regIndx in matchRegEvents:
-    #Generate list of DbmBitIndex objs
-    toMatchMaskBitList = []
-    fromMatchMaskBitList = []
+    maskValue = 0
+    matchValue = 0
     eventObj = matchRegEvents[regIndx]
     for triggerCondition in eventObj.triggerConditions:
-      toMatchMaskBitList += expandBitwise(triggerCondition, muxSignals)
-      fromMatchMaskBitList += expandBitwise(triggerCondition, muxSignals, from_value=True)
-
-    toMatchMaskLists[regIndx] = toMatchMaskBitList
-    fromMatchMaskLists[regIndx] = fromMatchMaskBitList
-
-  #Generate match and mask values
-  for regIndx in toMatchMaskLists:
-    maskBinList = [0 for i in range(g_claDebugInputWidth)]
-    matchBinList = [0 for i in range(g_claDebugInputWidth)]
-
-    for matchBitObj in toMatchMaskLists[regIndx]:
-      maskBinList[matchBitObj.outputBitIndx] = 1
-      matchBinList[matchBitObj.outputBitIndx] = matchBitObj.target
-
-    maskBinList.reverse()
-    matchBinList.reverse()
-    
-    maskValue = int("".join([str(i) for i in maskBinList]), 2)
-    matchValue = int("".join([str(i) for i in matchBinList]), 2)
+      signalMask, signalMatch = getSignalMaskValue(triggerCondition, muxSignals)
+      maskValue |= signalMask
+      matchValue = (matchValue & ~signalMask) | signalMatch
 
     #Populate CSR values
     maskRegisterName = "dbg_transition_mask"
@@ -2567,14 +3762,12 @@ def compileTransitionCsrs(nodeDict, transitionRegAllocations, muxSignals, csrVal
     csrValues.registers[matchRegisterName].value.value = matchValue
     csrValues.registers[matchRegisterName].comment = matchComment
 
-  for regIndx in fromMatchMaskLists:
-    matchBinList = [0 for i in range(g_claDebugInputWidth)]
-
-    for matchBitObj in fromMatchMaskLists[regIndx]:
-      matchBinList[matchBitObj.outputBitIndx] = matchBitObj.target
-
-    matchBinList.reverse()
-    matchValue = int("".join([str(i) for i in matchBinList]), 2)
+  for regIndx in matchRegEvents:
+    matchValue = 0
+    eventObj = matchRegEvents[regIndx]
+    for triggerCondition in eventObj.triggerConditions:
+      signalMask, signalMatch = getSignalMaskValue(triggerCondition, muxSignals, from_value=True)
+      matchValue = (matchValue & ~signalMask) | signalMatch
 
     #Populate CSR values
     matchRegisterName = "dbg_transition_from_value"
@@ -2601,25 +3794,13 @@ def compileAnyChangeMaskCsrs(nodeDict, anyChangeRegAllocations, muxSignals, csrV
           anyChangeRegEvents[regindx] = eventObj
           anyChangeRegMuxNames[regindx] = eapObj.debug_mux_reg
 
-  #Expand triggers per bit
-  anyChangeMaskLists = {}
+  #Generate mask values
   for regIndx in anyChangeRegEvents:
-    #Generate list of DbmBitIndex objs
-    anyChangeMaskBitList = []
+    maskValue = 0
     eventObj = anyChangeRegEvents[regIndx]
     for triggerCondition in eventObj.triggerConditions:
-      anyChangeMaskBitList += expandBitwise(triggerCondition, muxSignals)
-
-    anyChangeMaskLists[regIndx] = anyChangeMaskBitList
-
-  #Generate mask values
-  for regIndx in anyChangeMaskLists:
-    maskBinList = [0 for i in range(g_claDebugInputWidth)]
-    for matchBitObj in anyChangeMaskLists[regIndx]:
-      maskBinList[matchBitObj.outputBitIndx] = 1
-    maskBinList.reverse()
-    
-    maskValue = int("".join([str(i) for i in maskBinList]), 2)
+      signalMask, signalMatch = getSignalMaskValue(triggerCondition, muxSignals)
+      maskValue |= signalMask
 
     #Populate CSR values
     maskRegisterName = "dbg_any_change"
@@ -2646,25 +3827,13 @@ def compileOnesCountCsrs(nodeDict, countOneRegAllocations, muxSignals, csrValues
           countOnesRegEvents[regindx] = eventObj
           countOnesRegMuxNames[regindx] = eapObj.debug_mux_reg
 
-  #Expand triggers per bit
-  countOnesMaskLists = {}
+  #Generate mask values
   for regIndx in countOnesRegEvents:
-    #Generate list of DbmBitIndex objs
-    countOnesMaskBitList = []
+    maskValue = 0
     eventObj = countOnesRegEvents[regIndx]
     for triggerCondition in eventObj.triggerConditions:
-      countOnesMaskBitList += expandBitwise(triggerCondition, muxSignals)
-
-    countOnesMaskLists[regIndx] = countOnesMaskBitList
-
-  #Generate mask values
-  for regIndx in countOnesMaskLists:
-    maskBinList = [0 for i in range(g_claDebugInputWidth)]
-    for matchBitObj in countOnesMaskLists[regIndx]:
-      maskBinList[matchBitObj.outputBitIndx] = 1
-    maskBinList.reverse()
-    
-    maskValue = int("".join([str(i) for i in maskBinList]), 2)
+      signalMask, signalMatch = getSignalMaskValue(triggerCondition, muxSignals)
+      maskValue |= signalMask
 
     #Populate CSR values
     maskRegisterName = "dbg_ones_count_mask"
@@ -2678,35 +3847,31 @@ def compileOnesCountCsrs(nodeDict, countOneRegAllocations, muxSignals, csrValues
     csrValues.registers[valueRegisterName].comment = valueComment
 
 
-def compileSignalDelayCsr(nodeDict, countOneRegAllocations, muxSignals, csrValues):
+def compileSignalDelayCsr(nodeDict, countOneRegAllocations, muxSignals, debugMuxes, csrValues):
   g_logger.debug("Compiling debug signal delay register")
   
   #Fetch all final CLA input signals
   claInputSignals = []
   muxInstanceFound = False
-  for muxName in g_debugMuxes:
-    muxObj = g_debugMuxes[muxName]
+  for muxName in debugMuxes:
+    muxObj = debugMuxes[muxName]
     if (muxObj.final_mux):
       muxInstanceFound = True
       claInputSignals = muxObj.output_signals
       break
 
   if (not muxInstanceFound):
-    g_logger.error("Unable to find final mux instance that feeds CLA debug bus")
-    sys.exit()
+    raise ClaCompilerError("Unable to find final mux instance that feeds CLA debug bus")
 
   #Get per-lane propogation delays
   laneDelays = {}
-  for signal_obj in claInputSignals:
-    if (signal_obj.lower_signal_index != signal_obj.upper_signal_index):
-      raise IndexError("Multibit signal \"{}\" cannot be use for propogation delay compensation calculation".format(signal_obj.name))
-
-    inputLaneIndx = int((signal_obj.lower_signal_index) / 8)
-    if not (inputLaneIndx in laneDelays):
-      laneDelays[inputLaneIndx] = {"Lane Index": inputLaneIndx, "Signals": [], "Delays": []}
+  for range_obj in claInputSignals:
+    for inputLaneIndx in range(int(range_obj.bus_bit / 8), int((range_obj.bus_bit + range_obj.width - 1) / 8) + 1):
+      if not (inputLaneIndx in laneDelays):
+        laneDelays[inputLaneIndx] = {"Lane Index": inputLaneIndx, "Signals": [], "Delays": []}
 
-    laneDelays[inputLaneIndx]["Signals"].append(signal_obj)
-    laneDelays[inputLaneIndx]["Delays"].append(signal_obj.cycle_delay)
+      laneDelays[inputLaneIndx]["Signals"].append(range_obj)
+      laneDelays[inputLaneIndx]["Delays"].append(range_obj.cycle_delay)
   
   #Remove duplicate delays
   for laneIndx in laneDelays:
@@ -2764,49 +3929,305 @@ def compileSignalDelayCsr(nodeDict, countOneRegAllocations, muxSignals, csrValue
       csrValues.registers["dbg_signal_delay_mux_sel"].Muxselseg7.value = requiredStaging
 
 
-def compileCsrValues(nodeDict, startNode):
-  csrValues = ClaValues()
+def compileCsrValues(program, busModel, csrMap=None, compileState=None):
+  '''
+  Compiles program into a new ClaValues. When a ClaCompileState is passed in, it is filled with what an incremental
+  compile of the next version of the program needs
+  '''
+  nodeDict = program.nodeDict
+  startNode = program.startNode
+  csrValues = ClaValues(program.name, csrMap)
+  csrValues.programHash = program.getHash()
+  profile = csrValues.profile
+  signalObjCount = DebugBusSignal.createdCount
+
+  #Mux lane allocations are per-compile state. Never modify the shared bus model muxes
+  with profile.phase("createMuxInstances"):
+    debugMuxes = busModel.createMuxInstances()
 
   #Allocate match/mask, counter, edge cfg, and transition registers
-  matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations = allocateCfgRegisters(nodeDict)
+  with profile.phase("allocateCfgRegisters"):
+    matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations = allocateCfgRegisters(nodeDict, program.counterAliases)
 
   #Determine mux select lanes
-  muxSignals = generateMuxGroupings(nodeDict)
-  generateMuxLanes(muxSignals)
+  with profile.phase("generateMuxGroupings"):
+    muxSignals = generateMuxGroupings(nodeDict, program.counterAliases, busModel, debugMuxes, profile)
+  with profile.phase("generateMuxLanes"):
+    muxStats = generateMuxLanes(muxSignals, debugMuxes, busModel)
+  for counterName in muxStats:
+    profile.count(counterName, muxStats[counterName])
 
   #Compile mux select register values
-  if (g_busConfigProvided):
-    compileMuxCsrs(csrValues)
+  if (busModel.busConfigProvided):
+    with profile.phase("compileMuxCsrs"):
+      compileMuxCsrs(debugMuxes, csrValues)
 
   #Compile counter register values
-  compileCounterCsrs(counterRegAllocations, csrValues)
+  with profile.phase("compileCounterCsrs"):
+    compileCounterCsrs(counterRegAllocations, csrValues)
 
   #Compile edge detect register value
-  compileEdgeDetectCsrs(nodeDict, edgeRegAllocations, muxSignals, csrValues)
+  with profile.phase("compileEdgeDetectCsrs"):
+    compileEdgeDetectCsrs(nodeDict, edgeRegAllocations, muxSignals, csrValues)
 
   #Compile match/mask register values
-  compileMatchMaskCsrs(nodeDict, matchRegAllocations, muxSignals, csrValues)
+  with profile.phase("compileMatchMaskCsrs"):
+    compileMatchMaskCsrs(nodeDict, matchRegAllocations, muxSignals, csrValues)
 
   #Compile EAP register values
-  compileEapCsrs(nodeDict, startNode, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, csrValues)
+  with profile.phase("compileEapCsrs"):
+    compileEapCsrs(nodeDict, startNode, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, csrValues)
 
   #Compile transition mask/match register values
-  compileTransitionCsrs(nodeDict, transitionRegAllocations, muxSignals, csrValues)
+  with profile.phase("compileTransitionCsrs"):
+    compileTransitionCsrs(nodeDict, transitionRegAllocations, muxSignals, csrValues)
 
   #Compile any change mask register values
-  compileAnyChangeMaskCsrs(nodeDict, anyChangeRegAllocations, muxSignals, csrValues)
+  with profile.phase("compileAnyChangeMaskCsrs"):
+    compileAnyChangeMaskCsrs(nodeDict, anyChangeRegAllocations, muxSignals, csrValues)
 
   #Compile ones count register values
-  compileOnesCountCsrs(nodeDict, countOneRegAllocations, muxSignals, csrValues)
+  with profile.phase("compileOnesCountCsrs"):
+    compileOnesCountCsrs(nodeDict, countOneRegAllocations, muxSignals, csrValues)
 
   #Compile signal delay register value
-  compileSignalDelayCsr(nodeDict, countOneRegAllocations, muxSignals, csrValues)
+  with profile.phase("compileSignalDelayCsr"):
+    compileSignalDelayCsr(nodeDict, countOneRegAllocations, muxSignals, debugMuxes, csrValues)
+
+  #Includes objects created by other threads compiling at the same time
+  profile.count("DebugBusSignal Objects", DebugBusSignal.createdCount - signalObjCount)
+
+  if not (compileState is None):
+    allocations = (matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations)
+    compileState.update(program, csrValues, muxSignals, allocations)
 
   return csrValues
 
 
+class ClaCompileState:
+  '''
+  What an incremental compile keeps from the last compile of a program: the compiled registers, the resolved debug
+  mux signals, and fingerprints of the inputs of the shared trigger registers and of every EAP register
+  '''
+  def __init__ (self):
+    self.csrValues = None
+    self.muxKey = None
+    self.muxSignals = None
+    self.triggerKey = None
+    self.eapFingerprints = {}
+
+  def update(self, program, csrValues, muxSignals, allocations):
+    self.csrValues = csrValues
+    self.muxKey = getMuxKey(program)
+    self.muxSignals = muxSignals
+    self.triggerKey = getTriggerKey(program, allocations)
+    self.eapFingerprints = getEapFingerprints(program, allocations)
+
+
+def getMuxKey(program):
+  '''
+  Returns the (signal, debug_mux_reg) pairs routed through the debug muxes. Mux lanes only have to be solved again
+  when this set changes
+  '''
+  muxKey = set()
+  for nodeName in program.nodeDict:
+    nodeObj = program.nodeDict[nodeName]
+    for eapName in nodeObj.eaps:
+      eapObj = nodeObj.eaps[eapName]
+      for signalName in getEapMuxSignals(eapObj, program.counterAliases):
+        muxKey.add((signalName, eapObj.debug_mux_reg))
+
+  return frozenset(muxKey)
+
+def getTriggerKey(program, allocations):
+  '''
+  Returns the inputs of the registers shared by all EAPs (counters, match/mask, edge detect, transition, ones count,
+  and any change), in the order the compile functions visit them
+  '''
+  matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations = allocations
+  triggerRegAllocations = [matchRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations]
+
+  triggerKey = []
+  for nodeName in program.nodeDict:
+    nodeObj = program.nodeDict[nodeName]
+    for eapName in nodeObj.eaps:
+      eapObj = nodeObj.eaps[eapName]
+      for eventName in eapObj.event_triggers:
+        eventObj = eapObj.event_triggers[eventName]
+        eventHash = eventObj.getHash()
+        for allocationIndx in range(len(triggerRegAllocations)):
+          if (eventHash in triggerRegAllocations[allocationIndx]):
+            conditions = [(triggerCondition.type, triggerCondition.signal, triggerCondition.value, triggerCondition.from_value) for triggerCondition in eventObj.triggerConditions]
+            triggerKey.append((allocationIndx, triggerRegAllocations[allocationIndx][eventHash], conditions))
+
+  return (triggerKey, counterRegAllocations)
+
+def getEapFingerprints(program, allocations):
+  '''
+  Returns the sha256 of the inputs of every EAP register, keyed by register name. Besides the EAP description, an EAP
+  register depends on the node indexes, the custom action aliases, the counter registers, and the event opcodes
+  '''
+  nodeAllocations = allocateNodeIndexes(program.nodeDict, program.startNode)
+  counterRegisters = {}
+  for counterName in allocations[1]:
+    counterRegisters[counterName] = allocations[1][counterName]["register"]
+
+  eapFingerprints = {}
+  for registerName, eapObj in allocateEapRegisters(program.nodeDict, nodeAllocations):
+    eventOpcodes = [getEventOpcode(eapObj.event_triggers[eventName], *allocations) for eventName in eapObj.event_triggers]
+    eapInputs = [eapObj.parentNode.name, eapObj.name, eapObj.eapDict, nodeAllocations, program.customActionOpcodes, counterRegisters, eventOpcodes]
+    eapStr = json.dumps(eapInputs, sort_keys=True, default=str)
+    eapFingerprints[registerName] = hashlib.sha256(eapStr.encode("utf-8")).digest()
+
+  return eapFingerprints
+
+def getTriggerRegisterNames():
+  registerNames = ["dbg_cla_counter{}_cfg".format(i) for i in range(g_availableCounters)]
+  for i in range(g_availableMatchRegs):
+    registerNames += ["dbg_signal_mask{}".format(i), "dbg_signal_match{}".format(i)]
+  registerNames += ["dbg_signal_edge_detect_cfg", "dbg_transition_mask", "dbg_transition_from_value", "dbg_transition_to_value", "dbg_ones_count_mask", "dbg_ones_count_value", "dbg_any_change"]
+
+  return registerNames
+
+def compileCsrValuesIncremental(program, busModel, csrMap=None, previousState=None):
+  '''
+  Compiles program starting from the ClaCompileState of an earlier compile of the same program against the same
+  BusModel and CsrMap. Only the registers whose inputs changed are compiled again. Falls back to a full compile when
+  there is no previous state, or when the debug mux lanes have to be reassigned. Returns the ClaValues and the new
+  ClaCompileState
+  '''
+  compileState = ClaCompileState()
+  muxKey = getMuxKey(program)
+  if (previousState is None) or (previousState.csrValues is None) or (muxKey != previousState.muxKey):
+    csrValues = compileCsrValues(program, busModel, csrMap, compileState)
+    csrValues.profile.count("Full Compiles")
+    return csrValues, compileState
+
+  nodeDict = program.nodeDict
+  profile = PhaseProfiler()
+
+  #Allocation is cheap, and tells whether any shared register changed
+  with profile.phase("allocateCfgRegisters"):
+    allocations = allocateCfgRegisters(nodeDict, program.counterAliases)
+    matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations = allocations
+    triggerKey = getTriggerKey(program, allocations)
+    eapFingerprints = getEapFingerprints(program, allocations)
+
+  #Mux select and signal delay registers are kept as is, since the same signals are routed through the muxes
+  with profile.phase("ClaValues.copy"):
+    csrValues = previousState.csrValues.copy()
+  csrValues.name = program.name
+  csrValues.programHash = program.getHash()
+  csrValues.profile = profile
+  muxSignals = previousState.muxSignals
+
+  #Recompile the shared trigger registers when any trigger using them changed
+  if (triggerKey != previousState.triggerKey):
+    with profile.phase("compileTriggerCsrs"):
+      for registerName in getTriggerRegisterNames():
+        csrValues.resetRegister(registerName)
+      compileCounterCsrs(counterRegAllocations, csrValues)
+      compileEdgeDetectCsrs(nodeDict, edgeRegAllocations, muxSignals, csrValues)
+      compileMatchMaskCsrs(nodeDict, matchRegAllocations, muxSignals, csrValues)
+      compileTransitionCsrs(nodeDict, transitionRegAllocations, muxSignals, csrValues)
+      compileAnyChangeMaskCsrs(nodeDict, anyChangeRegAllocations, muxSignals, csrValues)
+      compileOnesCountCsrs(nodeDict, countOneRegAllocations, muxSignals, csrValues)
+    profile.count("Trigger Register Recompiles")
+
+  #Recompile the EAP registers whose inputs changed, and clear the ones no longer used
+  with profile.phase("compileEapCsrs"):
+    nodeAllocations = allocateNodeIndexes(nodeDict, program.startNode)
+    for registerName, eapObj in allocateEapRegisters(nodeDict, nodeAllocations):
+      if (previousState.eapFingerprints.get(registerName) == eapFingerprints[registerName]):
+        profile.count("EAP Registers Reused")
+        continue
+
+      csrValues.resetRegister(registerName)
+      compileEapReg(eapObj, csrValues.registers[registerName], nodeAllocations, matchRegAllocations, counterRegAllocations, edgeRegAllocations, transitionRegAllocations, countOneRegAllocations, anyChangeRegAllocations, profile)
+      profile.count("EAP Registers Recompiled")
+
+    for registerName in previousState.eapFingerprints:
+      if not (registerName in eapFingerprints):
+        csrValues.resetRegister(registerName)
+
+  compileState.csrValues = csrValues
+  compileState.muxKey = muxKey
+  compileState.muxSignals = muxSignals
+  compileState.triggerKey = triggerKey
+  compileState.eapFingerprints = eapFingerprints
+
+  return csrValues, compileState
+
+
+class ClaCompiler:
+  '''
+  Compiles any number of CLA programs against one BusModel. The bus info is loaded and flattened once,
+  and every compile keeps its own state, so a single ClaCompiler can be used from multiple threads.
+  Register layouts come from csrMap, which defaults to the CLA and MCR RDL files.
+  Errors are raised as ClaCompilerError exceptions
+  '''
+  def __init__ (self, busModel=None, csrMap=None):
+    if (busModel is None):
+      busModel = BusModel()
+    if (csrMap is None):
+      csrMap = loadCsrMap()
+    self.busModel = busModel
+    self.csrMap = csrMap
+
+  @classmethod
+  def fromBusInfoFile(cls, busInfoPath, cache=None, csrMap=None):
+    if (cache is None):
+      return cls(BusModel.fromJsonFile(busInfoPath), csrMap)
+    return cls(cache.load(busInfoPath), csrMap)
+
+  def compile(self, program):
+    '''
+    Compiles a ClaProgram (or a program description dict) and returns the ClaValues
+    '''
+    if not isinstance(program, ClaProgram):
+      program = ClaProgram(program)
+
+    try:
+      return self.compileProgram(program)
+    except ClaCompilerError as e:
+      if (e.sourcePath is None):
+        e.sourcePath = program.name
+      raise
+
+  def compileProgram(self, program):
+    return compileCsrValues(program, self.busModel, self.csrMap)
+
+  def compileFile(self, programPath):
+    return self.compile(ClaProgram.fromYamlFile(programPath))
+
+
+class IncrementalClaCompiler(ClaCompiler):
+  '''
+  ClaCompiler that keeps the ClaCompileState of the last compile of every program, keyed by program name. Compiling
+  an edited version of a program only recompiles the EAP registers whose inputs changed, and falls back to a full
+  compile when the debug mux lanes have to be reassigned. Unlike ClaCompiler, it must not be shared between threads
+  '''
+  def __init__ (self, busModel=None, csrMap=None):
+    ClaCompiler.__init__(self, busModel, csrMap)
+    self.compileStates = {}
+
+  def compileProgram(self, program):
+    csrValues, compileState = compileCsrValuesIncremental(program, self.busModel, self.csrMap, self.compileStates.get(program.name))
+    self.compileStates[program.name] = compileState
+    return csrValues
+
+  def forget(self, programName=None):
+    '''
+    Drops the compile state of one program, or of every program, so its next compile is a full compile
+    '''
+    if (programName is None):
+      self.compileStates = {}
+    else:
+      self.compileStates.pop(programName, None)
+
+
 ###################################
-# Main
+# File Helpers
 ###################################
 def escapeBazelSandbox(filePath):
   absolutePath = None
@@ -2847,186 +4268,783 @@ def escapeBazelSandbox(filePath):
   return absolutePath
   
 
+def findInputFile(filePath):
+  if (os.path.exists(filePath)):
+    return filePath
+
+  g_logger.info("\"{}\" not found. Searching for file outside of bazel sandbox".format(filePath))
+  absolutePath = escapeBazelSandbox(filePath)
+  if (absolutePath is None):
+    g_logger.error("Path \"{}\" does not exist".format(filePath))
+    g_logger.error("CWD={}".format(os.getcwd()))
+    sys.exit()
+  g_logger.info("\"{}\" found at \"{}\"".format(filePath, absolutePath))
+
+  return absolutePath
+
+
+def getOutputPaths(outputPath):
+  #yaml, csv, and binary CSR image output paths. Only the final extension is replaced, so .yml outputs (or outputs without an extension) don't overwrite each other
+  outputBase = os.path.splitext(outputPath)[0]
+  return [outputPath, outputBase + ".csv", outputBase + ".bin"]
+
+def writeOutputFiles(csrValues, outputPath):
+  outputPath, csvOutputPath, imageOutputPath = getOutputPaths(outputPath)
+  g_logger.info("Writing field values to \"{}\"".format(outputPath))
+  with csrValues.profile.phase("writeToYamlFile"):
+    csrValues.writeToYamlFile(outputPath)
+
+  g_logger.info("Writing field values to \"{}\"".format(csvOutputPath))
+  with csrValues.profile.phase("writeToCsvFile"):
+    csrValues.writeToCsvFile(csvOutputPath)
+
+  g_logger.info("Writing CSR image to \"{}\"".format(imageOutputPath))
+  with csrValues.profile.phase("writeToBinaryFile"):
+    csrValues.writeToBinaryFile(imageOutputPath)
+
+  return [outputPath, csvOutputPath, imageOutputPath]
+
+
+###################################
+# Compile Cache
+###################################
+g_compileCacheFormat = 1
+g_compileCacheMaxBytes = 256*1024*1024
+g_compileCacheArtifacts = ["value_dump.yaml", "value_dump.csv", "value_dump.bin"]
+g_compileCacheApbArtifact = "apb_traffic.txt"
+g_compileCacheTempPrefix = ".tmp-"
+#Temp directories older than this were left behind by a compile that did not finish
+g_compileCacheStaleTime = 3600
+
+class CompileCache:
+  '''
+  Content addressed cache of compiler output files. Entries are keyed by a hash of the program yaml, the debug bus info,
+  the register descriptions, the compiler version, and the options that change the outputs, so a hit can copy the
+  outputs of an earlier compile without loading the bus info or compiling. Each entry is a directory that is only renamed
+  into place once it is complete, so concurrent compiles (ie --batch workers) can share one cache. Least recently used
+  entries are evicted once the cache is larger than maxBytes
+  '''
+  def __init__(self, cacheDir, maxBytes=g_compileCacheMaxBytes):
+    self.cacheDir = cacheDir
+    self.maxBytes = maxBytes
+    self.hits = 0
+    self.misses = 0
+
+  def getContextKey(self, inputPaths, options=None):
+    '''
+    Returns the hash of every compile input other than the program. inputPaths are the debug bus info, register
+    descriptions, and any other files read by the compile (None for the default dummy bus). options is a json
+    serializable dict of the command line options that change the outputs
+    '''
+    hasher = hashlib.sha256()
+    hasher.update("{}:{}:{}:".format(g_program_version, g_compileCacheFormat, json.dumps(options, sort_keys=True)).encode("utf-8"))
+    for inputPath in inputPaths:
+      if (inputPath is None):
+        hasher.update(b"default:")
+        continue
+      inputFile = open(inputPath, "rb")
+      hasher.update(hashlib.sha256(inputFile.read()).digest())
+      inputFile.close()
+
+    return hasher.hexdigest()
+
+  def getCacheKey(self, contextKey, programPath):
+    programFile = open(programPath, "rb")
+    programBytes = programFile.read()
+    programFile.close()
+
+    hasher = hashlib.sha256()
+    hasher.update(contextKey.encode("utf-8"))
+    hasher.update(programBytes)
+    return hasher.hexdigest()
+
+  def getEntryPath(self, cacheKey):
+    return os.path.join(self.cacheDir, cacheKey)
+
+  def load(self, cacheKey, outputPaths):
+    '''
+    Copies the cached outputs of cacheKey to outputPaths (a dict of artifact name to output path). Returns False on a miss
+    '''
+    entryPath = self.getEntryPath(cacheKey)
+    try:
+      for artifactName, outputPath in outputPaths.items():
+        shutil.copyfile(os.path.join(entryPath, artifactName), outputPath)
+    except OSError:
+      #Not cached, or evicted by another process while it was being copied
+      self.misses += 1
+      return False
+
+    #Mark as most recently used
+    try:
+      os.utime(entryPath)
+    except OSError:
+      pass
+
+    self.hits += 1
+    g_logger.info("Copied compile outputs from cache \"{}\"".format(entryPath))
+    return True
+
+  def store(self, cacheKey, outputPaths):
+    '''
+    Adds the output files in outputPaths (a dict of artifact name to output path) to the cache
+    '''
+    entryPath = self.getEntryPath(cacheKey)
+    try:
+      if not (os.path.exists(self.cacheDir)):
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+      #Copy to a temp directory and rename, so concurrent compiles never see a partial entry
+      tempPath = tempfile.mkdtemp(dir=self.cacheDir, prefix=g_compileCacheTempPrefix)
+      try:
+        for artifactName, outputPath in outputPaths.items():
+          shutil.copyfile(outputPath, os.path.join(tempPath, artifactName))
+        os.rename(tempPath, entryPath)
+      except OSError:
+        shutil.rmtree(tempPath, ignore_errors=True)
+        #Another process stored the same entry first
+        if not (os.path.isdir(entryPath)):
+          raise
+
+      self.evict()
+    except OSError as e:
+      g_logger.warning("Could not write compile cache entry \"{}\" ({})".format(entryPath, e))
+
+  def getEntries(self):
+    '''
+    Returns (path, size, last use time) of every complete cache entry
+    '''
+    entries = []
+    for entryName in os.listdir(self.cacheDir):
+      entryPath = os.path.join(self.cacheDir, entryName)
+      try:
+        entryTime = os.path.getmtime(entryPath)
+        if (entryName.startswith(g_compileCacheTempPrefix)):
+          if ((time.time() - entryTime) > g_compileCacheStaleTime):
+            shutil.rmtree(entryPath, ignore_errors=True)
+          continue
+        entrySize = sum([os.path.getsize(os.path.join(entryPath, fileName)) for fileName in os.listdir(entryPath)])
+      except OSError:
+        continue
+      entries.append((entryPath, entrySize, entryTime))
+
+    return entries
+
+  def evict(self):
+    entries = self.getEntries()
+    cacheSize = sum([entry[1] for entry in entries])
+    if (cacheSize <= self.maxBytes):
+      return
+
+    entries.sort(key=lambda entry: entry[2])
+    for entryPath, entrySize, entryTime in entries:
+      if (cacheSize <= self.maxBytes):
+        break
+      g_logger.debug("Evicting compile cache entry \"{}\"".format(entryPath))
+      #Rename first, so the entry disappears at once for other processes
+      evictPath = None
+      try:
+        evictPath = tempfile.mkdtemp(dir=self.cacheDir, prefix=g_compileCacheTempPrefix)
+        os.rename(entryPath, os.path.join(evictPath, "entry"))
+      except OSError:
+        continue
+      finally:
+        if not (evictPath is None):
+          shutil.rmtree(evictPath, ignore_errors=True)
+      cacheSize -= entrySize
+
+  def getStats(self):
+    entries = []
+    if (os.path.isdir(self.cacheDir)):
+      entries = self.getEntries()
+
+    return {
+      "Hits": self.hits,
+      "Misses": self.misses,
+      "Entries": len(entries),
+      "Size (B)": sum([entry[1] for entry in entries])
+    }
+
+
+###################################
+# Batch Compilation
+###################################
+g_batchCompiler = None
+g_batchCompileCache = None
+g_batchCacheContextKey = None
+
+def collectBatchPrograms(batchPath):
+  #Directory: compile every yaml file inside it. Otherwise treat the path as a glob
+  if (os.path.isdir(batchPath)):
+    programPaths = glob.glob(os.path.join(batchPath, "*.yaml")) + glob.glob(os.path.join(batchPath, "*.yml"))
+  else:
+    programPaths = glob.glob(batchPath)
+
+  programPaths = [path for path in programPaths if os.path.isfile(path)]
+  programPaths.sort()
+
+  return programPaths
+
+def initBatchWorker(busModel, csrMap, compileCache=None, cacheContextKey=None):
+  #Runs once per worker process. The bus model and CSR map are only parsed once by the parent process
+  global g_batchCompiler
+  global g_batchCompileCache
+  global g_batchCacheContextKey
+  g_batchCompiler = ClaCompiler(busModel, csrMap)
+  g_batchCompileCache = compileCache
+  g_batchCacheContextKey = cacheContextKey
+
+def compileBatchProgram(programPath, outputPath):
+  result = {
+    "Program Path": programPath,
+    "Status": "FAIL",
+    "Output Paths": [],
+    "Compile Time (s)": None,
+    "Error": None,
+    "Compile Cache": None,
+    "Profile": None
+  }
+
+  startTime = time.perf_counter()
+  try:
+    profile = PhaseProfiler()
+    cacheKey = None
+    cacheHit = False
+    if not (g_batchCompileCache is None):
+      cacheKey = g_batchCompileCache.getCacheKey(g_batchCacheContextKey, programPath)
+      cacheArtifacts = dict(zip(g_compileCacheArtifacts, getOutputPaths(outputPath)))
+      with profile.phase("CompileCache.load"):
+        cacheHit = g_batchCompileCache.load(cacheKey, cacheArtifacts)
+      profile.count("Compile Cache Hits" if (cacheHit) else "Compile Cache Misses")
+      result["Compile Cache"] = "Hit" if (cacheHit) else "Miss"
+
+    if (cacheHit):
+      result["Output Paths"] = getOutputPaths(outputPath)
+    else:
+      csrValues = g_batchCompiler.compileFile(programPath)
+      result["Output Paths"] = writeOutputFiles(csrValues, outputPath)
+      if not (cacheKey is None):
+        with profile.phase("CompileCache.store"):
+          g_batchCompileCache.store(cacheKey, cacheArtifacts)
+      profile.merge(csrValues.profile)
+    result["Status"] = "PASS"
+    result["Profile"] = profile.getDict()
+  except ClaCompilerError as e:
+    result["Error"] = str(e)
+  except Exception as e:
+    g_logger.debug(traceback.format_exc())
+    result["Error"] = "Unhandled error while compiling \"{}\" ({}: {})".format(programPath, type(e).__name__, e)
+  result["Compile Time (s)"] = round(time.perf_counter() - startTime, 6)
+
+  if (result["Status"] == "PASS"):
+    g_logger.info("Compiled \"{}\"".format(programPath))
+  else:
+    g_logger.error(result["Error"])
+
+  return result
+
+def compileBatch(programPaths, busModel, outputDir, jobs=None, csrMap=None, compileCache=None, cacheContextKey=None):
+  #Determine output paths and make sure no two programs write to the same file. Outputs are always named .yaml, even for .yml programs
+  outputPaths = {}
+  for programPath in programPaths:
+    programName = os.path.splitext(os.path.basename(programPath))[0]
+    outputPath = os.path.join(outputDir, "value_dump.{}.yaml".format(programName))
+    if (outputPath in outputPaths.values()):
+      raise ClaCompilerError("Multiple batch programs would write to \"{}\". Program file names must be unique".format(outputPath), programPath)
+    outputPaths[programPath] = outputPath
+
+  if (jobs is None):
+    jobs = os.cpu_count() or 1
+  if (csrMap is None):
+    csrMap = loadCsrMap()
+
+  results = []
+  if (jobs <= 1):
+    initBatchWorker(busModel, csrMap, compileCache, cacheContextKey)
+    for programPath in programPaths:
+      results.append(compileBatchProgram(programPath, outputPaths[programPath]))
+  else:
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=initBatchWorker, initargs=(busModel, csrMap, compileCache, cacheContextKey)) as executor:
+      futures = [executor.submit(compileBatchProgram, programPath, outputPaths[programPath]) for programPath in programPaths]
+      for future in futures:
+        results.append(future.result())
+
+  return results
+
+def writeBatchManifest(manifestPath, results, busInfoPath, busModelLoadTime, totalTime, cacheStats=None):
+  manifestDict = {
+    "Compiler Version": g_program_version,
+    "Bus Info Path": busInfoPath,
+    "Bus Model Load Time (s)": round(busModelLoadTime, 6),
+    "Total Time (s)": round(totalTime, 6),
+    "Passed": len([result for result in results if (result["Status"] == "PASS")]),
+    "Failed": len([result for result in results if (result["Status"] != "PASS")])
+  }
+  if not (cacheStats is None):
+    manifestDict["Compile Cache"] = cacheStats
+  manifestDict["Programs"] = results
+
+  manifestFile = open(manifestPath, "w")
+  manifestFile.write(json.dumps(manifestDict, indent=2))
+  manifestFile.close()
+
+
+###################################
+# Compile Server
+###################################
+#Every request and response is one frame: the header and payload lengths, a json header, and the payload bytes
+g_serverFrameFmt = "<II"
+g_serverMaxFrameBytes = 64*1024*1024
+g_serverMaxBusModels = 8
+g_serverErrorTypes = {"ClaCompilerError": ClaCompilerError, "ClaProgramError": ClaProgramError, "ClaBusInfoError": ClaBusInfoError, "ClaResourceError": ClaResourceError}
+
+def readFrame(stream):
+  '''
+  Reads one frame from a binary stream and returns the (header dict, payload bytes). Returns (None, None) when the
+  stream ends between frames. Raises ValueError for a malformed frame
+  '''
+  prefixSize = struct.calcsize(g_serverFrameFmt)
+  prefix = stream.read(prefixSize)
+  if (len(prefix) == 0):
+    return None, None
+  if (len(prefix) < prefixSize):
+    raise ValueError("Truncated frame")
+
+  headerLength, payloadLength = struct.unpack(g_serverFrameFmt, prefix)
+  if ((headerLength + payloadLength) > g_serverMaxFrameBytes):
+    raise ValueError("Frame of {} bytes is larger than the {} byte limit".format(headerLength + payloadLength, g_serverMaxFrameBytes))
+
+  data = stream.read(headerLength + payloadLength)
+  if (len(data) < (headerLength + payloadLength)):
+    raise ValueError("Truncated frame")
+
+  header = json.loads(data[:headerLength].decode("utf-8"))
+  if not isinstance(header, dict):
+    raise ValueError("Frame header must be a json object")
+
+  return header, data[headerLength:]
+
+def writeFrame(stream, header, payload=b""):
+  headerBytes = json.dumps(header).encode("utf-8")
+  stream.write(struct.pack(g_serverFrameFmt, len(headerBytes), len(payload)) + headerBytes + payload)
+  stream.flush()
+
+
+class ClaCompileRequestHandler(socketserver.StreamRequestHandler):
+  '''
+  Serves the requests of one client connection until the client closes it
+  '''
+  def handle(self):
+    while True:
+      try:
+        request, payload = readFrame(self.rfile)
+      except ValueError as e:
+        g_logger.warning("Closing compile server connection after a malformed request. {}".format(e))
+        return
+
+      if (request is None):
+        return
+
+      response, responsePayload = self.server.handleRequest(request, payload)
+      try:
+        writeFrame(self.wfile, response, responsePayload)
+      except OSError as e:
+        g_logger.warning("Could not send compile server response. {}".format(e))
+        return
+
+      if (request.get("Command") == "shutdown"):
+        #shutdown() waits for serve_forever() to return, so it can not be called from the serving thread
+        threading.Thread(target=self.server.shutdown).start()
+        return
+
+
+class ClaCompileServer(socketserver.ThreadingUnixStreamServer):
+  '''
+  Long-running compile server on a Unix domain socket. The flattened BusModels (with their signal indexes), the UDF
+  cache, and the compile state of every program stay in memory between requests, so a compile only pays for the work
+  that changed. Each bus info file is a bus model id; None selects defaultBusInfoPath. Compiles are serialized,
+  while any number of clients can stay connected. See ClaCompileClient for the request format
+  '''
+  daemon_threads = True
+
+  def __init__ (self, socketPath, defaultBusInfoPath=None, csrMap=None, busModelCache=None):
+    if (csrMap is None):
+      csrMap = loadCsrMap()
+    self.socketPath = socketPath
+    self.defaultBusInfoPath = defaultBusInfoPath
+    self.csrMap = csrMap
+    self.busModelCache = busModelCache
+    self.compilers = {}
+    self.compileLock = threading.Lock()
+    self.compileCount = 0
+
+    removeStaleSocket(socketPath)
+    socketserver.ThreadingUnixStreamServer.__init__(self, socketPath, ClaCompileRequestHandler)
+    os.chmod(socketPath, 0o600)
+
+  def server_close(self):
+    socketserver.ThreadingUnixStreamServer.server_close(self)
+    if (os.path.exists(self.socketPath)):
+      os.remove(self.socketPath)
+
+  def getCompiler(self, busInfoPath=None):
+    '''
+    Returns the IncrementalClaCompiler of a bus info file. Bus models are loaded on first use, reloaded when the file
+    changes, and the least recently used ones are dropped once more than g_serverMaxBusModels are loaded
+    '''
+    if (busInfoPath is None):
+      busInfoPath = self.defaultBusInfoPath
+
+    busModelKey = None
+    busInfoStamp = None
+    if not (busInfoPath is None):
+      busModelKey = os.path.realpath(busInfoPath)
+      try:
+        fileStat = os.stat(busModelKey)
+      except OSError as e:
+        raise ClaBusInfoError("Could not read debug bus info. {}".format(e), busInfoPath)
+      busInfoStamp = (fileStat.st_mtime_ns, fileStat.st_size)
+
+    #Dicts keep insertion order, so the least recently used bus model is always first
+    entry = self.compilers.pop(busModelKey, None)
+    if (entry is None) or (entry[0] != busInfoStamp):
+      if (busModelKey is None):
+        busModel = BusModel()
+      elif (self.busModelCache is None):
+        busModel = BusModel.fromJsonFile(busModelKey)
+      else:
+        busModel = self.busModelCache.load(busModelKey)
+      g_logger.info("Loaded debug bus info \"{}\"".format(busModelKey))
+      entry = (busInfoStamp, IncrementalClaCompiler(busModel, self.csrMap))
+
+    self.compilers[busModelKey] = entry
+    while (len(self.compilers) > g_serverMaxBusModels):
+      del self.compilers[next(iter(self.compilers))]
+
+    return entry[1]
+
+  def compileRequest(self, request, programStr):
+    startTime = time.perf_counter()
+    compiler = self.getCompiler(request.get("Bus Model"))
+    program = ClaProgram.fromYamlString(programStr, request.get("Program Name"))
+    csrValues = compiler.compile(program)
+    imageBytes = csrValues.getCsrImage().toBytes(request.get("Include Names", True))
+    self.compileCount += 1
+
+    response = {
+      "Status": "PASS",
+      "Program Hash": csrValues.programHash.hex(),
+      "Registers": len(csrValues.registers),
+      "Compile Time (s)": time.perf_counter() - startTime
+    }
+    if (request.get("Profile")):
+      response["Profile"] = csrValues.profile.getDict()
+
+    return response, imageBytes
+
+  def handleRequest(self, request, payload):
+    '''
+    Returns the (response header, response payload) of one request. Errors are returned to the client, and never stop the server
+    '''
+    command = request.get("Command", "compile")
+    try:
+      if (command == "compile"):
+        with self.compileLock:
+          return self.compileRequest(request, payload.decode("utf-8"))
+      if (command == "ping"):
+        return {"Status": "PASS", "Version": g_program_version, "Bus Models": len(self.compilers), "Compiles": self.compileCount}, b""
+      if (command == "shutdown"):
+        g_logger.info("Compile server shutdown requested")
+        return {"Status": "PASS"}, b""
+
+      return {"Status": "FAIL", "Error Type": "ClaCompilerError", "Error": "Unknown compile server command \"{}\"".format(command)}, b""
+    except ClaCompilerError as e:
+      return {"Status": "FAIL", "Error Type": type(e).__name__, "Error": str(e)}, b""
+    except UnicodeDecodeError as e:
+      return {"Status": "FAIL", "Error Type": "ClaProgramError", "Error": "Program is not utf-8 text. {}".format(e)}, b""
+    except Exception as e:
+      g_logger.error(traceback.format_exc())
+      return {"Status": "FAIL", "Error Type": "ClaCompilerError", "Error": "Unhandled compile server error. {}".format(e)}, b""
+
+
+def removeStaleSocket(socketPath):
+  '''
+  Removes a socket file left behind by a server that is no longer running. Raises ClaCompilerError if a server is still
+  listening on it
+  '''
+  if not (os.path.exists(socketPath)):
+    return
+
+  probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    probe.connect(socketPath)
+  except OSError:
+    os.remove(socketPath)
+    return
+  finally:
+    probe.close()
+
+  raise ClaCompilerError("A compile server is already listening on \"{}\"".format(socketPath))
+
+
+class ClaCompileClient:
+  '''
+  Client of a ClaCompileServer. A request is a frame (g_serverFrameFmt lengths, a json header, and a payload). A compile
+  request has the header {"Command": "compile", "Bus Model": <bus info path or null>, "Program Name": <name or null>},
+  and the program yaml as the payload. The response header has "Status" ("PASS" or "FAIL"), and either the binary CSR
+  image as the payload or the "Error Type" and "Error" of the failure
+  '''
+  def __init__ (self, socketPath, timeout=None):
+    self.socketPath = socketPath
+    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    self.sock.settimeout(timeout)
+    try:
+      self.sock.connect(socketPath)
+    except OSError as e:
+      self.sock.close()
+      raise ClaCompilerError("Could not connect to compile server. {}".format(e), socketPath)
+    self.stream = self.sock.makefile("rwb")
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, excType, excValue, excTraceback):
+    self.close()
+
+  def close(self):
+    self.stream.close()
+    self.sock.close()
+
+  def request(self, request, payload=b""):
+    try:
+      writeFrame(self.stream, request, payload)
+      response, responsePayload = readFrame(self.stream)
+    except (OSError, ValueError) as e:
+      raise ClaCompilerError("Compile server request failed. {}".format(e), self.socketPath)
+    if (response is None):
+      raise ClaCompilerError("Compile server closed the connection", self.socketPath)
+
+    if (response.get("Status") != "PASS"):
+      errorType = g_serverErrorTypes.get(response.get("Error Type"), ClaCompilerError)
+      raise errorType(response.get("Error"))
+
+    return response, responsePayload
+
+  def compile(self, programStr, busModel=None, programName=None, includeNames=True):
+    '''
+    Compiles program yaml text on the server and returns the CsrImage
+    '''
+    request = {"Command": "compile", "Bus Model": busModel, "Program Name": programName, "Include Names": includeNames}
+    response, imageBytes = self.request(request, programStr.encode("utf-8"))
+    return CsrImage.fromBytes(imageBytes)
+
+  def ping(self):
+    return self.request({"Command": "ping"})[0]
+
+  def shutdown(self):
+    self.request({"Command": "shutdown"})
+
+
+def serveCompileRequests(socketPath, busInfoPath=None, csrMapPaths=None, busCacheDir=None):
+  busModelCache = None
+  if (busCacheDir):
+    busModelCache = BusModelCache(busCacheDir)
+  server = ClaCompileServer(socketPath, busInfoPath, loadCsrMap(csrMapPaths), busModelCache)
+
+  #Remove the socket on SIGTERM as well as on Ctrl-C
+  signal.signal(signal.SIGTERM, lambda signalNum, frame: sys.exit(0))
+  try:
+    #Load the default bus model up front, so the first request is as fast as the rest
+    server.getCompiler()
+    g_logger.info("Compile server listening on \"{}\"".format(socketPath))
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+    g_logger.info("Compile server stopped after {} compiles".format(server.compileCount))
+
+
+###################################
+# Main
+###################################
 def main():
   #Get args 
   parser = argparse.ArgumentParser(description='(Version {}) Compile CLA program description into CSR field values'.format(g_program_version))
-  parser.add_argument("programPath", type=str, help='Path to the yaml file that describes the desired CLA program')
+  parser.add_argument("programPath", type=str, nargs="?", help='Path to the yaml file that describes the desired CLA program. In --batch mode, a directory or glob of program yaml files')
   parser.add_argument('--busInfoPath', type=str, help='Path to the json file that contains information on the debug bus implementation. This json can be generated using generateClaDoc.py')
   parser.add_argument("--outputPath", type=str, help="Output path for where CSR fields will be dumped in a yaml file")
   parser.add_argument("--logName", type=str, default="compileClaProgram.log", help="Name of output log file")
+  parser.add_argument("--busCacheDir", type=str, help="Directory of the flattened debug bus info cache. Bus info files that were already flattened are loaded from the cache instead of parsed. Without it, the bus info json is parsed on every run")
+  parser.add_argument("--apbTrafficPath", type=str, help="Output path for APB write traffic in the dv/dfd/dfd_mmrs_tb.sv format")
+  parser.add_argument("--baseline", type=str, help="Binary CSR image (.bin) of the currently programmed registers, or \"reset\". Only registers that differ from it are written to --apbTrafficPath")
+  parser.add_argument("--profileJson", type=str, help="Output path for a json file with the wall/CPU time of each compile phase and work counters")
+  parser.add_argument("--csrMapPath", type=str, action="append", help="Path to a .rdl or .ipxact register description. Can be given multiple times. Defaults to cla_csr.rdl and mcr_csr.rdl in rtl/mmr/html")
+  parser.add_argument("--compileCacheDir", type=str, help="Directory of the compile output cache. Programs that were already compiled with the same bus info, register descriptions, and options are copied from the cache instead of compiled")
+  parser.add_argument("--compileCacheSize", type=int, default=g_compileCacheMaxBytes//(1024*1024), help="Size limit of --compileCacheDir in MiB. Least recently used entries are evicted")
+  parser.add_argument("--batch", action="store_true", help="Compile every program matched by programPath against the same debug bus info")
+  parser.add_argument("--outputDir", type=str, default=".", help="(--batch only) Directory where the CSR field values of each program will be dumped")
+  parser.add_argument("--manifestPath", type=str, help="(--batch only) Output path for the batch summary manifest. Defaults to <outputDir>/compile_manifest.json")
+  parser.add_argument("--jobs", type=int, help="(--batch only) Number of worker processes. Defaults to the number of CPUs")
+  parser.add_argument("--serve", type=str, metavar="SOCKETPATH", help="Run a warm compile server on this Unix domain socket instead of compiling programPath. --busInfoPath is the default bus model. See ClaCompileClient")
   args = parser.parse_args()
+  if (args.programPath is None) and not (args.serve):
+    parser.error("programPath is required unless --serve is given")
 
+  #A long-running server only logs INFO and above, so the log does not grow with every compile
   global g_logger
-  g_logger = getLogger(args.logName)
+  g_logger = getLogger(args.logName, fileLevel="INFO" if (args.serve) else "DEBUG")
 
   try:
     claInfoPath = args.busInfoPath
     programPath = args.programPath
-    outputPath = "value_dump.{}".format(os.path.basename(programPath))
-    if (args.outputPath):
-      outputPath = str(args.outputPath)
 
-    #Open CLA program description
-    g_logger.info("Opening program description \"{}\"".format(programPath))
-    if (not os.path.exists(programPath)):
-      g_logger.info("\"{}\" not found. Searching for file outside of bazel sandbox".format(programPath))
-      absolutePath = escapeBazelSandbox(programPath)
-      if (absolutePath is None):
-        g_logger.error("Path \"{}\" does not exist".format(programPath))
-        g_logger.error("CWD={}".format(os.getcwd()))
-        sys.exit()
-      g_logger.info("\"{}\" found at \"{}\"".format(programPath, absolutePath))
-      programPath = absolutePath
-
-    programFile = open(programPath, "r")
-    programDict = yaml.load(programFile, Loader=yaml.SafeLoader)
-    programFile.close()
-
-    #Extract counter aliases
-    if ("COUNTERS" in programDict):
-      g_logger.info("Parsing CLA counters")
-      counterNameList = programDict["COUNTERS"]
-      if (not isinstance(counterNameList, list)):
-        g_logger.error("\"COUNTERS\" must be a list of strings")
-        sys.exit()
+    profile = PhaseProfiler()
+    profileInfo = {"Program Path": programPath, "Bus Info Path": claInfoPath}
 
-      for counterName in counterNameList:
-        if (not isinstance(counterName, str)):
-          g_logger.error("\"COUNTERS\" must be a list of strings")
-          sys.exit()
+    if not (claInfoPath is None):
+      claInfoPath = findInputFile(claInfoPath)
+    csrMapPaths = None
+    if (args.csrMapPath):
+      csrMapPaths = [findInputFile(csrMapPath) for csrMapPath in args.csrMapPath]
 
-        g_claCounterAliases.append(counterName)
-
-    if (len(g_claCounterAliases) > g_availableCounters):
-      g_logger.error("{} counters defined. Only {} supported".format(len(g_claCounterAliases), g_availableCounters))
-      sys.exit()
+    if (args.serve):
+      serveCompileRequests(args.serve, claInfoPath, csrMapPaths, args.busCacheDir)
+      return
 
-    #Extract custom opcodes
-    if ("CUSTOM_ACTIONS" in programDict):
-      g_logger.info("Parsing custom action aliases")
-      for actionName in programDict["CUSTOM_ACTIONS"]:
-        opcodeVal = programDict["CUSTOM_ACTIONS"][actionName]
-        try:
-          g_customActionOpcodes[str(actionName)] = str2int(opcodeVal)
-        except:
-          g_logger.error("Could not parse custom action \"{}\"".format(actionNames))
-          g_logger.error("Field value must be either int or hex")
-          sys.exit()
+    outputPath = "value_dump.{}".format(os.path.basename(programPath))
+    if (args.outputPath):
+      outputPath = str(args.outputPath)
 
-    #Generate state node objs
-    g_logger.info("Constructing node dictionary")
-    nodeDict = {}
-    for nodeName in programDict["NODES"]:
-      g_logger.info("Parsing node \"{}\"".format(nodeName))
-      nodeDict[nodeName] = StateNode(nodeName, programDict["NODES"][nodeName])
+    #Outputs of a program that was already compiled with the same inputs are copied from the compile cache
+    compileCache = None
+    cacheContextKey = None
+    if (args.compileCacheDir):
+      compileCache = CompileCache(args.compileCacheDir, args.compileCacheSize*1024*1024)
+      cacheInputPaths = [claInfoPath] + list(csrMapPaths or g_defaultCsrMapPaths)
+      cacheOptions = {"APB Traffic": False, "Baseline": None}
+      if (args.apbTrafficPath) and not (args.batch):
+        cacheOptions = {"APB Traffic": True, "Baseline": args.baseline}
+        if (args.baseline) and (args.baseline != "reset"):
+          cacheOptions["Baseline"] = "file"
+          cacheInputPaths.append(findInputFile(args.baseline))
+      cacheContextKey = compileCache.getContextKey(cacheInputPaths, cacheOptions)
+
+    if not (compileCache is None) and not (args.batch):
+      programPath = findInputFile(programPath)
+      cacheKey = compileCache.getCacheKey(cacheContextKey, programPath)
+      cacheArtifacts = dict(zip(g_compileCacheArtifacts, getOutputPaths(outputPath)))
+      if (args.apbTrafficPath):
+        cacheArtifacts[g_compileCacheApbArtifact] = args.apbTrafficPath
+
+      with profile.phase("CompileCache.load"):
+        cacheHit = compileCache.load(cacheKey, cacheArtifacts)
+      if (cacheHit):
+        profile.count("Compile Cache Hits")
+        if (args.profileJson):
+          profile.writeToJsonFile(args.profileJson, profileInfo)
+        g_logger.info("Compilation success (outputs copied from the compile cache)")
+        return
+      profile.count("Compile Cache Misses")
 
     #Get CLA debug bus info
-    global g_busConfigProvided
-    claInfoDict = {}
-    if (claInfoPath is None):
-      #No debug bus info provided. Create dummy debug mux
-      g_logger.warning("No debug bus config provided. Instantiating default dummy mux")
-      g_busConfigProvided = False
-      claInfoDict = {
-                      "CLA Input": "dbm_out", 
-                      "Debug Mux Instances": {
-                        "debug_bus_mux_A": {
-                          "DEBUG_MUX_ID": 0, 
-                          "DbgMuxSelCsr": "default_dummy_mux", 
-                          "Debug Bus Inputs": [
-                            {
-                              "Bit Width": 64, 
-                              "Bus Lower Index": 0, 
-                              "Bus Upper Index": 63, 
-                              "Lane Lower": 0, 
-                              "Lane Lower Index": 0, 
-                              "Lane Upper": 3, 
-                              "Lane Upper Index": 15, 
-                              "Name": "debug_signals", 
-                              "Sub Buses": [], 
-                              "Type": "logic [63:0]"
-                            }
-                          ], 
-                          "Debug Bus Output": "dbm_out", 
-                          "LANE_WIDTH": 16
-                        }
-                      }
-                    }
-
-    else:
-      #Debug bus info path provided. Parse json file
-      g_busConfigProvided = True
-      g_logger.info("Parsing debug mux info \"{}\"".format(claInfoPath))
-      if (not os.path.exists(claInfoPath)):
-        g_logger.info("\"{}\" not found. Searching for file outside of bazel sandbox".format(claInfoPath))
-        absolutePath = escapeBazelSandbox(claInfoPath)
-        if (absolutePath is None):
-          g_logger.error("Path \"{}\" does not exist".format(claInfoPath))
-          g_logger.error("CWD={}".format(os.getcwd()))
-          sys.exit()
-        g_logger.info("\"{}\" found at \"{}\"".format(claInfoPath, absolutePath))
-        claInfoPath = absolutePath
-
-      claInfoFile = open(claInfoPath, "r")
-      claInfoDict = json.load(claInfoFile)
-      claInfoFile.close()
+    busModelStartTime = time.perf_counter()
+    busModel = None
+    with profile.phase("loadBusModel"):
+      if (claInfoPath is None):
+        busModel = BusModel()
+      else:
+        if (args.busCacheDir):
+          busModel = BusModelCache(args.busCacheDir).load(claInfoPath)
+        else:
+          busModel = BusModel.fromJsonFile(claInfoPath)
+    busModelLoadTime = time.perf_counter() - busModelStartTime
+    profile.merge(busModel.profile)
+
+    #Get CSR layouts and addresses
+    with profile.phase("loadCsrMap"):
+      csrMap = loadCsrMap(csrMapPaths)
+
+    if (args.batch):
+      programPaths = collectBatchPrograms(programPath)
+      if (len(programPaths) == 0):
+        g_logger.error("No CLA programs found in \"{}\"".format(programPath))
+        sys.exit(1)
+
+      if not (os.path.exists(args.outputDir)):
+        os.makedirs(args.outputDir)
+
+      manifestPath = args.manifestPath
+      if (manifestPath is None):
+        manifestPath = os.path.join(args.outputDir, "compile_manifest.json")
+
+      g_logger.info("Compiling {} CLA programs".format(len(programPaths)))
+      with profile.phase("compileBatch"):
+        results = compileBatch(programPaths, busModel, args.outputDir, jobs=args.jobs, csrMap=csrMap, compileCache=compileCache, cacheContextKey=cacheContextKey)
+      totalTime = time.perf_counter() - busModelStartTime
+
+      #Per-program profiles are only reported in the profile json
+      for result in results:
+        programProfile = result.pop("Profile")
+        if not (programProfile is None):
+          profile.merge(programProfile)
+      if (args.profileJson):
+        profile.writeToJsonFile(args.profileJson, profileInfo)
+
+      #Batch workers count their own cache hits
+      cacheStats = None
+      if not (compileCache is None):
+        compileCache.hits = len([result for result in results if (result["Compile Cache"] == "Hit")])
+        compileCache.misses = len([result for result in results if (result["Compile Cache"] == "Miss")])
+        cacheStats = compileCache.getStats()
+        g_logger.info("Compile cache: {} hits, {} misses".format(compileCache.hits, compileCache.misses))
+
+      writeBatchManifest(manifestPath, results, claInfoPath, busModelLoadTime, totalTime, cacheStats)
+      failedCount = len([result for result in results if (result["Status"] != "PASS")])
+      g_logger.info("Batch summary written to \"{}\". {} passed, {} failed".format(manifestPath, len(results)-failedCount, failedCount))
+      if (failedCount > 0):
+        sys.exit(1)
+      return
 
-    #Parse CLA unit info
-    global g_debugMuxes
-    try:
-      #Add CLA input signal to g_debugSignals
-      claInputSignalName = claInfoDict["CLA Input"]
-      claInputSignalName = str(claInputSignalName).strip()
-      if (len(claInputSignalName) == 0):
-        g_logger.error("Invalid \"CLA Input\" \"\" defined in \"{}\"".format(claInfoPath))
-        sys.exit()
-
-      g_debugSignals[claInputSignalName] = DebugBusSignal(claInputSignalName, busDict={
-                                                                                        "Bit Width": g_claDebugInputWidth, 
-                                                                                        "Bus Lower Index": 0, 
-                                                                                        "Bus Upper Index": g_claDebugInputWidth-1, 
-                                                                                        "Lane Lower": -1, 
-                                                                                        "Lane Lower Index": -1, 
-                                                                                        "Lane Upper": -1, 
-                                                                                        "Lane Upper Index": -1, 
-                                                                                        "Name": claInputSignalName, 
-                                                                                        "Sub Buses": [], 
-                                                                                        "Type": "logic [{}:0]".format(g_claDebugInputWidth-1)
-                                                                                      })
-
-      #Flatten all mux input signals
-      for mux_name in claInfoDict["Debug Mux Instances"]:
-        mux_info = claInfoDict["Debug Mux Instances"][mux_name]
-        additional_output_stages = 0
-        if ("additional_output_stages" in mux_info):
-          additional_output_stages = mux_info["additional_output_stages"]
-
-        muxObj = DebugMux(mux_name, output_signalname=mux_info["Debug Bus Output"], mux_select_csr=mux_info["DbgMuxSelCsr"], mux_id=mux_info["DEBUG_MUX_ID"], lane_width=mux_info["LANE_WIDTH"], output_width=64, cla_input_signalname=claInputSignalName, additional_output_stages=additional_output_stages)
-        g_debugMuxes[mux_name] = muxObj
-
-        flattenDebuBusSignals(muxObj, claInfoDict["Debug Mux Instances"][mux_name]["Debug Bus Inputs"])
-    except:
-      g_logger.error(traceback.format_exc())
-      g_logger.error("Error while parsing \"{}\"".format(claInfoPath))
-      sys.exit()
+    #Open CLA program description
+    g_logger.info("Opening program description \"{}\"".format(programPath))
+    programPath = findInputFile(programPath)
+    with profile.phase("ClaProgram.fromYamlFile"):
+      program = ClaProgram.fromYamlFile(programPath)
 
     #Calculate CSR values
-    if not ("START_NODE" in programDict):
-      g_logger.error("Required field \"START_NODE\" is not defined")
-      sys.exit()
-    startNode = programDict["START_NODE"]
     g_logger.info("Compiling CLA CSR field values")
-    csrValues = compileCsrValues(nodeDict, startNode)
+    compiler = ClaCompiler(busModel, csrMap)
+    with profile.phase("compileCsrValues"):
+      csrValues = compiler.compile(program)
 
     #Output CSR values to file
-    g_logger.info("Writing field values to \"{}\"".format(outputPath))
-    csrValues.writeToYamlFile(outputPath)
+    writeOutputFiles(csrValues, outputPath)
 
-    csvOutputPath = outputPath.replace(".yaml", ".csv")
-    g_logger.info("Writing field values to \"{}\"".format(csvOutputPath))
-    csrValues.writeToCsvFile(csvOutputPath)
+    if (args.apbTrafficPath):
+      baseline = None
+      if (args.baseline == "reset"):
+        baseline = csrValues.getResetImage()
+      elif (args.baseline):
+        baseline = CsrImage.fromFile(findInputFile(args.baseline))
+
+      with csrValues.profile.phase("writeToApbTrafficFile"):
+        writeCount = csrValues.writeToApbTrafficFile(args.apbTrafficPath, baseline)
+      csrValues.profile.count("APB Writes", writeCount)
+      g_logger.info("Wrote {} of {} APB writes to \"{}\"".format(writeCount, 2*len(csrValues.registers), args.apbTrafficPath))
+
+    if not (compileCache is None):
+      with csrValues.profile.phase("CompileCache.store"):
+        compileCache.store(cacheKey, cacheArtifacts)
+
+    profile.merge(csrValues.profile)
+    if (args.profileJson):
+      profile.writeToJsonFile(args.profileJson, profileInfo)
+      g_logger.info("Compile profile written to \"{}\"".format(args.profileJson))
 
     g_logger.info("Compilation success")
+  except ClaCompilerError as e:
+      g_logger.error(str(e))
+      sys.exit()
   except Exception as e:
       g_logger.error(traceback.format_exc())
       g_logger.critical("UNHANDLED ERROR!")
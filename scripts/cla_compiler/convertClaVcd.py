@@ -0,0 +1,629 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+import sys
+import time
+import struct
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+  import numpy
+except ImportError:
+  numpy = None
+import compileClaProgram
+from compileClaProgram import BusModel, ClaCompilerError, CsrImage, loadCsrMap
+from claCsrMap import CsrMapError
+
+
+###################################
+# Global vars
+###################################
+g_defaultChunkSize = 1 << 16
+
+#Every debug mux select CSR uses the MCR CDbgMuxSel layout (see MuxSelectReg)
+g_muxSelectCsr = "CDbgMuxSel"
+g_muxSelectFields = ["Muxselseg{}".format(i) for i in range(8)]
+g_functionalDbmMode = 1
+
+#X and Z bits of a value change are read as 0
+g_unknownBitTable = str.maketrans("xXzZ", "0000")
+g_varRangeRegex = re.compile(r"^(\S+?)\s*(\[\s*(\d+)\s*(:\s*(\d+)\s*)?\])?$")
+
+#.npy files are written with a fixed size header, so the sample count can be filled in once the dump has been read
+g_npyHeaderSize = 128
+
+
+###################################
+# Exceptions
+###################################
+class ClaVcdError(ClaCompilerError):
+  '''
+  Raised for unreadable VCD dumps, and signals that can not be found in or rebuilt from a dump
+  '''
+
+def requireNumpy():
+  if (numpy is None):
+    raise ClaVcdError("numpy is required to convert VCD dumps. Install it with \"pip install numpy\"")
+
+
+###################################
+# VCD Parsing
+###################################
+class VcdVariable:
+  '''
+  One $var declaration. Bits [msb:lsb] of the signal are sent as one value under idCode
+  '''
+  def __init__ (self, idCode, name, width, msb=None, lsb=None):
+    self.idCode = idCode
+    self.name = name
+    self.width = width
+    if (msb is None):
+      msb = width-1
+      lsb = 0
+    elif (lsb is None):
+      lsb = msb
+    self.msb = msb
+    self.lsb = lsb
+
+  def getLowBit(self):
+    return min(self.msb, self.lsb)
+
+class VcdReader:
+  '''
+  Streaming reader of a VCD dump. The header is parsed on open. Value changes are read one timestamp at a time, and
+  only the changes of the watched variables are kept, so memory use does not depend on the size of the dump
+  '''
+  def __init__ (self, vcdPath):
+    self.vcdPath = vcdPath
+    self.timescale = None
+    self.variables = {}
+    self.idCodes = set()
+    self.signalMatches = {}
+    try:
+      self.vcdFile = open(vcdPath, "r")
+    except OSError as e:
+      raise ClaVcdError("Could not read VCD dump. {}".format(e), vcdPath)
+    self.parseHeader()
+
+  def close(self):
+    self.vcdFile.close()
+
+  def getTokens(self):
+    for line in self.vcdFile:
+      for token in line.split():
+        yield token
+
+  def parseHeader(self):
+    scopes = []
+    tokens = self.getTokens()
+    for token in tokens:
+      if (token == "$enddefinitions"):
+        self.skipToEnd(tokens)
+        return
+
+      if (token == "$scope"):
+        scopeTokens = self.skipToEnd(tokens)
+        scopes.append(scopeTokens[-1] if (len(scopeTokens) > 0) else "")
+      elif (token == "$upscope"):
+        self.skipToEnd(tokens)
+        if (len(scopes) > 0):
+          scopes.pop()
+      elif (token == "$var"):
+        varTokens = self.skipToEnd(tokens)
+        if (len(varTokens) < 4):
+          raise ClaVcdError("Invalid $var declaration \"{}\"".format(" ".join(varTokens)), self.vcdPath)
+        self.addVariable(scopes, varTokens)
+      elif (token == "$timescale"):
+        self.timescale = " ".join(self.skipToEnd(tokens))
+      elif token.startswith("$"):
+        self.skipToEnd(tokens)
+
+    raise ClaVcdError("No $enddefinitions in VCD header", self.vcdPath)
+
+  def skipToEnd(self, tokens):
+    '''
+    Returns the tokens up to the next $end
+    '''
+    keywordTokens = []
+    for token in tokens:
+      if (token == "$end"):
+        return keywordTokens
+      keywordTokens.append(token)
+
+    raise ClaVcdError("Unterminated VCD keyword", self.vcdPath)
+
+  def addVariable(self, scopes, varTokens):
+    try:
+      width = int(varTokens[1])
+    except ValueError:
+      raise ClaVcdError("Invalid $var width \"{}\"".format(varTokens[1]), self.vcdPath)
+    idCode = varTokens[2]
+    reference = " ".join(varTokens[3:])
+    match = g_varRangeRegex.match(reference)
+    if (match is None):
+      raise ClaVcdError("Invalid $var reference \"{}\"".format(reference), self.vcdPath)
+
+    msb = None
+    lsb = None
+    if not (match.group(3) is None):
+      msb = int(match.group(3))
+    if not (match.group(5) is None):
+      lsb = int(match.group(5))
+    name = ".".join(scopes + [match.group(1)])
+
+    self.variables.setdefault(name, []).append(VcdVariable(idCode, name, width, msb, lsb))
+    self.idCodes.add(idCode)
+
+  def findSignal(self, signalName, scope=None):
+    '''
+    Returns the variables of the signal whose hierarchical name ends with signalName. Vectors that are dumped one bit
+    (or one range) at a time return one variable per part. Returns None if no signal matches
+    '''
+    if ((signalName, scope) in self.signalMatches):
+      return self.signalMatches[(signalName, scope)]
+
+    matchingNames = []
+    for name in self.variables:
+      if (scope is not None) and not (name.startswith(scope + ".")):
+        continue
+      if (name == signalName) or name.endswith("." + signalName):
+        matchingNames.append(name)
+
+    if (len(matchingNames) > 1):
+      raise ClaVcdError("\"{}\" matches more than one signal: {}. Use a scope to select one".format(signalName, ", ".join(sorted(matchingNames))), self.vcdPath)
+
+    variables = None
+    if (len(matchingNames) == 1):
+      variables = self.variables[matchingNames[0]]
+    self.signalMatches[(signalName, scope)] = variables
+    return variables
+
+  def parseVector(self, token):
+    if (token[0] in "rR"):
+      return 0
+    try:
+      return int(token[1:].translate(g_unknownBitTable), 2)
+    except ValueError:
+      raise ClaVcdError("Invalid vector value \"{}\"".format(token), self.vcdPath)
+
+  def readValueChanges(self, watchedIds):
+    '''
+    Yields (time, changes) for every timestamp of the dump, where changes is a list of (idCode, value) for the
+    watched variables that changed at that time. Values are ints, with X and Z bits read as 0. The last timestamp of
+    the dump is always yielded, even without changes
+    '''
+    currentTime = 0
+    changes = []
+    vectorValue = None
+    inComment = False
+    for line in self.vcdFile:
+      tokens = line.split()
+      if (len(tokens) == 0):
+        continue
+
+      #Fast path for the usual single value change per line
+      if (vectorValue is None) and not (inComment):
+        token = tokens[0]
+        firstChar = token[0]
+        if (len(tokens) == 1) and (firstChar in "01xXzZ"):
+          if (token[1:] in watchedIds):
+            changes.append((token[1:], 1 if (firstChar == "1") else 0))
+          continue
+        if (len(tokens) == 2) and (firstChar in "bB"):
+          if (tokens[1] in watchedIds):
+            changes.append((tokens[1], self.parseVector(token)))
+          continue
+
+      for token in tokens:
+        if (inComment):
+          inComment = (token != "$end")
+          continue
+
+        if not (vectorValue is None):
+          if (token in watchedIds):
+            changes.append((token, self.parseVector(vectorValue)))
+          vectorValue = None
+          continue
+
+        firstChar = token[0]
+        if (firstChar == "#"):
+          if (len(changes) > 0):
+            yield currentTime, changes
+            changes = []
+          try:
+            currentTime = int(token[1:])
+          except ValueError:
+            raise ClaVcdError("Invalid timestamp \"{}\"".format(token), self.vcdPath)
+        elif (firstChar in "bBrR"):
+          vectorValue = token
+        elif (firstChar in "01xXzZ"):
+          if (token[1:] in watchedIds):
+            changes.append((token[1:], 1 if (firstChar == "1") else 0))
+        elif (token == "$comment"):
+          inComment = True
+
+    yield currentTime, changes
+
+
+###################################
+# Sampling
+###################################
+class VcdColumn:
+  '''
+  Bits [bit+width-1:bit] of a dumped signal, sampled once per cycle. Each part is a (variable, variable shift, mask,
+  column shift) slice of one of the variables the signal was dumped as
+  '''
+  def __init__ (self, variables, bit, width):
+    self.parts = []
+    signalLowBit = min([variable.getLowBit() for variable in variables])
+    for variable in variables:
+      variableLow = variable.getLowBit() - signalLowBit
+      low = max(bit, variableLow)
+      high = min(bit + width, variableLow + variable.width)
+      if (low < high):
+        self.parts.append((variable.idCode, low - variableLow, (1 << (high - low)) - 1, low - bit))
+
+  def getValue(self, values):
+    value = 0
+    for idCode, variableShift, mask, columnShift in self.parts:
+      value |= ((values.get(idCode, 0) >> variableShift) & mask) << columnShift
+    return value
+
+def sampleVcdColumns(vcdReader, columns, clockVariable=None, clockPeriod=None, startTime=0, chunkSize=g_defaultChunkSize):
+  '''
+  Yields uint64 arrays of shape (samples, columns) with the value of every column once per cycle. Cycles are the
+  rising edges of clockVariable, or every clockPeriod time units from startTime. Like a flop, a sample is the value
+  before any change at the same timestamp as its clock edge
+  '''
+  requireNumpy()
+  columnsById = {}
+  for columnIndx, column in enumerate(columns):
+    for idCode, variableShift, mask, columnShift in column.parts:
+      columnsById.setdefault(idCode, []).append(columnIndx)
+
+  clockId = None
+  watchedIds = set(columnsById)
+  if not (clockVariable is None):
+    clockId = clockVariable.idCode
+    watchedIds.add(clockId)
+
+  values = {}
+  row = [0 for column in columns]
+  clockValue = None
+  nextSampleTime = startTime
+  rows = []
+  for changeTime, changes in vcdReader.readValueChanges(watchedIds):
+    if (clockId is None):
+      #Every sample since the last change has the same value. Long idle stretches are split into chunks
+      sampleCount = 0
+      if (nextSampleTime <= changeTime):
+        sampleCount = (changeTime - nextSampleTime)//clockPeriod + 1
+        nextSampleTime += sampleCount*clockPeriod
+      while (sampleCount > 0):
+        rowCount = min(sampleCount, chunkSize - len(rows))
+        rows.extend([tuple(row)]*rowCount)
+        sampleCount -= rowCount
+        if (len(rows) == chunkSize):
+          yield numpy.array(rows, dtype=numpy.uint64).reshape(chunkSize, len(columns))
+          rows = []
+    else:
+      newClockValue = clockValue
+      for idCode, value in changes:
+        if (idCode == clockId):
+          newClockValue = value & 1
+      if (clockValue == 0) and (newClockValue == 1):
+        rows.append(tuple(row))
+      clockValue = newClockValue
+
+    changedColumns = set()
+    for idCode, value in changes:
+      values[idCode] = value
+      changedColumns.update(columnsById.get(idCode, []))
+    for columnIndx in changedColumns:
+      row[columnIndx] = columns[columnIndx].getValue(values)
+
+    if (len(rows) == chunkSize):
+      yield numpy.array(rows, dtype=numpy.uint64).reshape(chunkSize, len(columns))
+      rows = []
+
+  if (len(rows) > 0):
+    yield numpy.array(rows, dtype=numpy.uint64).reshape(len(rows), len(columns))
+
+
+###################################
+# Debug Bus Reconstruction
+###################################
+def getMuxSelects(csrImage, csrMap=None):
+  '''
+  Returns the (DbmMode, [Muxselseg0-7]) written to each debug mux of a CSR image, keyed by DEBUG_MUX_ID. Every mux
+  select CSR is at the same address, so writes are matched to their mux by the DbmId field
+  '''
+  if (csrMap is None):
+    csrMap = loadCsrMap()
+  try:
+    muxSelectReg = csrMap.getRegister(g_muxSelectCsr)
+    fields = [muxSelectReg.getField(fieldName) for fieldName in ["DbmMode", "DbmId"] + g_muxSelectFields]
+  except CsrMapError as e:
+    raise ClaVcdError(str(e))
+
+  muxSelects = {}
+  for address, value in csrImage.getRecords():
+    if (address != muxSelectReg.address):
+      continue
+    fieldValues = [(value & field.getMask()) >> field.offset for field in fields]
+    muxSelects[fieldValues[1]] = (fieldValues[0], fieldValues[2:])
+
+  return muxSelects
+
+class DebugBusRebuilder:
+  '''
+  Traces every bit of a debug mux output back through the mux selects of a compiled program to the debug signal that
+  drives it. getRanges() returns (signal, signal bit, width, output bit, cycle delay) tuples for the signals found in
+  the dump, where the cycle delay is the number of mux output flops between the signal and the output
+  '''
+  def __init__ (self, busModel, muxSelects, vcdReader, scope=None):
+    self.busModel = busModel
+    self.muxSelects = muxSelects
+    self.vcdReader = vcdReader
+    self.scope = scope
+    self.disabledMuxes = []
+
+    self.outputMuxes = {}
+    for muxObj in busModel.debugMuxes.values():
+      self.outputMuxes[muxObj.output] = muxObj
+
+    #Top level inputs of every mux, and the sub buses of every signal
+    debugSignals = busModel.debugSignals
+    self.muxInputs = {}
+    self.subBuses = {}
+    for signalName in debugSignals:
+      parentName = signalName.rsplit(".", 1)[0] if ("." in signalName) else None
+      if (parentName in debugSignals):
+        self.subBuses.setdefault(parentName, []).append(signalName)
+        continue
+      signalObj = debugSignals[signalName]
+      if not (signalObj.input_mux is None):
+        self.muxInputs.setdefault(signalObj.input_mux.name, []).append(signalName)
+
+  def getBusPosition(self, signalName):
+    '''
+    Returns the lowest bit and width of a mux input signal on the input bus of its mux
+    '''
+    signalObj = self.busModel.debugSignals[signalName]
+    return signalObj.lower_lane*signalObj.input_mux.lane_width + signalObj.lower_lane_index, signalObj.width
+
+  def getRanges(self, signalName):
+    if not (signalName in self.outputMuxes):
+      raise ClaVcdError("\"{}\" is not the output of a debug mux in \"{}\"".format(signalName, self.busModel.sourcePath))
+
+    ranges = []
+    muxObj = self.outputMuxes[signalName]
+    self.addMuxOutputRanges(muxObj, 0, muxObj.output_lanes*muxObj.lane_width, 0, 0, ranges)
+    return ranges
+
+  def addMuxOutputRanges(self, muxObj, outputBit, width, busBit, delay, ranges):
+    if not (muxObj.mux_id in self.muxSelects):
+      raise ClaVcdError("No mux select CSR is written for debug mux \"{}\" (DEBUG_MUX_ID {})".format(muxObj.name, muxObj.mux_id))
+    dbmMode, laneSelects = self.muxSelects[muxObj.mux_id]
+    if (dbmMode != g_functionalDbmMode):
+      #The mux drives its id or toggles instead of its inputs
+      if not (muxObj.name in self.disabledMuxes):
+        self.disabledMuxes.append(muxObj.name)
+      return
+
+    delay += muxObj.output_cycle_delay
+    laneWidth = muxObj.lane_width
+    bit = outputBit
+    while (bit < outputBit + width):
+      outputLane = bit // laneWidth
+      laneIndx = bit % laneWidth
+      rangeWidth = min(outputBit + width - bit, laneWidth - laneIndx)
+      inputLane = outputLane
+      if (laneSelects[outputLane] > 0):
+        inputLane = muxObj.output_lanes + laneSelects[outputLane] - 1
+      self.addMuxInputRanges(muxObj, inputLane*laneWidth + laneIndx, rangeWidth, busBit + bit - outputBit, delay, ranges)
+      bit += rangeWidth
+
+  def addMuxInputRanges(self, muxObj, inputBit, width, busBit, delay, ranges):
+    #Input bits that are not driven by any signal read as 0
+    for signalName in self.muxInputs.get(muxObj.name, []):
+      signalLow, signalWidth = self.getBusPosition(signalName)
+      low = max(inputBit, signalLow)
+      high = min(inputBit + width, signalLow + signalWidth)
+      if (low < high):
+        self.addSignalRanges(signalName, low - signalLow, high - low, busBit + low - inputBit, delay, ranges)
+
+  def addSignalRanges(self, signalName, signalBit, width, busBit, delay, ranges):
+    if (signalName in self.outputMuxes):
+      self.addMuxOutputRanges(self.outputMuxes[signalName], signalBit, width, busBit, delay, ranges)
+      return
+
+    if not (self.vcdReader.findSignal(signalName, self.scope) is None):
+      ranges.append((signalName, signalBit, width, busBit, delay))
+      return
+
+    #Not dumped as a whole. Try its sub buses
+    if not (signalName in self.subBuses):
+      raise ClaVcdError("Debug signal \"{}\" is not in the VCD dump".format(signalName), self.vcdReader.vcdPath)
+    signalLow, signalWidth = self.getBusPosition(signalName)
+    for subBusName in self.subBuses[signalName]:
+      subBusLow, subBusWidth = self.getBusPosition(subBusName)
+      low = max(signalLow + signalBit, subBusLow)
+      high = min(signalLow + signalBit + width, subBusLow + subBusWidth)
+      if (low < high):
+        self.addSignalRanges(subBusName, low - subBusLow, high - low, busBit + low - signalLow - signalBit, delay, ranges)
+
+
+###################################
+# CLA Input Traces
+###################################
+class ClaVcdTrace:
+  '''
+  The CLA input (or any debug mux output) of a VCD dump as a stream of uint64 sample chunks. The signal is either read
+  from the dump, or rebuilt from the debug signals at the mux inputs (see fromBusModel())
+  '''
+  def __init__ (self, vcdPath, signalName, clockName=None, clockPeriod=None, startTime=0, scope=None):
+    requireNumpy()
+    if (clockName is None) == (clockPeriod is None):
+      raise ClaVcdError("Either a clock signal or a clock period is required to sample a VCD dump")
+    if not (clockPeriod is None) and (clockPeriod < 1):
+      raise ClaVcdError("Clock period must be at least 1")
+
+    self.vcdPath = vcdPath
+    self.signalName = signalName
+    self.clockName = clockName
+    self.clockPeriod = clockPeriod
+    self.startTime = startTime
+    self.scope = scope
+    self.vcdReader = VcdReader(vcdPath)
+
+    self.clockVariable = None
+    if not (clockName is None):
+      clockVariables = self.vcdReader.findSignal(clockName, scope)
+      if (clockVariables is None):
+        raise ClaVcdError("Clock \"{}\" is not in the VCD dump".format(clockName), vcdPath)
+      self.clockVariable = clockVariables[0]
+
+    #(signal, signal bit, width, output bit, cycle delay) of every bit range of the trace
+    self.ranges = [(signalName, 0, 64, 0, 0)]
+
+  @classmethod
+  def fromBusModel(cls, vcdPath, busModel, muxSelects, signalName=None, clockName=None, clockPeriod=None, startTime=0, scope=None):
+    '''
+    Rebuilds the output of a debug mux (by default the CLA input) from the signals at the inputs of the debug mux
+    network, using the mux selects of a compiled program (see getMuxSelects()). Mux output flops are modeled, so each
+    sample is the value the mux output has on that cycle
+    '''
+    if (signalName is None):
+      signalName = busModel.claInputSignalName
+    trace = cls(vcdPath, signalName, clockName, clockPeriod, startTime, scope)
+    rebuilder = DebugBusRebuilder(busModel, muxSelects, trace.vcdReader, scope)
+    trace.ranges = rebuilder.getRanges(signalName)
+    trace.disabledMuxes = rebuilder.disabledMuxes
+    return trace
+
+  def close(self):
+    self.vcdReader.close()
+
+  def getColumns(self):
+    columns = []
+    for signalName, signalBit, width, busBit, delay in self.ranges:
+      variables = self.vcdReader.findSignal(signalName, self.scope)
+      if (variables is None):
+        raise ClaVcdError("Signal \"{}\" is not in the VCD dump".format(signalName), self.vcdPath)
+      columns.append(VcdColumn(variables, signalBit, width))
+    return columns
+
+  def readChunks(self, chunkSize=g_defaultChunkSize):
+    '''
+    Yields uint64 arrays of up to chunkSize samples, one per cycle. Before the first sample of a signal reaches a
+    delayed output bit, that bit reads as 0
+    '''
+    columns = self.getColumns()
+    maxDelay = max([delay for signalName, signalBit, width, busBit, delay in self.ranges] + [0])
+    history = numpy.zeros((maxDelay, len(columns)), dtype=numpy.uint64)
+    try:
+      for columnValues in sampleVcdColumns(self.vcdReader, columns, self.clockVariable, self.clockPeriod, self.startTime, chunkSize):
+        columnValues = numpy.concatenate([history, columnValues])
+        sampleCount = len(columnValues) - maxDelay
+        samples = numpy.zeros(sampleCount, dtype=numpy.uint64)
+        for columnIndx, (signalName, signalBit, width, busBit, delay) in enumerate(self.ranges):
+          samples |= columnValues[maxDelay-delay:maxDelay-delay+sampleCount, columnIndx] << numpy.uint64(busBit)
+        history = columnValues[len(columnValues)-maxDelay:]
+        yield samples
+    finally:
+      self.close()
+
+
+###################################
+# Trace Files
+###################################
+def writeNpyHeader(outputFile, sampleCount):
+  header = "{{'descr': '<u8', 'fortran_order': False, 'shape': ({},), }}".format(sampleCount)
+  header = header.ljust(g_npyHeaderSize - 11) + "\n"
+  outputFile.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1"))
+
+def writeTraceFile(outputPath, sampleChunks):
+  '''
+  Writes sample chunks to a .npy file, or a raw little-endian uint64 file for any other extension. Returns the number
+  of samples written
+  '''
+  npyOutput = (os.path.splitext(outputPath)[1].lower() == ".npy")
+  sampleCount = 0
+  outputFile = open(outputPath, "wb")
+  try:
+    if (npyOutput):
+      writeNpyHeader(outputFile, sampleCount)
+    for samples in sampleChunks:
+      outputFile.write(samples.astype("<u8").tobytes())
+      sampleCount += len(samples)
+    if (npyOutput):
+      outputFile.seek(0)
+      writeNpyHeader(outputFile, sampleCount)
+  finally:
+    outputFile.close()
+
+  return sampleCount
+
+
+###################################
+# Main
+###################################
+def main():
+  #Get args
+  parser = argparse.ArgumentParser(description='(Version {}) Convert the CLA input of a VCD dump to a trace of 64 bit samples, one per cycle'.format(compileClaProgram.g_program_version))
+  parser.add_argument("vcdPath", type=str, help="VCD dump of a simulation")
+  parser.add_argument("--outputPath", type=str, default="cla_trace.npy", help="Output path of the trace. A .npy array, or a raw little-endian uint64 array for any other extension")
+  parser.add_argument("--signal", type=str, help="Debug mux output to convert. Defaults to the \"CLA Input\" of --busInfoPath")
+  parser.add_argument("--busInfoPath", type=str, help="Path to the json file that contains information on the debug bus implementation")
+  parser.add_argument("--imagePath", type=str, help="Binary CSR image written by compileClaProgram.py. The signal is rebuilt from the debug mux inputs in the dump, using the mux selects of the image. Requires --busInfoPath")
+  parser.add_argument("--csrMapPath", type=str, action="append", help="Path to a .rdl or .ipxact register description. Can be given multiple times. Defaults to cla_csr.rdl and mcr_csr.rdl in rtl/mmr/html")
+  parser.add_argument("--scope", type=str, help="Only match signals under this VCD scope (ie tb.dut)")
+  parser.add_argument("--clock", type=str, help="Clock signal. One sample is taken on every rising edge")
+  parser.add_argument("--clockPeriod", type=int, help="Take one sample every clockPeriod VCD time units instead of on clock edges")
+  parser.add_argument("--startTime", type=int, default=0, help="Time of the first sample with --clockPeriod. Defaults to 0")
+  parser.add_argument("--chunkSize", type=int, default=g_defaultChunkSize, help="Number of samples converted at a time. Defaults to {}".format(g_defaultChunkSize))
+  args = parser.parse_args()
+
+  if (args.chunkSize < 1):
+    sys.exit("ERROR: --chunkSize must be at least 1")
+  if not (args.imagePath is None) and (args.busInfoPath is None):
+    sys.exit("ERROR: --imagePath requires --busInfoPath")
+
+  try:
+    requireNumpy()
+    busModel = None
+    if not (args.busInfoPath is None):
+      busModel = BusModel.fromJsonFile(args.busInfoPath)
+    signalName = args.signal
+    if (signalName is None):
+      if (busModel is None):
+        sys.exit("ERROR: --signal or --busInfoPath is required")
+      signalName = busModel.claInputSignalName
+
+    if (args.imagePath is None):
+      trace = ClaVcdTrace(args.vcdPath, signalName, args.clock, args.clockPeriod, args.startTime, args.scope)
+    else:
+      try:
+        csrImage = CsrImage.fromFile(args.imagePath)
+      except OSError as e:
+        raise ClaVcdError("Could not read CSR image. {}".format(e), args.imagePath)
+      muxSelects = getMuxSelects(csrImage, loadCsrMap(args.csrMapPath))
+      trace = ClaVcdTrace.fromBusModel(args.vcdPath, busModel, muxSelects, signalName, args.clock, args.clockPeriod, args.startTime, args.scope)
+      for muxName in trace.disabledMuxes:
+        print("WARNING: Debug mux \"{}\" is not in functional mode. Its output bits are 0".format(muxName))
+
+    startTime = time.perf_counter()
+    sampleCount = writeTraceFile(args.outputPath, trace.readChunks(args.chunkSize))
+    conversionTime = time.perf_counter() - startTime
+  except ClaCompilerError as e:
+    sys.exit("ERROR: {}".format(e))
+
+  print("Wrote {} samples of \"{}\" to \"{}\" in {:.3f}s".format(sampleCount, signalName, args.outputPath, conversionTime))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,481 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import json
+import time
+import argparse
+import concurrent.futures
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+  import numpy
+except ImportError:
+  numpy = None
+import compileClaProgram
+from compileClaProgram import ClaCompilerError, ClaProgram, CsrImage, loadCsrMap
+from compileClaProgram import g_actionOpcodes, g_eventOpcodes, g_availableEapsPerNode, g_availableNodes
+from simulateClaProgram import ClaConfig, ClaEventGenerator, ClaSimulator, ClaSimulatorError, g_actionNames, g_defaultChunkSize, g_xtriggerEvents
+from simulateClaProgram import getChunkInputs, loadTraceArray, readTraceChunks, requireNumpy
+
+
+###################################
+# Global vars
+###################################
+#Trace actions, as they reach dfd_debug_sig_trace_gen
+g_startTraceAction = 1 << g_actionOpcodes["START_TRACE"]
+g_stopTraceAction = 1 << g_actionOpcodes["STOP_TRACE"]
+g_tracePulseAction = 1 << g_actionOpcodes["TRACE_PULSE"]
+g_traceActionMask = g_startTraceAction | g_stopTraceAction | g_tracePulseAction
+
+#Packet sizes from rtl/cla/dfd_dst_pkg.svh
+g_vltHeaderBytes = 2
+g_debugSignalBytes = 8
+g_timestampPacketBytes = 10
+
+#dst_format_mode_e, the Trdstformat field of the DST Trdstcontrol register
+g_traceFormats = {
+  "NO_COMPRESSION": 0,
+  "XOR_COMPRESSION_ONLY": 1,
+  "VLT_XOR_COMPRESSION": 3
+}
+g_defaultTraceFormat = "VLT_XOR_COMPRESSION"
+g_defaultClockFrequency = 1000.0
+
+g_workerConfig = None
+g_workerSamples = None
+g_workerXtriggers = None
+g_workerEventTypes = None
+g_workerTraceFormat = None
+
+
+###################################
+# Trace Generator
+###################################
+class ClaTraceGate:
+  '''
+  Model of how dfd_xor_compression turns the START_TRACE, STOP_TRACE, and TRACE_PULSE actions into traced cycles. An
+  action is on the action bus the cycle after its EAP fires, and a cycle is traced (trace_valid) the cycle after
+  trace_start or trace_pulse. The first traced cycle of a trace, and the cycle of trace_stop, are sent with every byte.
+  With syncPeriod, a timestamp packet is sent every syncPeriod cycles from the first traced cycle to trace_stop, like
+  Trdstsyncmode cycle count in dfd_vlt_packet_compression. The trace is assumed enabled (Trdstenable), without flushes
+  '''
+  def __init__ (self, syncPeriod=None):
+    self.syncPeriod = syncPeriod
+    self.reset()
+
+  def reset(self):
+    #First cycle whose trace_valid has not been returned by getTracedCycles()
+    self.cycle = 0
+    self.traceValid = False
+    self.lastTraceValid = False
+    self.lastTracePulse = False
+    self.traceInProgress = False
+    self.syncCount = 0
+    #Trace actions of cycles from self.cycle on
+    self.traceControls = {}
+
+  def addFirings(self, firings):
+    '''
+    Takes the trace actions of firing records returned by ClaSimulator
+    '''
+    traceActions = firings["actions"] & numpy.uint64(g_traceActionMask)
+    fireIndexes = numpy.flatnonzero(traceActions)
+    for cycle, actions in zip(firings["cycle"][fireIndexes].tolist(), traceActions[fireIndexes].tolist()):
+      self.traceControls[cycle + 1] = self.traceControls.get(cycle + 1, 0) | actions
+
+  def countSyncPackets(self, cycles):
+    if (self.syncPeriod is None) or not (self.traceInProgress):
+      return 0
+    self.syncCount += cycles
+    syncPackets = self.syncCount // self.syncPeriod
+    self.syncCount %= self.syncPeriod
+    return syncPackets
+
+  def getTracedCycles(self, endCycle):
+    '''
+    Returns the traced cycles up to endCycle-1, as a list of (start, end) runs, the traced cycles sent with every byte,
+    and the number of timestamp packets. Needs the firings of every cycle before endCycle-1
+    '''
+    tracedRuns = []
+    fullCycles = []
+    syncPackets = 0
+    controlCycles = sorted([cycle for cycle in self.traceControls if (cycle < endCycle)])
+    controlIndx = 0
+    cycle = self.cycle
+    while (cycle < endCycle):
+      #Up to the next trace action or the end of a pulse, trace_valid does not change
+      nextCycle = cycle if (self.lastTracePulse) else endCycle
+      if (controlIndx < len(controlCycles)):
+        nextCycle = min(nextCycle, controlCycles[controlIndx])
+      if (nextCycle > cycle):
+        if (self.traceValid):
+          if not (self.lastTraceValid):
+            fullCycles.append(cycle)
+            self.traceInProgress = True
+          if (len(tracedRuns) > 0) and (tracedRuns[-1][1] == cycle):
+            tracedRuns[-1] = (tracedRuns[-1][0], nextCycle)
+          else:
+            tracedRuns.append((cycle, nextCycle))
+        syncPackets += self.countSyncPackets(nextCycle - cycle)
+        self.lastTraceValid = self.traceValid
+        cycle = nextCycle
+        continue
+
+      actions = self.traceControls.pop(cycle, 0)
+      if (controlIndx < len(controlCycles)) and (controlCycles[controlIndx] == cycle):
+        controlIndx += 1
+      traceStart = bool(actions & g_startTraceAction)
+      traceStop = bool(actions & g_stopTraceAction)
+      tracePulse = bool(actions & g_tracePulseAction)
+
+      if (self.traceValid):
+        if not (self.lastTraceValid) or (traceStop):
+          fullCycles.append(cycle)
+        if not (self.lastTraceValid):
+          self.traceInProgress = True
+        if (len(tracedRuns) > 0) and (tracedRuns[-1][1] == cycle):
+          tracedRuns[-1] = (tracedRuns[-1][0], cycle + 1)
+        else:
+          tracedRuns.append((cycle, cycle + 1))
+      syncPackets += self.countSyncPackets(1)
+      if (self.traceValid) and (traceStop):
+        self.traceInProgress = False
+        self.syncCount = 0
+
+      #trace_valid_next of dfd_xor_compression
+      nextTraceValid = self.traceValid
+      if (traceStart):
+        nextTraceValid = True
+      elif (traceStop) or (self.lastTracePulse and not tracePulse):
+        nextTraceValid = False
+      self.lastTraceValid = self.traceValid
+      self.traceValid = nextTraceValid or tracePulse
+      self.lastTracePulse = tracePulse
+      cycle += 1
+
+    self.cycle = max(self.cycle, endCycle)
+    return tracedRuns, fullCycles, syncPackets
+
+def getTracePayloadBytes(samples, lastSample, tracedRuns, fullCycles, traceFormat):
+  '''
+  Returns the number of payload bytes of the data packet of every sample of a chunk. tracedRuns and fullCycles are
+  indexes into samples, and lastSample is the sample before the chunk. Packets of XOR_COMPRESSION_ONLY carry every byte
+  if any changed since the last traced cycle, and packets of VLT_XOR_COMPRESSION carry only the changed bytes
+  '''
+  tracedMask = numpy.zeros(len(samples) + 1, dtype=numpy.int8)
+  for runStart, runEnd in tracedRuns:
+    tracedMask[runStart] += 1
+    tracedMask[runEnd] -= 1
+  tracedMask = numpy.cumsum(tracedMask[:-1]) > 0
+
+  if (g_traceFormats[traceFormat] == g_traceFormats["NO_COMPRESSION"]):
+    payloadBytes = numpy.full(len(samples), g_debugSignalBytes, dtype=numpy.int64)
+  else:
+    #Within a run of traced cycles, the last traced sample is the one before
+    changedBits = samples ^ numpy.concatenate([numpy.array([lastSample], dtype=numpy.uint64), samples[:-1]])
+    if (g_traceFormats[traceFormat] == g_traceFormats["XOR_COMPRESSION_ONLY"]):
+      payloadBytes = (changedBits != 0).astype(numpy.int64) * g_debugSignalBytes
+    else:
+      payloadBytes = (changedBits.view(numpy.uint8).reshape(-1, g_debugSignalBytes) != 0).sum(axis=1).astype(numpy.int64)
+  payloadBytes[numpy.asarray(fullCycles, dtype=numpy.int64)] = g_debugSignalBytes
+  payloadBytes[~tracedMask] = 0
+  return payloadBytes
+
+
+###################################
+# Profiling
+###################################
+class ClaChunkProfile:
+  '''
+  Event counts and trace packets of one chunk
+  '''
+  def __init__ (self, cycles, eventCycles, tracedCycles, dataPackets, dataBytes):
+    self.cycles = cycles
+    self.eventCycles = eventCycles
+    self.tracedCycles = tracedCycles
+    self.dataPackets = dataPackets
+    self.dataBytes = dataBytes
+
+def profileChunk(eventGenerator, eventTypes, samples, xtriggers, lastSample, chunkStart, tracedRuns, fullCycles, traceFormat):
+  '''
+  Counts the cycles each event in eventTypes is on the event bus, and the data packets and bytes of the traced cycles
+  of a chunk. eventGenerator must have seen the samples before the chunk
+  '''
+  samples = numpy.asarray(samples, dtype=numpy.uint64)
+  signals, lastSignals, detectorEvents = eventGenerator.detect(samples)
+  eventCycles = {}
+  for eventType in eventTypes:
+    if (eventType in detectorEvents):
+      eventCycles[eventType] = int(numpy.count_nonzero(detectorEvents[eventType]))
+  for xtriggerIndx, xtriggerEvent in enumerate(g_xtriggerEvents):
+    if (xtriggerEvent in eventTypes) and not (xtriggers is None):
+      eventCycles[xtriggerEvent] = int(numpy.count_nonzero(numpy.asarray(xtriggers) & (1 << xtriggerIndx)))
+
+  tracedCycles = sum([runEnd - runStart for runStart, runEnd in tracedRuns])
+  dataPackets = 0
+  dataBytes = 0
+  if (tracedCycles > 0):
+    tracedRuns = [(runStart - chunkStart, runEnd - chunkStart) for runStart, runEnd in tracedRuns]
+    fullCycles = [cycle - chunkStart for cycle in fullCycles]
+    payloadBytes = getTracePayloadBytes(samples, lastSample, tracedRuns, fullCycles, traceFormat)
+    dataPackets = int(numpy.count_nonzero(payloadBytes))
+    dataBytes = int(payloadBytes.sum()) + dataPackets*g_vltHeaderBytes
+
+  return ClaChunkProfile(len(samples), eventCycles, tracedCycles, dataPackets, dataBytes)
+
+def initProfileWorker(config, tracePath, xtriggerPath, eventTypes, traceFormat):
+  #Runs once per worker process. Traces are memory mapped, so the samples are never pickled
+  global g_workerConfig
+  global g_workerSamples
+  global g_workerXtriggers
+  global g_workerEventTypes
+  global g_workerTraceFormat
+  g_workerConfig = config
+  g_workerSamples = loadTraceArray(tracePath, "<u8")
+  g_workerXtriggers = None
+  if not (xtriggerPath is None):
+    g_workerXtriggers = loadTraceArray(xtriggerPath, "u1")
+  g_workerEventTypes = eventTypes
+  g_workerTraceFormat = traceFormat
+
+def profileWorkerChunk(tracedChunk):
+  chunkStart, chunkEnd, tracedRuns, fullCycles = tracedChunk
+  historySamples, historyXtriggers, samples, xtriggers = getChunkInputs(g_workerSamples, g_workerXtriggers, chunkStart, chunkEnd)
+  eventGenerator = ClaEventGenerator(g_workerConfig)
+  eventGenerator.skipSamples(historySamples, historyXtriggers)
+  lastSample = int(historySamples[-1]) if (len(historySamples) > 0) else 0
+  return profileChunk(eventGenerator, g_workerEventTypes, samples, xtriggers, lastSample, chunkStart, tracedRuns, fullCycles, g_workerTraceFormat)
+
+class ClaProgramProfiler:
+  '''
+  Estimates how often the events, EAPs, and actions of a register image fire on a recorded trace, and the bandwidth of
+  the trace packets its trace actions would put on the trace network. The nodes are simulated by ClaSimulator, the
+  traced cycles follow ClaTraceGate, and data packets are sized like dfd_vlt_packet_compression: a 2 byte header and
+  the payload bytes of the trace format. Packet loss, flushes, and timestamp retries are not modeled
+  '''
+  def __init__ (self, config, program=None, traceFormat=g_defaultTraceFormat, syncPeriod=None):
+    requireNumpy()
+    self.config = config
+    self.traceFormat = traceFormat
+    self.simulator = ClaSimulator(config, program)
+    self.traceGate = ClaTraceGate(syncPeriod)
+
+    self.eventNames = {}
+    for eventName, opcode in g_eventOpcodes.items():
+      if not (opcode in self.eventNames):
+        self.eventNames[opcode] = eventName
+    #Only the events an EAP reads are profiled
+    self.eventTypes = []
+    for node in range(g_availableNodes):
+      for eap in range(g_availableEapsPerNode):
+        for eventType in config.eaps[node][eap].eventTypes:
+          if not (eventType in self.eventTypes):
+            self.eventTypes.append(eventType)
+    self.eventTypes.sort()
+    self.reset()
+
+  def reset(self):
+    self.simulator.reset()
+    self.traceGate.reset()
+    self.cycle = 0
+    self.eventCycles = {}
+    self.tracedCycles = 0
+    self.dataPackets = 0
+    self.dataBytes = 0
+    self.timestampPackets = 0
+    self.peakChunkBytes = 0
+    self.peakChunkCycles = 0
+
+  def addChunkProfile(self, chunkProfile, timestampPackets):
+    self.cycle += chunkProfile.cycles
+    for eventType, cycles in chunkProfile.eventCycles.items():
+      self.eventCycles[eventType] = self.eventCycles.get(eventType, 0) + cycles
+    self.tracedCycles += chunkProfile.tracedCycles
+    self.dataPackets += chunkProfile.dataPackets
+    self.dataBytes += chunkProfile.dataBytes
+    self.timestampPackets += timestampPackets
+
+    chunkBytes = chunkProfile.dataBytes + timestampPackets*g_timestampPacketBytes
+    if (chunkProfile.cycles > 0) and (chunkBytes*max(self.peakChunkCycles, 1) > self.peakChunkBytes*chunkProfile.cycles):
+      self.peakChunkBytes = chunkBytes
+      self.peakChunkCycles = chunkProfile.cycles
+
+  def profile(self, traceChunks):
+    '''
+    Profiles (samples, xtriggers) chunks of a trace from reset
+    '''
+    self.reset()
+    eventGenerator = ClaEventGenerator(self.config)
+    lastSample = 0
+    for samples, xtriggers in traceChunks:
+      chunkStart = self.simulator.cycle
+      firings = self.simulator.simulateChunk(samples, xtriggers)
+      self.traceGate.addFirings(firings)
+      tracedRuns, fullCycles, timestampPackets = self.traceGate.getTracedCycles(self.simulator.cycle)
+      self.addChunkProfile(profileChunk(eventGenerator, self.eventTypes, samples, xtriggers, lastSample, chunkStart, tracedRuns, fullCycles, self.traceFormat), timestampPackets)
+      if (len(samples) > 0):
+        lastSample = int(samples[-1])
+
+  def profileParallel(self, tracePath, xtriggerPath=None, chunkSize=g_defaultChunkSize, jobs=None):
+    '''
+    Profiles a whole trace file on worker processes. The nodes are simulated with ClaSimulator.simulateParallel(), which
+    gives the traced cycles of every chunk, and the events and packets of the chunks are then counted in parallel
+    '''
+    if (jobs is None):
+      jobs = os.cpu_count() or 1
+    self.reset()
+    tracedChunks = []
+    timestampPackets = []
+    chunkStart = 0
+    for firings in self.simulator.simulateParallel(tracePath, xtriggerPath, chunkSize, jobs):
+      self.traceGate.addFirings(firings)
+      tracedRuns, fullCycles, chunkTimestampPackets = self.traceGate.getTracedCycles(self.simulator.cycle)
+      tracedChunks.append((chunkStart, self.simulator.cycle, tracedRuns, fullCycles))
+      timestampPackets.append(chunkTimestampPackets)
+      chunkStart = self.simulator.cycle
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=initProfileWorker, initargs=(self.config, tracePath, xtriggerPath, self.eventTypes, self.traceFormat)) as executor:
+      for chunkProfile, chunkTimestampPackets in zip(executor.map(profileWorkerChunk, tracedChunks), timestampPackets):
+        self.addChunkProfile(chunkProfile, chunkTimestampPackets)
+
+  def getRate(self, count):
+    '''
+    Returns count as a number per million cycles of the profiled trace
+    '''
+    if (self.cycle == 0):
+      return 0.0
+    return round(count * 1e6 / self.cycle, 3)
+
+  def getSummary(self, clockFrequency=g_defaultClockFrequency):
+    '''
+    Returns the rates of the profiled trace. clockFrequency is the CLA clock in MHz
+    '''
+    simulator = self.simulator
+    eventRates = {}
+    for eventType in self.eventTypes:
+      if (eventType in self.eventCycles):
+        eventRates[self.eventNames[eventType]] = self.getRate(self.eventCycles[eventType])
+
+    eapRates = {}
+    snapshots = 0
+    for node in range(g_availableNodes):
+      for eap in range(g_availableEapsPerNode):
+        if (simulator.firingCounts[node][eap] > 0):
+          eapRates[simulator.eapNames[(node, eap)]] = self.getRate(simulator.firingCounts[node][eap])
+          #Every EAP that fires captures its snapshot register
+          snapshots += simulator.firingCounts[node][eap]
+
+    actionRates = {}
+    actionBitCycles, customActionBitCycles = simulator.getActionCycles()
+    for opcode, actionName in g_actionNames.items():
+      if (actionBitCycles[opcode] > 0):
+        actionRates[actionName] = self.getRate(actionBitCycles[opcode])
+    for opcode in range(len(customActionBitCycles)):
+      if (customActionBitCycles[opcode] > 0):
+        actionRates[simulator.customActionNames[opcode]] = self.getRate(customActionBitCycles[opcode])
+
+    traceBytes = self.dataBytes + self.timestampPackets*g_timestampPacketBytes
+    bytesPerSecond = 0.0
+    peakBytesPerSecond = 0.0
+    if (self.cycle > 0):
+      bytesPerSecond = round(traceBytes * clockFrequency * 1e6 / self.cycle, 3)
+    if (self.peakChunkCycles > 0):
+      peakBytesPerSecond = round(self.peakChunkBytes * clockFrequency * 1e6 / self.peakChunkCycles, 3)
+
+    return {
+      "Cycles": self.cycle,
+      "Events Per Million Cycles": eventRates,
+      "EAP Firings Per Million Cycles": eapRates,
+      "Action Cycles Per Million Cycles": actionRates,
+      "Snapshots Per Million Cycles": self.getRate(snapshots),
+      "Trace": {
+        "Format": self.traceFormat,
+        "Traced Cycles Per Million Cycles": self.getRate(self.tracedCycles),
+        "Data Packets": self.dataPackets,
+        "Timestamp Packets": self.timestampPackets,
+        "Bytes": traceBytes,
+        "Bytes Per Million Cycles": self.getRate(traceBytes),
+        "Clock Frequency (MHz)": clockFrequency,
+        "Bytes Per Second": bytesPerSecond,
+        "Peak Chunk Bytes Per Second": peakBytesPerSecond
+      }
+    }
+
+
+###################################
+# Main
+###################################
+def main():
+  #Get args
+  parser = argparse.ArgumentParser(description='(Version {}) Estimate the event, EAP, and action rates of a compiled CLA program on a recorded trace of the CLA debug signal input, and the trace bandwidth of its trace actions'.format(compileClaProgram.g_program_version))
+  parser.add_argument("imagePath", type=str, help="Binary CSR image (value_dump.<program>.bin) written by compileClaProgram.py")
+  parser.add_argument("tracePath", type=str, help="Recorded CLA input, one 64 bit sample per cycle. A .npy or raw little-endian uint64 array, or a text file (.txt, .hex) with a hex sample and optional XTRIGGER value per line")
+  parser.add_argument("--xtriggerPath", type=str, help="A .npy or raw uint8 array of the XTRIGGER inputs of every cycle")
+  parser.add_argument("--programPath", type=str, help="The program yaml the image was compiled from. EAPs and custom actions are reported by name")
+  parser.add_argument("--csrMapPath", type=str, action="append", help="Path to a .rdl or .ipxact register description. Can be given multiple times. Defaults to cla_csr.rdl and mcr_csr.rdl in rtl/mmr/html")
+  parser.add_argument("--chunkSize", type=int, default=g_defaultChunkSize, help="Number of samples profiled at a time. Defaults to {}".format(g_defaultChunkSize))
+  parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes. With more than 1, chunks of the trace are simulated and profiled in parallel. Requires a .npy or raw trace. Defaults to 1")
+  parser.add_argument("--traceFormat", type=str, default=g_defaultTraceFormat, choices=list(g_traceFormats.keys()), help="Trdstformat of the debug signal trace. Defaults to {}".format(g_defaultTraceFormat))
+  parser.add_argument("--syncMax", type=int, help="Trdstsyncmax, for a timestamp packet every 2^(syncMax + 4) cycles of a trace. Timestamps are not sent if not given")
+  parser.add_argument("--clockFrequency", type=float, default=g_defaultClockFrequency, help="Clock frequency of the CLA in MHz, to convert rates to bytes per second. Defaults to {}".format(g_defaultClockFrequency))
+  parser.add_argument("--summaryJson", type=str, help="Output path for a json summary of the rates")
+  args = parser.parse_args()
+
+  if (args.chunkSize < 1):
+    sys.exit("ERROR: --chunkSize must be at least 1")
+  if (args.jobs < 1):
+    sys.exit("ERROR: --jobs must be at least 1")
+  if (args.jobs > 1) and (os.path.splitext(args.tracePath)[1].lower() in [".txt", ".hex"]):
+    sys.exit("ERROR: --jobs needs a .npy or raw trace")
+  if not (args.syncMax is None) and not (0 <= args.syncMax <= 15):
+    sys.exit("ERROR: --syncMax must be between 0 and 15")
+  if (args.clockFrequency <= 0):
+    sys.exit("ERROR: --clockFrequency must be greater than 0")
+
+  syncPeriod = None
+  if not (args.syncMax is None):
+    syncPeriod = 1 << (args.syncMax + 4)
+
+  try:
+    requireNumpy()
+    csrMap = loadCsrMap(args.csrMapPath)
+    try:
+      csrImage = CsrImage.fromFile(args.imagePath)
+    except OSError as e:
+      raise ClaSimulatorError("Could not read CSR image. {}".format(e), args.imagePath)
+    program = None
+    if not (args.programPath is None):
+      program = ClaProgram.fromYamlFile(args.programPath)
+      if (program.getHash() != bytes(csrImage.programHash)):
+        print("WARNING: \"{}\" was not compiled from \"{}\"".format(args.imagePath, args.programPath))
+
+    profiler = ClaProgramProfiler(ClaConfig.fromCsrImage(csrImage, csrMap), program, args.traceFormat, syncPeriod)
+    startTime = time.perf_counter()
+    if (args.jobs > 1):
+      profiler.profileParallel(args.tracePath, args.xtriggerPath, args.chunkSize, args.jobs)
+    else:
+      profiler.profile(readTraceChunks(args.tracePath, args.chunkSize, args.xtriggerPath))
+    profilingTime = time.perf_counter() - startTime
+  except ClaCompilerError as e:
+    sys.exit("ERROR: {}".format(e))
+
+  summary = profiler.getSummary(args.clockFrequency)
+  summary["Profiling Time (s)"] = round(profilingTime, 6)
+  if not (args.summaryJson is None):
+    outputFile = open(args.summaryJson, "w")
+    outputFile.write(json.dumps(summary, indent=2))
+    outputFile.close()
+
+  print("Profiled {} cycles in {:.3f}s. Rates per million cycles:".format(summary["Cycles"], profilingTime))
+  for title in ["Events Per Million Cycles", "EAP Firings Per Million Cycles", "Action Cycles Per Million Cycles"]:
+    for name, rate in summary[title].items():
+      print("  {}: {}".format(name, rate))
+  print("  Snapshots: {}".format(summary["Snapshots Per Million Cycles"]))
+  traceSummary = summary["Trace"]
+  print("Trace ({}): {} traced cycles and {} bytes per million cycles, {:.1f} MB/s at {} MHz (busiest chunk {:.1f} MB/s)".format(traceSummary["Format"], traceSummary["Traced Cycles Per Million Cycles"], traceSummary["Bytes Per Million Cycles"], traceSummary["Bytes Per Second"]/1e6, args.clockFrequency, traceSummary["Peak Chunk Bytes Per Second"]/1e6))
+
+
+if __name__ == "__main__":
+  main()
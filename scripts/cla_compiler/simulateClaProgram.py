@@ -0,0 +1,1226 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import json
+import time
+import argparse
+import concurrent.futures
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+  import numpy
+  from claEventKernels import anyChangeEvents, delayArray, edgeEvents, getEventCycles, getFalseTriggers, getMatchedExpectations, matchEvents, onesCountEvents, transitionEvents
+except ImportError:
+  numpy = None
+import compileClaProgram
+from compileClaProgram import ClaCompilerError, ClaProgram, CsrImage, allocateCfgRegisters, allocateEapRegisters, allocateNodeIndexes, loadCsrMap
+from compileClaProgram import g_actionOpcodes, g_eventOpcodes, g_logicalOpcodes, g_availableCounters, g_availableEapsPerNode, g_availableMatchRegs, g_availableNodes
+from claCsrMap import CsrMapError
+
+
+###################################
+# Global vars
+###################################
+g_defaultChunkSize = 1 << 16
+#Number of cycles of a chunk that are stepped one at a time before its numpy arrays are converted to lists
+g_listConversionSteps = 256
+
+#Widths from rtl/cla/dfd_cla_pkg.svh
+g_counterWidth = 31
+g_counterMask = (1 << g_counterWidth) - 1
+g_onesCountMask = 0x7f
+g_customActionWidth = 16
+g_xtriggerWidth = 2
+
+#dfd_debug_signal_shift_mux delays each 8 bit lane of the CLA input by 0 to 3 cycles
+g_delayLaneWidth = 8
+g_delayLaneCount = 8
+g_maxLaneDelay = 3
+#The event flops only depend on this many of the last samples (the lane delays, and the previous aligned sample)
+g_eventHistoryLength = g_maxLaneDelay + 2
+
+#Parallel simulation speculates on at most this many chunk entry states
+g_maxSpeculativeStates = 16
+
+#Event bus positions
+g_alwaysOnEvent = g_eventOpcodes["ALWAYS_ON"]
+g_matchEvents = [(g_eventOpcodes["MATCH_{}".format(i)], g_eventOpcodes["NOT_MATCH_{}".format(i)]) for i in range(g_availableMatchRegs)]
+g_edgeEvents = [g_eventOpcodes["EDGE_DETECT_0"], g_eventOpcodes["EDGE_DETECT_1"]]
+g_xtriggerEvents = [g_eventOpcodes["XTRIGGER_0"], g_eventOpcodes["XTRIGGER_1"]]
+g_transitionEvent = g_eventOpcodes["TRANSITION"]
+g_onesCountEvent = g_eventOpcodes["ONES_COUNT"]
+g_anyChangeEvent = g_eventOpcodes["DEBUG_SIGNALS_CHANGE"]
+
+#Every counter drives 3 events (equal, greater, less than target) and takes 4 actions (increment, clear, auto increment, stop auto increment)
+g_eventsPerCounter = 3
+g_counterEventBase = g_eventOpcodes["COUNTER_0_EQUAL_TARGET"]
+g_counterEventMask = ((1 << (g_eventsPerCounter*g_availableCounters)) - 1) << g_counterEventBase
+g_actionsPerCounter = 4
+g_counterActionBase = g_actionOpcodes["INCREMENT_COUNTER_0"]
+g_counterActionMask = ((1 << (g_actionsPerCounter*g_availableCounters)) - 1) << g_counterActionBase
+g_interruptAction = 1 << g_actionOpcodes["DEBUG_INTERRUPT"]
+
+#Action bus bits are reported by the first name of their opcode. Bit 0 (NULL) is driven by EAPs with unused action fields
+g_actionNames = {}
+for actionName, opcode in g_actionOpcodes.items():
+  if (opcode != g_actionOpcodes["NULL"]) and not (opcode in g_actionNames):
+    g_actionNames[opcode] = actionName
+g_reportedActionMask = sum([1 << opcode for opcode in g_actionNames])
+
+if (numpy is not None):
+  g_firingDtype = numpy.dtype([("cycle", "<u8"), ("node", "u1"), ("eaps", "u1"), ("actions", "<u8"), ("customActions", "<u2"), ("snapshot", "<u8")])
+
+
+###################################
+# Exceptions
+###################################
+class ClaSimulatorError(ClaCompilerError):
+  '''
+  The CSR image or the recorded trace can not be simulated
+  '''
+  pass
+
+class ClaCounterStateRequired(Exception):
+  '''
+  Raised by ClaSpeculativeSimulator when an EAP of the current node reads a counter event, whose value depends on
+  counter state the speculative simulation does not have
+  '''
+  pass
+
+def requireNumpy():
+  if (numpy is None):
+    raise ClaSimulatorError("The CLA simulator requires numpy")
+
+
+###################################
+# Register Decoding
+###################################
+class ClaEapConfig:
+  '''
+  Fields of one dbg_node<n>_eap<m> register
+  '''
+  def __init__ (self, node, eap, eventTypes, logicalOp, udf, actions, customActions, destNode):
+    self.node = node
+    self.eap = eap
+    self.eventTypes = eventTypes
+    self.logicalOp = logicalOp
+    self.udf = udf
+    self.actions = actions
+    self.customActions = customActions
+    self.destNode = destNode
+
+    self.actionBus = 0
+    for action in actions:
+      self.actionBus |= 1 << action
+    self.customActionBus = 0
+    for customAction in customActions:
+      self.customActionBus |= 1 << customAction
+
+    #EAPs on counter events can only be evaluated one cycle at a time, since the counters depend on earlier actions
+    self.usesCounterEvents = any([((1 << eventType) & g_counterEventMask) for eventType in eventTypes])
+    self.resultTable = self.getResultTable()
+
+  def getRegisterName(self):
+    return "dbg_node{}_eap{}".format(self.node, self.eap)
+
+  def getResultTable(self):
+    '''
+    Returns the 8 bit truth table of the EAP, indexed by {event_type2, event_type1, event_type0}
+    '''
+    if (self.logicalOp == g_logicalOpcodes["NONE"]):
+      return self.udf
+
+    resultTable = 0
+    for row in range(8):
+      e0 = row & 1
+      e1 = (row >> 1) & 1
+      if (self.logicalOp == g_logicalOpcodes["OR"]):
+        result = e0 | e1
+      elif (self.logicalOp == g_logicalOpcodes["AND"]):
+        result = e0 & e1
+      else:
+        result = 1 - (e0 | e1)
+      resultTable |= result << row
+
+    return resultTable
+
+  def evaluate(self, eventBits):
+    row = 0
+    for eventIndx, eventType in enumerate(self.eventTypes):
+      row |= ((eventBits >> eventType) & 1) << eventIndx
+
+    return (self.resultTable >> row) & 1
+
+  def evaluateChunk(self, eventBus):
+    '''
+    Returns a bool array of the cycles the EAP logic is true, for a uint64 array of event bus values
+    '''
+    rows = numpy.zeros(len(eventBus), dtype=numpy.uint8)
+    for eventIndx, eventType in enumerate(self.eventTypes):
+      rows |= (((eventBus >> numpy.uint64(eventType)) & numpy.uint64(1)).astype(numpy.uint8) << numpy.uint8(eventIndx))
+
+    resultTable = numpy.array([(self.resultTable >> row) & 1 for row in range(8)], dtype=bool)
+    return resultTable[rows]
+
+class ClaConfig:
+  '''
+  Trigger, counter, and EAP settings decoded from the register values of a compiled CLA program. Registers that are
+  not in the image are at their reset values
+  '''
+  def __init__ (self, registerValues, csrMap=None):
+    if (csrMap is None):
+      csrMap = loadCsrMap()
+    self.csrMap = csrMap
+    #Register values keyed by APB address
+    self.registerValues = registerValues
+
+    self.matchMasks = [self.getField("dbg_signal_mask{}".format(i), "value") for i in range(g_availableMatchRegs)]
+    self.matchValues = [self.getField("dbg_signal_match{}".format(i), "value") for i in range(g_availableMatchRegs)]
+    self.edgeSelects = [self.getField("dbg_signal_edge_detect_cfg", "signal{}_select".format(i)) for i in range(len(g_edgeEvents))]
+    self.edgePositive = [self.getField("dbg_signal_edge_detect_cfg", "pos_edge_signal{}".format(i)) for i in range(len(g_edgeEvents))]
+    self.transitionMask = self.getField("dbg_transition_mask", "value")
+    self.transitionFrom = self.getField("dbg_transition_from_value", "value")
+    self.transitionTo = self.getField("dbg_transition_to_value", "value")
+    self.onesCountMask = self.getField("dbg_ones_count_mask", "value")
+    self.onesCountValue = self.getField("dbg_ones_count_value", "value") & g_onesCountMask
+    self.anyChangeMask = self.getField("dbg_any_change", "mask")
+    self.laneDelays = [self.getField("dbg_signal_delay_mux_sel", "Muxselseg{}".format(i)) for i in range(g_delayLaneCount)]
+
+    self.counterTargets = []
+    self.counterResetOnTarget = []
+    self.counterValues = []
+    for i in range(g_availableCounters):
+      registerName = "dbg_cla_counter{}_cfg".format(i)
+      self.counterTargets.append((self.getField(registerName, "upper_target") << 16) | self.getField(registerName, "target"))
+      self.counterResetOnTarget.append(self.getField(registerName, "reset_on_target") == 1)
+      self.counterValues.append((self.getField(registerName, "upper_counter") << 16) | self.getField(registerName, "counter"))
+
+    self.eaps = []
+    for node in range(g_availableNodes):
+      nodeEaps = []
+      for eap in range(g_availableEapsPerNode):
+        registerName = "dbg_node{}_eap{}".format(node, eap)
+        customActions = []
+        for i in range(2):
+          if (self.getField(registerName, "custom_action{}_enable".format(i))):
+            customActions.append(self.getField(registerName, "custom_action_{}".format(i)))
+        nodeEaps.append(ClaEapConfig(
+            node,
+            eap,
+            [self.getField(registerName, "event_type{}".format(i)) for i in range(3)],
+            self.getField(registerName, "logical_op"),
+            self.getField(registerName, "udf"),
+            [self.getField(registerName, "action{}".format(i)) for i in range(4)],
+            customActions,
+            self.getField(registerName, "dest_node")
+          ))
+      self.eaps.append(nodeEaps)
+
+  @classmethod
+  def fromCsrImage(cls, csrImage, csrMap=None):
+    #Every debug mux select CSR shares one address, but none of them are read by the CLA
+    return cls(dict(csrImage.getRecords()), csrMap)
+
+  @classmethod
+  def fromClaValues(cls, csrValues):
+    return cls.fromCsrImage(csrValues.getCsrImage(), csrValues.csrMap)
+
+  def getField(self, registerName, fieldName):
+    try:
+      csrRegister = self.csrMap.getRegister(registerName)
+      csrField = csrRegister.getField(fieldName)
+    except CsrMapError as e:
+      raise ClaSimulatorError(str(e))
+
+    value = self.registerValues.get(csrRegister.address, csrRegister.getResetValue())
+    return (value >> csrField.offset) & ((1 << csrField.width) - 1)
+
+
+###################################
+# Event Generation
+###################################
+class ClaEventGenerator:
+  '''
+  Vectorized model of the lane delay mux and dfd_cla_event_gen, except the counters. Every detector output is a flop,
+  so a sample is seen on the event bus one cycle after it reaches the CLA input. The flop values are carried from one
+  chunk of samples to the next
+  '''
+  def __init__ (self, config):
+    requireNumpy()
+    self.config = config
+    self.reset()
+
+  def reset(self):
+    #Raw samples of the last cycles, for the lane delay mux
+    self.sampleHistory = numpy.zeros(g_maxLaneDelay, dtype=numpy.uint64)
+    #Aligned debug signals of the last cycle (debug_signals_d1, and the delay flops of the edge and change detectors)
+    self.lastSignals = numpy.uint64(0)
+    #Detector flops. Negative match events reset to 1
+    self.eventFlops = numpy.uint64(sum([1 << negEvent for posEvent, negEvent in g_matchEvents]))
+    self.transitionFromMatch = False
+    self.xtriggerFlops = 0
+
+  def skipSamples(self, samples, xtriggers=None):
+    '''
+    Updates the flops as if samples had been generated, without computing the event bus of every sample
+    '''
+    samples = samples[-g_eventHistoryLength:]
+    if not (xtriggers is None):
+      xtriggers = xtriggers[-g_eventHistoryLength:]
+    self.generate(samples, xtriggers)
+
+  def alignSignals(self, samples):
+    history = numpy.concatenate([self.sampleHistory, samples])
+    self.sampleHistory = history[-g_maxLaneDelay:]
+    if not any(self.config.laneDelays):
+      return samples
+
+    signals = numpy.zeros(len(samples), dtype=numpy.uint64)
+    for lane, delay in enumerate(self.config.laneDelays):
+      laneMask = numpy.uint64(((1 << g_delayLaneWidth) - 1) << (lane*g_delayLaneWidth))
+      signals |= history[g_maxLaneDelay-delay:len(history)-delay] & laneMask
+
+    return signals
+
+  def detect(self, samples):
+    '''
+    Returns the aligned debug signals of a chunk of samples, and the result of every detector on each of them (before
+    the detector flops), keyed by event bus position
+    '''
+    config = self.config
+    signals = self.alignSignals(numpy.asarray(samples, dtype=numpy.uint64))
+    lastSignals = self.lastSignals
+    if (len(signals) > 0):
+      self.lastSignals = signals[-1]
+
+    detectorEvents = {}
+    for matchIndx, (posEvent, negEvent) in enumerate(g_matchEvents):
+      detectorEvents[posEvent] = matchEvents(signals, config.matchMasks[matchIndx], config.matchValues[matchIndx])
+      detectorEvents[negEvent] = ~detectorEvents[posEvent]
+
+    for edgeIndx, edgeEvent in enumerate(g_edgeEvents):
+      detectorEvents[edgeEvent] = edgeEvents(signals, config.edgeSelects[edgeIndx], config.edgePositive[edgeIndx], lastSignals)
+
+    detectorEvents[g_transitionEvent] = transitionEvents(signals, config.transitionMask, config.transitionFrom, config.transitionTo, self.transitionFromMatch)
+    if (len(signals) > 0):
+      self.transitionFromMatch = bool((int(signals[-1]) & config.transitionMask) == config.transitionFrom)
+
+    detectorEvents[g_onesCountEvent] = onesCountEvents(signals, config.onesCountMask, config.onesCountValue)
+    detectorEvents[g_anyChangeEvent] = anyChangeEvents(signals, config.anyChangeMask, lastSignals)
+
+    return signals, lastSignals, detectorEvents
+
+  def generate(self, samples, xtriggers=None):
+    '''
+    Returns the event bus of every cycle of a chunk of samples (without the counter events), and the aligned debug
+    signals of the cycle before, which is what a snapshot captures
+    '''
+    samples = numpy.asarray(samples, dtype=numpy.uint64)
+    if (len(samples) == 0):
+      return numpy.zeros(0, dtype=numpy.uint64), numpy.zeros(0, dtype=numpy.uint64)
+
+    signals, lastSignals, detectorResults = self.detect(samples)
+    lastSignals = delayArray(signals, lastSignals)
+
+    detectorEvents = numpy.zeros(len(samples), dtype=numpy.uint64)
+    for eventOpcode, events in detectorResults.items():
+      detectorEvents |= events.astype(numpy.uint64) << numpy.uint64(eventOpcode)
+    eventBus = delayArray(detectorEvents, self.eventFlops)
+    self.eventFlops = detectorEvents[-1]
+    eventBus |= numpy.uint64(1 << g_alwaysOnEvent)
+
+    #XTRIGGER inputs are flopped once before the event bus
+    if not (xtriggers is None):
+      xtriggers = numpy.asarray(xtriggers, dtype=numpy.uint64)
+      if (len(xtriggers) != len(samples)):
+        raise ClaSimulatorError("Got {} XTRIGGER values for {} debug signal samples".format(len(xtriggers), len(samples)))
+      delayedXtriggers = delayArray(xtriggers, self.xtriggerFlops)
+      self.xtriggerFlops = int(xtriggers[-1])
+    elif (self.xtriggerFlops != 0):
+      delayedXtriggers = numpy.zeros(len(samples), dtype=numpy.uint64)
+      delayedXtriggers[0] = self.xtriggerFlops
+      self.xtriggerFlops = 0
+    else:
+      delayedXtriggers = None
+
+    if not (delayedXtriggers is None):
+      for xtriggerIndx, xtriggerEvent in enumerate(g_xtriggerEvents):
+        eventBus |= ((delayedXtriggers >> numpy.uint64(xtriggerIndx)) & numpy.uint64(1)) << numpy.uint64(xtriggerEvent)
+
+    return eventBus, lastSignals
+
+
+###################################
+# Simulation
+###################################
+class ClaCounter:
+  '''
+  Model of dfd_cla_counter. The target flags are flops computed from the next counter value
+  '''
+  def __init__ (self, target, resetOnTarget=False, value=0):
+    self.target = target
+    self.resetOnTarget = resetOnTarget
+    self.value = value
+    self.running = False
+    self.flags = 0
+
+  def copy(self):
+    counterCopy = ClaCounter(self.target, self.resetOnTarget, self.value)
+    counterCopy.running = self.running
+    counterCopy.flags = self.flags
+    return counterCopy
+
+  def updateFlags(self):
+    if (self.value == self.target):
+      self.flags = 0x1
+    elif (self.value > self.target):
+      self.flags = 0x2
+    else:
+      self.flags = 0x4
+
+  def getNextValue(self):
+    if (self.resetOnTarget and (self.flags & 0x1)):
+      return 0
+    return (self.value + 1) & g_counterMask
+
+  def step(self, controls):
+    '''
+    Advances the counter one cycle. controls holds the increment, clear, auto increment, and stop auto increment
+    actions in bits 0 to 3
+    '''
+    if (controls & 0x2):
+      self.running = False
+      self.value = 0
+    elif (self.running):
+      if (controls & 0x8):
+        self.running = False
+      else:
+        self.value = self.getNextValue()
+    elif (controls & 0x1):
+      self.value = self.getNextValue()
+    elif (controls & 0x4):
+      self.running = True
+      self.value = self.getNextValue()
+
+    self.updateFlags()
+
+  def advance(self, cycles):
+    '''
+    Advances the counter any number of cycles without actions
+    '''
+    if (cycles <= 0):
+      return
+
+    if (self.running):
+      #Only the first cycle can see a target flag that does not match the counter value
+      self.value = self.getNextValue()
+      cycles -= 1
+      cyclesToTarget = (self.target - self.value) & g_counterMask
+      if (self.resetOnTarget) and (cycles > cyclesToTarget):
+        self.value = (cycles - cyclesToTarget - 1) % (self.target + 1)
+      else:
+        self.value = (self.value + cycles) & g_counterMask
+
+    self.updateFlags()
+
+class ClaSimulator:
+  '''
+  Cycle-level model of the CLA running a compiled program. Samples of the 64 bit CLA input (and the XTRIGGER inputs)
+  are simulated in chunks: the trigger events of a whole chunk are computed with numpy, and the nodes, counters, and
+  actions are then stepped through the cycles an EAP of the current node can fire. EAP results and actions follow
+  dfd_cla_node_eap_set and dfd_cla_action_gen: the actions of every firing EAP in the current node are ORed onto the
+  action bus, which is flopped, so actions (and counter controls) take effect the cycle after the EAP fires
+  '''
+  def __init__ (self, config, program=None):
+    requireNumpy()
+    self.config = config
+    self.eventGenerator = ClaEventGenerator(config)
+
+    #Per node lookup tables, indexed by the bit mask of the EAPs that fired
+    self.firedActions = []
+    self.firedCustomActions = []
+    self.firedDestinations = []
+    for node in range(g_availableNodes):
+      actionTable = []
+      customActionTable = []
+      destinationTable = []
+      for firedMask in range(1 << g_availableEapsPerNode):
+        actionBus = 0
+        customActionBus = 0
+        destination = None
+        for eapConfig in config.eaps[node]:
+          if (firedMask & (1 << eapConfig.eap)):
+            actionBus |= eapConfig.actionBus
+            customActionBus |= eapConfig.customActionBus
+            #The lowest EAP that fires selects the next node
+            if (destination is None):
+              destination = eapConfig.destNode
+        actionTable.append(actionBus)
+        customActionTable.append(customActionBus)
+        destinationTable.append(node if (destination is None) else destination)
+      self.firedActions.append(actionTable)
+      self.firedCustomActions.append(customActionTable)
+      self.firedDestinations.append(destinationTable)
+
+    self.setNames(program)
+    self.reset()
+
+  @classmethod
+  def fromCsrImage(cls, csrImage, program=None, csrMap=None):
+    return cls(ClaConfig.fromCsrImage(csrImage, csrMap), program)
+
+  def setNames(self, program=None):
+    '''
+    Names nodes, EAPs, counters, and custom actions after the program the image was compiled from
+    '''
+    self.nodeNames = [str(node) for node in range(g_availableNodes)]
+    self.eapNames = {}
+    for node in range(g_availableNodes):
+      for eap in range(g_availableEapsPerNode):
+        self.eapNames[(node, eap)] = "dbg_node{}_eap{}".format(node, eap)
+    self.counterNames = ["dbg_cla_counter{}_cfg".format(i) for i in range(g_availableCounters)]
+    self.customActionNames = ["CUSTOM_ACTION_{}".format(i) for i in range(g_customActionWidth)]
+
+    if (program is None):
+      return
+
+    nodeAllocations = allocateNodeIndexes(program.nodeDict, program.startNode)
+    for nodeName, node in nodeAllocations.items():
+      self.nodeNames[node] = nodeName
+    for registerName, eapObj in allocateEapRegisters(program.nodeDict, nodeAllocations):
+      node, eap = [int(indx) for indx in registerName[len("dbg_node"):].split("_eap")]
+      self.eapNames[(node, eap)] = "{}.{}".format(eapObj.parentNode.name, eapObj.name)
+
+    counterRegAllocations = allocateCfgRegisters(program.nodeDict, program.counterAliases)[1]
+    for counterName in counterRegAllocations:
+      self.counterNames[counterRegAllocations[counterName]["register"]] = counterName
+    for actionName, opcode in program.customActionOpcodes.items():
+      if (opcode < g_customActionWidth):
+        self.customActionNames[opcode] = actionName
+
+  def reset(self):
+    self.eventGenerator.reset()
+    self.cycle = 0
+    self.currentNode = 0
+    self.actionBus = 0
+    self.customActionBus = 0
+    #Node whose EAPs latched DEBUG_INTERRUPT. It stays on the action bus until the node changes
+    self.interruptNode = None
+    config = self.config
+    self.counters = [ClaCounter(config.counterTargets[i], config.counterResetOnTarget[i], config.counterValues[i]) for i in range(g_availableCounters)]
+
+    #Statistics
+    self.firingCounts = [[0]*g_availableEapsPerNode for node in range(g_availableNodes)]
+    #Number of cycles each (action bus, custom action bus) value was driven
+    self.actionBusCycles = {}
+    self.snapshots = {}
+
+  def getCounterEvents(self):
+    counterEvents = 0
+    for counterIndx, counter in enumerate(self.counters):
+      counterEvents |= counter.flags << (g_counterEventBase + counterIndx*g_eventsPerCounter)
+    return counterEvents
+
+  def countActions(self, actionBus, customActionBus, cycles):
+    if (cycles > 0) and (actionBus or customActionBus):
+      actionBusKey = (actionBus, customActionBus)
+      self.actionBusCycles[actionBusKey] = self.actionBusCycles.get(actionBusKey, 0) + cycles
+
+  def getActionCycles(self):
+    '''
+    Returns the number of cycles each action bus bit, and each custom action bus bit, was asserted
+    '''
+    actionCycles = [0]*64
+    customActionCycles = [0]*g_customActionWidth
+    for (actionBus, customActionBus), cycles in self.actionBusCycles.items():
+      for opcode in range(len(actionCycles)):
+        if (actionBus & (1 << opcode)):
+          actionCycles[opcode] += cycles
+      for opcode in range(len(customActionCycles)):
+        if (customActionBus & (1 << opcode)):
+          customActionCycles[opcode] += cycles
+
+    return actionCycles, customActionCycles
+
+  def getControlState(self):
+    '''
+    Returns the state of the CLA at the end of the last cycle, except for the counters and event flops
+    '''
+    return (self.currentNode, self.actionBus, self.customActionBus, self.interruptNode)
+
+  def setControlState(self, controlState):
+    self.currentNode, self.actionBus, self.customActionBus, self.interruptNode = controlState
+
+  def stepCounters(self, counterControls):
+    for counterIndx, counter in enumerate(self.counters):
+      controls = (counterControls >> (counterIndx*g_actionsPerCounter)) & 0xf
+      #A stopped counter without actions keeps its value and flags (which are only out of date right after reset)
+      if (controls or counter.running or (counter.flags == 0)):
+        counter.step(controls)
+
+  def advanceCounters(self, cycles):
+    for counter in self.counters:
+      counter.advance(cycles)
+
+  def skipCycles(self, cycles):
+    '''
+    Advances through cycles where no EAP of the current node fires, and the action bus has no counter actions
+    '''
+    self.countActions(self.actionBus, self.customActionBus, 1)
+    self.advanceCounters(cycles)
+
+    #Only a DEBUG_INTERRUPT latched by the current node stays on the action bus
+    self.actionBus = g_interruptAction if (self.interruptNode == self.currentNode) else 0
+    self.customActionBus = 0
+    if (self.actionBus == 0):
+      self.interruptNode = None
+    self.countActions(self.actionBus, 0, cycles-1)
+    self.cycle += cycles
+
+  def simulateChunk(self, samples, xtriggers=None):
+    '''
+    Simulates a chunk of samples, continuing from the end of the previous chunk. Returns a g_firingDtype array with a
+    record for every cycle an EAP of the current node fired: the EAPs that fired (bit mask), the actions and custom
+    actions they put on the action bus, and the debug signals captured by their snapshot registers
+    '''
+    return self.runChunk(self.prepareChunk(samples, xtriggers))
+
+  def prepareChunk(self, samples, xtriggers=None):
+    '''
+    Computes everything about a chunk that does not depend on the node, action, and counter state: the event bus,
+    snapshot data, and the results of the EAPs that do not use counter events
+    '''
+    eventBus, snapshotSignals = self.eventGenerator.generate(samples, xtriggers)
+    cycleCount = len(eventBus)
+    config = self.config
+
+    #Results of the EAPs that do not use counter events, as a bit mask per node
+    firedMasks = []
+    fireCycles = []
+    dynamicEaps = []
+    for node in range(g_availableNodes):
+      firedMask = numpy.zeros(cycleCount, dtype=numpy.uint8)
+      nodeDynamicEaps = []
+      for eapConfig in config.eaps[node]:
+        if (eapConfig.usesCounterEvents):
+          nodeDynamicEaps.append(eapConfig)
+        else:
+          firedMask |= eapConfig.evaluateChunk(eventBus).astype(numpy.uint8) << numpy.uint8(eapConfig.eap)
+      firedMasks.append(firedMask)
+      dynamicEaps.append(nodeDynamicEaps)
+      #Cycles that can be skipped are only known ahead of time when no EAP of the node depends on the counters
+      fireCycles.append(numpy.flatnonzero(firedMask) if (len(nodeDynamicEaps) == 0) else None)
+
+    return eventBus, snapshotSignals, firedMasks, fireCycles, dynamicEaps
+
+  def runChunk(self, preparedChunk):
+    '''
+    Steps the nodes, counters, and action bus through a chunk returned by prepareChunk()
+    '''
+    eventBus, snapshotSignals, firedMasks, fireCycles, dynamicEaps = preparedChunk
+    cycleCount = len(eventBus)
+    firings = []
+    cycleIndx = 0
+    stepCount = 0
+    firstCycle = self.cycle
+    while (cycleIndx < cycleCount):
+      node = self.currentNode
+
+      #Skip to the next cycle an EAP of the node fires
+      nodeFireCycles = fireCycles[node]
+      if not (nodeFireCycles is None) and not (self.actionBus & g_counterActionMask):
+        nextFireIndx = numpy.searchsorted(nodeFireCycles, cycleIndx)
+        nextCycleIndx = int(nodeFireCycles[nextFireIndx]) if (nextFireIndx < len(nodeFireCycles)) else cycleCount
+        if (nextCycleIndx > cycleIndx):
+          self.skipCycles(nextCycleIndx - cycleIndx)
+          cycleIndx = nextCycleIndx
+          continue
+
+      #Indexing python lists is much faster than indexing numpy arrays, when most cycles are stepped one at a time
+      stepCount += 1
+      if (stepCount == g_listConversionSteps):
+        eventBus = eventBus.tolist()
+        snapshotSignals = snapshotSignals.tolist()
+        firedMasks = [firedMask.tolist() for firedMask in firedMasks]
+
+      fired = int(firedMasks[node][cycleIndx])
+      if (len(dynamicEaps[node]) > 0):
+        eventBits = int(eventBus[cycleIndx]) | self.getCounterEvents()
+        for eapConfig in dynamicEaps[node]:
+          fired |= eapConfig.evaluate(eventBits) << eapConfig.eap
+
+      nextActionBus = self.firedActions[node][fired]
+      nextCustomActionBus = self.firedCustomActions[node][fired]
+      if (self.interruptNode == node):
+        nextActionBus |= g_interruptAction
+      self.interruptNode = node if (nextActionBus & g_interruptAction) else None
+
+      #Counters are controlled by the flopped action bus
+      self.stepCounters((self.actionBus & g_counterActionMask) >> g_counterActionBase)
+
+      if (fired):
+        snapshot = int(snapshotSignals[cycleIndx])
+        firings.append((self.cycle, node, fired, nextActionBus, nextCustomActionBus, snapshot))
+        for eap in range(g_availableEapsPerNode):
+          if (fired & (1 << eap)):
+            self.firingCounts[node][eap] += 1
+            self.snapshots[(node, eap)] = snapshot
+
+      self.countActions(self.actionBus, self.customActionBus, 1)
+      self.actionBus = nextActionBus
+      self.customActionBus = nextCustomActionBus
+      self.currentNode = self.firedDestinations[node][fired]
+      self.cycle += 1
+      cycleIndx += 1
+
+    assert (self.cycle == firstCycle + cycleCount)
+    return numpy.array(firings, dtype=g_firingDtype)
+
+  def simulate(self, traceChunks):
+    '''
+    Simulates (samples, xtriggers) chunks, and yields the firing records of each chunk
+    '''
+    for samples, xtriggers in traceChunks:
+      yield self.simulateChunk(samples, xtriggers)
+
+  def getReachableNodes(self):
+    '''
+    Returns the nodes the program can reach from node 0
+    '''
+    reachableNodes = [0]
+    for node in reachableNodes:
+      for destination in self.firedDestinations[node]:
+        if not (destination in reachableNodes):
+          reachableNodes.append(destination)
+
+    return reachableNodes
+
+  def readsCounterEvents(self):
+    '''
+    Returns True if an EAP of a reachable node reads a counter event
+    '''
+    for node in self.getReachableNodes():
+      if any([eapConfig.usesCounterEvents for eapConfig in self.config.eaps[node]]):
+        return True
+    return False
+
+  def getIdleEntryStates(self):
+    '''
+    Returns the control states after a cycle where no EAP fired, for every node the program can reach
+    '''
+    entryStates = []
+    for node in self.getReachableNodes():
+      entryStates.append((node, 0, 0, None))
+      if any([(eapConfig.actionBus & g_interruptAction) for eapConfig in self.config.eaps[node]]):
+        entryStates.append((node, g_interruptAction, 0, node))
+    return entryStates
+
+  def simulateParallel(self, tracePath, xtriggerPath=None, chunkSize=g_defaultChunkSize, jobs=None):
+    '''
+    Simulates a whole trace file from reset on worker processes, and yields the firing records of each chunk like
+    simulate(). Every chunk is simulated from each likely entry state at once: the idle state of every reachable node,
+    and the last states chunks were seen to end in. Chunks are then stitched in order by picking the result whose entry
+    state is the exit state of the chunk before, and the counters are updated from its logged counter controls. Chunks
+    that end in another state, or whose nodes read counter events, are simulated again here with the exact state.
+    When a reachable node reads counter events, most chunks would be simulated twice, so the whole trace is simulated
+    sequentially instead
+    '''
+    if (jobs is None):
+      jobs = os.cpu_count() or 1
+    self.reset()
+    self.resimulatedChunks = 0
+    self.sequentialFallback = self.readsCounterEvents()
+    if (self.sequentialFallback):
+      yield from self.simulate(readTraceChunks(tracePath, chunkSize, xtriggerPath))
+      return
+
+    samples = loadTraceArray(tracePath, "<u8")
+    xtriggers = None
+    if not (xtriggerPath is None):
+      xtriggers = loadTraceArray(xtriggerPath, "u1")
+      if (len(xtriggers) != len(samples)):
+        raise ClaSimulatorError("XTRIGGER trace has {} cycles, but the debug signal trace has {}".format(len(xtriggers), len(samples)), xtriggerPath)
+
+    chunkBounds = [(chunkStart, min(chunkStart + chunkSize, len(samples))) for chunkStart in range(0, len(samples), chunkSize)]
+    idleStates = self.getIdleEntryStates()
+    exitStates = []
+    pendingChunks = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=initSimulationWorker, initargs=(self.config, tracePath, xtriggerPath)) as executor:
+      for chunkIndx, (chunkStart, chunkEnd) in enumerate(chunkBounds):
+        #Keep a few chunks ahead of the one being stitched in flight
+        for submitIndx in range(chunkIndx, min(chunkIndx + 2*jobs, len(chunkBounds))):
+          if not (submitIndx in pendingChunks):
+            entryStates = [self.getControlState()] if (submitIndx == 0) else idleStates + [state for state in exitStates if not (state in idleStates)]
+            pendingChunks[submitIndx] = executor.submit(simulateSpeculativeChunk, chunkBounds[submitIndx][0], chunkBounds[submitIndx][1], entryStates[:g_maxSpeculativeStates])
+
+        result = pendingChunks.pop(chunkIndx).result().get(self.getControlState())
+        if (result is None):
+          historySamples, historyXtriggers, chunkSamples, chunkXtriggers = getChunkInputs(samples, xtriggers, chunkStart, chunkEnd)
+          self.eventGenerator.reset()
+          self.eventGenerator.skipSamples(historySamples, historyXtriggers)
+          firings = self.simulateChunk(chunkSamples, chunkXtriggers)
+          self.resimulatedChunks += 1
+        else:
+          replayCounterControls(self.counters, result.counterControlLog, chunkStart, chunkEnd)
+          for node in range(g_availableNodes):
+            for eap in range(g_availableEapsPerNode):
+              self.firingCounts[node][eap] += result.firingCounts[node][eap]
+          for (actionBus, customActionBus), cycles in result.actionBusCycles.items():
+            self.countActions(actionBus, customActionBus, cycles)
+          self.snapshots.update(result.snapshots)
+          self.setControlState(result.exitState)
+          self.cycle = chunkEnd
+          firings = result.firings
+
+        #Speculate on the most recent exit states from now on
+        exitState = self.getControlState()
+        if (exitState in exitStates):
+          exitStates.remove(exitState)
+        exitStates.insert(0, exitState)
+        yield firings
+
+  def getActionNames(self, actionBus, customActionBus=0):
+    actionNames = []
+    for opcode, actionName in g_actionNames.items():
+      if (actionBus & (1 << opcode)):
+        actionNames.append(actionName)
+    for opcode in range(g_customActionWidth):
+      if (customActionBus & (1 << opcode)):
+        actionNames.append(self.customActionNames[opcode])
+    return actionNames
+
+  def getSummary(self):
+    eapFirings = {}
+    snapshots = {}
+    for node in range(g_availableNodes):
+      for eap in range(g_availableEapsPerNode):
+        if (self.firingCounts[node][eap] > 0):
+          eapFirings[self.eapNames[(node, eap)]] = self.firingCounts[node][eap]
+        if ((node, eap) in self.snapshots):
+          snapshots[self.eapNames[(node, eap)]] = "0x{:016x}".format(self.snapshots[(node, eap)])
+
+    actionCycles = {}
+    actionBitCycles, customActionBitCycles = self.getActionCycles()
+    for opcode, actionName in g_actionNames.items():
+      if (actionBitCycles[opcode] > 0):
+        actionCycles[actionName] = actionBitCycles[opcode]
+    for opcode in range(g_customActionWidth):
+      if (customActionBitCycles[opcode] > 0):
+        actionCycles[self.customActionNames[opcode]] = customActionBitCycles[opcode]
+
+    counters = {}
+    for counterIndx, counter in enumerate(self.counters):
+      counters[self.counterNames[counterIndx]] = counter.value
+
+    return {
+      "Cycles": self.cycle,
+      "Current Node": self.nodeNames[self.currentNode],
+      "EAP Firings": eapFirings,
+      "Action Cycles": actionCycles,
+      "Counters": counters,
+      "Snapshots": snapshots
+    }
+
+  def writeFirings(self, outputFile, firings):
+    '''
+    Writes one csv row per EAP of each firing record
+    '''
+    for cycle, node, fired, actionBus, customActionBus, snapshot in firings.tolist():
+      for eap in range(g_availableEapsPerNode):
+        if (fired & (1 << eap)):
+          eapConfig = self.config.eaps[node][eap]
+          actionNames = self.getActionNames(eapConfig.actionBus & g_reportedActionMask, eapConfig.customActionBus)
+          outputFile.write("{},{},{},{},0x{:016x}\n".format(cycle, self.nodeNames[node], self.eapNames[(node, eap)], " ".join(actionNames), snapshot))
+
+
+###################################
+# Parallel Simulation
+###################################
+g_workerSimulator = None
+g_workerSamples = None
+g_workerXtriggers = None
+
+class ClaSpeculativeSimulator(ClaSimulator):
+  '''
+  ClaSimulator for a chunk of a trace whose entry state is a guess. The counter values at the start of the chunk are
+  not known, so counter controls are logged instead of applied (see replayCounterControls()), and an EAP reading a
+  counter event raises ClaCounterStateRequired
+  '''
+  def reset(self):
+    ClaSimulator.reset(self)
+    self.counterControlLog = []
+
+  def getCounterEvents(self):
+    raise ClaCounterStateRequired()
+
+  def stepCounters(self, counterControls):
+    if (counterControls):
+      self.counterControlLog.append((self.cycle, counterControls))
+
+  def advanceCounters(self, cycles):
+    pass
+
+class ClaChunkResult:
+  '''
+  Outcome of simulating one chunk from one entry state
+  '''
+  def __init__ (self, simulator, firings):
+    self.exitState = simulator.getControlState()
+    self.firings = firings
+    self.firingCounts = simulator.firingCounts
+    self.actionBusCycles = simulator.actionBusCycles
+    self.snapshots = simulator.snapshots
+    self.counterControlLog = simulator.counterControlLog
+
+def replayCounterControls(counters, counterControlLog, firstCycle, endCycle):
+  '''
+  Applies the counter controls a ClaSpeculativeSimulator logged for cycles firstCycle to endCycle-1
+  '''
+  cycle = firstCycle
+  for controlCycle, counterControls in counterControlLog:
+    for counterIndx, counter in enumerate(counters):
+      counter.advance(controlCycle - cycle)
+      counter.step((counterControls >> (counterIndx*g_actionsPerCounter)) & 0xf)
+    cycle = controlCycle + 1
+  for counter in counters:
+    counter.advance(endCycle - cycle)
+
+def getChunkInputs(samples, xtriggers, chunkStart, chunkEnd):
+  '''
+  Returns the samples and XTRIGGER inputs of a chunk, and of the cycles before it that the event flops depend on
+  '''
+  historyStart = max(0, chunkStart - g_eventHistoryLength)
+  historyXtriggers = None
+  chunkXtriggers = None
+  if not (xtriggers is None):
+    historyXtriggers = numpy.array(xtriggers[historyStart:chunkStart], dtype=numpy.uint8)
+    chunkXtriggers = numpy.array(xtriggers[chunkStart:chunkEnd], dtype=numpy.uint8)
+  return numpy.array(samples[historyStart:chunkStart], dtype=numpy.uint64), historyXtriggers, numpy.array(samples[chunkStart:chunkEnd], dtype=numpy.uint64), chunkXtriggers
+
+def initSimulationWorker(config, tracePath, xtriggerPath=None):
+  #Runs once per worker process. Traces are memory mapped, so the samples are never pickled
+  global g_workerSimulator
+  global g_workerSamples
+  global g_workerXtriggers
+  g_workerSimulator = ClaSpeculativeSimulator(config)
+  g_workerSamples = loadTraceArray(tracePath, "<u8")
+  g_workerXtriggers = None
+  if not (xtriggerPath is None):
+    g_workerXtriggers = loadTraceArray(xtriggerPath, "u1")
+
+def simulateSpeculativeChunk(chunkStart, chunkEnd, entryStates):
+  '''
+  Simulates one chunk from each entry state. Returns a dict of entry state -> ClaChunkResult, or None where the
+  result depends on the counter values
+  '''
+  simulator = g_workerSimulator
+  historySamples, historyXtriggers, samples, xtriggers = getChunkInputs(g_workerSamples, g_workerXtriggers, chunkStart, chunkEnd)
+  simulator.reset()
+  simulator.eventGenerator.skipSamples(historySamples, historyXtriggers)
+  preparedChunk = simulator.prepareChunk(samples, xtriggers)
+
+  results = {}
+  for entryState in entryStates:
+    #The prepared chunk does not depend on the event generator, so reset() only clears the node and statistics
+    simulator.reset()
+    simulator.cycle = chunkStart
+    simulator.setControlState(entryState)
+    try:
+      results[entryState] = ClaChunkResult(simulator, simulator.runChunk(preparedChunk))
+    except ClaCounterStateRequired:
+      results[entryState] = None
+
+  return results
+
+
+###################################
+# Trigger Scoring
+###################################
+class ClaTriggerScorer:
+  '''
+  Counts the cycles each trigger event of a register image is on the event bus, without simulating the nodes. Given
+  the cycles a trigger is expected on, events more than window cycles from any of them are false triggers, and
+  expected cycles without an event within window cycles are missed triggers. Cycles are numbered like the firings of
+  ClaSimulator, so a detector result is on the event bus the cycle after its sample
+  '''
+  def __init__ (self, config, expectedCycles=None, window=0):
+    requireNumpy()
+    self.config = config
+    self.window = window
+    self.expectedCycles = None
+    if not (expectedCycles is None):
+      self.expectedCycles = numpy.unique(numpy.asarray(expectedCycles, dtype=numpy.int64))
+
+    self.eventNames = {}
+    for eventName, opcode in g_eventOpcodes.items():
+      if not (opcode in self.eventNames):
+        self.eventNames[opcode] = eventName
+    self.eventUsers = {}
+    for node in range(g_availableNodes):
+      for eap in range(g_availableEapsPerNode):
+        for eventType in config.eaps[node][eap].eventTypes:
+          self.eventUsers.setdefault(eventType, []).append(config.eaps[node][eap].getRegisterName())
+    self.reset()
+
+  def reset(self):
+    self.generator = ClaEventGenerator(self.config)
+    self.cycle = 0
+    self.eventCycles = {}
+    self.falseTriggers = {}
+    self.matchedExpectations = {}
+
+  def scoreChunk(self, samples):
+    '''
+    Scores a chunk of samples, and returns the detector results of the chunk keyed by event bus position
+    '''
+    signals, lastSignals, detectorEvents = self.generator.detect(samples)
+    firstCycle = self.cycle + 1
+    self.cycle += len(signals)
+    if not (self.expectedCycles is None):
+      expectedStart = numpy.searchsorted(self.expectedCycles, firstCycle - self.window)
+      expectedEnd = numpy.searchsorted(self.expectedCycles, self.cycle + self.window, side="right")
+
+    for eventType, events in detectorEvents.items():
+      eventCycles = getEventCycles(events, firstCycle)
+      self.eventCycles[eventType] = self.eventCycles.get(eventType, 0) + len(eventCycles)
+      if (self.expectedCycles is None):
+        continue
+
+      self.falseTriggers[eventType] = self.falseTriggers.get(eventType, 0) + int(numpy.count_nonzero(getFalseTriggers(eventCycles, self.expectedCycles, self.window)))
+      if not (eventType in self.matchedExpectations):
+        self.matchedExpectations[eventType] = numpy.zeros(len(self.expectedCycles), dtype=bool)
+      matched = self.matchedExpectations[eventType][expectedStart:expectedEnd]
+      matched |= getMatchedExpectations(eventCycles, self.expectedCycles[expectedStart:expectedEnd], self.window)
+
+    return detectorEvents
+
+  def score(self, traceChunks):
+    for samples, xtriggers in traceChunks:
+      self.scoreChunk(samples)
+
+  def getSummary(self):
+    events = {}
+    for eventType in sorted(self.eventCycles):
+      eventSummary = {
+        "Cycles": self.eventCycles[eventType],
+        "EAPs": self.eventUsers.get(eventType, [])
+      }
+      if not (self.expectedCycles is None):
+        eventSummary["False Triggers"] = self.falseTriggers[eventType]
+        eventSummary["Missed Triggers"] = int(len(self.expectedCycles) - numpy.count_nonzero(self.matchedExpectations[eventType]))
+      events[self.eventNames[eventType]] = eventSummary
+
+    summary = {
+      "Cycles": self.cycle,
+      "Events": events
+    }
+    if not (self.expectedCycles is None):
+      summary["Expected Cycles"] = len(self.expectedCycles)
+      summary["Trigger Window"] = self.window
+    return summary
+
+def readExpectedCycles(cyclesPath):
+  '''
+  Reads the cycles a trigger is expected on, from a .npy array or a text file with one cycle per line
+  '''
+  requireNumpy()
+  try:
+    if (os.path.splitext(cyclesPath)[1].lower() == ".npy"):
+      return numpy.load(cyclesPath).astype(numpy.int64)
+    return numpy.loadtxt(cyclesPath, dtype=numpy.int64, comments="#", ndmin=1)
+  except (OSError, ValueError) as e:
+    raise ClaSimulatorError("Could not read expected cycles. {}".format(e), cyclesPath)
+
+
+###################################
+# Trace Files
+###################################
+def readTextTraceChunks(tracePath, chunkSize):
+  '''
+  Reads a text trace with one sample per line: the debug signals in hex, and optionally the XTRIGGER inputs
+  '''
+  samples = []
+  xtriggers = []
+  traceFile = open(tracePath, "r")
+  try:
+    for lineNumber, line in enumerate(traceFile):
+      line = line.split("#")[0].split()
+      if (len(line) == 0):
+        continue
+      try:
+        samples.append(int(line[0], 16))
+        xtriggers.append(int(line[1], 0) if (len(line) > 1) else 0)
+      except ValueError:
+        raise ClaSimulatorError("Could not parse line {}".format(lineNumber+1), tracePath)
+
+      if (len(samples) == chunkSize):
+        yield numpy.array(samples, dtype=numpy.uint64), numpy.array(xtriggers, dtype=numpy.uint8)
+        samples = []
+        xtriggers = []
+  finally:
+    traceFile.close()
+
+  if (len(samples) > 0):
+    yield numpy.array(samples, dtype=numpy.uint64), numpy.array(xtriggers, dtype=numpy.uint8)
+
+def loadTraceArray(arrayPath, dtype):
+  '''
+  Memory maps a .npy array, or a raw little-endian array
+  '''
+  try:
+    if (os.path.splitext(arrayPath)[1].lower() == ".npy"):
+      values = numpy.load(arrayPath, mmap_mode="r")
+    elif (os.path.getsize(arrayPath) == 0):
+      values = numpy.zeros(0, dtype=dtype)
+    else:
+      values = numpy.memmap(arrayPath, dtype=dtype, mode="r")
+  except (OSError, ValueError) as e:
+    raise ClaSimulatorError("Could not read trace. {}".format(e), arrayPath)
+
+  if (values.ndim != 1):
+    raise ClaSimulatorError("Expected a 1 dimensional array, got shape {}".format(values.shape), arrayPath)
+  return values
+
+def readArrayChunks(arrayPath, dtype, chunkSize):
+  '''
+  Reads a .npy array, or a raw little-endian array, in chunks without loading the whole file
+  '''
+  values = loadTraceArray(arrayPath, dtype)
+  for chunkStart in range(0, len(values), chunkSize):
+    yield numpy.array(values[chunkStart:chunkStart+chunkSize], dtype=dtype)
+
+def readTraceChunks(tracePath, chunkSize=g_defaultChunkSize, xtriggerPath=None):
+  '''
+  Yields (samples, xtriggers) chunks of a recorded CLA input trace. tracePath is a .npy or raw little-endian uint64
+  array of debug signal samples, or a text file (.txt or .hex). xtriggerPath is a .npy or raw uint8 array of the
+  XTRIGGER inputs of every cycle (bit 0 is XTRIGGER_0)
+  '''
+  requireNumpy()
+  if (os.path.splitext(tracePath)[1].lower() in [".txt", ".hex"]):
+    traceChunks = readTextTraceChunks(tracePath, chunkSize)
+  else:
+    traceChunks = ((samples, None) for samples in readArrayChunks(tracePath, "<u8", chunkSize))
+
+  if (xtriggerPath is None):
+    yield from traceChunks
+    return
+
+  xtriggerChunks = readArrayChunks(xtriggerPath, "u1", chunkSize)
+  for samples, textXtriggers in traceChunks:
+    xtriggers = next(xtriggerChunks, None)
+    if (xtriggers is None) or (len(xtriggers) != len(samples)):
+      raise ClaSimulatorError("XTRIGGER trace is shorter than the debug signal trace", xtriggerPath)
+    yield samples, xtriggers
+  if not (next(xtriggerChunks, None) is None):
+    raise ClaSimulatorError("XTRIGGER trace is longer than the debug signal trace", xtriggerPath)
+
+
+###################################
+# Main
+###################################
+def scoreEvents(csrImage, csrMap, args, expectedCycles):
+  scorer = ClaTriggerScorer(ClaConfig.fromCsrImage(csrImage, csrMap), expectedCycles, args.triggerWindow)
+  startTime = time.perf_counter()
+  scorer.score(readTraceChunks(args.tracePath, args.chunkSize, args.xtriggerPath))
+  scoringTime = time.perf_counter() - startTime
+
+  summary = scorer.getSummary()
+  summary["Scoring Time (s)"] = round(scoringTime, 6)
+  if not (args.summaryJson is None):
+    outputFile = open(args.summaryJson, "w")
+    outputFile.write(json.dumps(summary, indent=2))
+    outputFile.close()
+
+  print("Scored {} cycles in {:.3f}s".format(summary["Cycles"], scoringTime))
+  for eventName, eventSummary in summary["Events"].items():
+    if (len(eventSummary["EAPs"]) == 0):
+      continue
+    line = "  {}: {} cycles".format(eventName, eventSummary["Cycles"])
+    if not (expectedCycles is None):
+      line += ", {} false triggers, {} missed triggers".format(eventSummary["False Triggers"], eventSummary["Missed Triggers"])
+    print(line)
+
+def main():
+  #Get args
+  parser = argparse.ArgumentParser(description='(Version {}) Simulate a compiled CLA program on a recorded trace of the CLA debug signal input'.format(compileClaProgram.g_program_version))
+  parser.add_argument("imagePath", type=str, help="Binary CSR image (value_dump.<program>.bin) written by compileClaProgram.py")
+  parser.add_argument("tracePath", type=str, help="Recorded CLA input, one 64 bit sample per cycle. A .npy or raw little-endian uint64 array, or a text file (.txt, .hex) with a hex sample and optional XTRIGGER value per line")
+  parser.add_argument("--xtriggerPath", type=str, help="A .npy or raw uint8 array of the XTRIGGER inputs of every cycle")
+  parser.add_argument("--programPath", type=str, help="The program yaml the image was compiled from. Nodes, EAPs, counters, and custom actions are reported by name")
+  parser.add_argument("--csrMapPath", type=str, action="append", help="Path to a .rdl or .ipxact register description. Can be given multiple times. Defaults to cla_csr.rdl and mcr_csr.rdl in rtl/mmr/html")
+  parser.add_argument("--chunkSize", type=int, default=g_defaultChunkSize, help="Number of samples simulated at a time. Defaults to {}".format(g_defaultChunkSize))
+  parser.add_argument("--outputPath", type=str, default="cla_sim_firings.csv", help="Output path for the csv of every EAP firing")
+  parser.add_argument("--summaryJson", type=str, help="Output path for a json summary of EAP firings, action cycles, counters, and snapshots")
+  parser.add_argument("--eventsOnly", action="store_true", help="Only count the cycles of each trigger event, without simulating the nodes. Writes the counts to --summaryJson")
+  parser.add_argument("--expectedCycles", type=str, help="A .npy array or text file of the cycles a trigger is expected on. With --eventsOnly, events on other cycles are reported as false triggers")
+  parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes. With more than 1, chunks of the trace are simulated in parallel from their likely entry states, and stitched together. Programs that read counter events (COUNTER_*) in a reachable node are simulated sequentially. Requires a .npy or raw trace. Defaults to 1")
+  parser.add_argument("--triggerWindow", type=int, default=0, help="Number of cycles an event may be away from an expected cycle. Defaults to 0")
+  args = parser.parse_args()
+
+  if (args.chunkSize < 1):
+    sys.exit("ERROR: --chunkSize must be at least 1")
+  if (args.triggerWindow < 0):
+    sys.exit("ERROR: --triggerWindow must be at least 0")
+  if (args.jobs < 1):
+    sys.exit("ERROR: --jobs must be at least 1")
+  if (args.jobs > 1) and (os.path.splitext(args.tracePath)[1].lower() in [".txt", ".hex"]):
+    sys.exit("ERROR: --jobs needs a .npy or raw trace")
+
+  try:
+    requireNumpy()
+    csrMap = loadCsrMap(args.csrMapPath)
+    try:
+      csrImage = CsrImage.fromFile(args.imagePath)
+    except OSError as e:
+      raise ClaSimulatorError("Could not read CSR image. {}".format(e), args.imagePath)
+    program = None
+    if not (args.programPath is None):
+      program = ClaProgram.fromYamlFile(args.programPath)
+      if (program.getHash() != bytes(csrImage.programHash)):
+        print("WARNING: \"{}\" was not compiled from \"{}\"".format(args.imagePath, args.programPath))
+
+    if (args.eventsOnly):
+      expectedCycles = None
+      if not (args.expectedCycles is None):
+        expectedCycles = readExpectedCycles(args.expectedCycles)
+      scoreEvents(csrImage, csrMap, args, expectedCycles)
+      return
+
+    simulator = ClaSimulator.fromCsrImage(csrImage, program, csrMap)
+    startTime = time.perf_counter()
+    firingCount = 0
+    outputFile = open(args.outputPath, "w")
+    try:
+      outputFile.write("cycle,node,eap,actions,snapshot\n")
+      if (args.jobs > 1):
+        firingChunks = simulator.simulateParallel(args.tracePath, args.xtriggerPath, args.chunkSize, args.jobs)
+      else:
+        firingChunks = simulator.simulate(readTraceChunks(args.tracePath, args.chunkSize, args.xtriggerPath))
+      for firings in firingChunks:
+        simulator.writeFirings(outputFile, firings)
+        firingCount += len(firings)
+    finally:
+      outputFile.close()
+    simulationTime = time.perf_counter() - startTime
+  except ClaCompilerError as e:
+    sys.exit("ERROR: {}".format(e))
+
+  summary = simulator.getSummary()
+  summary["Simulation Time (s)"] = round(simulationTime, 6)
+  if (args.jobs > 1):
+    summary["Resimulated Chunks"] = simulator.resimulatedChunks
+    summary["Sequential Fallback"] = simulator.sequentialFallback
+    if (simulator.sequentialFallback):
+      print("WARNING: The program reads counter events, so --jobs was ignored and the trace was simulated sequentially")
+  if not (args.summaryJson is None):
+    outputFile = open(args.summaryJson, "w")
+    outputFile.write(json.dumps(summary, indent=2))
+    outputFile.close()
+
+  print("Simulated {} cycles in {:.3f}s. EAPs fired on {} cycles, ending in node {}".format(summary["Cycles"], simulationTime, firingCount, summary["Current Node"]))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: Copyright 2026 Tenstorrent AI ULC
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from compileClaProgram import BusModel, ClaProgram, ClaProgramError, g_defaultBusInfo
+
+logging.getLogger("compileClaProgram").addHandler(logging.NullHandler())
+
+def makeBus(name, msb, lsb, subBuses=[]):
+  return {
+    "Bit Width": msb - lsb + 1,
+    "Bus Lower Index": lsb,
+    "Bus Upper Index": msb,
+    "Lane Lower": lsb // 16,
+    "Lane Lower Index": lsb % 16,
+    "Lane Upper": msb // 16,
+    "Lane Upper Index": msb % 16,
+    "Name": name,
+    "Sub Buses": subBuses,
+    "Type": "logic [{}:0]".format(msb - lsb)
+  }
+
+def makeBusModel(debugBusInputs):
+  claInfoDict = copy.deepcopy(g_defaultBusInfo)
+  claInfoDict["Debug Mux Instances"]["debug_bus_mux_A"]["Debug Bus Inputs"] = debugBusInputs
+  return BusModel(claInfoDict)
+
+class TestFindSignal(unittest.TestCase):
+  def test_nestedSameNameSubBuses(self):
+    #p.q and p.q.q both contain "q". Both reduce to the largest parent bus p.q
+    busModel = makeBusModel([makeBus("p", 63, 0, [makeBus("q", 15, 0, [makeBus("q", 7, 0)])])])
+    self.assertEqual(busModel.findSignal("q"), ["p.q"])
+    self.assertEqual(busModel.findSignal("p.q.q"), ["p.q.q"])
+
+  def test_partialComponentMatches(self):
+    #"sig" is inside both top.sig and top.sig_valid, so the name is ambiguous
+    busModel = makeBusModel([makeBus("top", 63, 0, [makeBus("sig", 7, 0), makeBus("sig_valid", 8, 8)])])
+    self.assertEqual(busModel.findSignal("sig"), ["top.sig", "top.sig_valid"])
+
+  def test_matchInsideParentName(self):
+    #"y" is first found inside xy, so xy.y reduces to xy
+    busModel = makeBusModel([makeBus("xy", 63, 0, [makeBus("y", 7, 0)])])
+    self.assertEqual(busModel.findSignal("y"), ["xy"])
+
+class TestClaProgram(unittest.TestCase):
+  def test_malformedStructure(self):
+    #Malformed nodes and EAPs are reported as ClaProgramError naming the offending key
+    malformedPrograms = {
+      "START_NODE: A\nNODES: [A]\n": "\"NODES\"",
+      "START_NODE: A\nNODES: {A: 1}\n": "State node \"A\"",
+      "START_NODE: A\nNODES: {A: {E: 1}}\n": "Event action pair \"A.E\"",
+      "START_NODE: A\nCUSTOM_ACTIONS: [X]\nNODES: {A: {}}\n": "\"CUSTOM_ACTIONS\""
+    }
+    for programStr, errorKey in malformedPrograms.items():
+      with self.assertRaisesRegex(ClaProgramError, errorKey):
+        ClaProgram.fromYamlString(programStr)
+
+if __name__ == "__main__":
+  unittest.main()
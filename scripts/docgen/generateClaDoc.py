@@ -2,13 +2,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
-import math
 import traceback
 import json
 import argparse
 import sys
 import logging
 import re
+import time
+import contextlib
 
 
 ###################################
@@ -80,13 +81,61 @@ def getLogger(name, console="ERROR", outputdir="", logFile=True, fileLevel="DEBU
 
 g_logger = None
 
+###################################
+# Profiling
+###################################
+class PhaseProfiler:
+  '''
+  Collects the wall and CPU time of named phases, and named work counters. Repeated phases are accumulated
+  '''
+  def __init__(self):
+    self.phases = {}
+    self.counters = {}
+
+  @contextlib.contextmanager
+  def phase(self, phaseName):
+    wallStartTime = time.perf_counter()
+    cpuStartTime = time.process_time()
+    try:
+      yield
+    finally:
+      if not (phaseName in self.phases):
+        self.phases[phaseName] = {"Wall Time (s)": 0.0, "CPU Time (s)": 0.0, "Calls": 0}
+      self.phases[phaseName]["Wall Time (s)"] += time.perf_counter() - wallStartTime
+      self.phases[phaseName]["CPU Time (s)"] += time.process_time() - cpuStartTime
+      self.phases[phaseName]["Calls"] += 1
+
+  def count(self, counterName, amount=1):
+    self.counters[counterName] = self.counters.get(counterName, 0) + amount
+
+  def writeToJsonFile(self, outputPath, infoDict=None):
+    profileDict = {"Version": g_program_version}
+    if not (infoDict is None):
+      profileDict.update(infoDict)
+
+    profileDict["Phases"] = {}
+    for phaseName in self.phases:
+      profileDict["Phases"][phaseName] = {
+        "Wall Time (s)": round(self.phases[phaseName]["Wall Time (s)"], 6),
+        "CPU Time (s)": round(self.phases[phaseName]["CPU Time (s)"], 6),
+        "Calls": self.phases[phaseName]["Calls"]
+      }
+    profileDict["Counters"] = dict(self.counters)
+
+    outputFile = open(outputPath, "w")
+    outputFile.write(json.dumps(profileDict, indent=2))
+    outputFile.close()
+
+g_profile = PhaseProfiler()
+
 ###################################
 # Verilog Source Parsing
 ###################################
 class StructField:
-  def __init__(self, name, fieldType):
+  def __init__(self, name, fieldType, location=""):
     self.name = name
     self.fieldType = fieldType
+    self.location = location
     self.bitWidth = None
 
   def __str__(self):
@@ -100,50 +149,20 @@ class StructField:
   def __repr__(self):
     return str(self)
 
-  def replaceParam(self, paramDefObj):
-    #Replace paramter in bit width
-    if not (self.bitWidth is None):
-      if (isinstance(self.bitWidth, str)):
-        self.bitWidth = self.bitWidth.replace("{}{}".format(paramDefObj.packagePrefix, paramDefObj.name), str("({})".format(paramDefObj.paramValue)))
-        self.bitWidth = self.bitWidth.replace(paramDefObj.name, str("({})".format(paramDefObj.paramValue)))
-    #Replace paramter in field type
-    if not (self.fieldType is None):
-      if (isinstance(self.fieldType, str)):
-        self.fieldType = self.fieldType.replace("{}{}".format(paramDefObj.packagePrefix, paramDefObj.name), str("({})".format(paramDefObj.paramValue)))
-        self.fieldType = self.fieldType.replace(paramDefObj.name, str("({})".format(paramDefObj.paramValue)))
-
-  def caclulateBitWidth(self, definitionDict):
+  def resolveParams(self, symbolTable, packageName):
+    #Replace paramters in field type
+    self.fieldType = symbolTable.resolveText(self.fieldType, packageName, self.location)
+
+  def caclulateBitWidth(self, symbolTable, packageName):
     #Check if bit width is already calculated
     if (isinstance(self.bitWidth, int)):
       return
 
     #Get bit width based on field type
-    if ("logic" in self.fieldType):
-      #Get bitwidth expression if field type is logic
-      bitWidth = 1
-      if ("[" in self.fieldType):
-        bitWidth = None
-        widthExpression = extractBitWidthExpr(self.fieldType)
-        try:
-          bitWidth = int(eval(widthExpression))
-        except:
-          g_logger.warning(traceback.format_exc())
-          raise ValueError("Could not evaluate bitwidth expression \"{}\"".format(widthExpression))
-
-      if (isinstance(bitWidth, int)):
-        self.bitWidth = bitWidth
-    else:
-      if (self.fieldType in definitionDict):
-        defObj = definitionDict[self.fieldType]
-        defObj.caclulateBitWidth(definitionDict)
-        if not (defObj.bitWidth is None):
-          self.bitWidth = defObj.bitWidth
-      else:
-        g_logger.warning(self)
-        raise ValueError("Could not find \"{}\" definition. Make sure you specified all required pkg files".format(self.fieldType))
+    self.bitWidth = calcDataTypeBitWidth(self.fieldType, symbolTable, packageName, self.location)
 
 class Definition:
-  def __init__(self, name, parentPackageName, defType, text):
+  def __init__(self, name, parentPackageName, defType, text, location=""):
     self.name = name
     
     self.parentPackageName = parentPackageName
@@ -158,8 +177,11 @@ class Definition:
       raise ValueError()
     self.defType = defType
     self.text = text
+    self.location = location
 
     self.paramValue = None
+    #Base type of enums, and type of typedefs that are not structs, unions or enums
+    self.dataType = None
     self.structFields = None
     self.enumNames = None
 
@@ -194,34 +216,29 @@ class Definition:
   def setBitWidth(self, value):
     self.bitWidth = value
 
-  def replaceParam(self, paramDefObj):
-    try:
-      #Replace paramter in bit width
-      if not (self.bitWidth is None):
-        if (isinstance(self.bitWidth, str)):
-          self.bitWidth = self.bitWidth.replace("{}{}".format(paramDefObj.packagePrefix, paramDefObj.name), str(paramDefObj.paramValue))
-          self.bitWidth = self.bitWidth.replace(paramDefObj.name, str(paramDefObj.paramValue))
-      #Replace paramter in param value
-      if not (self.paramValue is None):
-        if (isinstance(self.paramValue, str)):
-          self.paramValue = self.paramValue.replace("{}{}".format(paramDefObj.packagePrefix, paramDefObj.name), str(paramDefObj.paramValue))
-          self.paramValue = self.paramValue.replace(paramDefObj.name, str(paramDefObj.paramValue))
-      #Replace paramter in struct fields
-      if not (self.structFields is None):
-        for fieldObj in self.structFields:
-          fieldObj.replaceParam(paramDefObj)
-      #Replace paramter in enums
-      if not (self.enumNames is None):
-        for enum in self.enumNames:
-          if not (self.enumNames[enum] is None):
-            self.enumNames[enum] = self.enumNames[enum].replace("{}{}".format(paramDefObj.packagePrefix, paramDefObj.name), str(paramDefObj.paramValue))
-            self.enumNames[enum] = self.enumNames[enum].replace(paramDefObj.name, str(paramDefObj.paramValue))
-    except:
-      g_logger.error(traceback.format_exc())
-      g_logger.error("Could not replace parameter {} in {}".format(paramDefObj, self))
-      sys.exit()
-
-  def caclulateBitWidth(self, definitionDict):
+  def setDataType(self, dataType):
+    self.dataType = dataType
+
+  def resolveParams(self, symbolTable):
+    #Replace paramters in bit width and data type
+    if (isinstance(self.bitWidth, str)):
+      self.bitWidth = symbolTable.resolveText(self.bitWidth, self.parentPackageName, self.location)
+    if not (self.dataType is None):
+      self.dataType = symbolTable.resolveText(self.dataType, self.parentPackageName, self.location)
+    #Replace param value with its resolved value
+    if not (self.paramValue is None):
+      self.paramValue = symbolTable.getParamValue(self)
+    #Replace paramters in struct fields
+    if not (self.structFields is None):
+      for fieldObj in self.structFields:
+        fieldObj.resolveParams(symbolTable, self.parentPackageName)
+    #Replace paramters in enums
+    if not (self.enumNames is None):
+      for enum in self.enumNames:
+        if not (self.enumNames[enum] is None):
+          self.enumNames[enum] = symbolTable.resolveText(self.enumNames[enum], self.parentPackageName, self.location)
+
+  def caclulateBitWidth(self, symbolTable):
     try:
       #Check if bit width calculation would be valid
       if (self.defType == "localparam"):
@@ -234,505 +251,923 @@ class Definition:
       #Check if bit width is can be calculated from expression
       if (isinstance(self.bitWidth, str)):
         try:
-          value = int(eval(self.bitWidth))
-          if (isinstance(value, int)):
-              self.bitWidth = value
-              return
-        except:
+          self.bitWidth = evalConstantExpression(self.bitWidth)
+          return
+        except ValueError:
           g_logger.warning(traceback.format_exc())
           raise ValueError("Could not evaluate bitwidth expression \"{}\"".format(self.bitWidth))
 
-      #Calculate bitwidth by summing all struct fields
-      if (self.defType == "struct"):
+      #Calculate bitwidth from the data type of enums and typedefs
+      if not (self.dataType is None):
+        self.bitWidth = calcDataTypeBitWidth(self.dataType, symbolTable, self.parentPackageName, self.location)
+        return
+
+      #Calculate bitwidth by summing all struct fields, or from the widest union field
+      if (self.defType in ["struct", "union"]):
         widthSum = 0
+        widthMax = 0
         for fieldObj in self.structFields:
           try:
-            fieldObj.caclulateBitWidth(definitionDict)
+            fieldObj.caclulateBitWidth(symbolTable, self.parentPackageName)
           except:
             g_logger.warning(traceback.format_exc())
             raise ValueError("Could not calculate bit width for struct field \"{}\"".format(fieldObj))
 
           if not (fieldObj.bitWidth is None):
             widthSum += fieldObj.bitWidth
+            widthMax = max(widthMax, fieldObj.bitWidth)
 
-        self.bitWidth = widthSum
+        if (self.defType == "union"):
+          self.bitWidth = widthMax
+        else:
+          self.bitWidth = widthSum
     except:
       self.bitWidthError = True
       g_logger.warning(traceback.format_exc())
-      raise ValueError("Could not calculate bit width for \"{}{}\" definition".format(self.packagePrefix, self.name))
-
-
-def cleanLine(text):
-  cleanLine = text
-
-  longCommentStartIndex = cleanLine.find("/*")
-  longCommentEndIndex = cleanLine.find("*/")
-  shortCommentStartIndex = cleanLine.find("//")
-
-  if (("/*" in cleanLine) and ((longCommentStartIndex < shortCommentStartIndex) or (shortCommentStartIndex == -1))):
-    if ("*/" in cleanLine):
-        if ((cleanLine.find("*/")+2) < len(cleanLine)):
-          cleanLine = cleanLine[0:cleanLine.find("/*")] + cleanLine[cleanLine.find("*/")+2:]
-        else:
-          cleanLine = cleanLine[0:cleanLine.find("/*")]
-    else:
-      cleanLine = cleanLine[0:cleanLine.find("/*")] 
-  if (("*/" in cleanLine) and ((longCommentEndIndex < shortCommentStartIndex) or (shortCommentStartIndex == -1))):
-    if ((cleanLine.find("*/")+2) < len(cleanLine)):
-      cleanLine = cleanLine[cleanLine.find("*/")+2:]
-    else:
-      cleanLine = ""
-  if ("//" in cleanLine):
-    cleanLine = cleanLine[0:cleanLine.find("//")]
-
-  cleanLine = cleanLine.strip() + " " 
-
-  return cleanLine
-
-
-def getDefinitionStrings(text):
-  definitionStrings = []
-  currentPackageName = ""
-  stringAccumulator = ""
-  typedef = False
-  for string in text.split(";"):
-    if (re.search("^\s*package\s", string)):
-      packageName = string.replace("package", "").strip()
-      if (len(packageName) > 0):
-        if (len(packageName.split()) == 1):
-          currentPackageName = packageName
-
-    if ("localparam" in string):
-      definitionStrings.append((string, currentPackageName))
-      continue
-
-    if ("typedef" in string):
-      typedef = True
-
-    if (typedef):
-      stringAccumulator += string + ";"
-      if ("}" in string):
-        typedef = False
-        definitionStrings.append((stringAccumulator, currentPackageName))
-        stringAccumulator = ""
-        continue
-
-  return definitionStrings
-    
+      raise ValueError("Could not calculate bit width for \"{}{}\" definition ({})".format(self.packagePrefix, self.name, self.location))
+
+
+g_tokenRegex = re.compile(r"""
+   (?P<newline>\n)
+  |(?P<space>[ \t\r\f\v]+)
+  |(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  |(?P<string>"(?:[^"\\\n]|\\.)*")
+  |(?P<directive>`[A-Za-z_]\w*)
+  |(?P<number>(?:\d[\d_]*[ \t]*)?'[sS]?[bBoOdDhH][ \t]*[0-9a-fA-FxXzZ_?]+|'[01xXzZ]|\d[\d_]*(?:\.\d[\d_]*)?)
+  |(?P<name>[A-Za-z_$][\w$]*)
+  |(?P<operator><<<|>>>|===|!==|::|<<|>>|<=|>=|==|!=|&&|\|\||\*\*|~&|~\||~\^|\^~|\S)
+""", re.DOTALL | re.VERBOSE)
+
+class Token:
+  def __init__(self, kind, text, lineNumber):
+    self.kind = kind
+    self.text = text
+    self.lineNumber = lineNumber
 
-def evalInlineConditionals(string):
-  #Recursion base case
-  if not ("?" in string):
-    return string
-
-  #Find first "?"
-  first_question_indx  = None
-  current_parenthesis_depth = 0
-  pareDepthList = []
-  first_question_parenthesis_depth = None
-  for charIndx in range(len(string)):
-    char = string[charIndx]
-
-    if (char == "("):
-      pareDepthList.append(current_parenthesis_depth)
-      current_parenthesis_depth += 1
-    elif (char == ")"):
-      current_parenthesis_depth -= 1
-      pareDepthList.append(current_parenthesis_depth)
-    else:
-      pareDepthList.append(current_parenthesis_depth)
-
-    if (char == "?"):
-      first_question_indx = charIndx
-      first_question_parenthesis_depth = current_parenthesis_depth
-
-  #Isolate first "?" expression within its parenthesis depth
-  startIdx = first_question_indx
-  endIdx = first_question_indx
-
-  for charIndx in range(first_question_indx, -1, -1):
-    current_parenthesis_depth = pareDepthList[charIndx]
-    if (current_parenthesis_depth < first_question_parenthesis_depth):
-      break
-    startIdx = charIndx
-
-  for charIndx in range(first_question_indx, len(pareDepthList), 1):
-    current_parenthesis_depth = pareDepthList[charIndx]
-    if (current_parenthesis_depth < first_question_parenthesis_depth):
-      break
-    endIdx = charIndx
-
-  expression_string = string[startIdx:endIdx+1]
-
-  #Split expression_string into condition_expr, true_expr, false_expr
-  first_question_indx  = None
-  last_colon_indx = None
-  for charIndx in range(len(expression_string)):
-    char = expression_string[charIndx]
-
-    if (char == "?") and (first_question_indx is None):
-      first_question_indx = charIndx
-    if (char == ":"):
-      last_colon_indx = charIndx
-  
-  condition_expr = expression_string[0:first_question_indx].strip()
-  true_expr = expression_string[first_question_indx+1:last_colon_indx].strip()
-  false_expr = expression_string[last_colon_indx+1:].strip()
-
-  #Handle nested conditionals recursively
-  condition_expr = evalInlineConditionals(condition_expr)
-  true_expr = evalInlineConditionals(true_expr)
-  false_expr = evalInlineConditionals(false_expr)
-
-  #Evaluate condition
-  condition_true = None
-  try:
-    condition_true = bool(eval(condition_expr))
-  except Exception as e:
-    g_logger.warning(traceback.format_exc())
-    if (re.search("[A-Za-z]", condition_expr)):
-      g_logger.warning("Looks like not all paramters were replaced in the conditional expression\"{}\". Make sure you have included paths to all package file dependancies in the flop info file".format(condition_expr))
-    raise ValueError("Could not evaluate the condition \"{}\" inside the conditional expression \"{}\"".format(condition_expr, expression_string))
-
-  if (condition_true):
-    return string.replace(expression_string, true_expr)
-  else:
-    return string.replace(expression_string, false_expr)
-
-
-def extractBitWidthExpr(widthString):
-  while ("?" in widthString):
-    widthString = evalInlineConditionals(widthString)
-
-  bitIndexes = widthString[widthString.find("[")+1:widthString.find("]")]
-  widthExpression = "({})+1".format(bitIndexes.replace(":", ")-("))
-  widthExpression = widthExpression.replace(" ", "").strip()
-  if ("$clog2" in widthExpression):
-    startIndx = widthExpression.find("$clog2")
-    openIndx = None
-    endIndx = None
-    openParenCnt = 0
-    closeParenCnt = 0
-    for charIndx in range(startIndx, len(widthExpression)):
-      if (widthExpression[charIndx] == "("):
-        openParenCnt += 1
-        if (openParenCnt == 1):
-          openIndx = charIndx
-      if (widthExpression[charIndx] == ")"):
-        closeParenCnt += 1
-
-      if (openParenCnt > 0) and (openParenCnt==closeParenCnt):
-        endIndx = charIndx
-        break
-
-    logOperand = widthExpression[openIndx+1:endIndx]
-    widthExpression = "math.ceil({}math.log({},2){})".format(widthExpression[0:startIndx], logOperand, widthExpression[endIndx+1:])
-
-  return widthExpression
+  def __str__(self):
+    return "{}({}, line {})".format(self.kind, self.text, self.lineNumber)
 
+  def __repr__(self):
+    return str(self)
 
-def calcLogicBitWidth(defString):
-  #Get list of array dimension expressions
-  widthExpressions = defString.replace("logic", "").strip().split("]")
-  widthExpressions = ["{}]".format(i.strip()) for i in widthExpressions if len(i.strip()) > 0]
-
-  finalWidth = None
-  for exprStr in widthExpressions:
-    #Determine width of this dimension
-    expr = extractBitWidthExpr(exprStr)
-    dimBitWidth = None
+  def isWord(self):
+    return (self.kind in ["name", "number"])
+
+
+def tokenize(text):
+  '''
+  Yields the tokens of Verilog source text in one pass. Whitespace and comments are dropped, but still counted in the
+  line numbers of the tokens
+  '''
+  lineNumber = 1
+  for tokenMatch in g_tokenRegex.finditer(text):
+    kind = tokenMatch.lastgroup
+    if (kind == "newline"):
+      lineNumber += 1
+    elif (kind == "comment"):
+      lineNumber += tokenMatch.group().count("\n")
+    elif (kind != "space"):
+      yield Token(kind, tokenMatch.group(), lineNumber)
+
+
+def getTokenText(tokens):
+  '''
+  Returns the source text of a list of tokens, with a space between words and before packed dimensions
+  '''
+  textList = []
+  lastToken = None
+  for token in tokens:
+    if not (lastToken is None) and lastToken.isWord() and (token.isWord() or (token.text == "[")):
+      textList.append(" ")
+    textList.append(token.text)
+    lastToken = token
+
+  return "".join(textList)
+
+
+#Binary operators of constant expressions, by precedence. All of them are left associative
+g_binaryOperatorPrecedence = {
+  "||": 1, "&&": 2, "|": 3, "^": 4, "~^": 4, "^~": 4, "&": 5,
+  "==": 6, "!=": 6, "===": 6, "!==": 6, "<": 7, "<=": 7, ">": 7, ">=": 7,
+  "<<": 8, ">>": 8, "<<<": 8, ">>>": 8, "+": 9, "-": 9, "*": 10, "/": 10, "%": 10, "**": 11
+}
+g_basedNumberRegex = re.compile(r"(\d[\d_]*)?\s*'[sS]?([bBoOdDhH])\s*([0-9a-fA-F_]+)$")
+g_numberBases = {"b": 2, "o": 8, "d": 10, "h": 16}
+
+def clog2(value):
+  '''
+  Returns the ceiling of log2 of value, like $clog2. Exact for integers of any size
+  '''
+  if (value <= 1):
+    return 0
+  return (value-1).bit_length()
+
+def divide(dividend, divisor):
+  #Integer division truncates towards zero
+  if (divisor == 0):
+    raise ValueError("Division by zero")
+  quotient = abs(dividend) // abs(divisor)
+  if ((dividend < 0) != (divisor < 0)):
+    return -quotient
+  return quotient
+
+def modulo(dividend, divisor):
+  #The remainder has the sign of the dividend
+  return dividend - divisor*divide(dividend, divisor)
+
+def power(base, exponent):
+  if (exponent < 0):
+    if (base == 0):
+      raise ValueError("Zero raised to a negative power")
+    if (abs(base) != 1):
+      return 0
+    return base**(-exponent)
+  return base**exponent
+
+g_unaryOperatorFunctions = {
+  "+": lambda a: a,
+  "-": lambda a: -a,
+  "~": lambda a: ~a,
+  "!": lambda a: int(a == 0),
+  "$clog2": clog2
+}
+g_binaryOperatorFunctions = {
+  "|": lambda a, b: a | b,
+  "^": lambda a, b: a ^ b,
+  "~^": lambda a, b: ~(a ^ b),
+  "^~": lambda a, b: ~(a ^ b),
+  "&": lambda a, b: a & b,
+  "==": lambda a, b: int(a == b),
+  "!=": lambda a, b: int(a != b),
+  "===": lambda a, b: int(a == b),
+  "!==": lambda a, b: int(a != b),
+  "<": lambda a, b: int(a < b),
+  "<=": lambda a, b: int(a <= b),
+  ">": lambda a, b: int(a > b),
+  ">=": lambda a, b: int(a >= b),
+  "<<": lambda a, b: a << b,
+  ">>": lambda a, b: a >> b,
+  "<<<": lambda a, b: a << b,
+  ">>>": lambda a, b: a >> b,
+  "+": lambda a, b: a + b,
+  "-": lambda a, b: a - b,
+  "*": lambda a, b: a * b,
+  "/": divide,
+  "%": modulo,
+  "**": power
+}
+
+class ConstantExpressionParser:
+  '''
+  Parses the integer subset of SystemVerilog constant expressions into a tree by precedence climbing. Leaves are ints,
+  and nodes are (operator, operand) for unary operators and $clog2, (operator, left, right) for binary operators, and
+  ("?", condition, true, false) for conditionals. Parameters must already be replaced by their values
+  '''
+  def __init__(self, text):
+    self.text = text
+    self.tokens = list(tokenize(text))
+    self.indx = 0
+
+  def error(self, message):
+    raise ValueError("{} in constant expression \"{}\"".format(message, self.text))
+
+  def peekText(self):
+    if (self.indx < len(self.tokens)):
+      return self.tokens[self.indx].text
+    return None
+
+  def next(self):
+    if (self.indx >= len(self.tokens)):
+      self.error("Unexpected end")
+    self.indx += 1
+    return self.tokens[self.indx-1]
+
+  def accept(self, text):
+    if (self.peekText() == text):
+      self.indx += 1
+      return True
+    return False
+
+  def expect(self, text):
+    token = self.next()
+    if (token.text != text):
+      self.error("Expected \"{}\" but found \"{}\"".format(text, token.text))
+
+  def expectEnd(self):
+    if (self.indx < len(self.tokens)):
+      self.error("Unexpected \"{}\"".format(self.tokens[self.indx].text))
+
+  def parse(self):
+    node = self.parseConditional()
+    self.expectEnd()
+    return node
+
+  def parseDimensions(self):
+    '''
+    Parses packed dimensions, like "[W-1:0][3:0]", into a list of (msb, lsb) trees. lsb is None for dimensions that
+    only give a size
+    '''
+    dimensionList = []
+    while (self.accept("[")):
+      msb = self.parseConditional()
+      lsb = None
+      if (self.accept(":")):
+        lsb = self.parseConditional()
+      self.expect("]")
+      dimensionList.append((msb, lsb))
+    self.expectEnd()
+    return dimensionList
+
+  def parseConditional(self):
+    condition = self.parseBinary(1)
+    if (self.accept("?")):
+      trueNode = self.parseConditional()
+      self.expect(":")
+      falseNode = self.parseConditional()
+      return ("?", condition, trueNode, falseNode)
+    return condition
+
+  def parseBinary(self, minPrecedence):
+    left = self.parseUnary()
+    while (g_binaryOperatorPrecedence.get(self.peekText(), 0) >= minPrecedence):
+      operator = self.next().text
+      right = self.parseBinary(g_binaryOperatorPrecedence[operator]+1)
+      left = (operator, left, right)
+    return left
+
+  def parseUnary(self):
+    if (self.peekText() in ["+", "-", "~", "!"]):
+      operator = self.next().text
+      return (operator, self.parseUnary())
+    return self.parsePrimary()
+
+  def parsePrimary(self):
+    token = self.next()
+    if (token.text == "("):
+      node = self.parseConditional()
+      self.expect(")")
+      return node
+    if (token.text == "$clog2"):
+      self.expect("(")
+      node = self.parseConditional()
+      self.expect(")")
+      return ("$clog2", node)
+    if (token.kind == "number"):
+      return self.parseNumber(token.text)
+    if (token.text.startswith("$")):
+      self.error("Unsupported system function \"{}\"".format(token.text))
+    if (token.kind == "name"):
+      self.error("Unresolved name \"{}\"".format(token.text))
+    self.error("Unsupported \"{}\"".format(token.text))
+
+  def parseNumber(self, text):
+    if (re.match(r"\d[\d_]*$", text)):
+      return int(text.replace("_", ""))
+    if (text == "'0"):
+      return 0
+    numberMatch = g_basedNumberRegex.match(text)
+    if (numberMatch is None):
+      self.error("Unsupported number \"{}\"".format(text))
+    return int(numberMatch.group(3).replace("_", ""), g_numberBases[numberMatch.group(2).lower()])
+
+
+def evalConstantNode(node):
+  if (isinstance(node, int)):
+    return node
+  if (len(node) == 4):
+    #Only the selected branch of a conditional is evaluated
+    if (evalConstantNode(node[1]) != 0):
+      return evalConstantNode(node[2])
+    return evalConstantNode(node[3])
+  if (len(node) == 2):
+    return g_unaryOperatorFunctions[node[0]](evalConstantNode(node[1]))
+  if (node[0] == "&&"):
+    return int((evalConstantNode(node[1]) != 0) and (evalConstantNode(node[2]) != 0))
+  if (node[0] == "||"):
+    return int((evalConstantNode(node[1]) != 0) or (evalConstantNode(node[2]) != 0))
+  return g_binaryOperatorFunctions[node[0]](evalConstantNode(node[1]), evalConstantNode(node[2]))
+
+
+g_constantExpressionCache = {}
+
+def evalConstantExpression(expression):
+  '''
+  Returns the integer value of a constant expression. Values are cached by expression text
+  '''
+  g_profile.count("Constant Expressions")
+  if not (expression in g_constantExpressionCache):
+    g_profile.count("Constant Expression Cache Misses")
+    node = ConstantExpressionParser(expression).parse()
     try:
-      dimBitWidth = int(eval(expr))
-    except:
-      g_logger.warning(traceback.format_exc())
-      raise ValueError("Could not evaluate bitwidth expression \"{}\" extracted from \"{}\" in \"{}\"".format(expr, exprStr, defString))
+      g_constantExpressionCache[expression] = evalConstantNode(node)
+    except ValueError as e:
+      raise ValueError("{} in constant expression \"{}\"".format(e, expression))
+  return g_constantExpressionCache[expression]
 
-    #Update finalWidth
-    if (finalWidth is None):
-      #This is the first dimension
-      finalWidth = dimBitWidth
-    else:
-      #Multidimensional array. Multiply bit widths
-      finalWidth = finalWidth*dimBitWidth
-
-  if (finalWidth is None):
-    #No dimensions defined. Must be a 1 bit logic
-    finalWidth = 1
-
-  return finalWidth
-
-
-def parseParameter(string, packageName):
-  g_logger.debug("Parsing parameter \"{}\"".format(string))
-
-  name = string.split("=")[0].split()[-1]
-  value = string[string.find("=")+1:].strip()
 
-  defObj = Definition(name=name, parentPackageName=packageName, defType="localparam", text=string)
-  defObj.setParamValue(value)
+g_integerTypeWidths = {"logic": 1, "bit": 1, "reg": 1, "byte": 8, "shortint": 16, "int": 32, "integer": 32, "longint": 64, "time": 64}
+g_integerTypeRegex = re.compile(r"\s*([A-Za-z_]\w*)(?:\s+(?:signed|unsigned)\b)?")
 
-  return defObj
+def getIntegerTypeMatch(defString):
+  typeMatch = g_integerTypeRegex.match(defString)
+  if not (typeMatch is None) and (typeMatch.group(1) in g_integerTypeWidths):
+    return typeMatch
+  return None
 
 
-def parseEnum(string, packageName):
-  g_logger.debug("Parsing enum \"{}\"".format(string))
+g_bitWidthCache = {}
 
-  name = string.split("}")[-1].strip().replace(";","")
-  defObj = Definition(name=name, parentPackageName=packageName, defType="enum", text=string)
+def calcLogicBitWidth(defString):
+  '''
+  Returns the bit width of a logic or integer type with optional packed dimensions. Widths are cached by type text
+  '''
+  if (defString in g_bitWidthCache):
+    return g_bitWidthCache[defString]
 
-  #Determine width of enum
-  widthString = string.split("{")[0].split("enum")[-1]
-  widthExpression = extractBitWidthExpr(widthString)
-  defObj.setBitWidth(widthExpression)
+  #Get list of array dimension expressions
+  typeMatch = getIntegerTypeMatch(defString)
+  try:
+    dimensionList = ConstantExpressionParser(defString[typeMatch.end():]).parseDimensions()
+  except ValueError as e:
+    raise ValueError("Could not parse the dimensions of \"{}\". {}".format(defString, e))
 
-  #Extract enum names and values
-  enumDefList = string[string.find("{")+1:string.find("}")].split(",")
-  for enumDef in enumDefList:
+  finalWidth = g_integerTypeWidths[typeMatch.group(1)]
+  for msb, lsb in dimensionList:
+    #Determine width of this dimension. Multidimensional arrays multiply bit widths
     try:
-      name = enumDef.split("=")[0].strip()
-      
-      value = None
-      if (len(enumDef.split("=")) > 1):
-        value = enumDef.split("=")[1].strip()
-        
-      defObj.addEnumName(name, value)
-    except:
-      g_logger.error(traceback.format_exc())
-      g_logger.error("Error parsing \"{}\"".format(enumDef))
-      sys.exit()
-
-  return defObj
-
-
-def parseStruct(string, packageName):
-  g_logger.debug("Parsing struct \"{}\"".format(string))
-
-  name = string.split("}")[-1].strip().replace(";","")
-  defObj = Definition(name=name, parentPackageName=packageName, defType="struct", text=string)
-
-  #Extract struct fields
-  fieldDefList = string[string.find("{")+1:string.find("}")].split(";")
-  for fieldDef in fieldDefList:
-    fieldDefSplit = fieldDef.replace("]", "] ").replace("[", "[ ").strip().split()
-    if (len(fieldDefSplit) > 1):
-      name = fieldDefSplit[-1]
-      fieldType = " ".join(fieldDefSplit[0:-1])
-      fieldObj = StructField(name=name, fieldType=fieldType)
-      defObj.addStructField(fieldObj)
-
-  return defObj
-
-
-def parseDefinition(string, packageName):
-  defObj = None
-
-  if ("localparam" in string):
-    defObj = parseParameter(string, packageName)
-  if ("typedef" in string):
-    defType = string.split()[1]
-    if ("enum" in defType):
-      defObj = parseEnum(string, packageName)
-    if ("struct" in defType):
-      defObj = parseStruct(string, packageName)
-
-  return defObj
-
-
-def extractMacroDefines(pkgTxt, macroDefines):
-  searchTxt = pkgTxt
+      if (lsb is None):
+        dimBitWidth = evalConstantNode(msb)
+      else:
+        dimBitWidth = abs(evalConstantNode(msb)-evalConstantNode(lsb))+1
+    except ValueError as e:
+      raise ValueError("Could not evaluate the dimensions of \"{}\". {}".format(defString, e))
+    finalWidth = finalWidth*dimBitWidth
 
-  #Find all defined macros in pkgTxt
-  newMacros = []
-  nxt_define_indx  = searchTxt.find("`define")
-  while(nxt_define_indx != -1):
-    searchTxt = searchTxt[nxt_define_indx+len("`define"):].strip()
-    macroName = searchTxt.split()[0]
-    newMacros.append(macroName)
+  g_bitWidthCache[defString] = finalWidth
+  return finalWidth
 
-    searchTxt = searchTxt[searchTxt.find(macroName)+len(macroName):]
-    nxt_define_indx  = searchTxt.find("`define")
 
-  #Remove macro definitions from pkgTxt
-  pkgTxt = pkgTxt.replace("`define", "")
-  for macroName in newMacros:
-    pkgTxt = pkgTxt.replace(macroName, "")
+def calcDataTypeBitWidth(typeString, symbolTable, packageName="", location=""):
+  '''
+  Returns the bit width of a logic or integer type with optional packed dimensions, or of a defined type
+  '''
+  if not (getIntegerTypeMatch(typeString) is None):
+    return calcLogicBitWidth(typeString)
+
+  #Packed arrays of defined types multiply the type width by the array dimensions
+  typeName = typeString.split("[")[0].strip()
+  defObj = symbolTable.lookup(typeName, packageName)
+  if not (defObj is None):
+    bitWidth = symbolTable.getBitWidth(defObj)
+    if ("[" in typeString) and not (bitWidth is None):
+      bitWidth *= calcLogicBitWidth("logic {}".format(typeString[typeString.find("["):]))
+    return bitWidth
+
+  raise ValueError("Could not find \"{}\" definition used at {}. Make sure you specified all required pkg files".format(typeString, location))
+
+
+g_compilationDirectives = ["`ifdef", "`ifndef", "`elsif", "`else", "`endif", "`define", "`undef"]
+#Other compiler directives, which are dropped with their number of arguments. None drops the rest of the line
+g_otherDirectiveArguments = {
+  "`include": 1, "`default_nettype": 1, "`unconnected_drive": 1, "`begin_keywords": 1,
+  "`resetall": 0, "`celldefine": 0, "`endcelldefine": 0, "`nounconnected_drive": 0, "`end_keywords": 0, "`undefineall": 0,
+  "`timescale": None, "`line": None, "`pragma": None
+}
+
+class CompilationFlagEvaluator:
+  '''
+  Evaluates compilation flags in a single pass over the tokens of a file. Every `ifdef/`ifndef pushes an entry on a
+  stack, `elsif/`else switch to the next branch of the top entry, and `endif pops it. Tokens and `define/`undef
+  directives are only kept while every entry on the stack is in its taken branch, so macros are defined in source order
+  '''
+  def __init__(self, macroDefines, filePath=""):
+    #macroDefines is updated in place, so macros defined in one package file are seen by the next
+    self.macroDefines = macroDefines
+    self.filePath = filePath
+    #One [branchActive, branchTaken, parentActive] entry per open `ifdef/`ifndef
+    self.conditionStack = []
+    self.active = True
+
+  def error(self, message, lineNumber):
+    g_logger.error("{} (line {} of \"{}\")".format(message, lineNumber, self.filePath))
+    sys.exit()
+
+  def getMacroName(self, tokens, directiveToken):
+    nameToken = next(tokens, None)
+    if (nameToken is None) or (nameToken.kind != "name") or (nameToken.lineNumber != directiveToken.lineNumber):
+      self.error("Expected a macro name after {}".format(directiveToken.text), directiveToken.lineNumber)
+    return nameToken.text
+
+  def evalTokens(self, tokens):
+    '''
+    Yields the tokens that are not excluded by compilation flags, without the directives
+    '''
+    tokens = iter(tokens)
+    lastToken = None
+    skippedToken = None
+    for token in tokens:
+      if not (skippedToken is None):
+        #The macro text of a `define is the rest of the line, or the next lines if it ends with a backslash
+        if (token.lineNumber == skippedToken.lineNumber) or (skippedToken.text == "\\"):
+          skippedToken = token
+          continue
+        skippedToken = None
+
+      lastToken = token
+      if (token.text in g_otherDirectiveArguments):
+        argumentCount = g_otherDirectiveArguments[token.text]
+        if (argumentCount is None):
+          skippedToken = token
+        for argumentIndx in range(argumentCount or 0):
+          argumentToken = next(tokens, None)
+          if not (argumentToken is None) and (argumentToken.text == "<"):
+            #`include <file> spans several tokens
+            while not (argumentToken is None) and (argumentToken.text != ">"):
+              argumentToken = next(tokens, None)
+        continue
+      if not (token.text in g_compilationDirectives):
+        if (self.active):
+          yield token
+        continue
 
-  macroDefines += newMacros
-  
-  return (pkgTxt, macroDefines)
+      g_profile.count("Compilation Flags")
+      if (token.text in ["`ifdef", "`ifndef"]):
+        macroName = self.getMacroName(tokens, token)
+        branchActive = (macroName in self.macroDefines) == (token.text == "`ifdef")
+        self.conditionStack.append([self.active and branchActive, branchActive, self.active])
+      elif (token.text == "`elsif"):
+        macroName = self.getMacroName(tokens, token)
+        if (len(self.conditionStack) == 0):
+          self.error("`elsif without `ifdef", token.lineNumber)
+        condition = self.conditionStack[-1]
+        branchActive = (not condition[1]) and (macroName in self.macroDefines)
+        condition[0] = condition[2] and branchActive
+        condition[1] = condition[1] or branchActive
+      elif (token.text == "`else"):
+        if (len(self.conditionStack) == 0):
+          self.error("`else without `ifdef", token.lineNumber)
+        condition = self.conditionStack[-1]
+        condition[0] = condition[2] and not condition[1]
+        condition[1] = True
+      elif (token.text == "`endif"):
+        if (len(self.conditionStack) == 0):
+          self.error("`endif without `ifdef", token.lineNumber)
+        self.conditionStack.pop()
+      elif (token.text == "`undef"):
+        macroName = self.getMacroName(tokens, token)
+        if (self.active) and (macroName in self.macroDefines):
+          self.macroDefines.remove(macroName)
+      else:
+        macroName = self.getMacroName(tokens, token)
+        if (self.active) and not (macroName in self.macroDefines):
+          self.macroDefines.append(macroName)
+        skippedToken = token
+
+      self.active = (len(self.conditionStack) == 0) or self.conditionStack[-1][0]
+
+    if (len(self.conditionStack) > 0):
+      lineNumber = 0
+      if not (lastToken is None):
+        lineNumber = lastToken.lineNumber
+      self.error("Missing `endif for {} `ifdef/`ifndef".format(len(self.conditionStack)), lineNumber)
+
+
+g_openBrackets = ["(", "[", "{"]
+g_closeBrackets = [")", "]", "}"]
+#Items that are skipped as a whole, up to their end keyword
+g_skippedBlocks = {"function": "endfunction", "task": "endtask", "class": "endclass", "covergroup": "endgroup", "property": "endproperty", "sequence": "endsequence"}
+
+class PackageParser:
+  '''
+  Recursive descent parser for the package items that docgen needs: localparam/parameter declarations, and typedefs of
+  packed structs, packed unions, enums, and logic/integer types. Other items are skipped. Every definition keeps the
+  file and line it was declared on
+  '''
+  def __init__(self, tokens, filePath=""):
+    self.tokens = list(tokens)
+    self.indx = 0
+    self.filePath = filePath
+    self.definitionList = []
+
+  def peek(self, offset=0):
+    if (self.indx+offset < len(self.tokens)):
+      return self.tokens[self.indx+offset]
+    return None
+
+  def peekText(self, offset=0):
+    token = self.peek(offset)
+    if (token is None):
+      return None
+    return token.text
+
+  def next(self):
+    token = self.peek()
+    if (token is None):
+      raise ValueError("Unexpected end of file")
+    self.indx += 1
+    return token
+
+  def accept(self, text):
+    if (self.peekText() == text):
+      self.indx += 1
+      return True
+    return False
+
+  def expect(self, text):
+    token = self.next()
+    if (token.text != text):
+      raise ValueError("Expected \"{}\" but found \"{}\" on line {}".format(text, token.text, token.lineNumber))
+    return token
+
+  def expectName(self):
+    token = self.next()
+    if (token.kind != "name"):
+      raise ValueError("Expected a name but found \"{}\" on line {}".format(token.text, token.lineNumber))
+    return token
+
+  def getLocation(self, token):
+    return "{}:{}".format(self.filePath, token.lineNumber)
+
+  def getTokensUntil(self, endTexts):
+    '''
+    Returns the tokens up to the first one in endTexts that is outside of brackets. The end token is not consumed
+    '''
+    startIndx = self.indx
+    depth = 0
+    while (True):
+      token = self.peek()
+      if (token is None):
+        raise ValueError("Expected one of {} after line {}".format(endTexts, self.tokens[startIndx-1].lineNumber))
+      if (depth == 0) and (token.text in endTexts):
+        return self.tokens[startIndx:self.indx]
+      if (token.text in g_openBrackets):
+        depth += 1
+      elif (token.text in g_closeBrackets):
+        depth -= 1
+      self.indx += 1
+
+  def splitTokens(self, tokens, separator=","):
+    '''
+    Splits a list of tokens at the separators that are outside of brackets
+    '''
+    tokenLists = [[]]
+    depth = 0
+    for token in tokens:
+      if (depth == 0) and (token.text == separator):
+        tokenLists.append([])
+        continue
+      if (token.text in g_openBrackets):
+        depth += 1
+      elif (token.text in g_closeBrackets):
+        depth -= 1
+      tokenLists[-1].append(token)
+    return tokenLists
+
+  def skipStatement(self):
+    '''
+    Skips tokens up to and including the next ";" outside of brackets, stopping early at endpackage
+    '''
+    depth = 0
+    while not (self.peek() is None):
+      text = self.peekText()
+      if (depth <= 0) and (text == "endpackage"):
+        return
+      self.indx += 1
+      if (text in g_openBrackets):
+        depth += 1
+      elif (text in g_closeBrackets):
+        depth -= 1
+      elif (depth <= 0) and (text == ";"):
+        return
 
+  def addDefinition(self, defObj):
+    g_logger.debug("Parsed {} \"{}\" at {}".format(defObj.defType, defObj.name, defObj.location))
+    self.definitionList.append(defObj)
 
-def evalCompilationFlags(pkgTxt, macroDefines):
-  #Find first "`if"
-  first_ifdef_indx  = pkgTxt.find("`if")
+  def parse(self):
+    while not (self.peek() is None):
+      if (self.peekText() == "endpackage"):
+        g_logger.error("endpackage without package at {}".format(self.getLocation(self.next())))
+        continue
+      self.parseItem("")
+    return self.definitionList
 
-  #Update defined macros for everything preceeding first_ifdef_indx
-  preceedingTxt = pkgTxt[:first_ifdef_indx+1]
-  preceedingTxt, macroDefines = extractMacroDefines(preceedingTxt, macroDefines)
+  def parseItem(self, packageName):
+    startIndx = self.indx
+    startToken = self.peek()
+    try:
+      if (startToken.text == "package"):
+        self.parsePackage()
+      elif (startToken.text in ["localparam", "parameter"]):
+        self.parseParameters(packageName)
+      elif (startToken.text == "typedef"):
+        self.parseTypedef(packageName)
+      elif (startToken.text in g_skippedBlocks):
+        self.getTokensUntil([g_skippedBlocks[startToken.text]])
+        self.next()
+        if (self.accept(":")):
+          self.expectName()
+      else:
+        self.skipStatement()
+    except ValueError as e:
+      g_logger.warning("Skipping unsupported \"{}\" at {}. {}".format(startToken.text, self.getLocation(startToken), e))
+      self.indx = startIndx
+      self.next()
+      self.skipStatement()
+
+    #Every item consumes at least one token, so parsing always makes progress
+    if (self.indx == startIndx):
+      self.next()
+
+  def parsePackage(self):
+    self.expect("package")
+    if (self.peekText() in ["automatic", "static"]):
+      self.next()
+    packageName = self.expectName().text
+    self.expect(";")
+
+    while not (self.peekText() in [None, "endpackage"]):
+      self.parseItem(packageName)
+
+    self.expect("endpackage")
+    if (self.accept(":")):
+      self.expectName()
+
+  def parseParameters(self, packageName):
+    self.next()
+    declTokens = self.getTokensUntil([";"])
+    self.expect(";")
+
+    #A declaration can assign several parameters of the same type, separated by commas
+    for assignTokens in self.splitTokens(declTokens):
+      assignTexts = [token.text for token in assignTokens]
+      if ("type" in assignTexts) or not ("=" in assignTexts):
+        continue
+      eqIndx = assignTexts.index("=")
+      if (eqIndx == 0) or (assignTokens[eqIndx-1].kind != "name"):
+        raise ValueError("Unsupported parameter declaration \"{}\"".format(getTokenText(assignTokens)))
+
+      nameToken = assignTokens[eqIndx-1]
+      defObj = Definition(name=nameToken.text, parentPackageName=packageName, defType="localparam", text=getTokenText(assignTokens), location=self.getLocation(nameToken))
+      defObj.setParamValue(getTokenText(assignTokens[eqIndx+1:]))
+      self.addDefinition(defObj)
+
+  def parseTypedef(self, packageName):
+    startIndx = self.indx
+    self.expect("typedef")
+    defType = self.peekText()
+    if (defType in ["struct", "union"]):
+      self.next()
+      self.expect("packed")
+      if (self.peekText() in ["signed", "unsigned"]):
+        self.next()
+      self.expect("{")
+      fieldList = []
+      while not (self.accept("}")):
+        fieldList += self.parseStructFields()
+    elif (defType == "enum"):
+      self.next()
+      baseTokens = self.getTokensUntil(["{"])
+      self.expect("{")
+      enumList = []
+      for enumTokens in self.splitTokens(self.getTokensUntil(["}"])):
+        enumTexts = [token.text for token in enumTokens]
+        if (len(enumTokens) == 0) or (enumTokens[0].kind != "name") or not (len(enumTokens) == 1 or enumTexts[1] == "="):
+          raise ValueError("Unsupported enum item \"{}\"".format(getTokenText(enumTokens)))
+        enumValue = None
+        if (len(enumTokens) > 1):
+          enumValue = getTokenText(enumTokens[2:])
+        enumList.append((enumTexts[0], enumValue))
+      self.expect("}")
+    else:
+      #The last token before the ";" is the typedef name
+      defType = "typedef"
+      typeTokens = self.getTokensUntil([";"])[0:-1]
+      if (len(typeTokens) == 0):
+        raise ValueError("Missing typedef type")
+      self.indx -= 1
+
+    nameToken = self.expectName()
+    self.expect(";")
+    defObj = Definition(name=nameToken.text, parentPackageName=packageName, defType=defType, text=getTokenText(self.tokens[startIndx:self.indx]), location=self.getLocation(nameToken))
+
+    if (defType in ["struct", "union"]):
+      for fieldObj in fieldList:
+        defObj.addStructField(fieldObj)
+    elif (defType == "enum"):
+      #Enums without a base type are int
+      baseType = getTokenText(baseTokens)
+      if (len(baseTokens) == 0) or (baseTokens[0].text in ["signed", "unsigned"]):
+        baseType = "int"
+      defObj.setDataType(baseType)
+      for enumName, enumValue in enumList:
+        defObj.addEnumName(enumName, enumValue)
+    else:
+      defObj.setDataType(getTokenText(typeTokens))
 
-  #Recursion base case
-  if (first_ifdef_indx == -1):
-    return pkgTxt
+    self.addDefinition(defObj)
 
-  g_logger.debug("Currently defined macros = {}. Evaluating compilation flags in \"{}\"".format(macroDefines, pkgTxt))
+  def parseStructFields(self):
+    '''
+    Parses one member declaration of a struct or union, which can declare several fields of the same type
+    '''
+    if (self.peekText() in ["struct", "union", "enum"]):
+      raise ValueError("Nested {} types are not supported, use a typedef instead".format(self.peekText()))
 
-  #Isolate first "`if" expression within its endif depth
-  startIdx = first_ifdef_indx
-  endIdx = len(pkgTxt)
+    declTokens = self.getTokensUntil([";"])
+    self.expect(";")
 
-  ifDepth = [0 for i in range(startIdx)]
-  for charIndx in range(startIdx, len(pkgTxt)):
-    subStr = pkgTxt[startIdx:charIndx+1]
-    currentIfDepth = subStr.count("`ifdef ") + subStr.count("`ifndef ") - subStr.count("`endif ")
+    declList = self.splitTokens(declTokens)
+    typeTokens = declList[0][0:-1]
+    nameTokens = [decl[-1] for decl in declList if len(decl) > 0]
+    if (len(typeTokens) == 0) or (len(nameTokens) != len(declList)) or any((len(decl) != 1) for decl in declList[1:]) or any((token.kind != "name") for token in nameTokens):
+      raise ValueError("Unsupported struct field \"{}\"".format(getTokenText(declTokens)))
 
-    ifDepth.append(currentIfDepth)
-    if (ifDepth[-2] > 0) and (currentIfDepth == 0):
-      endIdx = charIndx
-      break
-    
-  ifdefExpr = pkgTxt[startIdx:endIdx+1].strip()
-  ifDepth = ifDepth[startIdx:]
-
-  #Extraction condition type and condition macro
-  conditionStart = 0
-  conditionEnd = None
-
-  macroStarted = False
-  for charIndx in range(len(ifdefExpr)):
-    if (not (re.search("\s", ifdefExpr[charIndx]))) and (ifDepth[charIndx] > 0):
-      macroStarted = True
-    if ((re.search("\s", ifdefExpr[charIndx])) and macroStarted):
-      conditionEnd = charIndx
-      break
-
-  condition_expr = ifdefExpr[conditionStart:conditionEnd]
-  conditionType = condition_expr.strip().split()[0]
-  conditionMacro = condition_expr.strip().split()[-1]
-
-  #Determine if this ifdef has an else block
-  maskedExpr = ""
-  for charIndx in range(len(ifdefExpr)):
-    if (ifDepth[charIndx] > 1):
-      maskedExpr += " "
-    else:
-      maskedExpr += ifdefExpr[charIndx]
+    fieldType = getTokenText(typeTokens)
+    return [StructField(name=token.text, fieldType=fieldType, location=self.getLocation(token)) for token in nameTokens]
 
-  elseIndx = maskedExpr.find("`else")
-  
-  #Extract true string and false string
-  true_str = ifdefExpr[conditionEnd:-1*len("`endif ")]
-  false_str = ""
 
-  if (elseIndx >= 0):
-    true_str = ifdefExpr[conditionEnd:elseIndx]
-    false_str = ifdefExpr[elseIndx+len("`else"):-1*len("`endif ")]
+def parsePkgFile(filePath, macroDefines):
+  g_logger.info("Parsing package file \"{}\"".format(filePath))
 
-  #Evaluate conidtion
-  insertedText = ""
-  if (conditionType == "`ifdef") and (conditionMacro in macroDefines):
-    insertedText = evalCompilationFlags(true_str, macroDefines)
-  elif (conditionType == "`ifndef") and (not (conditionMacro in macroDefines)):
-    insertedText = evalCompilationFlags(true_str, macroDefines)
-  else:
-    insertedText = evalCompilationFlags(false_str, macroDefines)
+  pkgFile = open(filePath, "r")
+  text = pkgFile.read()
+  pkgFile.close()
 
-  #Replace ifdef expression in package text
-  finalTxt = "{} {} {}".format(preceedingTxt, insertedText, pkgTxt[endIdx:])
-  
-  return finalTxt
+  #Tokenize the file, dropping comments and the tokens excluded by compilation flags
+  flagEvaluator = CompilationFlagEvaluator(macroDefines, filePath)
+  tokens = list(flagEvaluator.evalTokens(tokenize(text)))
+  g_profile.count("Package Tokens", len(tokens))
 
+  #Parse package items into definitions
+  definitionList = PackageParser(tokens, filePath).parse()
+  g_profile.count("Definitions", len(definitionList))
 
-def parsePkgFile(filePath, macroDefines):
-  g_logger.info("Parsing package file \"{}\"".format(filePath))
+  return definitionList
 
-  pkgFile = open(filePath, "r")
 
-  #Sanatize text from file. Remove comments
-  line = pkgFile.readline()
-  cleanText = ""
-  longComment = False
-  while(line):
-    if ("*/" in line):
-      longComment = False
-    if (not longComment):
-      cleanText += cleanLine(line)
-    if (("/*" in line) and (not ("*/" in line))):
-      longComment = True
+###################################
+# Parameter Resolution
+###################################
+#Names in expressions and types that are not looked up
+g_unresolvedKeywords = list(g_integerTypeWidths.keys()) + ["signed", "unsigned"]
+
+class SymbolTable:
+  '''
+  Definitions of all package files, by package::name and by plain name. Parameter values are resolved on first use and
+  memoized, following the parameters they depend on, so every parameter and type is only resolved once
+  '''
+  def __init__(self):
+    self.definitions = []
+    self.symbols = {}
+    self.paramValues = {}
+    #Definitions that are being resolved, in dependency order, to report cycles
+    self.resolveStack = []
+
+  def addDefinitions(self, definitionList):
+    for defObj in definitionList:
+      self.definitions.append(defObj)
+      self.symbols[defObj.name] = defObj
+      self.symbols["{}{}".format(defObj.packagePrefix, defObj.name)] = defObj
+
+  def lookup(self, name, packageName=""):
+    '''
+    Returns the definition of a name used in a package. Plain names are looked up in the package first
+    '''
+    if ("::" in name) or (len(packageName) == 0):
+      return self.symbols.get(name)
+
+    defObj = self.symbols.get("{}::{}".format(packageName, name))
+    if (defObj is None):
+      defObj = self.symbols.get(name)
+    return defObj
+
+  def enterDefinition(self, defObj):
+    if (defObj in self.resolveStack):
+      cycleList = self.resolveStack[self.resolveStack.index(defObj):] + [defObj]
+      cycleStr = " -> ".join(["{}{} ({})".format(cycleObj.packagePrefix, cycleObj.name, cycleObj.location) for cycleObj in cycleList])
+      raise ValueError("Circular definition {}".format(cycleStr))
+    self.resolveStack.append(defObj)
+
+  def exitDefinition(self, defObj):
+    self.resolveStack.remove(defObj)
+
+  def getParamValue(self, defObj):
+    '''
+    Returns the value of a parameter, with the parameters it uses replaced by their values
+    '''
+    if (defObj in self.paramValues):
+      return self.paramValues[defObj]
+
+    self.enterDefinition(defObj)
+    try:
+      value = self.resolveText(defObj.paramValue, defObj.parentPackageName, defObj.location)
+    finally:
+      self.exitDefinition(defObj)
+    g_profile.count("Parameter Resolutions")
 
-    line = pkgFile.readline()
+    #Constant expressions are folded, so every use of this parameter gets the value
+    try:
+      value = str(evalConstantExpression(value))
+    except ValueError:
+      pass
 
-  pkgFile.close()
+    self.paramValues[defObj] = value
+    return value
 
-  #Evaluate all compilation flags
-  while ("`if" in cleanText) or ("`define" in cleanText):
-    cleanText = evalCompilationFlags(cleanText, macroDefines)
-
-  #Split file text into definitions
-  definitionStrings = getDefinitionStrings(cleanText)
-  
-  #Parse definition strings
-  definitionDict = {}
-  for stringTup in definitionStrings:
-    string, packageName = stringTup
-    defObj = parseDefinition(string, packageName)
-    if not (defObj is None):
-      definitionDict[defObj.name] = defObj
+  def getBitWidth(self, defObj):
+    '''
+    Returns the bit width of a type definition, calculating it and the types it uses on first use
+    '''
+    if (isinstance(defObj.bitWidth, int)):
+      return defObj.bitWidth
 
-  return definitionDict
+    self.enterDefinition(defObj)
+    try:
+      defObj.caclulateBitWidth(self)
+    finally:
+      self.exitDefinition(defObj)
+    return defObj.bitWidth
+
+  def resolveText(self, text, packageName="", location="", warnUnresolved=True):
+    '''
+    Returns text with every parameter name replaced by its value. Only whole names are replaced, and text without
+    parameters is returned as is
+    '''
+    tokens = list(tokenize(text))
+    resolvedTokens = []
+    replaced = False
+    indx = 0
+    while (indx < len(tokens)):
+      token = tokens[indx]
+      indx += 1
+      if (token.kind != "name") or token.text.startswith("$"):
+        resolvedTokens.append(token)
+        continue
 
+      #Package scoped names are 3 tokens
+      name = token.text
+      if (indx+1 < len(tokens)) and (tokens[indx].text == "::") and (tokens[indx+1].kind == "name"):
+        name = "{}::{}".format(name, tokens[indx+1].text)
+        indx += 2
+
+      defObj = self.lookup(name, packageName)
+      if (defObj is None):
+        if (warnUnresolved) and not (name in g_unresolvedKeywords):
+          g_logger.warning("Unresolved name \"{}\" in \"{}\" at {}. Make sure you specified all required pkg files".format(name, text, location))
+        resolvedTokens.append(Token(token.kind, name, token.lineNumber))
+      elif (defObj.defType == "localparam"):
+        value = self.getParamValue(defObj)
+        if not (value.isdigit()):
+          value = "({})".format(value)
+        resolvedTokens.append(Token("number", value, token.lineNumber))
+        replaced = True
+      else:
+        resolvedTokens.append(Token(token.kind, name, token.lineNumber))
 
-def replaceAllParameters(definitionDict):
-  g_logger.info("Replacing all parameters with values")
+    if not (replaced):
+      return text
+    return getTokenText(resolvedTokens)
 
-  #Replace paramters from longest length to shortest
-  defNameList = sorted(list(definitionDict.keys()), key=len)
-  defNameList.reverse()
 
-  for defName in defNameList:
-    defObj = definitionDict[defName]
-    if (defObj.defType == "localparam"):
-      #Replace all uses of this paremter with parameter value
-      for targetName in definitionDict:
-        targetDef = definitionDict[targetName]
-        targetDef.replaceParam(defObj)
+def resolveAllParameters(symbolTable):
+  g_logger.info("Resolving all parameters")
+  for defObj in symbolTable.definitions:
+    try:
+      defObj.resolveParams(symbolTable)
+    except ValueError as e:
+      g_logger.warning("Could not resolve parameters of \"{}{}\" ({}). {}".format(defObj.packagePrefix, defObj.name, defObj.location, e))
 
 
-def calculateBitWidths(definitionDict):
+def calculateBitWidths(symbolTable):
   g_logger.debug("Calculating bit widths")
-  for defName in definitionDict:
-    defObj = definitionDict[defName]
+  for defObj in symbolTable.definitions:
     try:
-      defObj.caclulateBitWidth(definitionDict)
+      symbolTable.getBitWidth(defObj)
     except:
       pass
       g_logger.warning(traceback.format_exc())
-      g_logger.warning("BIT WIDTH CALCULATION ERROR \"{}\"\n\n".format(defName))
-
-
-def replaceAllCfgParameters(definitionDict, inputDict):
-  g_logger.info("Replacing all parameters used in cfg file with values")
+      g_logger.warning("BIT WIDTH CALCULATION ERROR \"{}\"\n\n".format(defObj.name))
 
-  #Replace paramters from longest length to shortest
-  defNameList = sorted(list(definitionDict.keys()), key=len)
-  defNameList.reverse()
 
-  inputDictStr = json.dumps(inputDict, indent=2, sort_keys=True)
-
-  for defName in defNameList:
-    defObj = definitionDict[defName]
-    if (defObj.defType == "localparam"):
-      #Replace all uses of this paremter with parameter value
-      inputDictStr = inputDictStr.replace(defObj.name, str(defObj.paramValue))
-
-  #Return new dict with replaces params
-  sanitizedDict = json.loads(inputDictStr)
-  return sanitizedDict
+def replaceAllCfgParameters(symbolTable, value):
+  '''
+  Returns a copy of the cfg file values with the parameters used in them replaced by their values. Keys are sorted
+  '''
+  if (isinstance(value, dict)):
+    return {key: replaceAllCfgParameters(symbolTable, value[key]) for key in sorted(value)}
+  if (isinstance(value, list)):
+    return [replaceAllCfgParameters(symbolTable, item) for item in value]
+  if (isinstance(value, str)):
+    return symbolTable.resolveText(value, warnUnresolved=False)
+  return value
 
 ###################################
 # Bus Index and Lane Calculation
 ###################################
 class BusInfo:
-  def __init__(self, name, varType, upperIndx, lowerIndx, laneWidth, definitionDict):
+  def __init__(self, name, varType, upperIndx, lowerIndx, laneWidth, symbolTable, packageName=""):
+    g_profile.count("BusInfo Objects")
     self.name = name
     self.varType = varType
     self.upperIndx = upperIndx
@@ -746,8 +1181,8 @@ class BusInfo:
 
     #Get bus info for all sub buses
     self.subBuses = []
-    if (self.varType in definitionDict):
-      defObj = definitionDict[self.varType]
+    defObj = symbolTable.lookup(self.varType, packageName)
+    if not (defObj is None):
       if (defObj.defType == "struct"):
         fieldUpperInx = self.upperIndx
         for fieldObj in defObj.structFields:
@@ -756,7 +1191,7 @@ class BusInfo:
           fieldWidth = fieldObj.bitWidth
           fieldLowerIndx = fieldUpperInx-fieldWidth+1
 
-          fieldBusInfo = BusInfo(fieldName, fieldType, fieldUpperInx, fieldLowerIndx, self.laneWidth, definitionDict)
+          fieldBusInfo = BusInfo(fieldName, fieldType, fieldUpperInx, fieldLowerIndx, self.laneWidth, symbolTable, defObj.parentPackageName)
           self.subBuses.append(fieldBusInfo)
 
           fieldUpperInx = fieldLowerIndx-1
@@ -816,16 +1251,16 @@ class BusInfo:
 
 
 def isLogicDef(defString):
-  return (defString.strip().split()[0] == "logic")
+  return not (getIntegerTypeMatch(defString) is None)
 
-def calculateBusIndexes(busInputList, laneWidth, definitionDict):
+def calculateBusIndexes(busInputList, laneWidth, symbolTable):
   #Get total bit width of debug bus inputs
   totalBitWidth = 0
   for variableDict in busInputList:
     varName = str(variableDict["Name"])
     varType = str(variableDict["Type"])
-    if (varType in definitionDict):
-      defObj = definitionDict[varType]
+    defObj = symbolTable.lookup(varType)
+    if not (defObj is None):
       if (defObj.bitWidthError):
         raise ValueError("Could not calculate bus indexes. Bus input \"{}\" has an unknown bitwith".format(varName))
       totalBitWidth += defObj.bitWidth
@@ -843,9 +1278,8 @@ def calculateBusIndexes(busInputList, laneWidth, definitionDict):
 
     bitWidth = None
     lowerIndx = None
-    if (varType in definitionDict):
-      defObj = definitionDict[varType]
-      
+    defObj = symbolTable.lookup(varType)
+    if not (defObj is None):
       bitWidth = defObj.bitWidth
       lowerIndx = upperIndx-(bitWidth-1)
     elif (isLogicDef(varType)):
@@ -854,7 +1288,7 @@ def calculateBusIndexes(busInputList, laneWidth, definitionDict):
     else:
       raise ValueError("Could not find definition for variable type \"{}\". Make sure you specified all required pkg files".format(varType))
 
-    busInfoObj = BusInfo(name=varName, varType=varType, upperIndx=upperIndx, lowerIndx=lowerIndx, laneWidth=laneWidth, definitionDict=definitionDict)
+    busInfoObj = BusInfo(name=varName, varType=varType, upperIndx=upperIndx, lowerIndx=lowerIndx, laneWidth=laneWidth, symbolTable=symbolTable)
     busIndxList.append(busInfoObj)
 
     upperIndx = lowerIndx-1
@@ -889,6 +1323,7 @@ def main():
   parser.add_argument("--jsonOutputPath", type=str, default="debugBusInfo.json", help="Output path for where debug mux info json will be written")
   parser.add_argument("--csvOutputPath", type=str, default="debugBusInfo.csv", help="Output path for where debug mux info csv will be written")
   parser.add_argument("--logName", type=str, default="generateClaDoc.log", help="Name of output log file")
+  parser.add_argument("--profileJson", type=str, help="Output path for a json file with the wall/CPU time of each phase and work counters")
   args = parser.parse_args()
 
   global g_logger
@@ -905,9 +1340,10 @@ def main():
       g_logger.error("Mux config file \"{}\" does not exist".format(inputJsonPath))
       sys.exit()
 
-  inputFile = open(inputJsonPath, "r")
-  inputDict = json.load(inputFile)
-  inputFile.close()
+  with g_profile.phase("readMuxCfg"):
+    inputFile = open(inputJsonPath, "r")
+    inputDict = json.load(inputFile)
+    inputFile.close()
 
   #Parse pkg files
   pkgPaths = inputDict["Package Files"]
@@ -915,7 +1351,7 @@ def main():
   if ("Macro Defines" in inputDict):
     macroDefines = inputDict["Macro Defines"]
 
-  definitionDict = {}
+  symbolTable = SymbolTable()
   for filePath in pkgPaths:
     if not (os.path.exists(filePath)):
       absolutePath = escapeBazelSandbox(filePath)
@@ -925,16 +1361,20 @@ def main():
         g_logger.error("Package file \"{}\" does not exist".format(filePath))
         sys.exit()
 
-    definitionDict.update(parsePkgFile(filePath, macroDefines))
+    with g_profile.phase("parsePkgFile"):
+      symbolTable.addDefinitions(parsePkgFile(filePath, macroDefines))
 
-  #Replace parameters in pkg definitions
-  replaceAllParameters(definitionDict)
+  #Resolve parameters in pkg definitions
+  with g_profile.phase("resolveAllParameters"):
+    resolveAllParameters(symbolTable)
 
   #Calculate bit widths for all defined types
-  calculateBitWidths(definitionDict)
+  with g_profile.phase("calculateBitWidths"):
+    calculateBitWidths(symbolTable)
 
   #Replace parameters in debug bus info file
-  inputDict = replaceAllCfgParameters(definitionDict, inputDict)
+  with g_profile.phase("replaceAllCfgParameters"):
+    inputDict = replaceAllCfgParameters(symbolTable, inputDict)
 
   #Parse debug bus info file
   dbmInstances = {}
@@ -952,7 +1392,8 @@ def main():
     
     busIndxList = []
     try:
-      busIndxList = calculateBusIndexes(busInputList, laneWidth, definitionDict)
+      with g_profile.phase("calculateBusIndexes"):
+        busIndxList = calculateBusIndexes(busInputList, laneWidth, symbolTable)
     except:
       g_logger.error(traceback.format_exc())
       g_logger.error("BUS INDEX CALCULATION ERROR")
@@ -984,9 +1425,10 @@ def main():
     debugBusInfoDict["Debug Mux Instances"][muxName] = muxInfo
 
   jsonPath = args.jsonOutputPath
-  jsonFile = open(jsonPath, "w")
-  jsonFile.write(json.dumps(debugBusInfoDict, indent=2, sort_keys=True))
-  jsonFile.close()
+  with g_profile.phase("writeJson"):
+    jsonFile = open(jsonPath, "w")
+    jsonFile.write(json.dumps(debugBusInfoDict, indent=2, sort_keys=True))
+    jsonFile.close()
 
   g_logger.info("CLA MUX info dumped to \"{}\"".format(os.path.join(os.getcwd(), jsonPath)))
 
@@ -1009,10 +1451,15 @@ def main():
   csvStr.replace("\n\n\n", "\n")
 
   csvPath = args.csvOutputPath
-  csvFile = open(csvPath, "w")
-  csvFile.write(csvStr)
-  csvFile.close()
+  with g_profile.phase("writeCsv"):
+    csvFile = open(csvPath, "w")
+    csvFile.write(csvStr)
+    csvFile.close()
 
   g_logger.info("CLA MUX documentation created in \"{}\"".format(os.path.join(os.getcwd(), csvPath)))
 
+  if (args.profileJson):
+    g_profile.writeToJsonFile(args.profileJson, {"Mux Config Path": inputJsonPath})
+    g_logger.info("Profile written to \"{}\"".format(args.profileJson))
+
 main()
\ No newline at end of file